@@ -1,4 +1,8 @@
-from PyQt5.QtWidgets import QPlainTextEdit, QTabWidget
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QPlainTextEdit, QTableWidget, QTableWidgetItem, QTabWidget
+
+from ide.skuld.semantic import Symbol
+
+_SYMBOL_COLUMNS = ("Nombre", "Categoría", "Tipo", "Ámbito", "Línea")
 
 
 class AnalysisPanel(QTabWidget):
@@ -9,13 +13,15 @@ class AnalysisPanel(QTabWidget):
         self._syntax = self._make_output("Árbol sintáctico / salida estructurada.")
         self._semantic = self._make_output("Resultados semánticos y validaciones.")
         self._intermediate = self._make_output("Código intermedio (tres direcciones, etc.).")
-        self._symbols = self._make_output("Tabla de símbolos.")
+        self._symbols = self._make_symbol_table()
+        self._profile = self._make_output("Perfil de la ejecución (Compilar > Perfilar ejecución).")
 
         self.addTab(self._tokens, "Tokens")
         self.addTab(self._syntax, "Sintáctico")
         self.addTab(self._semantic, "Semántico")
         self.addTab(self._intermediate, "Intermedio")
         self.addTab(self._symbols, "Símbolos")
+        self.addTab(self._profile, "Perfil")
 
     def set_tokens(self, text: str) -> None:
         self._tokens.setPlainText(text)
@@ -29,8 +35,22 @@ class AnalysisPanel(QTabWidget):
     def set_intermediate(self, text: str) -> None:
         self._intermediate.setPlainText(text)
 
-    def set_symbols(self, text: str) -> None:
-        self._symbols.setPlainText(text)
+    def set_symbols(self, symbols: list[Symbol]) -> None:
+        table = self._symbols
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(symbols))
+        for row, symbol in enumerate(symbols):
+            values = (symbol.name, symbol.kind, symbol.signature(), symbol.scope, str(symbol.line))
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(value))
+        table.setUpdatesEnabled(True)
+
+    def set_profile(self, text: str) -> None:
+        self._profile.setPlainText(text)
+
+    def show_profile(self, text: str) -> None:
+        self.set_profile(text)
+        self.setCurrentWidget(self._profile)
 
     @staticmethod
     def _make_output(text: str) -> QPlainTextEdit:
@@ -38,3 +58,14 @@ class AnalysisPanel(QTabWidget):
         output.setReadOnly(True)
         output.setPlainText(text)
         return output
+
+    @staticmethod
+    def _make_symbol_table() -> QTableWidget:
+        table = QTableWidget(0, len(_SYMBOL_COLUMNS))
+        table.setHorizontalHeaderLabels(_SYMBOL_COLUMNS)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
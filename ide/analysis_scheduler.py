@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+from ide.code_editor import CodeEditor
+from ide.skuld.analysis import AnalysisResult, DocumentAnalyzer
+from ide.skuld.incremental_lexer import IncrementalLexer
+from ide.skuld.phases import DEFAULT_OPTIONS, PhaseOptions
+
+DEFAULT_DEBOUNCE_MS = 150
+
+
+class AnalysisTask(QThread):
+    """Analiza una instantánea del documento fuera del hilo de la interfaz."""
+
+    result_ready = pyqtSignal(object, object)
+
+    def __init__(
+        self,
+        editor: CodeEditor,
+        analyzer: DocumentAnalyzer,
+        source: str,
+        version: int,
+        options: PhaseOptions = DEFAULT_OPTIONS,
+        lexer: IncrementalLexer | None = None,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.editor = editor
+        self.analyzer = analyzer
+        self.source = source
+        self.version = version
+        self.options = options
+        self.lexer = lexer
+
+    def run(self) -> None:  # type: ignore[override]
+        try:
+            result = self.analyzer.analyze(self.source, self.version, self.options, self.lexer)
+        except Exception as exc:  # noqa: BLE001 - un fallo no debe tumbar la interfaz
+            result = AnalysisResult(self.version, "", f"Error inesperado en el análisis:\n{exc}")
+        self.result_ready.emit(self.editor, result)
+
+
+class AnalysisScheduler(QObject):
+    """Análisis en vivo con retardo tras cada edición.
+
+    Las ediciones reinician el temporizador; al vencer se toma el texto más
+    reciente. Mientras hay una tarea en curso solo se recuerda el último
+    editor pendiente, de modo que las versiones intermedias nunca se
+    analizan. La versión es ``QTextDocument.revision()`` y un resultado cuya
+    versión ya no coincide con la del documento se descarta.
+    """
+
+    result_ready = pyqtSignal(object, object)
+
+    def __init__(self, delay_ms: int = DEFAULT_DEBOUNCE_MS, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._on_timeout)
+        self._editor: CodeEditor | None = None
+        self._pending: CodeEditor | None = None
+        self._task: AnalysisTask | None = None
+        self.options = DEFAULT_OPTIONS
+
+    def delay_ms(self) -> int:
+        return self._timer.interval()
+
+    def set_delay_ms(self, delay_ms: int) -> None:
+        self._timer.setInterval(max(0, delay_ms))
+
+    def schedule(self, editor: CodeEditor) -> None:
+        self._editor = editor
+        self._timer.start()
+
+    def cancel(self) -> None:
+        self._timer.stop()
+        self._editor = None
+        self._pending = None
+
+    def shutdown(self, timeout_ms: int = 2000) -> None:
+        self.cancel()
+        if self._task is not None:
+            self._task.wait(timeout_ms)
+
+    def _on_timeout(self) -> None:
+        editor = self._editor
+        self._editor = None
+        if editor is None or sip.isdeleted(editor):
+            return
+        if self._task is not None:
+            self._pending = editor
+            return
+        self._start(editor)
+
+    def _start(self, editor: CodeEditor) -> None:
+        version = editor.document().revision()
+        # Los tokens salen del lexer incremental del editor, que ya está al día
+        # con este texto: el análisis no vuelve a tokenizar el documento.
+        task = AnalysisTask(
+            editor,
+            editor.analyzer(),
+            editor.toPlainText(),
+            version,
+            self.options,
+            editor.lexer().snapshot(),
+            self,
+        )
+        task.result_ready.connect(self._on_task_finished)
+        task.finished.connect(task.deleteLater)
+        self._task = task
+        task.start()
+
+    def _on_task_finished(self, editor: CodeEditor, result: AnalysisResult) -> None:
+        self._task = None
+        if not sip.isdeleted(editor) and editor.document().revision() == result.version:
+            self.result_ready.emit(editor, result)
+
+        pending = self._pending
+        self._pending = None
+        if pending is not None and not sip.isdeleted(pending):
+            self._start(pending)
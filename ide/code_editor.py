@@ -2,6 +2,9 @@ from PyQt5.QtCore import QRect, QSize, Qt
 from PyQt5.QtGui import QColor, QPainter, QTextCursor, QTextFormat
 from PyQt5.QtWidgets import QPlainTextEdit, QTextEdit, QWidget
 
+from ide.skuld.analysis import DocumentAnalyzer
+from ide.skuld.incremental_lexer import IncrementalLexer
+from ide.syntax_highlighter import SkuldHighlighter
 from ide.theme import steins_gate_theme
 
 
@@ -22,7 +25,15 @@ class CodeEditor(QPlainTextEdit):
         super().__init__()
         self._line_number_area = LineNumberArea(self)
         self._search_selections: list[QTextEdit.ExtraSelection] = []
-
+        # Muestras del último perfil por línea (1-based); se descartan al editar.
+        self._line_hits: dict[int, int] = {}
+        self._lexer = IncrementalLexer()
+        self._analyzer = DocumentAnalyzer()
+
+        # El lexer debe conectarse antes que el resaltador para que este
+        # encuentre los tokens ya actualizados al recibir el mismo cambio.
+        self.document().contentsChange.connect(self._on_contents_change)
+        self._highlighter = SkuldHighlighter(self.document(), self._lexer)
         self.blockCountChanged.connect(self.update_line_number_area_width)
         self.updateRequest.connect(self.update_line_number_area)
         self.cursorPositionChanged.connect(self.highlight_current_line)
@@ -31,10 +42,70 @@ class CodeEditor(QPlainTextEdit):
         self.highlight_current_line()
         self.setLineWrapMode(QPlainTextEdit.NoWrap)
 
+    def lexer(self) -> IncrementalLexer:
+        return self._lexer
+
+    def analyzer(self) -> DocumentAnalyzer:
+        return self._analyzer
+
+    def set_line_hits(self, hits: dict[int, int]) -> None:
+        self._line_hits = {line: count for line, count in hits.items() if line > 0 and count > 0}
+        self.update_line_number_area_width(0)
+        self._line_number_area.update()
+
+    def clear_line_hits(self) -> None:
+        if self._line_hits:
+            self.set_line_hits({})
+
+    def _on_contents_change(self, position: int, _removed: int, added: int) -> None:
+        self.clear_line_hits()
+        document = self.document()
+        first_block = document.findBlock(position)
+        last_block = document.findBlock(position + added)
+        if not first_block.isValid():
+            self._lexer.reset(document.toPlainText())
+            return
+        if not last_block.isValid():
+            last_block = document.lastBlock()
+
+        first_line = first_block.blockNumber()
+        last_line = last_block.blockNumber()
+        line_delta = document.blockCount() - self._lexer.line_count
+        removed_lines = (last_line - first_line + 1) - line_delta
+        if removed_lines < 0:
+            self._lexer.reset(document.toPlainText())
+            return
+
+        new_lines: list[str] = []
+        block = first_block
+        while block.isValid() and block.blockNumber() <= last_line:
+            new_lines.append(block.text())
+            block = block.next()
+        self._lexer.update(first_line, removed_lines, new_lines)
+
+    def refresh_syntax_theme(self) -> None:
+        first_visible = self.firstVisibleBlock()
+        last_visible = first_visible.blockNumber()
+        viewport_height = self.viewport().height()
+        offset = self.contentOffset()
+        block = first_visible
+        while block.isValid():
+            if self.blockBoundingGeometry(block).translated(offset).top() > viewport_height:
+                break
+            last_visible = block.blockNumber()
+            block = block.next()
+        self._highlighter.apply_theme(first_visible, last_visible)
+
     def line_number_area_width(self) -> int:
         digits = max(1, len(str(self.blockCount())))
         space = 6 + self.fontMetrics().horizontalAdvance("9") * digits
-        return space
+        return space + self._hits_column_width()
+
+    def _hits_column_width(self) -> int:
+        if not self._line_hits:
+            return 0
+        digits = len(str(max(self._line_hits.values())))
+        return 8 + self.fontMetrics().horizontalAdvance("9") * digits
 
     def update_line_number_area_width(self, _block_count: int) -> None:
         self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
@@ -62,11 +133,21 @@ class CodeEditor(QPlainTextEdit):
         block_number = block.blockNumber()
         top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
         bottom = top + int(self.blockBoundingRect(block).height())
+        hits_width = self._hits_column_width()
+        max_hits = max(self._line_hits.values(), default=0)
 
         while block.isValid() and top <= event.rect().bottom():
             if block.isVisible() and bottom >= event.rect().top():
                 number = str(block_number + 1)
                 block_height = int(self.blockBoundingRect(block).height())
+                hits = self._line_hits.get(block_number + 1)
+                if hits:
+                    # Barra de calor proporcional a la línea más muestreada.
+                    heat = QColor(colors.accent)
+                    heat.setAlpha(40 + 160 * hits // max_hits)
+                    painter.fillRect(0, top, hits_width - 4, block_height, heat)
+                    painter.setPen(QColor(colors.foreground))
+                    painter.drawText(0, top, hits_width - 6, block_height, Qt.AlignRight | Qt.AlignVCenter, str(hits))
                 painter.setPen(QColor(colors.comments))
                 painter.drawText(
                     0,
@@ -1,17 +1,42 @@
 from __future__ import annotations
 
+import json
 import os
+import queue
 import shlex
+import shutil
 import subprocess
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import List
 
+from ide.output_stream import OutputStream
+from ide.skuld.phases import (
+    DEFAULT_OPTIONS,
+    IN_PROCESS_PHASES,
+    PhaseOptions,
+    execution_phase,
+    profile_phase,
+    upstream_outputs,
+)
+from ide.skuld.profiler import ProfileResult
+from ide.skuld.vm import ExecutionInterrupted
+
 
 @dataclass
 class CompilerResult:
     returncode: int
     stdout: str
     stderr: str
+    cancelled: bool = False
+    timed_out: bool = False
+    profile: ProfileResult | None = None
+    # Salida de las fases anteriores calculadas en la misma ejecución.
+    stages: dict[str, str] = field(default_factory=dict)
+    # La salida estándar ya se entregó por un OutputStream y no está en stdout.
+    streamed: bool = False
 
 
 PHASE_ARGS = {
@@ -22,6 +47,14 @@ PHASE_ARGS = {
     "ejecucion": "--ejecutar",
 }
 
+# El perfilado muestrea los marcos del propio proceso, así que nunca se
+# delega en el compilador externo.
+PROFILE_PHASE = "perfil"
+
+DEFAULT_TIMEOUT_SECONDS = 60
+_POLL_INTERVAL_SECONDS = 0.1
+SERVER_ARG = "--servidor"
+
 
 def _get_compiler_command() -> List[str] | None:
     env_command = os.getenv("SKULD_COMPILER_CMD")
@@ -30,24 +63,436 @@ def _get_compiler_command() -> List[str] | None:
     return None
 
 
-def run_compiler(phase: str, source_path: str) -> CompilerResult:
+def _missing_compiler_result() -> CompilerResult:
+    return CompilerResult(
+        returncode=1,
+        stdout="",
+        stderr=(
+            "No se encontró comando del compilador. "
+            "Define la variable de entorno SKULD_COMPILER_CMD."
+        ),
+    )
+
+
+def compiler_identity() -> str:
+    """Identifica al compilador que produciría el resultado de una fase.
+
+    Para un comando externo se usa el comando y la fecha del ejecutable;
+    para el compilador integrado, el tamaño y la fecha de sus módulos.
+    """
+    command = _get_compiler_command()
+    if command:
+        executable = shutil.which(command[0])
+        stamp = _file_stamp(Path(executable)) if executable else ""
+        return f"{shlex.join(command)}|{stamp}"
+    package = Path(__file__).resolve().parent / "skuld"
+    return "integrado|" + ";".join(f"{path.name}:{_file_stamp(path)}" for path in sorted(package.glob("*.py")))
+
+
+def _file_stamp(path: Path) -> str:
+    try:
+        stat = path.stat()
+    except OSError:
+        return ""
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def runs_in_process(phase: str) -> bool:
+    return phase == PROFILE_PHASE or (not _get_compiler_command() and phase in IN_PROCESS_PHASES)
+
+
+def build_phase_command(command: List[str], phase: str, source_path: str) -> List[str]:
+    phase_arg = PHASE_ARGS.get(phase, "")
+    return [*command, phase_arg, source_path] if phase_arg else [*command, source_path]
+
+
+def run_compiler(
+    phase: str,
+    source_path: str,
+    *,
+    timeout: float | None = None,
+    cancel_event: threading.Event | None = None,
+    use_server: bool = False,
+    options: PhaseOptions = DEFAULT_OPTIONS,
+    output: OutputStream | None = None,
+    with_stages: bool = True,
+) -> CompilerResult:
     command = _get_compiler_command()
+    if phase == PROFILE_PHASE or (not command and phase in IN_PROCESS_PHASES):
+        return run_in_process(
+            phase,
+            source_path,
+            options,
+            timeout=timeout,
+            cancel_event=cancel_event,
+            output=output,
+            with_stages=with_stages,
+        )
     if not command:
-        return CompilerResult(
-            returncode=1,
-            stdout="",
-            stderr=(
-                "No se encontró comando del compilador. "
-                "Define la variable de entorno SKULD_COMPILER_CMD."
-            ),
+        return _missing_compiler_result()
+
+    if use_server:
+        # Sin respuesta del servidor (no compatible o caído a mitad de la
+        # petición) la fase se ejecuta igualmente con un proceso propio.
+        server = _get_compiler_server(command)
+        if server.supported is not False:
+            result = server.request(phase, source_path, timeout=timeout, cancel_event=cancel_event)
+            if result is not None:
+                return result
+
+    full_command = build_phase_command(command, phase, source_path)
+    try:
+        process = subprocess.Popen(
+            full_command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
         )
+    except OSError as exc:
+        return CompilerResult(1, "", f"No fue posible iniciar el compilador:\n{exc}")
 
-    phase_arg = PHASE_ARGS.get(phase, "")
-    full_command = [*command, phase_arg, source_path] if phase_arg else [*command, source_path]
-    result = subprocess.run(
-        full_command,
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    return CompilerResult(result.returncode, result.stdout, result.stderr)
+    deadline = time.monotonic() + timeout if timeout else None
+    if output is not None:
+        return _stream_process(process, output, timeout, deadline, cancel_event)
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=_POLL_INTERVAL_SECONDS)
+            return CompilerResult(process.returncode, stdout, stderr)
+        except subprocess.TimeoutExpired:
+            pass
+
+        if cancel_event is not None and cancel_event.is_set():
+            stdout, stderr = _kill_process(process)
+            return CompilerResult(-1, stdout, "Fase cancelada por el usuario.", cancelled=True)
+
+        if deadline is not None and time.monotonic() >= deadline:
+            stdout, stderr = _kill_process(process)
+            return CompilerResult(
+                -1,
+                stdout,
+                f"El compilador excedió el tiempo límite ({timeout:g} s).",
+                timed_out=True,
+            )
+
+
+def _stream_process(
+    process: subprocess.Popen,
+    output: OutputStream,
+    timeout: float | None,
+    deadline: float | None,
+    cancel_event: threading.Event | None,
+) -> CompilerResult:
+    # Un hilo entrega stdout línea a línea; si la interfaz va atrasada,
+    # OutputStream.write bloquea la lectura y el proceso espera con la
+    # tubería llena.
+    stderr_parts: list[str] = []
+
+    def read_stdout() -> None:
+        for line in process.stdout:
+            output.write(line)
+
+    def read_stderr() -> None:
+        stderr_parts.append(process.stderr.read())
+
+    readers = [threading.Thread(target=read_stdout, daemon=True), threading.Thread(target=read_stderr, daemon=True)]
+    for reader in readers:
+        reader.start()
+
+    result: CompilerResult | None = None
+    while result is None:
+        try:
+            process.wait(timeout=_POLL_INTERVAL_SECONDS)
+        except subprocess.TimeoutExpired:
+            if cancel_event is not None and cancel_event.is_set():
+                process.kill()
+                result = CompilerResult(-1, "", "Fase cancelada por el usuario.", cancelled=True)
+            elif deadline is not None and time.monotonic() >= deadline:
+                process.kill()
+                result = CompilerResult(
+                    -1, "", f"El compilador excedió el tiempo límite ({timeout:g} s).", timed_out=True
+                )
+            continue
+        for reader in readers:
+            reader.join()
+        result = CompilerResult(process.returncode, "", "".join(stderr_parts))
+    output.close()
+    result.streamed = True
+    return result
+
+
+def run_in_process(
+    phase: str,
+    source_path: str,
+    options: PhaseOptions = DEFAULT_OPTIONS,
+    *,
+    timeout: float | None = None,
+    cancel_event: threading.Event | None = None,
+    output: OutputStream | None = None,
+    with_stages: bool = True,
+) -> CompilerResult:
+    # ``with_stages`` agrega la salida de las fases anteriores; la tubería
+    # completa no la necesita porque ejecuta cada fase por separado.
+    source = read_source(Path(source_path))
+    if source is None:
+        return CompilerResult(1, "", f"No fue posible leer el archivo fuente:\n{source_path}")
+    if phase in ("ejecucion", PROFILE_PHASE):
+        result = _run_execution(source, options, timeout, cancel_event, profile=phase == PROFILE_PHASE, output=output)
+    else:
+        stdout, stderr = IN_PROCESS_PHASES[phase](source, options)
+        result = CompilerResult(0, stdout, stderr)
+    if with_stages and not result.cancelled and not result.timed_out:
+        result.stages = upstream_outputs(source, phase, options)
+    return result
+
+
+def _run_execution(
+    source: str,
+    options: PhaseOptions,
+    timeout: float | None,
+    cancel_event: threading.Event | None,
+    *,
+    profile: bool = False,
+    output: OutputStream | None = None,
+) -> CompilerResult:
+    # La máquina virtual consulta periódicamente si debe detenerse, así un
+    # bucle infinito respeta la cancelación y el tiempo límite.
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def should_stop() -> bool:
+        if cancel_event is not None and cancel_event.is_set():
+            return True
+        return deadline is not None and time.monotonic() >= deadline
+
+    write = output.write if output is not None else None
+    profile_result = None
+    try:
+        if profile:
+            stdout, stderr, profile_result = profile_phase(source, options, should_stop, write)
+        else:
+            stdout, stderr = execution_phase(source, options, should_stop, write)
+    except ExecutionInterrupted:
+        if cancel_event is not None and cancel_event.is_set():
+            return CompilerResult(-1, "", "Fase cancelada por el usuario.", cancelled=True)
+        return CompilerResult(-1, "", f"El programa excedió el tiempo límite ({timeout:g} s).", timed_out=True)
+    finally:
+        if output is not None:
+            output.close()
+    return CompilerResult(0, stdout, stderr, profile=profile_result, streamed=output is not None)
+
+
+def read_source(path: Path) -> str | None:
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    for enc in ("utf-8-sig", "utf-8", "cp1252", "latin-1"):
+        try:
+            return raw.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def _kill_process(process: subprocess.Popen) -> tuple[str, str]:
+    process.kill()
+    stdout, stderr = process.communicate()
+    return stdout or "", stderr or ""
+
+
+class CompilerServer:
+    """Proceso persistente del compilador que atiende peticiones JSON por línea.
+
+    El IDE arranca ``<comando> --servidor`` y escribe una petición por línea en
+    stdin: ``{"id": 1, "phase": "lexico", "source": "ruta.stn"}``. El compilador
+    responde en stdout con ``{"id": 1, "returncode": 0, "stdout": "...", "stderr": ""}``.
+    Al arrancar se envía ``{"id": 0, "phase": "ping"}`` y se espera ``{"id": 0, "pong": true}``;
+    si el comando no responde así, se marca como no compatible y se usa el modo de una sola ejecución.
+
+    ``request`` devuelve ``None`` cuando el servidor no está disponible o se
+    cae a mitad de una petición; quien llama repite entonces esa petición en
+    modo de una sola ejecución, y el servidor se vuelve a arrancar en la
+    siguiente.
+    """
+
+    HANDSHAKE_TIMEOUT_SECONDS = 3.0
+    MAX_CONSECUTIVE_CRASHES = 3
+
+    def __init__(self, command: List[str]) -> None:
+        self.command = list(command)
+        self.supported: bool | None = None
+        self._process: subprocess.Popen | None = None
+        self._responses: queue.Queue[dict | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._consecutive_crashes = 0
+
+    def request(
+        self,
+        phase: str,
+        source_path: str,
+        *,
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> CompilerResult | None:
+        with self._lock:
+            if not self._ensure_running():
+                return None
+
+            request_id = self._next_id
+            self._next_id += 1
+            payload = {"id": request_id, "phase": phase, "source": source_path}
+            if not self._send(payload):
+                self._on_crash()
+                return None
+
+            deadline = time.monotonic() + timeout if timeout else None
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    self._stop_process()
+                    return CompilerResult(-1, "", "Fase cancelada por el usuario.", cancelled=True)
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._stop_process()
+                    return CompilerResult(
+                        -1,
+                        "",
+                        f"El compilador excedió el tiempo límite ({timeout:g} s).",
+                        timed_out=True,
+                    )
+
+                try:
+                    message = self._responses.get(timeout=_POLL_INTERVAL_SECONDS)
+                except queue.Empty:
+                    continue
+                if message is None:
+                    self._on_crash()
+                    return None
+                if message.get("id") != request_id:
+                    continue
+
+                self._consecutive_crashes = 0
+                return CompilerResult(
+                    int(message.get("returncode", 1)),
+                    str(message.get("stdout", "")),
+                    str(message.get("stderr", "")),
+                )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stop_process()
+
+    def _ensure_running(self) -> bool:
+        if self._process is not None and self._process.poll() is None:
+            return True
+        if self.supported is False:
+            return False
+        if self._consecutive_crashes >= self.MAX_CONSECUTIVE_CRASHES:
+            self.supported = False
+            return False
+        return self._start()
+
+    def _start(self) -> bool:
+        try:
+            process = subprocess.Popen(
+                [*self.command, SERVER_ARG],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                # Los errores de una petición caída se ven al repetirla en modo de una sola ejecución.
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+            )
+        except OSError:
+            self.supported = False
+            return False
+
+        self._process = process
+        self._responses = queue.Queue()
+        threading.Thread(target=self._read_stdout, args=(process, self._responses), daemon=True).start()
+
+        if not self._send({"id": 0, "phase": "ping"}):
+            self._reject()
+            return False
+        try:
+            message = self._responses.get(timeout=self.HANDSHAKE_TIMEOUT_SECONDS)
+        except queue.Empty:
+            message = None
+        if not message or message.get("id") != 0 or not message.get("pong"):
+            self._reject()
+            return False
+
+        self.supported = True
+        return True
+
+    def _reject(self) -> None:
+        # Solo se descarta el protocolo si nunca funcionó; un servidor que ya
+        # respondió antes simplemente se cuenta como caída.
+        if self.supported is None:
+            self.supported = False
+        else:
+            self._consecutive_crashes += 1
+        self._stop_process()
+
+    def _send(self, payload: dict) -> bool:
+        process = self._process
+        if process is None or process.stdin is None:
+            return False
+        try:
+            process.stdin.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            process.stdin.flush()
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def _on_crash(self) -> None:
+        self._consecutive_crashes += 1
+        self._stop_process()
+
+    def _stop_process(self) -> None:
+        process = self._process
+        self._process = None
+        if process is None:
+            return
+        if process.poll() is None:
+            process.kill()
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, responses: queue.Queue) -> None:
+        assert process.stdout is not None
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(message, dict):
+                responses.put(message)
+        responses.put(None)
+
+
+_server: CompilerServer | None = None
+_server_lock = threading.Lock()
+
+
+def _get_compiler_server(command: List[str]) -> CompilerServer:
+    global _server
+    with _server_lock:
+        if _server is None or _server.command != command:
+            if _server is not None:
+                _server.shutdown()
+            _server = CompilerServer(command)
+        return _server
+
+
+def shutdown_compiler_server() -> None:
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server = None
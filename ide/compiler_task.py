@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from ide.compiler_runner import CompilerResult, compiler_identity, run_compiler
+from ide.output_stream import OutputStream
+from ide.phase_cache import CACHEABLE_PHASES, PhaseCache, phase_cache_key
+from ide.skuld.phases import DEFAULT_OPTIONS, PhaseOptions
+
+# Fases cuya salida estándar es la del programa y se entrega mientras corre.
+STREAMED_PHASES = ("ejecucion", "perfil")
+
+
+class CompilerTask(QThread):
+    """Ejecuta una fase del compilador fuera del hilo de la interfaz."""
+
+    result_ready = pyqtSignal(str, object)
+
+    def __init__(
+        self,
+        phase: str,
+        source_path: str,
+        *,
+        timeout: float | None = None,
+        use_server: bool = False,
+        options: PhaseOptions = DEFAULT_OPTIONS,
+        output: OutputStream | None = None,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.phase = phase
+        self.source_path = source_path
+        self.timeout = timeout
+        self.use_server = use_server
+        self.options = options
+        self.output = output
+        self._cancel_event = output.cancel_event if output is not None else threading.Event()
+
+    def run(self) -> None:  # type: ignore[override]
+        try:
+            result = run_compiler(
+                self.phase,
+                self.source_path,
+                timeout=self.timeout,
+                cancel_event=self._cancel_event,
+                use_server=self.use_server,
+                options=self.options,
+                output=self.output,
+            )
+        except Exception as exc:  # noqa: BLE001 - cualquier fallo debe llegar a la consola
+            result = CompilerResult(1, "", f"Error inesperado ejecutando la fase {self.phase}:\n{exc}")
+        self.result_ready.emit(self.phase, result)
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+
+class PipelineTask(CompilerTask):
+    """Ejecuta varias fases seguidas y entrega cada una en cuanto termina.
+
+    ``stage_ready`` se emite por fase con su resultado, los segundos que
+    tardó y si salió de la caché; al acabar, ``pipeline_finished`` entrega
+    la lista de tiempos. La secuencia se detiene en la primera fase con
+    errores, ya que las siguientes solo los repetirían.
+    """
+
+    stage_ready = pyqtSignal(str, object, float, bool)
+    pipeline_finished = pyqtSignal(object)
+
+    def __init__(
+        self,
+        phases: tuple[str, ...],
+        source_path: str,
+        source: str,
+        *,
+        cache: PhaseCache | None = None,
+        timeout: float | None = None,
+        use_server: bool = False,
+        options: PhaseOptions = DEFAULT_OPTIONS,
+        output: OutputStream | None = None,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(
+            phases[0],
+            source_path,
+            timeout=timeout,
+            use_server=use_server,
+            options=options,
+            output=output,
+            parent=parent,
+        )
+        self.phases = phases
+        self.source = source
+        self.cache = cache
+
+    def run(self) -> None:  # type: ignore[override]
+        timings: list[tuple[str, float, bool]] = []
+        identity = compiler_identity() if self.cache is not None else ""
+        for phase in self.phases:
+            if self.is_cancelled():
+                break
+            self.phase = phase
+            started = time.perf_counter()
+            key = None
+            result = None
+            if self.cache is not None and phase in CACHEABLE_PHASES:
+                key = phase_cache_key(phase, self.source, identity, self.options)
+                result = self.cache.get(key)
+            from_cache = result is not None
+            if result is None:
+                result = self._run_phase(phase)
+                if key is not None:
+                    self.cache.put(key, result)
+            elapsed = time.perf_counter() - started
+            timings.append((phase, elapsed, from_cache))
+            self.stage_ready.emit(phase, result, elapsed, from_cache)
+            if result.cancelled or result.timed_out or result.returncode != 0 or result.stderr:
+                break
+        self.pipeline_finished.emit(timings)
+
+    def _run_phase(self, phase: str) -> CompilerResult:
+        try:
+            return run_compiler(
+                phase,
+                self.source_path,
+                timeout=self.timeout,
+                cancel_event=self._cancel_event,
+                use_server=self.use_server,
+                options=self.options,
+                output=self.output if phase in STREAMED_PHASES else None,
+                # Cada fase ya llena su propia pestaña.
+                with_stages=False,
+            )
+        except Exception as exc:  # noqa: BLE001 - cualquier fallo debe llegar a la consola
+            return CompilerResult(1, "", f"Error inesperado ejecutando la fase {phase}:\n{exc}")
@@ -1,4 +1,11 @@
-from PyQt5.QtWidgets import QPlainTextEdit, QTabWidget
+from PyQt5.QtCore import QTimer, QUrl
+from PyQt5.QtGui import QDesktopServices, QTextCursor
+from PyQt5.QtWidgets import QLabel, QPlainTextEdit, QTabWidget, QVBoxLayout, QWidget
+
+from ide.output_stream import OutputStream
+
+# Cada cuánto se vuelca en la pestaña la salida pendiente del programa.
+OUTPUT_FLUSH_INTERVAL_MS = 50
 
 
 class ConsolePanel(QTabWidget):
@@ -8,10 +15,25 @@ class ConsolePanel(QTabWidget):
         self._console = self._make_output("Bienvenido a Reading Steiner IDE\nEl Psy Kongroo\nListo para compilar...")
         self._errors = self._make_output("Errores léxicos, sintácticos y semánticos aparecerán aquí.")
         self._execution = self._make_output("Salida de ejecución del programa compilado.")
+        self._spill_label = QLabel()
+        self._spill_label.setWordWrap(True)
+        self._spill_label.setVisible(False)
+        self._spill_label.linkActivated.connect(lambda url: QDesktopServices.openUrl(QUrl(url)))
+        self._output: OutputStream | None = None
+        self._output_timer = QTimer(self)
+        self._output_timer.setInterval(OUTPUT_FLUSH_INTERVAL_MS)
+        self._output_timer.timeout.connect(self._flush_output)
+
+        execution_container = QWidget()
+        execution_layout = QVBoxLayout(execution_container)
+        execution_layout.setContentsMargins(0, 0, 0, 0)
+        execution_layout.setSpacing(2)
+        execution_layout.addWidget(self._spill_label)
+        execution_layout.addWidget(self._execution, 1)
 
         self.addTab(self._console, "Consola")
         self.addTab(self._errors, "Errores")
-        self.addTab(self._execution, "Ejecución")
+        self.addTab(execution_container, "Ejecución")
 
     def append_console(self, text: str) -> None:
         self._console.appendPlainText(text)
@@ -22,10 +44,54 @@ class ConsolePanel(QTabWidget):
     def append_execution(self, text: str) -> None:
         self._execution.appendPlainText(text)
 
+    def attach_output(self, output: OutputStream) -> None:
+        """Muestra en la pestaña de ejecución la salida de ``output`` mientras llega."""
+        self.finish_output()
+        self._output = output
+        self._spill_label.setVisible(False)
+        cursor = self._execution.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        if cursor.block().text():
+            cursor.insertText("\n")
+        self._output_timer.start()
+
+    def finish_output(self) -> None:
+        """Vuelca lo que quede pendiente y deja de seguir la salida actual."""
+        output = self._output
+        if output is None:
+            return
+        self._output_timer.stop()
+        self._flush_output()
+        self._output = None
+        if output.closed and not output.total_bytes:
+            self.append_execution("(sin salida)")
+
     def clear_all(self) -> None:
         self._console.clear()
         self._errors.clear()
         self._execution.clear()
+        self._spill_label.setVisible(False)
+
+    def _flush_output(self) -> None:
+        output = self._output
+        if output is None:
+            return
+        text = output.drain()
+        if text:
+            scrollbar = self._execution.verticalScrollBar()
+            follow = scrollbar.value() >= scrollbar.maximum() - 4
+            cursor = QTextCursor(self._execution.document())
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text)
+            if follow:
+                scrollbar.setValue(scrollbar.maximum())
+        if output.spill_path is not None and self._spill_label.isHidden():
+            url = QUrl.fromLocalFile(output.spill_path).toString()
+            self._spill_label.setText(
+                f"La salida superó {output.cap_bytes // 1024} KB; el resto se guarda en "
+                f"<a href=\"{url}\">{output.spill_path}</a>."
+            )
+            self._spill_label.setVisible(True)
 
     @staticmethod
     def _make_output(text: str) -> QPlainTextEdit:
@@ -1,163 +1,562 @@
+from __future__ import annotations
+
+import bisect
+import os
+import queue
+from dataclasses import dataclass
 from pathlib import Path
 
-from PyQt5.QtCore import QPoint, Qt, QUrl, pyqtSignal
+from PyQt5.QtCore import (
+    QAbstractItemModel,
+    QFileSystemWatcher,
+    QModelIndex,
+    QObject,
+    QPoint,
+    Qt,
+    QThread,
+    QTimer,
+    QUrl,
+    pyqtSignal,
+)
 from PyQt5.QtGui import QDesktopServices, QIcon
-from PyQt5.QtWidgets import QAbstractItemView, QInputDialog, QMenu, QMessageBox, QStyle, QTreeWidget, QTreeWidgetItem
+from PyQt5.QtWidgets import QAbstractItemView, QInputDialog, QMenu, QMessageBox, QStyle, QTreeView
+
+IGNORED_DIRS = frozenset({".git", "__pycache__", ".venv", ".venv311", "venv", "venv312", "node_modules"})
+VISIBLE_SUFFIXES = frozenset({".stn", ".txt"})
+# Espera tras un aviso del sistema de archivos antes de releer la carpeta,
+# para agrupar ráfagas de cambios (p. ej. un ``git checkout``).
+WATCH_DEBOUNCE_MS = 150
+
+_TYPE_ROLE = Qt.UserRole
+_PATH_ROLE = Qt.UserRole + 1
+_ROOT_ROLE = Qt.UserRole + 2
+
+
+@dataclass(frozen=True)
+class ScanEntry:
+    name: str
+    path: str
+    is_dir: bool
+
+
+def should_skip_entry(name: str, is_dir: bool) -> bool:
+    if is_dir:
+        if name in IGNORED_DIRS:
+            return True
+        return name.startswith(".") and name != ".vscode"
+    # Para archivos, solo mostrar .stn y .txt
+    return os.path.splitext(name)[1].lower() not in VISIBLE_SUFFIXES
+
+
+def _sort_key(is_dir: bool, name: str) -> tuple[bool, str]:
+    return (not is_dir, name.lower())
+
+
+def scan_directory(folder: str) -> list[ScanEntry]:
+    """Hijos visibles de ``folder``, carpetas primero y por nombre.
+
+    ``DirEntry.is_dir`` usa el tipo que devuelve el sistema al listar la
+    carpeta, así que no hace falta un ``stat`` por entrada.
+    """
+    entries: list[ScanEntry] = []
+    with os.scandir(folder) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if not should_skip_entry(entry.name, is_dir):
+                entries.append(ScanEntry(entry.name, entry.path, is_dir))
+    entries.sort(key=lambda entry: _sort_key(entry.is_dir, entry.name))
+    return entries
+
+
+class DirectoryScanner(QThread):
+    """Hilo que lista carpetas a petición y entrega el resultado por señal."""
+
+    scanned = pyqtSignal(str, object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._requests: queue.Queue[str | None] = queue.Queue()
+
+    def request(self, folder: str) -> None:
+        if not self.isRunning():
+            self.start()
+        self._requests.put(folder)
+
+    def shutdown(self, timeout_ms: int = 2000) -> None:
+        if self.isRunning():
+            self._requests.put(None)
+            self.wait(timeout_ms)
+
+    def run(self) -> None:  # type: ignore[override]
+        while True:
+            folder = self._requests.get()
+            if folder is None:
+                return
+            try:
+                entries: list[ScanEntry] | None = scan_directory(folder)
+            except OSError:
+                entries = None
+            self.scanned.emit(folder, entries)
+
+
+class FileTreeNode:
+    """Entrada del árbol del explorador.
+
+    ``children`` es ``None`` mientras la carpeta no se ha leído; ``row`` es
+    la posición dentro del padre, para que ``parent()`` no tenga que buscarla.
+    """
+
+    __slots__ = ("name", "path", "is_dir", "is_root", "parent", "row", "children", "pending")
+
+    def __init__(self, name: str, path: str, is_dir: bool, parent: FileTreeNode | None = None) -> None:
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.is_root = False
+        self.parent = parent
+        self.row = 0
+        self.children: list[FileTreeNode] | None = None if is_dir else []
+        self.pending = False
+
+    @property
+    def kind(self) -> str:
+        return "folder" if self.is_dir else "file"
+
+
+class FileTreeModel(QAbstractItemModel):
+    """Modelo de las carpetas raíz y de los archivos abiertos fuera de ellas.
+
+    Las carpetas se leen en segundo plano la primera vez que la vista pide
+    sus filas (``fetchMore``). Las carpetas ya leídas se vigilan con
+    ``QFileSystemWatcher``; cada aviso vuelve a leer solo esa carpeta y el
+    resultado se aplica insertando, quitando o renombrando filas sueltas.
+
+    ``files_changed`` avisa de lo que aparece o desaparece en carpetas ya
+    leídas, como listas de ``(ruta, es_carpeta)`` añadidas y quitadas.
+    """
+
+    files_changed = pyqtSignal(object, object)
+
+    def __init__(self, file_icon: QIcon, folder_icon: QIcon, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._file_icon = file_icon
+        self._folder_icon = folder_icon
+        # Nodo invisible: primero los archivos abiertos sueltos, luego las raíces.
+        self._root = FileTreeNode("", "", True)
+        self._root.children = []
+        self._open_count = 0
+        self._folders: dict[str, FileTreeNode] = {}
+        self._scanner = DirectoryScanner(self)
+        self._scanner.scanned.connect(self._on_directory_scanned)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._dirty_folders: set[str] = set()
+        self._watch_timer = QTimer(self)
+        self._watch_timer.setSingleShot(True)
+        self._watch_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self._watch_timer.timeout.connect(self._rescan_dirty_folders)
+
+    def shutdown(self) -> None:
+        self._watch_timer.stop()
+        self._scanner.shutdown()
+
+    # --- QAbstractItemModel -------------------------------------------------
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        children = self.node(parent).children or []
+        if column != 0 or not 0 <= row < len(children):
+            return QModelIndex()
+        return self.createIndex(row, 0, children[row])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:  # type: ignore[override]
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        return len(self.node(parent).children or [])
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        node = self.node(parent)
+        if node.children is None:
+            return True
+        return bool(node.children)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        node = self.node(parent)
+        return node.is_dir and node.children is None and not node.pending
 
+    def fetchMore(self, parent: QModelIndex) -> None:
+        node = self.node(parent)
+        if node.is_dir and node.children is None:
+            self._request_scan(node)
 
-class FileExplorer(QTreeWidget):
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node: FileTreeNode = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return node.name
+        if role == Qt.DecorationRole:
+            return self._folder_icon if node.is_dir else self._file_icon
+        if role == Qt.ToolTipRole:
+            return node.path if node.parent is self._root else None
+        if role == _TYPE_ROLE:
+            return node.kind
+        if role == _PATH_ROLE:
+            return node.path
+        if role == _ROOT_ROLE:
+            return "root" if node.is_root else None
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # --- Acceso -------------------------------------------------------------
+
+    def node(self, index: QModelIndex) -> FileTreeNode:
+        if not index.isValid():
+            return self._root
+        return index.internalPointer()
+
+    def index_for_node(self, node: FileTreeNode) -> QModelIndex:
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def folder_node(self, folder: str) -> FileTreeNode | None:
+        return self._folders.get(folder)
+
+    # --- Raíces y archivos abiertos -----------------------------------------
+
+    def add_root(self, path: Path) -> QModelIndex:
+        node = FileTreeNode(path.name or str(path), str(path), True, self._root)
+        node.is_root = True
+        self._insert_nodes(self._root, len(self._root.children), [node])
+        return self.index_for_node(node)
+
+    def remove_root(self, path: Path) -> None:
+        for node in self._root.children[self._open_count:]:
+            if node.path == str(path):
+                self._remove_rows(self._root, node.row, node.row)
+                return
+
+    def set_open_files(self, paths: list[Path]) -> None:
+        """Deja arriba un nodo por archivo de ``paths``, en ese orden."""
+        wanted = [str(path) for path in paths]
+        current = self._root.children[: self._open_count]
+        for node in reversed(current):
+            if node.path not in wanted:
+                self._remove_rows(self._root, node.row, node.row)
+        existing = {node.path for node in self._root.children[: self._open_count]}
+        for position, path in enumerate(paths):
+            if str(path) not in existing:
+                self._insert_nodes(self._root, position, [FileTreeNode(path.name, str(path), False, self._root)])
+
+    # --- Cambios en disco ---------------------------------------------------
+
+    def refresh_loaded(self) -> None:
+        for node in list(self._folders.values()):
+            if node.children is not None:
+                self._request_scan(node)
+
+    def refresh_folder(self, folder: str) -> None:
+        node = self._folders.get(folder)
+        if node is not None and node.children is not None:
+            self._request_scan(node)
+
+    def rename_path(self, old_path: str, new_path: str) -> None:
+        """Aplica ya un renombrado hecho desde el explorador, sin esperar al aviso."""
+        parent = self._folders.get(str(Path(old_path).parent))
+        if parent is None or parent.children is None:
+            return
+        for node in parent.children:
+            if node.path == old_path:
+                self._rename_node(node, Path(new_path).name, new_path)
+                return
+
+    def remove_path(self, path: str) -> None:
+        parent = self._folders.get(str(Path(path).parent))
+        if parent is None or parent.children is None:
+            return
+        for node in parent.children:
+            if node.path == path:
+                self._remove_rows(parent, node.row, node.row)
+                self.files_changed.emit([], [(path, node.is_dir)])
+                return
+
+    def _request_scan(self, node: FileTreeNode) -> None:
+        if node.pending:
+            return
+        node.pending = True
+        self._scanner.request(node.path)
+
+    def _on_directory_changed(self, folder: str) -> None:
+        self._dirty_folders.add(folder)
+        self._watch_timer.start()
+
+    def _rescan_dirty_folders(self) -> None:
+        folders, self._dirty_folders = self._dirty_folders, set()
+        for folder in folders:
+            self.refresh_folder(folder)
+
+    def _on_directory_scanned(self, folder: str, entries: list[ScanEntry] | None) -> None:
+        node = self._folders.get(folder)
+        if node is None:
+            return
+        node.pending = False
+        first_load = node.children is None
+        if first_load:
+            node.children = []
+            self._watcher.addPath(folder)
+        self._merge_children(node, entries or [], notify=not first_load)
+
+    def _merge_children(self, node: FileTreeNode, entries: list[ScanEntry], *, notify: bool = True) -> None:
+        """Deja los hijos de ``node`` iguales a ``entries`` con cambios mínimos.
+
+        Si desaparece una sola entrada y aparece otra del mismo tipo se trata
+        como un renombrado: la fila se conserva (y con ella la expansión y
+        la selección de la vista) y solo se mueve a su nuevo sitio.
+        """
+        children = node.children or []
+        wanted = {entry.path: entry for entry in entries}
+        existing = {child.path for child in children}
+        removed = [child for child in children if child.path not in wanted or wanted[child.path].is_dir != child.is_dir]
+        added = [entry for entry in entries if entry.path not in existing]
+        if len(removed) == 1 and len(added) == 1 and removed[0].is_dir == added[0].is_dir:
+            self._rename_node(removed[0], added[0].name, added[0].path)
+            return
+
+        for first, last in reversed(_runs([child.row for child in removed])):
+            self._remove_rows(node, first, last)
+        if notify and (removed or added):
+            self.files_changed.emit(
+                [(entry.path, entry.is_dir) for entry in added],
+                [(child.path, child.is_dir) for child in removed],
+            )
+
+        existing = {child.path for child in node.children}
+        position = 0
+        pending: list[FileTreeNode] = []
+        for entry in entries:
+            if entry.path in existing:
+                if pending:
+                    self._insert_nodes(node, position - len(pending), pending)
+                    pending = []
+                position += 1
+                continue
+            pending.append(FileTreeNode(entry.name, entry.path, entry.is_dir, node))
+            position += 1
+        if pending:
+            self._insert_nodes(node, position - len(pending), pending)
+
+        if not node.children:
+            # Sin hijos: la vista quita la flecha de expandir.
+            index = self.index_for_node(node)
+            self.dataChanged.emit(index, index)
+
+    def _rename_node(self, node: FileTreeNode, new_name: str, new_path: str) -> None:
+        parent = node.parent
+        self.files_changed.emit([(new_path, node.is_dir)], [(node.path, node.is_dir)])
+        self._rekey(node, new_path)
+        node.name = new_name
+        index = self.index_for_node(node)
+        self.dataChanged.emit(index, index)
+
+        siblings = parent.children
+        others = [_sort_key(sibling.is_dir, sibling.name) for sibling in siblings if sibling is not node]
+        target = bisect.bisect_left(others, _sort_key(node.is_dir, node.name))
+        row = node.row
+        if target == row:
+            return
+        destination = target if target < row else target + 1
+        parent_index = self.index_for_node(parent)
+        if not self.beginMoveRows(parent_index, row, row, parent_index, destination):
+            return
+        siblings.pop(row)
+        siblings.insert(target, node)
+        _renumber(siblings, min(row, target))
+        self.endMoveRows()
+
+    def _rekey(self, node: FileTreeNode, new_path: str) -> None:
+        if node.is_dir and self._folders.get(node.path) is node:
+            del self._folders[node.path]
+            self._folders[new_path] = node
+            if node.children is not None:
+                self._watcher.removePath(node.path)
+                self._watcher.addPath(new_path)
+        node.path = new_path
+        for child in node.children or []:
+            self._rekey(child, os.path.join(new_path, child.name))
+
+    # --- Filas --------------------------------------------------------------
+
+    def _insert_nodes(self, parent: FileTreeNode, position: int, nodes: list[FileTreeNode]) -> None:
+        siblings = parent.children
+        self.beginInsertRows(self.index_for_node(parent), position, position + len(nodes) - 1)
+        siblings[position:position] = nodes
+        _renumber(siblings, position)
+        for node in nodes:
+            if node.is_dir:
+                self._folders[node.path] = node
+        if parent is self._root:
+            self._open_count = sum(1 for child in siblings if not child.is_root)
+        self.endInsertRows()
+
+    def _remove_rows(self, parent: FileTreeNode, first: int, last: int) -> None:
+        siblings = parent.children
+        self.beginRemoveRows(self.index_for_node(parent), first, last)
+        for node in siblings[first : last + 1]:
+            self._forget(node)
+        del siblings[first : last + 1]
+        _renumber(siblings, first)
+        if parent is self._root:
+            self._open_count = sum(1 for child in siblings if not child.is_root)
+        self.endRemoveRows()
+
+    def _forget(self, node: FileTreeNode) -> None:
+        if not node.is_dir:
+            return
+        if self._folders.get(node.path) is node:
+            del self._folders[node.path]
+            if node.children is not None:
+                self._watcher.removePath(node.path)
+        for child in node.children or []:
+            self._forget(child)
+
+
+def _renumber(nodes: list[FileTreeNode], start: int) -> None:
+    for row in range(start, len(nodes)):
+        nodes[row].row = row
+
+
+def _runs(rows: list[int]) -> list[tuple[int, int]]:
+    """Agrupa filas ordenadas en tramos consecutivos ``(primera, última)``."""
+    runs: list[tuple[int, int]] = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+class FileExplorer(QTreeView):
     file_open_requested = pyqtSignal(str)
     file_close_requested = pyqtSignal(str)
     path_renamed = pyqtSignal(str, str)
     path_deleted = pyqtSignal(str)
+    roots_changed = pyqtSignal()
+    files_changed = pyqtSignal(object, object)
 
     def __init__(self) -> None:
         super().__init__()
         self._root_paths: list[Path] = []
         self._open_files: list[Path] = []
-        self._ignored_dirs = {
-            ".git",
-            "__pycache__",
-            ".venv",
-            ".venv311",
-            "venv",
-            "venv312",
-            "node_modules",
-        }
+        self._model = FileTreeModel(
+            self.style().standardIcon(QStyle.SP_FileIcon),
+            self.style().standardIcon(QStyle.SP_DirIcon),
+            self,
+        )
+        self._model.files_changed.connect(self.files_changed)
+        self.setModel(self._model)
         self.setHeaderHidden(True)
+        self.setUniformRowHeights(True)
         self.setSelectionMode(QAbstractItemView.SingleSelection)
         self.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.setExpandsOnDoubleClick(False)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self._show_context_menu)
-        self.itemDoubleClicked.connect(self._on_item_activated)
-        self._build_tree()
-
-    def _build_tree(self) -> None:
-        self.clear()
-        if not self._root_paths and not self._open_files:
-            return
-
-        icon_file = self.style().standardIcon(QStyle.SP_FileIcon)
-        icon_folder = self.style().standardIcon(QStyle.SP_DirIcon)
+        self.doubleClicked.connect(self._on_index_activated)
 
-        for file_path in self._open_files:
-            # No mostrar si ya está dentro de alguna carpeta abierta
-            if any(file_path.is_relative_to(root) for root in self._root_paths):
-                continue
-            item = QTreeWidgetItem([file_path.name])
-            item.setIcon(0, icon_file)
-            item.setData(0, Qt.UserRole, "file")
-            item.setData(0, Qt.UserRole + 1, str(file_path))
-            item.setToolTip(0, str(file_path))
-            self.addTopLevelItem(item)
-
-        for root_path in self._root_paths:
-            root_label = root_path.name if root_path.name else str(root_path)
-            root_item = QTreeWidgetItem([root_label])
-            root_item.setIcon(0, icon_folder)
-            root_item.setData(0, Qt.UserRole, "folder")
-            root_item.setData(0, Qt.UserRole + 1, str(root_path))
-            root_item.setData(0, Qt.UserRole + 2, "root")
-            root_item.setToolTip(0, str(root_path))
-
-            for path in sorted(root_path.iterdir(), key=lambda p: (p.is_file(), p.name.lower())):
-                if self._should_skip(path):
-                    continue
-                item = self._create_item(path, icon_folder, icon_file)
-                if item:
-                    root_item.addChild(item)
-
-            self.addTopLevelItem(root_item)
-
-        self.expandAll()
+    def shutdown(self) -> None:
+        self._model.shutdown()
 
     def refresh(self) -> None:
-        self._build_tree()
+        """Vuelve a leer las carpetas ya cargadas y aplica solo las diferencias."""
+        self._model.refresh_loaded()
+
+    def refresh_path(self, folder_path: str) -> None:
+        self._model.refresh_folder(str(Path(folder_path).resolve()))
 
     def set_root_path(self, folder_path: str) -> None:
-        self._root_paths.clear()
-        self.add_root_path(folder_path)
+        self.set_root_paths([folder_path])
 
     def set_root_paths(self, folder_paths: list[str]) -> None:
+        for root_path in list(self._root_paths):
+            self._model.remove_root(root_path)
         self._root_paths.clear()
         for folder_path in folder_paths:
-            selected = Path(folder_path)
-            if not selected.exists() or not selected.is_dir():
-                continue
-            resolved = selected.resolve()
-            if resolved in self._root_paths:
-                continue
-            self._root_paths.append(resolved)
-        self._build_tree()
+            self._add_root(folder_path)
+        self._sync_open_files()
+        self.roots_changed.emit()
 
     def add_root_path(self, folder_path: str) -> None:
+        if self._add_root(folder_path):
+            self._sync_open_files()
+            self.roots_changed.emit()
+
+    def _add_root(self, folder_path: str) -> bool:
         selected = Path(folder_path)
         if not selected.exists() or not selected.is_dir():
-            return
+            return False
         resolved = selected.resolve()
         if resolved in self._root_paths:
-            return
+            return False
         self._root_paths.append(resolved)
-        self._build_tree()
+        self.expand(self._model.add_root(resolved))
+        return True
 
     def clear_roots(self) -> None:
-        self._root_paths.clear()
-        self._build_tree()
+        self.set_root_paths([])
 
     def add_open_file(self, file_path: str) -> None:
         path = Path(file_path).resolve()
         if path not in self._open_files:
             self._open_files.append(path)
-        self._build_tree()
+        self._sync_open_files()
 
     def remove_open_file(self, file_path: str) -> None:
         path = Path(file_path).resolve()
         self._open_files = [f for f in self._open_files if f != path]
-        self._build_tree()
+        self._sync_open_files()
 
     def get_root_paths(self) -> list[str]:
         return [str(path) for path in self._root_paths]
 
     def _should_skip(self, path: Path) -> bool:
-        if path.is_dir():
-            if path.name in self._ignored_dirs:
-                return True
-            if path.name.startswith(".") and path.name not in {".vscode"}:
-                return True
-            return False
-        # Para archivos, solo mostrar .stn y .txt
-        if path.suffix.lower() not in {".stn", ".txt"}:
-            return True
-        return False
-
-    def _create_item(self, path: Path, icon_folder: QIcon, icon_file: QIcon) -> QTreeWidgetItem | None:
-        if self._should_skip(path):
-            return None
-
-        item_type = "folder" if path.is_dir() else "file"
-        item = QTreeWidgetItem([path.name])
-        item.setIcon(0, icon_folder if item_type == "folder" else icon_file)
-        item.setData(0, Qt.UserRole, item_type)
-        item.setData(0, Qt.UserRole + 1, str(path))
-
-        if path.is_dir():
-            for child in sorted(path.iterdir(), key=lambda p: (p.is_file(), p.name.lower())):
-                child_item = self._create_item(child, icon_folder, icon_file)
-                if child_item:
-                    item.addChild(child_item)
-
-        return item
+        return should_skip_entry(path.name, path.is_dir())
+
+    def _sync_open_files(self) -> None:
+        # Los archivos abiertos fuera de las carpetas raíz van arriba, en el
+        # orden en que se abrieron.
+        self._model.set_open_files(
+            [
+                path
+                for path in self._open_files
+                if not any(path.is_relative_to(root) for root in self._root_paths)
+            ]
+        )
 
     def _show_context_menu(self, position: QPoint) -> None:
-        item = self.itemAt(position)
-        if not item:
-            return
-
-        item_type = item.data(0, Qt.UserRole)
-        if item_type not in {"folder", "file"}:
+        index = self.indexAt(position)
+        if not index.isValid():
             return
+        node = self._model.node(index)
 
         menu = QMenu(self)
         action_open_file = None
@@ -167,9 +566,9 @@ class FileExplorer(QTreeWidget):
         action_new_folder = menu.addAction("Nueva carpeta")
         action_rename = menu.addAction("Renombrar")
         action_delete = menu.addAction("Eliminar")
-        if item_type == "folder":
+        if node.is_dir:
             action_open_target = menu.addAction("Abrir en el explorador")
-            if item.data(0, Qt.UserRole + 2) == "root":
+            if node.is_root:
                 action_remove_root = menu.addAction("Quitar carpeta del explorador")
         else:
             action_open_file = menu.addAction("Abrir archivo")
@@ -178,61 +577,48 @@ class FileExplorer(QTreeWidget):
 
         selected_action = menu.exec_(self.viewport().mapToGlobal(position))
         if selected_action == action_new_file:
-            self._create_new_file_for_item(item)
+            self._create_new_file_for_node(node)
             return
 
         if selected_action == action_new_folder:
-            self._create_new_folder_for_item(item)
+            self._create_new_folder_for_node(node)
             return
 
         if selected_action == action_rename:
-            self._rename_item_path(item)
+            self._rename_node_path(node)
             return
 
         if selected_action == action_delete:
-            self._delete_item_path(item)
+            self._delete_node_path(node)
             return
 
         if action_open_file and selected_action == action_open_file:
-            item_path_raw = item.data(0, Qt.UserRole + 1)
-            if item_path_raw:
-                self.file_open_requested.emit(str(item_path_raw))
+            self.file_open_requested.emit(node.path)
             return
 
         if action_close_file and selected_action == action_close_file:
-            item_path_raw = item.data(0, Qt.UserRole + 1)
-            if item_path_raw:
-                self.file_close_requested.emit(str(item_path_raw))
+            self.file_close_requested.emit(node.path)
             return
 
         if selected_action == action_open_target:
-            self._open_folder_for_item(item)
+            self._open_folder_for_node(node)
             return
 
         if action_remove_root and selected_action == action_remove_root:
-            item_path_raw = item.data(0, Qt.UserRole + 1)
-            if item_path_raw:
-                self._remove_root_path(str(item_path_raw))
+            self._remove_root_path(node.path)
 
     def _remove_root_path(self, folder_path: str) -> None:
         selected = Path(folder_path)
-        if not selected.exists():
-            self._root_paths = [path for path in self._root_paths if str(path) != folder_path]
-            self._build_tree()
-            return
-
-        resolved = selected.resolve()
-        self._root_paths = [path for path in self._root_paths if path != resolved]
-        self._build_tree()
-
-    def _open_folder_for_item(self, item: QTreeWidgetItem) -> None:
-        item_path_raw = item.data(0, Qt.UserRole + 1)
-        item_type = item.data(0, Qt.UserRole)
-        if not item_path_raw:
-            return
-
-        item_path = Path(str(item_path_raw))
-        folder_path = item_path if item_type == "folder" else item_path.parent
+        resolved = selected.resolve() if selected.exists() else None
+        for root_path in [path for path in self._root_paths if path == resolved or str(path) == folder_path]:
+            self._root_paths.remove(root_path)
+            self._model.remove_root(root_path)
+        self._sync_open_files()
+        self.roots_changed.emit()
+
+    def _open_folder_for_node(self, node: FileTreeNode) -> None:
+        item_path = Path(node.path)
+        folder_path = item_path if node.is_dir else item_path.parent
         if not folder_path.exists() or not folder_path.is_dir():
             QMessageBox.warning(
                 self,
@@ -243,14 +629,9 @@ class FileExplorer(QTreeWidget):
 
         QDesktopServices.openUrl(QUrl.fromLocalFile(str(folder_path)))
 
-    def _create_new_file_for_item(self, item: QTreeWidgetItem) -> None:
-        item_path_raw = item.data(0, Qt.UserRole + 1)
-        item_type = item.data(0, Qt.UserRole)
-        if not item_path_raw:
-            return
-
-        selected_path = Path(str(item_path_raw))
-        target_dir = selected_path if item_type == "folder" else selected_path.parent
+    def _create_new_file_for_node(self, node: FileTreeNode) -> None:
+        selected_path = Path(node.path)
+        target_dir = selected_path if node.is_dir else selected_path.parent
         if not target_dir.exists() or not target_dir.is_dir():
             QMessageBox.warning(
                 self,
@@ -290,17 +671,12 @@ class FileExplorer(QTreeWidget):
             )
             return
 
-        self.refresh()
+        self.refresh_path(str(target_dir))
         self.file_open_requested.emit(str(new_file_path))
 
-    def _create_new_folder_for_item(self, item: QTreeWidgetItem) -> None:
-        item_path_raw = item.data(0, Qt.UserRole + 1)
-        item_type = item.data(0, Qt.UserRole)
-        if not item_path_raw:
-            return
-
-        selected_path = Path(str(item_path_raw))
-        target_dir = selected_path if item_type == "folder" else selected_path.parent
+    def _create_new_folder_for_node(self, node: FileTreeNode) -> None:
+        selected_path = Path(node.path)
+        target_dir = selected_path if node.is_dir else selected_path.parent
         if not target_dir.exists() or not target_dir.is_dir():
             QMessageBox.warning(
                 self,
@@ -337,22 +713,17 @@ class FileExplorer(QTreeWidget):
             )
             return
 
-        self.refresh()
-
-    def _rename_item_path(self, item: QTreeWidgetItem) -> None:
-        item_path_raw = item.data(0, Qt.UserRole + 1)
-        item_type = item.data(0, Qt.UserRole)
-        if not item_path_raw:
-            return
+        self.refresh_path(str(target_dir))
 
-        path = Path(str(item_path_raw))
-        if item_type == "folder" and item.data(0, Qt.UserRole + 2) == "root":
+    def _rename_node_path(self, node: FileTreeNode) -> None:
+        path = Path(node.path)
+        if node.is_root:
             QMessageBox.information(self, "Renombrar", "No se puede renombrar una carpeta raíz desde el explorador.")
             return
 
         if not path.exists():
             QMessageBox.warning(self, "Renombrar", f"La ruta ya no existe:\n{path}")
-            self.refresh()
+            self.refresh_path(str(path.parent))
             return
 
         new_name, ok = QInputDialog.getText(self, "Renombrar", "Nuevo nombre:", text=path.name)
@@ -374,22 +745,17 @@ class FileExplorer(QTreeWidget):
             QMessageBox.warning(self, "Renombrar", f"No fue posible renombrar:\n{path}\n\n{exc}")
             return
 
-        self.refresh()
+        self._model.rename_path(str(path), str(target_path))
         self.path_renamed.emit(str(path), str(target_path))
 
-    def _delete_item_path(self, item: QTreeWidgetItem) -> None:
-        item_path_raw = item.data(0, Qt.UserRole + 1)
-        item_type = item.data(0, Qt.UserRole)
-        if not item_path_raw:
-            return
-
-        path = Path(str(item_path_raw))
-        if item_type == "folder" and item.data(0, Qt.UserRole + 2) == "root":
+    def _delete_node_path(self, node: FileTreeNode) -> None:
+        path = Path(node.path)
+        if node.is_root:
             QMessageBox.information(self, "Eliminar", "Usa 'Quitar carpeta del explorador' para la carpeta raíz.")
             return
 
         if not path.exists():
-            self.refresh()
+            self.refresh_path(str(path.parent))
             return
 
         label = "carpeta" if path.is_dir() else "archivo"
@@ -417,12 +783,10 @@ class FileExplorer(QTreeWidget):
             )
             return
 
-        self.refresh()
+        self._model.remove_path(str(path))
         self.path_deleted.emit(str(path))
 
-    def _on_item_activated(self, item: QTreeWidgetItem, _column: int) -> None:
-        item_type = item.data(0, Qt.UserRole)
-        item_path_raw = item.data(0, Qt.UserRole + 1)
-        if item_type == "file" and item_path_raw:
-            self.file_open_requested.emit(str(item_path_raw))
-
+    def _on_index_activated(self, index: QModelIndex) -> None:
+        node = self._model.node(index)
+        if index.isValid() and not node.is_dir:
+            self.file_open_requested.emit(node.path)
@@ -0,0 +1,538 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import json
+import operator
+import os
+import queue
+import re
+import threading
+from pathlib import Path
+from typing import Callable
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from ide.file_explorer import should_skip_entry
+
+FILE_INDEX_VERSION = 1
+DEFAULT_RESULT_LIMIT = 50
+# Las filas candidatas son las que tienen todas las letras de la consulta.
+# Si no pasan de esta fracción, todos los niveles se buscan en un texto hecho
+# solo con ellas; hasta ``LETTERS_CANDIDATE_FRACTION``, solo los que buscan
+# letras en orden, que son los más caros de recorrer enteros.
+CANDIDATE_FRACTION = 0.125
+LETTERS_CANDIDATE_FRACTION = 0.5
+# Niveles de coincidencia, del mejor al peor: clave, si miran solo el nombre
+# y qué comprueban (que empiece por la consulta, que la contenga o que
+# contenga sus letras en orden).
+_TIERS = (
+    ("nombre_inicio", True, "inicio"),
+    ("nombre", True, "literal"),
+    ("nombre_letras", True, "letras"),
+    ("ruta", False, "literal"),
+    ("ruta_letras", False, "letras"),
+)
+
+
+class FileIndex:
+    """Rutas de los archivos visibles de cada carpeta raíz, para "Ir a archivo".
+
+    Cada raíz es un ``RootFiles`` con sus rutas y lo necesario para
+    buscarlas, que ``FileIndexBuilder`` prepara en segundo plano. Los
+    resultados se ordenan por nivel de coincidencia y, dentro de cada nivel,
+    por raíz y por ruta.
+
+    Dos atajos evitan repetir trabajo a cada tecla: si la consulta amplía la
+    anterior y esta devolvió todas sus coincidencias, solo se clasifican de
+    nuevo esas filas; si no, cada nivel sigue desde donde se quedó.
+    """
+
+    def __init__(self) -> None:
+        self._roots: dict[str, RootFiles] = {}
+        # Última consulta con todas sus coincidencias ``(nivel, raíz, fila)``,
+        # para afinarla sin volver a recorrer el índice.
+        self._exhaustive: tuple[str, list[tuple[int, int, int]]] | None = None
+        # Hasta dónde recorrió cada nivel de cada raíz la última consulta,
+        # para que la siguiente tecla siga desde ahí.
+        self._scanned: tuple[str, dict[int, _TierScans]] | None = None
+        self.modified = False
+
+    def __len__(self) -> int:
+        return sum(len(files) for files in self._roots.values())
+
+    def roots(self) -> list[str]:
+        return list(self._roots)
+
+    def set_root(self, root: str, files: list[str] | RootFiles) -> None:
+        """Sustituye los archivos de ``root`` por rutas relativas o por un ``RootFiles`` ya preparado."""
+        self._roots[root] = files if isinstance(files, RootFiles) else RootFiles(root, files)
+        self._changed()
+
+    def remove_root(self, root: str) -> None:
+        if self._roots.pop(root, None) is not None:
+            self._changed()
+
+    def add_file(self, path: str) -> None:
+        located = self._locate(path)
+        if located is not None and located[0].insert(located[1]):
+            self._changed()
+
+    def remove_file(self, path: str) -> None:
+        located = self._locate(path)
+        if located is None:
+            return
+        files, relative = located
+        position = bisect.bisect_left(files.files, relative)
+        if position < len(files) and files.files[position] == relative:
+            files.delete(position, position + 1)
+            self._changed()
+
+    def remove_tree(self, folder: str) -> None:
+        """Quita todo lo que cuelga de ``folder``."""
+        located = self._locate(folder)
+        if located is None:
+            return
+        files, relative = located
+        prefix = f"{relative}/"
+        first = bisect.bisect_left(files.files, prefix)
+        last = first
+        while last < len(files) and files.files[last].startswith(prefix):
+            last += 1
+        if last > first:
+            files.delete(first, last)
+            self._changed()
+
+    def root_for(self, path: str) -> str | None:
+        for root in self._roots:
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    def search(self, query: str, limit: int = DEFAULT_RESULT_LIMIT) -> list[tuple[str, str]]:
+        """Devuelve hasta ``limit`` pares ``(ruta absoluta, ruta mostrada)``.
+
+        Orden: nombre que empieza por la consulta, nombre que la contiene,
+        nombre que contiene sus letras en orden, y lo mismo sobre la ruta
+        completa. Dentro de cada nivel, por orden alfabético de ruta.
+        """
+        needle = "".join(query.lower().split())
+        roots = list(self._roots.values())
+        if not needle:
+            entries: list[tuple[str, str]] = []
+            for files in roots:
+                entries.extend(map(files.entry, range(min(limit - len(entries), len(files)))))
+            return entries
+
+        letters = re.compile(_subsequence_pattern(needle))
+        narrowed = self._exhaustive
+        if narrowed is not None and needle.startswith(narrowed[0]):
+            # La búsqueda anterior devolvió todas sus coincidencias y esta
+            # consulta la amplía: solo pueden coincidir esas mismas filas.
+            found = []
+            for _tier, position, row in narrowed[1]:
+                tier = roots[position].tier(row, needle, letters)
+                if tier is not None:
+                    found.append((tier, position, row))
+            found.sort()
+        else:
+            scanned = self._scanned
+            earlier = scanned[1] if scanned is not None and needle.startswith(scanned[0]) else {}
+            found = []
+            scans: dict[int, _TierScans] = {}
+            tier_count = len(_TIERS)
+            for position, files in enumerate(roots):
+                rows, scans[position] = files.search(needle, letters, limit, tier_count, earlier.get(position))
+                found.extend((tier, position, row) for row, tier in rows)
+                found.sort()
+                del found[limit:]
+                if len(found) == limit:
+                    # Dentro de un nivel las raíces siguientes van detrás: solo
+                    # entrarían con un nivel mejor que el del último resultado.
+                    tier_count = found[-1][0]
+            self._scanned = (needle, scans)
+        found = found[:limit]
+        if len(found) < limit:
+            self._exhaustive = (needle, found)
+        return [roots[position].entry(row) for _tier, position, row in found]
+
+    def save(self, path: Path) -> None:
+        data = {"version": FILE_INDEX_VERSION, "roots": {root: files.files for root, files in self._roots.items()}}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(temporary, path)
+        self.modified = False
+
+    @classmethod
+    def load(cls, path: Path) -> FileIndex:
+        """Índice guardado; cada raíz se prepara para buscar la primera vez que se usa."""
+        index = cls()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return index
+        if not isinstance(data, dict) or data.get("version") != FILE_INDEX_VERSION:
+            return index
+        roots = data.get("roots")
+        if isinstance(roots, dict):
+            index._roots = {
+                str(root): RootFiles(str(root), list(map(str, files)))
+                for root, files in roots.items()
+                if isinstance(files, list)
+            }
+        return index
+
+    def _locate(self, path: str) -> tuple[RootFiles, str] | None:
+        root = self.root_for(path)
+        if root is None or path == root:
+            return None
+        relative = path[len(root.rstrip(os.sep)) + 1 :].replace(os.sep, "/")
+        return self._roots[root], relative
+
+    def _changed(self) -> None:
+        self._exhaustive = None
+        self._scanned = None
+        self.modified = True
+
+
+class RootFiles:
+    """Archivos de una carpeta raíz y lo necesario para buscarlos.
+
+    ``files`` son las rutas relativas ordenadas, con ``/``. Para buscar se
+    unen los nombres, y aparte las rutas mostradas, en un texto en minúsculas
+    con una entrada por línea: cada nivel de coincidencia es una sola
+    expresión regular sobre ese texto, así que el recorrido lo hace ``re`` y
+    no un bucle de Python.
+
+    Como filtro previo se guarda, por carácter, qué filas lo contienen en el
+    nombre y en la ruta: un entero con un byte por fila que vale 1 o 0, de
+    modo que un ``&`` entre enteros cruza varios caracteres y ``to_bytes``
+    da las marcas listas para ``itertools.compress``. Una consulta solo
+    puede coincidir en las filas con todas sus letras; si no son muchas, se
+    busca en un texto hecho solo con esas.
+
+    ``prepare`` lo construye todo y ``FileIndexBuilder`` lo llama en su hilo;
+    un índice cargado de disco se prepara en la primera búsqueda. Añadir o
+    quitar archivos actualiza los bits en el momento y los textos se rehacen
+    al buscar.
+    """
+
+    def __init__(self, root: str, files: list[str]) -> None:
+        self.root = root
+        self.label = os.path.basename(root.rstrip(os.sep)) or root
+        self.files = sorted(files)
+        self._prepared = False
+        self._paths: list[str] = []
+        self._names: list[str] = []
+        self._path_flags: dict[str, int] = {}
+        self._name_flags: dict[str, int] = {}
+        self._path_text: tuple[str, list[int]] | None = None
+        self._name_text: tuple[str, list[int]] | None = None
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def prepare(self) -> None:
+        if self._prepared:
+            return
+        if self.files:
+            prefix = f"{self.label}/"
+            self._paths = (prefix + f"\n{prefix}".join(self.files)).lower().split("\n")
+        self._names = [path.rpartition("/")[2] for path in self._paths]
+        self._path_flags = _char_flags(self._paths)
+        self._name_flags = _char_flags(self._names)
+        self._texts()
+        self._prepared = True
+
+    def entry(self, row: int) -> tuple[str, str]:
+        relative = self.files[row]
+        return os.path.join(self.root, *relative.split("/")), f"{self.label}/{relative}"
+
+    def insert(self, relative: str) -> bool:
+        position = bisect.bisect_left(self.files, relative)
+        if position < len(self.files) and self.files[position] == relative:
+            return False
+        self.files.insert(position, relative)
+        if self._prepared:
+            path = f"{self.label}/{relative}".lower()
+            name = path.rpartition("/")[2]
+            self._paths.insert(position, path)
+            self._names.insert(position, name)
+            _insert_row(self._path_flags, position, path)
+            _insert_row(self._name_flags, position, name)
+            self._path_text = self._name_text = None
+        return True
+
+    def delete(self, first: int, last: int) -> None:
+        """Quita las filas de ``first`` a ``last`` (sin incluir)."""
+        del self.files[first:last]
+        if self._prepared:
+            del self._paths[first:last]
+            del self._names[first:last]
+            _delete_rows(self._path_flags, first, last)
+            _delete_rows(self._name_flags, first, last)
+            self._path_text = self._name_text = None
+
+    def search(
+        self,
+        needle: str,
+        letters: re.Pattern[str],
+        limit: int,
+        tier_count: int,
+        earlier: _TierScans | None,
+    ) -> tuple[list[tuple[int, int]], _TierScans]:
+        """Hasta ``limit`` pares ``(fila, nivel)`` de los ``tier_count`` primeros niveles, en orden.
+
+        ``earlier`` es lo que recorrió una consulta que ``needle`` amplía: en
+        la parte ya recorrida de cada nivel solo pueden coincidir sus filas,
+        así que se comprueban esas y el recorrido sigue donde se quedó.
+        """
+        self.prepare()
+        chars = set(needle)
+        literal = re.escape(needle)
+        found: dict[int, int] = {}
+        scans: _TierScans = {}
+        marks: dict[bool, tuple[bytes, int]] = {}
+        subsets: dict[bool, str] = {}
+        for tier, (key, by_name, kind) in enumerate(_TIERS[:tier_count]):
+            if len(found) >= limit:
+                break
+            if by_name and "/" in needle:
+                continue
+            if by_name not in marks:
+                target_marks = self._marks(chars, by_name)
+                marks[by_name] = target_marks, target_marks.count(1)
+            target_marks, count = marks[by_name]
+            if not count:
+                continue
+            pattern = re.compile({"inicio": "\n" + literal, "literal": literal, "letras": letters.pattern}[kind])
+            lines = self._names if by_name else self._paths
+            fraction = LETTERS_CANDIDATE_FRACTION if kind == "letras" else CANDIDATE_FRACTION
+            if count <= fraction * len(lines):
+                if by_name not in subsets:
+                    subsets[by_name] = "\n" + "\n".join(itertools.compress(lines, target_marks)) + "\n"
+                _scan_subset(pattern, subsets[by_name], target_marks, tier, found, limit)
+                continue
+            text, starts = self._texts()[by_name]
+            previous = earlier.get(key) if earlier is not None else None
+            test = _row_test(lines, needle, letters, kind)
+            scans[key] = _scan_tier(pattern, text, starts, test, tier, found, limit, previous)
+        return list(found.items()), scans
+
+    def tier(self, row: int, needle: str, letters: re.Pattern[str]) -> int | None:
+        """Nivel en que ``row`` coincide con ``needle``, o ``None``."""
+        for tier, (_key, by_name, kind) in enumerate(_TIERS):
+            if by_name and "/" in needle:
+                continue
+            if _row_test(self._names if by_name else self._paths, needle, letters, kind)(row):
+                return tier
+        return None
+
+    def _marks(self, chars: set[str], by_name: bool) -> bytes:
+        """Un byte por fila: 1 si su nombre (o su ruta) contiene todos los ``chars``."""
+        flags = self._name_flags if by_name else self._path_flags
+        mask = (1 << 8 * len(self.files)) - 1
+        for char in chars:
+            mask &= flags.get(char, 0)
+        return mask.to_bytes(len(self.files), "little")
+
+    def _texts(self) -> tuple[tuple[str, list[int]], tuple[str, list[int]]]:
+        """Textos de las rutas y de los nombres, con la posición donde empieza cada línea."""
+        if self._path_text is None:
+            self._path_text = _joined(self._paths)
+        if self._name_text is None:
+            self._name_text = _joined(self._names)
+        return self._path_text, self._name_text
+
+
+# Por nivel de coincidencia: filas halladas, en orden, y posición del texto
+# hasta la que se recorrió (siempre un salto de línea o el final).
+_TierScans = dict[str, tuple[list[int], int]]
+
+
+def _char_flags(lines: list[str]) -> dict[str, int]:
+    """Por carácter, un entero con un byte por línea: 1 si la línea lo contiene."""
+    flags: dict[str, int] = {}
+    for char in set("".join(lines)):
+        flags[char] = int.from_bytes(bytes(map(operator.contains, lines, itertools.repeat(char))), "little")
+    return flags
+
+
+def _insert_row(flags: dict[str, int], row: int, line: str) -> None:
+    """Abre la fila ``row`` en las marcas de cada carácter y la marca en las de ``line``."""
+    shift = 8 * row
+    low = (1 << shift) - 1
+    for char, value in flags.items():
+        flags[char] = (value >> shift << (shift + 8)) | (value & low)
+    for char in set(line):
+        flags[char] = flags.get(char, 0) | (1 << shift)
+
+
+def _delete_rows(flags: dict[str, int], first: int, last: int) -> None:
+    low = (1 << 8 * first) - 1
+    for char, value in list(flags.items()):
+        value = (value >> 8 * last << 8 * first) | (value & low)
+        if value:
+            flags[char] = value
+        else:
+            del flags[char]
+
+
+def _row_test(lines: list[str], needle: str, letters: re.Pattern[str], kind: str) -> Callable[[int], object]:
+    if kind == "inicio":
+        return lambda row: lines[row].startswith(needle)
+    if kind == "literal":
+        return lambda row: needle in lines[row]
+    return lambda row: letters.search(lines[row])
+
+
+def _scan_tier(
+    pattern: re.Pattern[str],
+    text: str,
+    starts: list[int],
+    test: Callable[[int], object],
+    tier: int,
+    found: dict[int, int],
+    limit: int,
+    previous: tuple[list[int], int] | None,
+) -> tuple[list[int], int]:
+    """Añade a ``found`` las filas de un nivel, con ese nivel, hasta que haya ``limit``."""
+    rows: list[int] = []
+    position = 0
+    if previous is not None:
+        previous_rows, position = previous
+        for row in previous_rows:
+            if len(found) >= limit:
+                return rows, starts[row] - 1
+            if test(row):
+                rows.append(row)
+                found.setdefault(row, tier)
+    if len(found) >= limit:
+        return rows, position
+    last_row = -1
+    for match in pattern.finditer(text, position):
+        row = bisect.bisect_right(starts, match.end() - 1) - 1
+        if row == last_row:
+            continue
+        last_row = row
+        rows.append(row)
+        found.setdefault(row, tier)
+        if len(found) >= limit:
+            return rows, starts[row + 1] - 1 if row + 1 < len(starts) else len(text)
+    return rows, len(text)
+
+
+def _scan_subset(
+    pattern: re.Pattern[str],
+    text: str,
+    marks: bytes,
+    tier: int,
+    found: dict[int, int],
+    limit: int,
+) -> None:
+    """Como ``_scan_tier`` sobre el texto de las filas con ``marks``, sin guardar hasta dónde llegó.
+
+    La línea de cada coincidencia se sabe contando los saltos de línea desde
+    la anterior, y su fila avanzando sobre las marcas, así que este texto no
+    necesita la lista de comienzos.
+    """
+    rows = itertools.compress(itertools.count(), marks)
+    counted = 0
+    for match in pattern.finditer(text):
+        end = match.end() - 1
+        skipped = text.count("\n", counted, end)
+        counted = end
+        if not skipped:
+            continue
+        row = next(itertools.islice(rows, skipped - 1, None))
+        found.setdefault(row, tier)
+        if len(found) >= limit:
+            return
+
+
+def _joined(lines: list[str]) -> tuple[str, list[int]]:
+    # El texto empieza con un salto de línea para que "\n" + consulta
+    # encuentre también la primera línea.
+    return "\n" + "\n".join(lines) + "\n", _line_starts(lines)
+
+
+def _line_starts(lines: list[str]) -> list[int]:
+    return list(itertools.accumulate(map((1).__add__, map(len, lines)), initial=1))[:-1]
+
+
+def _subsequence_pattern(needle: str) -> str:
+    """Expresión que encuentra las letras de ``needle`` en orden dentro de una línea.
+
+    Entre letra y letra se avanza con un cuantificador posesivo que no puede
+    cruzar ni la letra siguiente ni el salto de línea, así que cada intento
+    es lineal y no hay retroceso.
+    """
+    parts = [re.escape(needle[0])]
+    for char in needle[1:]:
+        excluded = "\\" + char if char in "\\]^-[" else char
+        parts.append(f"[^{excluded}\\n]*+{re.escape(char)}")
+    return "".join(parts)
+
+
+def walk_root(root: str) -> list[str]:
+    """Rutas relativas de todos los archivos visibles bajo ``root``."""
+    files: list[str] = []
+    prefix_length = len(root.rstrip(os.sep)) + 1
+    pending = [root]
+    while pending:
+        folder = pending.pop()
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if should_skip_entry(entry.name, is_dir):
+                        continue
+                    if is_dir:
+                        pending.append(entry.path)
+                    else:
+                        files.append(entry.path[prefix_length:].replace(os.sep, "/"))
+        except OSError:
+            continue
+    files.sort()
+    return files
+
+
+class FileIndexBuilder(QThread):
+    """Hilo que recorre carpetas raíz completas y entrega sus archivos ya preparados para buscar."""
+
+    built = pyqtSignal(str, object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._requests: queue.Queue[str | None] = queue.Queue()
+        self._pending: set[str] = set()
+        self._pending_lock = threading.Lock()
+
+    def request(self, root: str) -> None:
+        with self._pending_lock:
+            if root in self._pending:
+                return
+            self._pending.add(root)
+        if not self.isRunning():
+            self.start()
+        self._requests.put(root)
+
+    def shutdown(self, timeout_ms: int = 2000) -> None:
+        if self.isRunning():
+            self._requests.put(None)
+            self.wait(timeout_ms)
+
+    def run(self) -> None:  # type: ignore[override]
+        while True:
+            root = self._requests.get()
+            if root is None:
+                return
+            with self._pending_lock:
+                self._pending.discard(root)
+            files = RootFiles(root, walk_root(root))
+            files.prepare()
+            self.built.emit(root, files)
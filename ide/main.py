@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 
@@ -31,4 +32,6 @@ def main() -> int:
 
 
 if __name__ == "__main__":
+    # Necesario para el pool de "Reemplazar en carpeta" en el ejecutable de PyInstaller.
+    multiprocessing.freeze_support()
     raise SystemExit(main())
@@ -4,7 +4,7 @@ import datetime
 import importlib
 from pathlib import Path
 
-from PyQt5.QtCore import QFileSystemWatcher, QSettings, QSize, Qt, QTimer
+from PyQt5.QtCore import QFileSystemWatcher, QSettings, QSize, QStandardPaths, Qt, QTimer
 from PyQt5.QtGui import QCloseEvent, QFont, QFontDatabase, QFontMetrics, QIcon, QKeySequence, QTextCursor, QTextDocument
 from PyQt5.QtWidgets import (
     QAction,
@@ -21,6 +21,7 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QMainWindow,
     QPlainTextEdit,
+    QProgressBar,
     QSpinBox,
     QSplitter,
     QStackedWidget,
@@ -35,56 +36,95 @@ from PyQt5.QtWidgets import (
 )
 
 from ide.analysis_panel import AnalysisPanel
+from ide.analysis_scheduler import DEFAULT_DEBOUNCE_MS, AnalysisScheduler
 from ide.code_editor import CodeEditor
-from ide.compiler_runner import run_compiler
+from ide.compiler_runner import DEFAULT_TIMEOUT_SECONDS, shutdown_compiler_server
+from ide.compiler_task import CompilerTask
 from ide.console_panel import ConsolePanel
+from ide.output_stream import DEFAULT_OUTPUT_CAP_KB
 from ide.file_explorer import FileExplorer
+from ide.file_index import FileIndexBuilder, RootFiles
+from ide.phase_cache import PhaseCache
+from ide.quick_open import QuickOpenDialog
+from ide.replace_in_files import FileReplacement, shutdown_replace_pool
+from ide.replace_task import ReplaceTask
+from ide.search_panel import SearchPanel
+from ide.text_index import TextMatch, TextSearchWorker
 from ide.main_window_sections import (
     apply_code_font_to_open_editors,
+    apply_replace,
     apply_theme,
     auto_save_open_files,
     build_find_bar,
     build_layout,
     build_menu,
     build_toolbar,
+    cancel_phase,
+    cancel_replace_preview,
     change_code_font_size,
     clear_outputs,
+    clear_phase_cache,
     close_file,
     close_file_from_explorer,
     close_tab,
     collect_unsaved_tab_indexes,
     confirm_all_unsaved_before_exit,
     confirm_unsaved_for_tab,
+    configure_analysis_delay,
+    configure_compiler_timeout,
+    configure_output_cap,
     create_themed_file_dialog,
     current_tab_title,
     get_active_editor,
     get_active_file_path,
+    load_file_index,
     new_file,
     normalize_settings_list,
+    on_analysis_ready,
+    on_explorer_files_changed,
+    on_file_index_built,
     on_path_deleted,
     on_path_renamed,
+    on_search_file_matched,
+    on_search_finished,
     on_tab_changed,
     on_watched_file_changed,
     open_file,
     open_file_from_explorer,
     open_file_path,
     open_folder,
+    open_search_result,
     open_theme_dialog,
+    preview_replace,
     reload_editor_from_disk,
     restore_layout_state,
     restore_session,
+    run_all_phases,
+    run_folder_search,
     run_phase,
     save_editor,
     save_editor_as,
     save_file,
     save_file_as,
+    save_file_index,
     save_session,
+    schedule_live_analysis,
     set_autosave_enabled,
+    set_compiler_server_mode,
+    set_execution_engine,
+    set_live_analysis,
+    set_opt_level,
     select_code_font,
+    show_folder_search,
+    show_quick_open,
+    sync_file_index_roots,
+    sync_text_index_roots,
     unwatch_file_if_unused,
+    update_compiler_elapsed,
     watch_file,
     write_editor_to_path,
 )
+from ide.skuld.phases import DEFAULT_ENGINE, ENGINES, PhaseOptions
 from ide.theme import steins_gate_theme
 
 try:
@@ -123,6 +163,7 @@ class MainWindow(QMainWindow):
         self._analysis_panel: AnalysisPanel | None = None
         self._console_panel: ConsolePanel | None = None
         self._file_explorer: FileExplorer | None = None
+        self._search_panel: SearchPanel | None = None
         self._analysis_container: QWidget | None = None
         self._console_container: QWidget | None = None
         self._analysis_minimized = False
@@ -143,6 +184,47 @@ class MainWindow(QMainWindow):
         self._file_watcher.fileChanged.connect(self._on_watched_file_changed)
         self._watched_files_mtime: dict[str, float] = {}
         self._suppress_file_watch_event: set[str] = set()
+        self._compiler_task: CompilerTask | None = None
+        self._compiler_timeout_seconds = int(
+            self._settings.value("compiler/timeout_seconds", DEFAULT_TIMEOUT_SECONDS, type=int)
+        )
+        self._compiler_server_mode = bool(self._settings.value("compiler/server_mode", False, type=bool))
+        self._action_cancel_phase: QAction | None = None
+        self._compile_progress: QProgressBar | None = None
+        self._compile_status_label: QLabel | None = None
+        self._compile_started_at = 0.0
+        self._compile_elapsed_timer = QTimer(self)
+        self._compile_elapsed_timer.setInterval(100)
+        self._compile_elapsed_timer.timeout.connect(self._update_compiler_elapsed)
+        self._live_analysis_enabled = bool(self._settings.value("analysis/live", True, type=bool))
+        self._analysis_scheduler = AnalysisScheduler(
+            int(self._settings.value("analysis/debounce_ms", DEFAULT_DEBOUNCE_MS, type=int)), self
+        )
+        self._analysis_scheduler.result_ready.connect(self._on_analysis_ready)
+        self._opt_level = int(self._settings.value("compiler/opt_level", 0, type=int))
+        self._analysis_scheduler.options = PhaseOptions(opt_level=self._opt_level)
+        self._execution_input = ""
+        self._execution_engine = str(self._settings.value("compiler/engine", DEFAULT_ENGINE))
+        if self._execution_engine not in ENGINES:
+            self._execution_engine = DEFAULT_ENGINE
+        self._data_dir = Path(
+            QStandardPaths.writableLocation(QStandardPaths.AppDataLocation) or Path.home() / ".reading_steiner_ide"
+        )
+        self._phase_cache = PhaseCache(self._data_dir / "phase_cache")
+        self._phase_cache_key: str | None = None
+        self._output_cap_kb = int(self._settings.value("execution/output_cap_kb", DEFAULT_OUTPUT_CAP_KB, type=int))
+        self._file_index = load_file_index(self)
+        self._file_index_builder = FileIndexBuilder(self)
+        self._file_index_builder.built.connect(self._on_file_index_built)
+        self._file_index_built_at = 0.0
+        self._quick_open: QuickOpenDialog | None = None
+        self._text_search = TextSearchWorker(self._data_dir / "text_index.json", self)
+        self._text_search.file_matched.connect(self._on_search_file_matched)
+        self._text_search.search_finished.connect(self._on_search_finished)
+        self._search_generation = 0
+        self._search_started_at = 0.0
+        self._replace_task: ReplaceTask | None = None
+        self._replace_started_at = 0.0
 
         self._restore_code_font_preference()
         self._build_menu()
@@ -180,6 +262,16 @@ class MainWindow(QMainWindow):
 
     def _build_status_bar(self) -> None:
         self._status.showMessage(f"{self._current_lab_member_label()} · El Psy Kongroo")
+        self._compile_status_label = QLabel(self._status)
+        self._compile_progress = QProgressBar(self._status)
+        self._compile_progress.setRange(0, 0)
+        self._compile_progress.setMaximumWidth(140)
+        self._compile_progress.setMaximumHeight(14)
+        self._compile_progress.setTextVisible(False)
+        self._status.addPermanentWidget(self._compile_status_label)
+        self._status.addPermanentWidget(self._compile_progress)
+        self._compile_status_label.setVisible(False)
+        self._compile_progress.setVisible(False)
         self.setStatusBar(self._status)
 
     def _current_lab_member_label(self) -> str:
@@ -652,14 +744,29 @@ class MainWindow(QMainWindow):
         open_theme_dialog(self)
 
     def _on_text_changed(self) -> None:
-        editor = self._get_active_editor()
+        # El documento puede cambiar sin ser la pestaña activa (p. ej. al reemplazar en carpeta).
+        sender = self.sender()
+        editor = sender if isinstance(sender, CodeEditor) else self._get_active_editor()
         if editor:
             editor.setProperty("unsaved", True)
             if self._search_text:
                 editor.set_search_highlights(self._search_text)
             self._update_find_match_label()
+            self._schedule_live_analysis(editor)
         self._update_cursor_status()
 
+    def _schedule_live_analysis(self, editor: CodeEditor | None = None) -> None:
+        schedule_live_analysis(self, editor)
+
+    def _on_analysis_ready(self, editor: CodeEditor, result) -> None:
+        on_analysis_ready(self, editor, result)
+
+    def _set_live_analysis(self, enabled: bool) -> None:
+        set_live_analysis(self, enabled)
+
+    def _configure_analysis_delay(self) -> None:
+        configure_analysis_delay(self)
+
     def _set_autosave_enabled(self, enabled: bool, *, persist: bool = True) -> None:
         set_autosave_enabled(self, enabled, persist=persist)
 
@@ -752,6 +859,69 @@ class MainWindow(QMainWindow):
     def _run_phase(self, phase: str) -> None:
         run_phase(self, phase)
 
+    def _run_all_phases(self) -> None:
+        run_all_phases(self)
+
+    def _cancel_phase(self) -> None:
+        cancel_phase(self)
+
+    def _update_compiler_elapsed(self) -> None:
+        update_compiler_elapsed(self)
+
+    def _configure_compiler_timeout(self) -> None:
+        configure_compiler_timeout(self)
+
+    def _configure_output_cap(self) -> None:
+        configure_output_cap(self)
+
+    def _set_compiler_server_mode(self, enabled: bool) -> None:
+        set_compiler_server_mode(self, enabled)
+
+    def _set_opt_level(self, level: int) -> None:
+        set_opt_level(self, level)
+
+    def _set_execution_engine(self, engine: str) -> None:
+        set_execution_engine(self, engine)
+
+    def _clear_phase_cache(self) -> None:
+        clear_phase_cache(self)
+
+    def _show_quick_open(self) -> None:
+        show_quick_open(self)
+
+    def _sync_file_index_roots(self) -> None:
+        sync_file_index_roots(self)
+
+    def _on_file_index_built(self, root: str, files: RootFiles) -> None:
+        on_file_index_built(self, root, files)
+
+    def _sync_text_index_roots(self) -> None:
+        sync_text_index_roots(self)
+
+    def _show_folder_search(self) -> None:
+        show_folder_search(self)
+
+    def _run_folder_search(self, query: str, use_regex: bool, case_sensitive: bool) -> None:
+        run_folder_search(self, query, use_regex, case_sensitive)
+
+    def _on_search_file_matched(self, generation: int, path: str, matches: list[TextMatch]) -> None:
+        on_search_file_matched(self, generation, path, matches)
+
+    def _on_search_finished(self, generation: int, files: int, matches: int, truncated: bool) -> None:
+        on_search_finished(self, generation, files, matches, truncated)
+
+    def _open_search_result(self, file_path: str, line: int, column: int) -> None:
+        open_search_result(self, file_path, line, column)
+
+    def _preview_replace(self, query: str, replacement: str, use_regex: bool, case_sensitive: bool) -> None:
+        preview_replace(self, query, replacement, use_regex, case_sensitive)
+
+    def _apply_replace(self, plans: list[FileReplacement]) -> None:
+        apply_replace(self, plans)
+
+    def _on_explorer_files_changed(self, added: list[tuple[str, bool]], removed: list[tuple[str, bool]]) -> None:
+        on_explorer_files_changed(self, added, removed)
+
     def _open_file_from_explorer(self, file_path: str) -> None:
         open_file_from_explorer(self, file_path)
 
@@ -778,6 +948,21 @@ class MainWindow(QMainWindow):
             event.ignore()
             return
         self._save_session()
+        if self._compiler_task is not None:
+            task = self._compiler_task
+            self._cancel_phase()
+            # Cancelar detiene el programa o mata el proceso en cuanto se comprueba;
+            # destruir el QThread mientras sigue en marcha abortaría la aplicación.
+            task.wait()
+        self._analysis_scheduler.shutdown()
+        if self._file_explorer is not None:
+            self._file_explorer.shutdown()
+        self._file_index_builder.shutdown()
+        save_file_index(self)
+        self._text_search.shutdown()
+        cancel_replace_preview(self)
+        shutdown_replace_pool()
+        shutdown_compiler_server()
         super().closeEvent(event)
 
     def _close_tab(self, index: int) -> None:
@@ -7,39 +7,73 @@ from .appearance import (
 )
 from .ui_builders import build_find_bar, build_layout, build_menu, build_toolbar
 from .workspace_flow import (
+    apply_replace,
     auto_save_open_files,
+    cancel_phase,
+    cancel_replace_preview,
     clear_outputs,
+    clear_phase_cache,
     close_file,
     close_file_from_explorer,
     close_tab,
     collect_unsaved_tab_indexes,
     confirm_all_unsaved_before_exit,
     confirm_unsaved_for_tab,
+    configure_analysis_delay,
+    configure_compiler_timeout,
+    configure_output_cap,
     create_themed_file_dialog,
     current_tab_title,
+    find_editor_for_path,
     get_active_editor,
     get_active_file_path,
+    load_file_index,
     new_file,
     normalize_settings_list,
+    on_analysis_ready,
+    on_explorer_files_changed,
+    on_file_index_built,
     on_path_deleted,
     on_path_renamed,
+    on_replace_finished,
+    on_replace_planned,
+    on_search_file_matched,
+    on_search_finished,
     on_tab_changed,
     on_watched_file_changed,
     open_file,
     open_file_from_explorer,
     open_file_path,
     open_folder,
+    open_search_result,
+    preview_replace,
+    rebuild_file_index,
     reload_editor_from_disk,
+    replace_editor_text,
     restore_layout_state,
     restore_session,
+    run_all_phases,
+    run_folder_search,
     run_phase,
     save_editor,
     save_editor_as,
     save_file,
     save_file_as,
+    save_file_index,
     save_session,
+    schedule_live_analysis,
     set_autosave_enabled,
+    set_compiler_server_mode,
+    set_execution_engine,
+    set_live_analysis,
+    set_opt_level,
+    show_analysis_output,
+    show_folder_search,
+    show_quick_open,
+    sync_file_index_roots,
+    sync_text_index_roots,
     unwatch_file_if_unused,
+    update_compiler_elapsed,
     watch_file,
     write_editor_to_path,
 )
@@ -74,6 +108,20 @@ __all__ = [
     "save_file_as",
     "close_file",
     "run_phase",
+    "run_all_phases",
+    "show_analysis_output",
+    "cancel_phase",
+    "update_compiler_elapsed",
+    "configure_compiler_timeout",
+    "configure_output_cap",
+    "set_compiler_server_mode",
+    "set_opt_level",
+    "set_execution_engine",
+    "clear_phase_cache",
+    "schedule_live_analysis",
+    "on_analysis_ready",
+    "set_live_analysis",
+    "configure_analysis_delay",
     "open_file_from_explorer",
     "close_file_from_explorer",
     "open_file_path",
@@ -85,7 +133,27 @@ __all__ = [
     "on_tab_changed",
     "on_path_renamed",
     "on_path_deleted",
+    "show_quick_open",
+    "load_file_index",
+    "save_file_index",
+    "rebuild_file_index",
+    "sync_file_index_roots",
+    "on_file_index_built",
+    "on_explorer_files_changed",
+    "sync_text_index_roots",
+    "show_folder_search",
+    "run_folder_search",
+    "on_search_file_matched",
+    "on_search_finished",
+    "open_search_result",
+    "preview_replace",
+    "cancel_replace_preview",
+    "on_replace_planned",
+    "on_replace_finished",
+    "apply_replace",
+    "replace_editor_text",
     "get_active_editor",
+    "find_editor_for_path",
     "get_active_file_path",
     "current_tab_title",
     "clear_outputs",
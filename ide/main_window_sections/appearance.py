@@ -247,6 +247,7 @@ def apply_theme(window, theme_key: str, *, persist: bool = True, show_status: bo
             if not isinstance(editor, CodeEditor):
                 continue
             editor.highlight_current_line()
+            editor.refresh_syntax_theme()
             editor.viewport().update()
             editor.update()
 
@@ -4,6 +4,7 @@ from PyQt5.QtCore import QSize, Qt
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import (
     QAction,
+    QActionGroup,
     QHBoxLayout,
     QLabel,
     QLineEdit,
@@ -23,6 +24,9 @@ from ide.analysis_panel import AnalysisPanel
 from ide.code_editor import CodeEditor
 from ide.console_panel import ConsolePanel
 from ide.file_explorer import FileExplorer
+from ide.search_panel import SearchPanel
+from ide.skuld.optimizer import OPT_LEVELS
+from ide.skuld.phases import ENGINES
 from ide.theme import steins_gate_theme
 
 
@@ -35,12 +39,14 @@ def build_menu(window) -> None:
     action_new = QAction("Nuevo", window)
     action_open = QAction("Abrir", window)
     action_open_folder = QAction("Abrir Carpeta", window)
+    action_quick_open = QAction("Ir a archivo...", window)
     action_close = QAction("Cerrar", window)
     action_save = QAction("Guardar", window)
     action_save_as = QAction("Guardar Como", window)
     action_find = QAction("Buscar", window)
     action_find_next = QAction("Buscar siguiente", window)
     action_find_prev = QAction("Buscar anterior", window)
+    action_find_in_folder = QAction("Buscar en carpeta", window)
     action_go_to_line = QAction("Ir a línea", window)
     action_toggle_analysis = QAction("Alternar Analizadores", window)
     action_toggle_terminal = QAction("Alternar Terminal", window)
@@ -59,6 +65,8 @@ def build_menu(window) -> None:
 
     action_new.setShortcut(QKeySequence("Ctrl+N"))
     action_open_folder.setShortcut(QKeySequence("Ctrl+O"))
+    action_quick_open.setShortcut(QKeySequence("Ctrl+P"))
+    action_quick_open.setShortcutContext(Qt.ApplicationShortcut)
     action_save.setShortcut(QKeySequence("Ctrl+S"))
     action_save.setShortcutContext(Qt.ApplicationShortcut)
     action_save_as.setShortcut(QKeySequence("Ctrl+G"))
@@ -66,6 +74,8 @@ def build_menu(window) -> None:
     action_find.setShortcut(QKeySequence("Ctrl+F"))
     action_find_next.setShortcut(QKeySequence("F3"))
     action_find_prev.setShortcut(QKeySequence("Shift+F3"))
+    action_find_in_folder.setShortcut(QKeySequence("Ctrl+Shift+F"))
+    action_find_in_folder.setShortcutContext(Qt.ApplicationShortcut)
     action_go_to_line.setShortcut(QKeySequence("Ctrl+4"))
     action_undo.setShortcut(QKeySequence("Ctrl+Z"))
     action_redo.setShortcut(QKeySequence("Ctrl+Y"))
@@ -96,12 +106,14 @@ def build_menu(window) -> None:
     action_new.triggered.connect(window._new_file)
     action_open.triggered.connect(window._open_file)
     action_open_folder.triggered.connect(window._open_folder)
+    action_quick_open.triggered.connect(window._show_quick_open)
     action_close.triggered.connect(window._close_file)
     action_save.triggered.connect(window._save_file)
     action_save_as.triggered.connect(window._save_file_as)
     action_find.triggered.connect(window._find_in_code)
     action_find_next.triggered.connect(window._find_next)
     action_find_prev.triggered.connect(window._find_previous)
+    action_find_in_folder.triggered.connect(window._show_folder_search)
     action_go_to_line.triggered.connect(window._go_to_line)
     action_undo.triggered.connect(window._undo_active_editor)
     action_redo.triggered.connect(window._redo_active_editor)
@@ -121,6 +133,7 @@ def build_menu(window) -> None:
     menu_file.addAction(action_new)
     menu_file.addAction(action_open)
     menu_file.addAction(action_open_folder)
+    menu_file.addAction(action_quick_open)
     menu_file.addAction(action_close)
     menu_file.addSeparator()
     menu_file.addAction(action_save)
@@ -136,6 +149,7 @@ def build_menu(window) -> None:
     menu_edit.addAction(action_find)
     menu_edit.addAction(action_find_next)
     menu_edit.addAction(action_find_prev)
+    menu_edit.addAction(action_find_in_folder)
     menu_edit.addAction(action_go_to_line)
     menu_edit.addAction(action_toggle_analysis)
     menu_edit.addAction(action_toggle_terminal)
@@ -152,13 +166,40 @@ def build_menu(window) -> None:
     action_sem = QAction("Análisis Semántico", window)
     action_inter = QAction("Código Intermedio", window)
     action_exec = QAction("Ejecución", window)
+    action_profile = QAction("Perfilar ejecución", window)
+    action_run_all = QAction("Compilar todo", window)
+    action_cancel = QAction("Cancelar fase", window)
+    action_timeout = QAction("Tiempo límite...", window)
+    action_output_cap = QAction("Límite de salida...", window)
+    action_server_mode = QAction("Servidor persistente", window)
+    action_clear_cache = QAction("Vaciar caché de fases", window)
+    action_live_analysis = QAction("Análisis en vivo", window)
+    action_analysis_delay = QAction("Retardo del análisis...", window)
     action_clear = QAction("Limpiar", window)
 
+    action_run_all.setShortcut(QKeySequence("F5"))
+    action_cancel.setShortcut(QKeySequence("Ctrl+Alt+C"))
+    action_cancel.setShortcutContext(Qt.ApplicationShortcut)
+    action_cancel.setEnabled(False)
+    action_server_mode.setCheckable(True)
+    action_server_mode.setChecked(window._compiler_server_mode)
+    action_live_analysis.setCheckable(True)
+    action_live_analysis.setChecked(window._live_analysis_enabled)
+
     action_lex.triggered.connect(lambda: window._run_phase("lexico"))
     action_syn.triggered.connect(lambda: window._run_phase("sintactico"))
     action_sem.triggered.connect(lambda: window._run_phase("semantico"))
     action_inter.triggered.connect(lambda: window._run_phase("intermedio"))
     action_exec.triggered.connect(lambda: window._run_phase("ejecucion"))
+    action_profile.triggered.connect(lambda: window._run_phase("perfil"))
+    action_run_all.triggered.connect(window._run_all_phases)
+    action_cancel.triggered.connect(window._cancel_phase)
+    action_timeout.triggered.connect(window._configure_compiler_timeout)
+    action_output_cap.triggered.connect(window._configure_output_cap)
+    action_server_mode.triggered.connect(lambda enabled: window._set_compiler_server_mode(bool(enabled)))
+    action_clear_cache.triggered.connect(window._clear_phase_cache)
+    action_live_analysis.triggered.connect(lambda enabled: window._set_live_analysis(bool(enabled)))
+    action_analysis_delay.triggered.connect(window._configure_analysis_delay)
     action_clear.triggered.connect(window._clear_outputs)
 
     menu_build.addAction(action_lex)
@@ -166,9 +207,42 @@ def build_menu(window) -> None:
     menu_build.addAction(action_sem)
     menu_build.addAction(action_inter)
     menu_build.addAction(action_exec)
+    menu_build.addAction(action_profile)
+    menu_build.addAction(action_run_all)
+    menu_build.addSeparator()
+    menu_build.addAction(action_cancel)
+    menu_build.addAction(action_timeout)
+    menu_build.addAction(action_output_cap)
+    menu_build.addAction(action_server_mode)
+    menu_build.addAction(action_clear_cache)
+    menu_build.addSeparator()
+    menu_optimization = menu_build.addMenu("Optimización")
+    optimization_group = QActionGroup(window)
+    optimization_group.setExclusive(True)
+    for level, label in OPT_LEVELS.items():
+        action_level = QAction(f"O{level} · {label}", window)
+        action_level.setCheckable(True)
+        action_level.setChecked(level == window._opt_level)
+        action_level.triggered.connect(lambda _checked, value=level: window._set_opt_level(value))
+        optimization_group.addAction(action_level)
+        menu_optimization.addAction(action_level)
+    menu_engine = menu_build.addMenu("Motor de ejecución")
+    engine_group = QActionGroup(window)
+    engine_group.setExclusive(True)
+    for engine, label in ENGINES.items():
+        action_engine = QAction(label, window)
+        action_engine.setCheckable(True)
+        action_engine.setChecked(engine == window._execution_engine)
+        action_engine.triggered.connect(lambda _checked, value=engine: window._set_execution_engine(value))
+        engine_group.addAction(action_engine)
+        menu_engine.addAction(action_engine)
+    menu_build.addAction(action_live_analysis)
+    menu_build.addAction(action_analysis_delay)
     menu_build.addSeparator()
     menu_build.addAction(action_clear)
 
+    window._action_cancel_phase = action_cancel
+
     for label in ["Documentación", "Acerca de"]:
         menu_help.addAction(QAction(label, window))
 
@@ -198,6 +272,7 @@ def build_toolbar(window) -> None:
     action_sem = QAction(window._toolbar_icon(["fa5s.check-circle", "fa5.check-circle"], QStyle.SP_MessageBoxInformation, color=green_color), "Semántico", window)
     action_inter = QAction(window._toolbar_icon(["fa5s.cogs", "fa5.cogs"], QStyle.SP_ComputerIcon, color=warm_color), "Intermedio", window)
     action_exec = QAction(window._toolbar_icon(["fa5s.play-circle", "fa5.play-circle"], QStyle.SP_MediaPlay, color=colors.accent), "Ejecución", window)
+    action_run_all = QAction(window._toolbar_icon(["fa5s.forward", "fa5.forward"], QStyle.SP_MediaSeekForward, color=colors.accent), "Compilar todo", window)
 
     action_new.setToolTip("Nuevo (Ctrl+N)")
     action_open.setToolTip("Abrir archivo")
@@ -212,6 +287,7 @@ def build_toolbar(window) -> None:
     action_sem.setToolTip("Análisis semántico")
     action_inter.setToolTip("Código intermedio")
     action_exec.setToolTip("Ejecución")
+    action_run_all.setToolTip("Compilar todo (F5)")
 
     action_new.triggered.connect(window._new_file)
     action_open.triggered.connect(window._open_file)
@@ -226,6 +302,7 @@ def build_toolbar(window) -> None:
     action_sem.triggered.connect(lambda: window._run_phase("semantico"))
     action_inter.triggered.connect(lambda: window._run_phase("intermedio"))
     action_exec.triggered.connect(lambda: window._run_phase("ejecucion"))
+    action_run_all.triggered.connect(window._run_all_phases)
 
     toolbar.addAction(action_new)
     toolbar.addAction(action_open)
@@ -242,6 +319,7 @@ def build_toolbar(window) -> None:
     toolbar.addAction(action_sem)
     toolbar.addAction(action_inter)
     toolbar.addAction(action_exec)
+    toolbar.addAction(action_run_all)
 
 
 def build_layout(window) -> None:
@@ -267,6 +345,9 @@ def build_layout(window) -> None:
     window._file_explorer.file_close_requested.connect(window._close_file_from_explorer)
     window._file_explorer.path_renamed.connect(window._on_path_renamed)
     window._file_explorer.path_deleted.connect(window._on_path_deleted)
+    window._file_explorer.roots_changed.connect(window._sync_file_index_roots)
+    window._file_explorer.roots_changed.connect(window._sync_text_index_roots)
+    window._file_explorer.files_changed.connect(window._on_explorer_files_changed)
     window._analysis_panel = AnalysisPanel()
     window._analysis_container = window._create_panel_container(
         "Analizadores",
@@ -287,6 +368,12 @@ def build_layout(window) -> None:
     window._top_sizes_before_analysis_toggle = window._top_splitter.sizes()
 
     window._console_panel = ConsolePanel()
+    window._search_panel = SearchPanel()
+    window._search_panel.search_requested.connect(window._run_folder_search)
+    window._search_panel.result_activated.connect(window._open_search_result)
+    window._search_panel.replace_preview_requested.connect(window._preview_replace)
+    window._search_panel.replace_apply_requested.connect(window._apply_replace)
+    window._console_panel.addTab(window._search_panel, "Búsqueda")
     window._console_container = window._create_panel_container(
         "Terminal",
         window._console_panel,
@@ -2,15 +2,42 @@ from __future__ import annotations
 
 import datetime
 import os
+import re
+import time
 from pathlib import Path
 
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QDialog, QFileDialog, QMessageBox
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import QDialog, QFileDialog, QInputDialog, QMessageBox
 
 from ide.code_editor import CodeEditor
-from ide.compiler_runner import run_compiler
+from ide.compiler_runner import CompilerResult, compiler_identity, runs_in_process, shutdown_compiler_server
+from ide.compiler_task import STREAMED_PHASES, CompilerTask, PipelineTask
+from ide.file_index import FileIndex, RootFiles
+from ide.output_stream import OutputStream
+from ide.phase_cache import CACHEABLE_PHASES, phase_cache_key
+from ide.quick_open import QuickOpenDialog
+from ide.replace_in_files import (
+    FileReplacement,
+    ReplaceConflict,
+    ReplaceRequest,
+    apply_replacements,
+    common_prefix_length,
+)
+from ide.replace_task import ReplaceTask
+from ide.skuld.analysis import AnalysisResult
+from ide.skuld.optimizer import OPT_LEVELS
+from ide.skuld.phases import DEFAULT_ENGINE, ENGINES, PhaseOptions
+from ide.skuld.profiler import format_profile
+from ide.text_index import SearchRequest, TextMatch, compile_query
 from ide.theme import steins_gate_theme
 
+# Fases que encadena "Compilar todo", en orden.
+ALL_PHASES = ("lexico", "sintactico", "semantico", "intermedio", "ejecucion")
+FILE_INDEX_FILE = "file_index.json"
+# Antigüedad a partir de la cual abrir "Ir a archivo" vuelve a recorrer las raíces.
+FILE_INDEX_REFRESH_SECONDS = 60
+
 
 def set_autosave_enabled(window, enabled: bool, *, persist: bool = True) -> None:
     window._autosave_enabled = enabled
@@ -62,6 +89,7 @@ def write_editor_to_path(window, editor: CodeEditor, path: Path) -> bool:
 
     editor.setProperty("unsaved", False)
     watch_file(window, path)
+    window._text_search.update_path(path_key)
     return True
 
 
@@ -100,7 +128,7 @@ def save_editor_as(window, editor: CodeEditor, index: int | None = None) -> bool
         window._editor_tabs.setTabToolTip(tab_index, str(path))
 
     if window._file_explorer is not None:
-        window._file_explorer.refresh()
+        window._file_explorer.refresh_path(str(path.parent))
         window._file_explorer.add_open_file(str(path))
     return True
 
@@ -116,7 +144,7 @@ def save_editor(window, editor: CodeEditor, index: int | None = None) -> bool:
         return False
 
     if window._file_explorer is not None:
-        window._file_explorer.refresh()
+        window._file_explorer.refresh_path(str(path.parent))
     return True
 
 
@@ -464,40 +492,364 @@ def close_file(window) -> None:
 
 
 def run_phase(window, phase: str) -> None:
+    prepared = prepare_phase_run(window, (phase,))
+    if prepared is None:
+        return
+    editor, current_file, options = prepared
+
+    window._phase_cache_key = None
+    if phase in CACHEABLE_PHASES:
+        key = phase_cache_key(phase, editor.toPlainText(), compiler_identity(), options)
+        cached = window._phase_cache.get(key)
+        if cached is not None:
+            if not cached.stages:
+                cached.stages = cached_upstream_outputs(window, phase, editor.toPlainText(), options)
+            apply_phase_result(window, phase, cached, str(current_file))
+            window._status.showMessage(f"Resultado de {phase} tomado de la caché.", 2000)
+            return
+        window._phase_cache_key = key
+
+    timeout = window._compiler_timeout_seconds or None
+    task = CompilerTask(
+        phase,
+        str(current_file),
+        timeout=timeout,
+        use_server=window._compiler_server_mode,
+        options=options,
+        output=start_output_stream(window) if phase in STREAMED_PHASES else None,
+        parent=window,
+    )
+    task.result_ready.connect(lambda finished_phase, result: on_phase_finished(window, finished_phase, result))
+    task.finished.connect(task.deleteLater)
+    window._compiler_task = task
+    set_compiler_busy(window, phase)
+    task.start()
+
+
+def prepare_phase_run(window, phases: tuple[str, ...]) -> tuple[CodeEditor, Path, PhaseOptions] | None:
+    """Comprueba que se puede compilar, pide la entrada si hace falta y guarda."""
     editor = get_active_editor(window)
     if not editor:
-        return
+        return None
+
+    if window._compiler_task is not None:
+        window._status.showMessage("Ya hay una fase en ejecución. Cancélala o espera a que termine.", 2500)
+        return None
 
     current_file = get_active_file_path(window)
     if not current_file:
         save_file_as(window)
         current_file = get_active_file_path(window)
         if not current_file:
-            return
+            return None
+
+    options = PhaseOptions(opt_level=window._opt_level, engine=window._execution_engine)
+    needs_input = any(phase in ("ejecucion", "perfil") and runs_in_process(phase) for phase in phases)
+    if needs_input and "sphone" in editor.toPlainText():
+        # La máquina virtual integrada no tiene consola interactiva: la
+        # entrada se pide antes de ejecutar, un valor por línea.
+        stdin, ok = QInputDialog.getMultiLineText(
+            window,
+            "Entrada del programa",
+            "Valores para 'sphone', uno por línea:",
+            window._execution_input,
+        )
+        if not ok:
+            return None
+        window._execution_input = stdin
+        options = PhaseOptions(opt_level=window._opt_level, stdin=stdin, engine=window._execution_engine)
 
     save_file(window)
-    result = run_compiler(phase, str(current_file))
+    return editor, current_file, options
+
+
+def run_all_phases(window) -> None:
+    prepared = prepare_phase_run(window, ALL_PHASES)
+    if prepared is None:
+        return
+    editor, current_file, options = prepared
+
+    task = PipelineTask(
+        ALL_PHASES,
+        str(current_file),
+        editor.toPlainText(),
+        cache=window._phase_cache,
+        timeout=window._compiler_timeout_seconds or None,
+        use_server=window._compiler_server_mode,
+        options=options,
+        output=start_output_stream(window),
+        parent=window,
+    )
+    task.stage_ready.connect(
+        lambda phase, result, _elapsed, _cached: on_pipeline_stage(window, phase, result, str(current_file))
+    )
+    task.pipeline_finished.connect(lambda timings: on_pipeline_finished(window, timings))
+    task.finished.connect(task.deleteLater)
+    window._compiler_task = task
+    set_compiler_busy(window, ALL_PHASES[0])
+    task.start()
+
+
+def start_output_stream(window) -> OutputStream:
+    output = OutputStream(window._output_cap_kb * 1024)
+    if window._console_panel is not None:
+        window._console_panel.attach_output(output)
+    return output
+
+
+def on_pipeline_stage(window, phase: str, result: CompilerResult, source_path: str) -> None:
+    if phase in STREAMED_PHASES and window._console_panel is not None:
+        window._console_panel.finish_output()
+    # Las fases anteriores ya llegaron en su propia señal.
+    apply_phase_result(window, phase, result, source_path, show_stages=False)
+
+
+def on_pipeline_finished(window, timings: list[tuple[str, float, bool]]) -> None:
+    window._compiler_task = None
+    set_compiler_busy(window, None)
+    if window._console_panel is not None:
+        window._console_panel.finish_output()
+    if window._console_panel is not None and timings:
+        window._console_panel.append_console(format_pipeline_timings(timings))
+
+
+def format_pipeline_timings(timings: list[tuple[str, float, bool]]) -> str:
+    lines = ["Tiempos de Compilar todo:"]
+    for phase, elapsed, cached in timings:
+        lines.append(f"  {phase:<12}{elapsed * 1000:>10.1f} ms{'  (caché)' if cached else ''}")
+    total = sum(elapsed for _phase, elapsed, _cached in timings)
+    lines.append(f"  {'total':<12}{total * 1000:>10.1f} ms")
+    return "\n".join(lines)
+
+
+def on_phase_finished(window, phase: str, result: CompilerResult) -> None:
+    task = window._compiler_task
+    window._compiler_task = None
+    set_compiler_busy(window, None)
+    if window._console_panel is not None:
+        window._console_panel.finish_output()
+    if window._phase_cache_key is not None:
+        window._phase_cache.put(window._phase_cache_key, result)
+        window._phase_cache_key = None
+    apply_phase_result(window, phase, result, task.source_path if task is not None else None)
+
+
+def cached_upstream_outputs(window, phase: str, source: str, options: PhaseOptions) -> dict[str, str]:
+    # "Compilar todo" guarda cada fase sin las anteriores; se recuperan de
+    # sus propias entradas cuando existen.
+    stages: dict[str, str] = {}
+    for earlier in CACHEABLE_PHASES[: CACHEABLE_PHASES.index(phase)]:
+        cached = window._phase_cache.get(phase_cache_key(earlier, source, compiler_identity(), options))
+        if cached is not None:
+            stages[earlier] = cached.stdout
+    return stages
+
+
+def apply_phase_result(
+    window,
+    phase: str,
+    result: CompilerResult,
+    source_path: str | None = None,
+    *,
+    show_stages: bool = True,
+) -> None:
+    if result.cancelled:
+        if window._console_panel is not None:
+            window._console_panel.append_console(f"Fase cancelada: {phase}")
+        return
 
     if result.returncode != 0:
         if window._console_panel is not None:
             window._console_panel.append_errors(result.stderr or "Error ejecutando el compilador.")
         return
 
+    # Las fases anteriores se calcularon en la misma ejecución: se muestran
+    # sin volver a invocar al compilador.
+    for stage, stage_text in result.stages.items() if show_stages else ():
+        show_analysis_output(window, stage, stage_text or "(sin salida)")
+
     output_text = result.stdout or "(sin salida)"
+    if phase in ("lexico", "sintactico", "semantico", "intermedio"):
+        show_analysis_output(window, phase, output_text)
+    elif phase == "ejecucion":
+        if window._console_panel is not None and not result.streamed:
+            window._console_panel.append_execution(output_text)
+    elif phase == "perfil":
+        if window._console_panel is not None and not result.streamed:
+            window._console_panel.append_execution(output_text)
+        if result.profile is not None:
+            window._analysis_panel.show_profile(format_profile(result.profile))
+            editor = find_editor_for_path(window, Path(source_path)) if source_path else None
+            if editor is not None:
+                editor.set_line_hits(result.profile.line_hits)
+
+    if result.stderr and window._console_panel is not None:
+        window._console_panel.append_errors(result.stderr)
+
+    if window._console_panel is not None:
+        window._console_panel.append_console(f"Fase ejecutada: {phase}")
+
+
+def show_analysis_output(window, phase: str, text: str) -> None:
     if phase == "lexico":
-        window._analysis_panel.set_tokens(output_text)
+        window._analysis_panel.set_tokens(text)
     elif phase == "sintactico":
-        window._analysis_panel.set_syntax(output_text)
+        window._analysis_panel.set_syntax(text)
     elif phase == "semantico":
-        window._analysis_panel.set_semantic(output_text)
+        window._analysis_panel.set_semantic(text)
     elif phase == "intermedio":
-        window._analysis_panel.set_intermediate(output_text)
-    elif phase == "ejecucion":
-        if window._console_panel is not None:
-            window._console_panel.append_execution(output_text)
+        window._analysis_panel.set_intermediate(text)
+
+
+def cancel_phase(window) -> None:
+    task = window._compiler_task
+    if task is None:
+        return
+    task.cancel()
+    window._status.showMessage(f"Cancelando fase: {task.phase}...", 2000)
+
+
+def set_compiler_busy(window, phase: str | None) -> None:
+    busy = phase is not None
+    if window._action_cancel_phase is not None:
+        window._action_cancel_phase.setEnabled(busy)
+    if window._compile_progress is not None:
+        window._compile_progress.setVisible(busy)
+    if window._compile_status_label is not None:
+        window._compile_status_label.setVisible(busy)
+        window._compile_status_label.setText(f"Ejecutando {phase}..." if busy else "")
+
+    if busy:
+        window._compile_started_at = time.monotonic()
+        window._compile_elapsed_timer.start()
+    else:
+        window._compile_elapsed_timer.stop()
+
+
+def update_compiler_elapsed(window) -> None:
+    task = window._compiler_task
+    if task is None or window._compile_status_label is None:
+        return
+    elapsed = time.monotonic() - window._compile_started_at
+    window._compile_status_label.setText(f"Ejecutando {task.phase} · {elapsed:.1f} s")
+
+
+def set_compiler_server_mode(window, enabled: bool, *, persist: bool = True) -> None:
+    window._compiler_server_mode = enabled
+    if not enabled:
+        shutdown_compiler_server()
+    if persist:
+        window._settings.setValue("compiler/server_mode", enabled)
+    label = "activado" if enabled else "desactivado"
+    window._status.showMessage(f"Servidor persistente del compilador {label}", 2000)
+
+
+def configure_compiler_timeout(window) -> None:
+    value, ok = QInputDialog.getInt(
+        window,
+        "Tiempo límite del compilador",
+        "Segundos antes de detener la fase (0 = sin límite):",
+        int(window._compiler_timeout_seconds),
+        0,
+        3600,
+    )
+    if not ok:
+        return
+    window._compiler_timeout_seconds = value
+    window._settings.setValue("compiler/timeout_seconds", value)
+    label = f"{value} s" if value else "sin límite"
+    window._status.showMessage(f"Tiempo límite del compilador: {label}", 2500)
+
+
+def configure_output_cap(window) -> None:
+    value, ok = QInputDialog.getInt(
+        window,
+        "Límite de salida",
+        "KB de salida del programa que se muestran antes de volcar el resto a un archivo:",
+        int(window._output_cap_kb),
+        16,
+        1024 * 1024,
+    )
+    if not ok:
+        return
+    window._output_cap_kb = value
+    window._settings.setValue("execution/output_cap_kb", value)
+    window._status.showMessage(f"Límite de salida: {value} KB", 2500)
 
+
+def clear_phase_cache(window) -> None:
+    freed = window._phase_cache.clear()
+    message = f"Caché de fases vaciada ({freed / 1024:.1f} KB liberados)."
+    window._status.showMessage(message, 3000)
     if window._console_panel is not None:
-        window._console_panel.append_console(f"Fase ejecutada: {phase}")
+        window._console_panel.append_console(message)
+
+
+def set_opt_level(window, level: int, *, persist: bool = True) -> None:
+    if level not in OPT_LEVELS:
+        level = 0
+    window._opt_level = level
+    window._analysis_scheduler.options = PhaseOptions(opt_level=level)
+    if persist:
+        window._settings.setValue("compiler/opt_level", level)
+    window._status.showMessage(f"Optimización O{level}: {OPT_LEVELS[level]}", 2000)
+    schedule_live_analysis(window)
+
+
+def set_execution_engine(window, engine: str, *, persist: bool = True) -> None:
+    if engine not in ENGINES:
+        engine = DEFAULT_ENGINE
+    window._execution_engine = engine
+    if persist:
+        window._settings.setValue("compiler/engine", engine)
+    window._status.showMessage(f"Motor de ejecución: {ENGINES[engine]}", 2000)
+
+
+def schedule_live_analysis(window, editor: CodeEditor | None = None) -> None:
+    if not window._live_analysis_enabled:
+        return
+    editor = editor or get_active_editor(window)
+    if editor is not None:
+        window._analysis_scheduler.schedule(editor)
+
+
+def on_analysis_ready(window, editor: CodeEditor, result: AnalysisResult) -> None:
+    # Un resultado de otra pestaña o llegado tras desactivar el análisis se ignora.
+    if not window._live_analysis_enabled or editor is not get_active_editor(window):
+        return
+    if window._analysis_panel is None:
+        return
+    window._analysis_panel.set_tokens(result.tokens_text)
+    window._analysis_panel.set_syntax(result.syntax_text)
+    window._analysis_panel.set_semantic(result.semantic_text)
+    window._analysis_panel.set_intermediate(result.intermediate_text)
+    window._analysis_panel.set_symbols(result.symbols)
+
+
+def set_live_analysis(window, enabled: bool, *, persist: bool = True) -> None:
+    window._live_analysis_enabled = enabled
+    if persist:
+        window._settings.setValue("analysis/live", enabled)
+    if enabled:
+        schedule_live_analysis(window)
+    else:
+        window._analysis_scheduler.cancel()
+
+
+def configure_analysis_delay(window) -> None:
+    value, ok = QInputDialog.getInt(
+        window,
+        "Retardo del análisis en vivo",
+        "Milisegundos sin escribir antes de analizar:",
+        window._analysis_scheduler.delay_ms(),
+        0,
+        5000,
+    )
+    if not ok:
+        return
+    window._analysis_scheduler.set_delay_ms(value)
+    window._settings.setValue("analysis/debounce_ms", value)
+    window._status.showMessage(f"Retardo del análisis en vivo: {value} ms", 2500)
 
 
 def open_file_from_explorer(window, file_path: str) -> None:
@@ -760,6 +1112,7 @@ def on_tab_changed(window, _index: int) -> None:
         editor.set_search_highlights(window._search_text)
         window._update_find_match_label()
         editor.setFocus()
+        schedule_live_analysis(window, editor)
     window._update_cursor_status()
 
 
@@ -829,6 +1182,259 @@ def on_path_deleted(window, deleted_path_raw: str) -> None:
         new_file(window)
 
 
+def show_quick_open(window) -> None:
+    if window._quick_open is None:
+        window._quick_open = QuickOpenDialog(window._file_index, window)
+        window._quick_open.file_chosen.connect(lambda file_path: open_file_path(window, Path(file_path)))
+    # Se muestra ya con lo indexado; si es antiguo se rehace por detrás y la
+    # lista se actualiza al terminar.
+    if time.monotonic() - window._file_index_built_at > FILE_INDEX_REFRESH_SECONDS:
+        rebuild_file_index(window)
+    window._quick_open.popup()
+
+
+def load_file_index(window) -> FileIndex:
+    return FileIndex.load(window._data_dir / FILE_INDEX_FILE)
+
+
+def save_file_index(window) -> None:
+    if not window._file_index.modified:
+        return
+    try:
+        window._file_index.save(window._data_dir / FILE_INDEX_FILE)
+    except OSError:
+        pass
+
+
+def rebuild_file_index(window) -> None:
+    if window._file_explorer is None:
+        return
+    window._file_index_built_at = time.monotonic()
+    for root in window._file_explorer.get_root_paths():
+        window._file_index_builder.request(root)
+
+
+def sync_file_index_roots(window) -> None:
+    roots = set(window._file_explorer.get_root_paths()) if window._file_explorer is not None else set()
+    for root in window._file_index.roots():
+        if root not in roots:
+            window._file_index.remove_root(root)
+    rebuild_file_index(window)
+
+
+def on_file_index_built(window, root: str, files: RootFiles) -> None:
+    if window._file_explorer is None or root not in window._file_explorer.get_root_paths():
+        return
+    window._file_index.set_root(root, files)
+    if window._quick_open is not None and window._quick_open.isVisible():
+        window._quick_open.update_results()
+
+
+def on_explorer_files_changed(window, added: list[tuple[str, bool]], removed: list[tuple[str, bool]]) -> None:
+    index = window._file_index
+    for path, is_dir in removed:
+        window._text_search.remove_path(path)
+        if is_dir:
+            index.remove_tree(path)
+        else:
+            index.remove_file(path)
+    for path, is_dir in added:
+        if not is_dir:
+            index.add_file(path)
+            window._text_search.update_path(path)
+            continue
+        window._text_search.rescan_path(path)
+        # De una carpeta nueva no se conoce el contenido: se recorre su raíz.
+        root = index.root_for(path)
+        if root is not None:
+            window._file_index_builder.request(root)
+
+
+def sync_text_index_roots(window) -> None:
+    roots = window._file_explorer.get_root_paths() if window._file_explorer is not None else []
+    window._text_search.sync_roots(roots)
+
+
+def show_folder_search(window) -> None:
+    if window._search_panel is None or window._console_panel is None:
+        return
+    window._show_terminal_panel()
+    window._console_panel.setCurrentWidget(window._search_panel)
+    editor = get_active_editor(window)
+    selected = editor.textCursor().selectedText() if editor is not None else ""
+    # Una selección de varias líneas no sirve como consulta.
+    window._search_panel.focus_input(selected if "\u2029" not in selected else "")
+
+
+def run_folder_search(window, query: str, use_regex: bool, case_sensitive: bool) -> None:
+    panel = window._search_panel
+    if panel is None:
+        return
+    if window._file_explorer is None or not window._file_explorer.get_root_paths():
+        panel.show_message("Abre una carpeta para buscar en ella.")
+        return
+    request = SearchRequest(query, use_regex, case_sensitive)
+    try:
+        compile_query(request)
+    except re.error as exc:
+        panel.show_message(f"Expresión regular no válida: {exc}")
+        return
+    # Lo que se busca en los editores con cambios es lo que se ve, no lo guardado.
+    for index in range(window._editor_tabs.count() if window._editor_tabs is not None else 0):
+        editor = window._editor_tabs.widget(index)
+        file_path_raw = editor.property("file_path") if isinstance(editor, CodeEditor) else None
+        if file_path_raw and bool(editor.property("unsaved")):
+            request.overrides[str(Path(str(file_path_raw)).resolve())] = editor.toPlainText()
+    panel.begin(query)
+    window._search_started_at = time.perf_counter()
+    window._search_generation = window._text_search.search(request)
+
+
+def on_search_file_matched(window, generation: int, path: str, matches: list[TextMatch]) -> None:
+    if generation == window._search_generation and window._search_panel is not None:
+        window._search_panel.add_matches(path, matches)
+
+
+def on_search_finished(window, generation: int, files: int, matches: int, truncated: bool) -> None:
+    if generation == window._search_generation and window._search_panel is not None:
+        window._search_panel.finish(files, matches, truncated, time.perf_counter() - window._search_started_at)
+
+
+def open_search_result(window, file_path: str, line: int, column: int) -> None:
+    open_file_path(window, Path(file_path), log_to_console=False)
+    editor = find_editor_for_path(window, Path(file_path))
+    if editor is None:
+        return
+    block = editor.document().findBlockByNumber(max(0, line - 1))
+    cursor = QTextCursor(block)
+    cursor.movePosition(QTextCursor.Right, QTextCursor.MoveAnchor, max(0, min(column - 1, block.length() - 1)))
+    editor.setTextCursor(cursor)
+    editor.centerCursor()
+    editor.setFocus()
+
+
+def preview_replace(window, query: str, replacement: str, use_regex: bool, case_sensitive: bool) -> None:
+    panel = window._search_panel
+    if panel is None:
+        return
+    roots = window._file_explorer.get_root_paths() if window._file_explorer is not None else []
+    if not roots:
+        panel.show_message("Abre una carpeta para reemplazar en ella.")
+        return
+    request = ReplaceRequest(query, replacement, use_regex, case_sensitive)
+    try:
+        request.validate()
+    except re.error as exc:
+        panel.show_message(f"Expresión regular no válida: {exc}")
+        return
+    cancel_replace_preview(window)
+    # Los archivos abiertos se calculan sobre el texto del editor: es el que se
+    # modificará al aplicar, tenga o no cambios sin guardar.
+    overrides: dict[str, str] = {}
+    for index in range(window._editor_tabs.count() if window._editor_tabs is not None else 0):
+        editor = window._editor_tabs.widget(index)
+        file_path_raw = editor.property("file_path") if isinstance(editor, CodeEditor) else None
+        if file_path_raw:
+            overrides[str(Path(str(file_path_raw)).resolve())] = editor.toPlainText()
+    task = ReplaceTask([str(Path(root).resolve()) for root in roots], request, overrides, window)
+    task.file_planned.connect(lambda plan, task=task: on_replace_planned(window, task, plan))
+    task.planning_finished.connect(
+        lambda files, count, cancelled, task=task: on_replace_finished(window, task, files, count, cancelled)
+    )
+    window._replace_task = task
+    window._replace_started_at = time.perf_counter()
+    panel.begin_replace(query)
+    task.start()
+
+
+def cancel_replace_preview(window) -> None:
+    task = window._replace_task
+    window._replace_task = None
+    if task is not None:
+        task.cancel()
+        task.wait()
+
+
+def on_replace_planned(window, task: ReplaceTask, plan: FileReplacement) -> None:
+    if task is window._replace_task and window._search_panel is not None:
+        window._search_panel.add_replacement(plan)
+
+
+def on_replace_finished(window, task: ReplaceTask, files: int, replacements: int, cancelled: bool) -> None:
+    if task is not window._replace_task:
+        return
+    window._replace_task = None
+    if window._search_panel is not None:
+        elapsed = time.perf_counter() - window._replace_started_at
+        window._search_panel.finish_replace(files, replacements, cancelled, elapsed)
+
+
+def apply_replace(window, plans: list[FileReplacement]) -> None:
+    panel = window._search_panel
+    if panel is None or not plans:
+        return
+    open_plans: list[tuple[CodeEditor, FileReplacement]] = []
+    disk_plans: list[FileReplacement] = []
+    stale: list[str] = []
+    for plan in plans:
+        editor = find_editor_for_path(window, Path(plan.path))
+        if editor is None:
+            disk_plans.append(plan)
+        elif editor.toPlainText() != plan.original:
+            stale.append(plan.path)
+        else:
+            open_plans.append((editor, plan))
+    if stale:
+        panel.show_message(f"{len(stale)} archivo(s) abiertos cambiaron desde la vista previa; vuelve a generarla.")
+        return
+
+    try:
+        apply_replacements(disk_plans)
+    except ReplaceConflict as exc:
+        panel.show_message(f"{len(exc.paths)} archivo(s) cambiaron en disco desde la vista previa; vuelve a generarla.")
+        return
+    except OSError as exc:
+        panel.show_message(f"No se pudo reemplazar (no se modificó ningún archivo): {exc}")
+        return
+    for plan in disk_plans:
+        window._text_search.update_path(plan.path)
+
+    # Los editores abiertos cambian a través de su documento para conservar el
+    # deshacer; los que no tenían cambios se guardan sin aviso de recarga.
+    failed: list[str] = []
+    for editor, plan in open_plans:
+        was_unsaved = bool(editor.property("unsaved"))
+        replace_editor_text(editor, plan.replaced)
+        if not was_unsaved and not write_editor_to_path(window, editor, Path(plan.path)):
+            failed.append(os.path.basename(plan.path))
+
+    total = sum(plan.count for plan in plans)
+    message = f"Reemplazo: {total} cambios en {len(plans)} archivo(s)."
+    if failed:
+        message += f" No se pudieron guardar: {', '.join(failed)}."
+    panel.close_replace(message)
+    if window._console_panel is not None:
+        window._console_panel.append_console(message)
+
+
+def replace_editor_text(editor: CodeEditor, text: str) -> None:
+    """Sustituye el texto del editor en un solo paso deshacible, tocando solo el tramo que cambia."""
+    current = editor.toPlainText()
+    start = common_prefix_length(current, text)
+    tail = min(common_prefix_length(current, text, from_end=True), len(current) - start, len(text) - start)
+    cursor = QTextCursor(editor.document())
+    cursor.beginEditBlock()
+    cursor.setPosition(_utf16_length(current[:start]))
+    cursor.setPosition(_utf16_length(current[: len(current) - tail]), QTextCursor.KeepAnchor)
+    cursor.insertText(text[start : len(text) - tail])
+    cursor.endEditBlock()
+
+
+def _utf16_length(text: str) -> int:
+    """Longitud en unidades UTF-16, que es como cuenta Qt las posiciones del documento."""
+    return len(text.encode("utf-16-le")) // 2
+
+
 def get_active_editor(window) -> CodeEditor | None:
     if window._editor_tabs is None:
         return None
@@ -838,6 +1444,20 @@ def get_active_editor(window) -> CodeEditor | None:
     return None
 
 
+def find_editor_for_path(window, path: Path) -> CodeEditor | None:
+    if window._editor_tabs is None:
+        return None
+    target = path.resolve()
+    for index in range(window._editor_tabs.count()):
+        editor = window._editor_tabs.widget(index)
+        if not isinstance(editor, CodeEditor):
+            continue
+        file_path_raw = editor.property("file_path")
+        if file_path_raw and Path(str(file_path_raw)).resolve() == target:
+            return editor
+    return None
+
+
 def get_active_file_path(window) -> Path | None:
     editor = get_active_editor(window)
     if not editor:
@@ -863,6 +1483,7 @@ def clear_outputs(window) -> None:
         window._analysis_panel.set_syntax("")
         window._analysis_panel.set_semantic("")
         window._analysis_panel.set_intermediate("")
-        window._analysis_panel.set_symbols("")
+        window._analysis_panel.set_symbols([])
+        window._analysis_panel.set_profile("")
     if window._console_panel is not None:
         window._console_panel.clear_all()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+from typing import TextIO
+
+DEFAULT_OUTPUT_CAP_KB = 1024
+# Bytes (en UTF-8) que pueden esperar a la interfaz antes de frenar al programa.
+MAX_PENDING_BYTES = 256 * 1024
+_WAIT_TIMEOUT_SECONDS = 0.1
+
+
+class OutputStream:
+    """Salida de un programa entregada por líneas mientras se ejecuta.
+
+    El hilo que ejecuta escribe con ``write``; solo se entregan líneas
+    completas, que se acumulan en un búfer. Si la interfaz no lo vacía a
+    tiempo y supera ``MAX_PENDING_BYTES``, ``write`` se bloquea hasta que
+    haya sitio (contrapresión). La interfaz llama a ``drain``
+    periódicamente y se lleva todo lo escrito desde la vez anterior.
+
+    Los tamaños se cuentan en bytes de UTF-8, no en caracteres. Pasados
+    ``cap_bytes`` el resto de la salida ya no se encola: se vuelca
+    en un archivo temporal cuya ruta queda en ``spill_path``.
+    """
+
+    def __init__(self, cap_bytes: int = DEFAULT_OUTPUT_CAP_KB * 1024) -> None:
+        self.cap_bytes = cap_bytes
+        self.total_bytes = 0
+        self._queued_bytes = 0
+        self.spill_path: str | None = None
+        self._pending: list[str] = []
+        self._pending_bytes = 0
+        self._ready = threading.Condition()
+        self._partial = ""
+        self._spill: TextIO | None = None
+        # La tarea lo usa como su evento de cancelación: al cancelar, ``write``
+        # deja de esperar a la interfaz.
+        self.cancel_event = threading.Event()
+        self._closed = False
+
+    def write(self, text: str) -> None:
+        if self._closed or not text:
+            return
+        self.total_bytes += _utf8_length(text)
+        if self._spill is not None:
+            self._spill.write(text)
+            return
+        text = self._partial + text
+        cut = text.rfind("\n") + 1
+        self._partial = text[cut:]
+        if cut:
+            self._deliver(text[:cut])
+
+    def close(self) -> None:
+        """Entrega la última línea sin salto y cierra el archivo de volcado."""
+        if self._closed:
+            return
+        partial, self._partial = self._partial, ""
+        if partial and self._spill is None:
+            self._deliver(partial)
+        self._closed = True
+        if self._spill is not None:
+            self._spill.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def drain(self) -> str:
+        with self._ready:
+            chunks, self._pending = self._pending, []
+            self._pending_bytes = 0
+            self._ready.notify_all()
+        return "".join(chunks)
+
+    def _deliver(self, text: str) -> None:
+        size = _utf8_length(text)
+        if self._queued_bytes + size > self.cap_bytes:
+            # Las líneas que caben se muestran; el resto, incluido lo que
+            # llegue después, va al archivo temporal.
+            room = max(0, self.cap_bytes - self._queued_bytes)
+            encoded = text.encode("utf-8", "surrogatepass")
+            # Tras un salto de línea siempre empieza un carácter completo.
+            cut = len(encoded[: encoded.rfind(b"\n", 0, room) + 1].decode("utf-8", "surrogatepass"))
+            self._spill = tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", prefix="skuld-salida-", suffix=".txt", delete=False
+            )
+            self.spill_path = self._spill.name
+            self._spill.write(text[cut:] + self._partial)
+            self._partial = ""
+            text = text[:cut]
+            if not text:
+                return
+            size = _utf8_length(text)
+        self._queued_bytes += size
+        with self._ready:
+            # Un bloque mayor que el límite entra cuando el búfer está vacío.
+            while self._pending and self._pending_bytes + size > MAX_PENDING_BYTES:
+                if self.cancel_event.is_set():
+                    return
+                self._ready.wait(_WAIT_TIMEOUT_SECONDS)
+            self._pending.append(text)
+            self._pending_bytes += size
+
+
+def _utf8_length(text: str) -> int:
+    return len(text.encode("utf-8", "surrogatepass"))
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from ide.compiler_runner import CompilerResult
+from ide.skuld.phases import PhaseOptions
+
+# Fases deterministas: su salida depende solo del código y de las opciones.
+CACHEABLE_PHASES = ("lexico", "sintactico", "semantico", "intermedio")
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+_ENTRY_SUFFIX = ".json"
+
+
+def phase_cache_key(phase: str, source: str, compiler: str, options: PhaseOptions) -> str:
+    """Clave de una entrada: contenido, fase, compilador y opciones."""
+    source_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    # Solo el código intermedio depende del nivel de optimización.
+    opt_level = options.opt_level if phase == "intermedio" else 0
+    payload = json.dumps([source_hash, phase, compiler, opt_level])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PhaseCache:
+    """Resultados de fases guardados en disco, un archivo JSON por entrada.
+
+    El índice en memoria conserva el orden de uso (el más reciente al final)
+    y el tamaño de cada archivo; al superar ``max_bytes`` se eliminan las
+    entradas menos usadas. El índice se reconstruye a partir de la fecha de
+    modificación de los archivos, que se actualiza en cada acierto.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CompilerResult | None:
+        with self._lock:
+            entries = self._load_index()
+            path = self._entry_path(key)
+            if key not in entries:
+                self.misses += 1
+                return None
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                result = CompilerResult(
+                    int(data["returncode"]),
+                    str(data["stdout"]),
+                    str(data["stderr"]),
+                    stages={str(name): str(text) for name, text in data.get("stages", {}).items()},
+                )
+                os.utime(path)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                self._forget(key)
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: CompilerResult) -> None:
+        # Solo se guardan resultados completos del compilador.
+        if result.returncode != 0 or result.cancelled or result.timed_out:
+            return
+        payload = json.dumps(
+            {
+                "returncode": result.returncode,
+                "stdout": result.stdout,
+                "stderr": result.stderr,
+                "stages": result.stages,
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            entries = self._load_index()
+            path = self._entry_path(key)
+            temp_path = path.with_suffix(".tmp")
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                temp_path.write_bytes(payload)
+                os.replace(temp_path, path)
+            except OSError:
+                return
+            self._forget_index(key)
+            entries[key] = len(payload)
+            self._total_bytes += len(payload)
+            self._evict()
+
+    def clear(self) -> int:
+        """Vacía la caché y devuelve cuántos bytes se liberaron."""
+        with self._lock:
+            entries = self._load_index()
+            freed = self._total_bytes
+            for key in list(entries):
+                self._forget(key)
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            return freed
+
+    def size(self) -> tuple[int, int]:
+        with self._lock:
+            entries = self._load_index()
+            return len(entries), self._total_bytes
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._entries is not None:
+            return self._entries
+        found: list[tuple[float, str, int]] = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(_ENTRY_SUFFIX) or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, entry.name[: -len(_ENTRY_SUFFIX)], stat.st_size))
+        except OSError:
+            pass
+        found.sort()
+        self._entries = OrderedDict((key, size) for _mtime, key, size in found)
+        self._total_bytes = sum(size for _mtime, _key, size in found)
+        self._evict()
+        return self._entries
+
+    def _evict(self) -> None:
+        entries = self._entries
+        while entries and self._total_bytes > self.max_bytes:
+            self._forget(next(iter(entries)))
+
+    def _forget(self, key: str) -> None:
+        self._forget_index(key)
+        try:
+            self._entry_path(key).unlink()
+        except OSError:
+            pass
+
+    def _forget_index(self, key: str) -> None:
+        size = self._entries.pop(key, None) if self._entries is not None else None
+        if size is not None:
+            self._total_bytes -= size
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{_ENTRY_SUFFIX}"
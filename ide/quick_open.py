@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from PyQt5.QtCore import QEvent, QObject, Qt, pyqtSignal
+from PyQt5.QtWidgets import QDialog, QLabel, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout, QWidget
+
+from ide.file_index import FileIndex
+
+_PATH_ROLE = Qt.UserRole
+_NAVIGATION_KEYS = {Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown}
+
+
+class QuickOpenDialog(QDialog):
+    """Ventana de "Ir a archivo": filtra el índice a cada tecla."""
+
+    file_chosen = pyqtSignal(str)
+
+    def __init__(self, index: FileIndex, parent: QWidget | None = None) -> None:
+        super().__init__(parent, Qt.Popup | Qt.FramelessWindowHint)
+        self._index = index
+        self._input = QLineEdit()
+        self._input.setPlaceholderText("Nombre del archivo (letras en orden, p. ej. «mlstn»)")
+        self._input.installEventFilter(self)
+        self._input.textChanged.connect(self.update_results)
+        self._input.returnPressed.connect(self._choose_current)
+        self._results = QListWidget()
+        self._results.itemActivated.connect(self._choose_item)
+        self._status = QLabel()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.setSpacing(4)
+        layout.addWidget(self._input)
+        layout.addWidget(self._results, 1)
+        layout.addWidget(self._status)
+
+    def popup(self) -> None:
+        parent = self.parentWidget()
+        if parent is not None:
+            width = min(640, max(360, parent.width() // 2))
+            self.resize(width, 360)
+            top_left = parent.mapToGlobal(parent.rect().topLeft())
+            self.move(top_left.x() + (parent.width() - width) // 2, top_left.y() + 60)
+        self._input.selectAll()
+        self.update_results()
+        self.show()
+        self._input.setFocus()
+
+    def update_results(self) -> None:
+        matches = self._index.search(self._input.text())
+        self._results.clear()
+        for path, display in matches:
+            folder, _, name = display.rpartition("/")
+            item = QListWidgetItem(f"{name}    {folder}")
+            item.setData(_PATH_ROLE, path)
+            item.setToolTip(path)
+            self._results.addItem(item)
+        if matches:
+            self._results.setCurrentRow(0)
+        total = len(self._index)
+        self._status.setText(f"{len(matches)} de {total} archivos" if total else "Sin carpetas indexadas.")
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if watched is self._input and event.type() == QEvent.KeyPress and event.key() in _NAVIGATION_KEYS:
+            self._results.keyPressEvent(event)
+            return True
+        return super().eventFilter(watched, event)
+
+    def _choose_current(self) -> None:
+        item = self._results.currentItem()
+        if item is not None:
+            self._choose_item(item)
+
+    def _choose_item(self, item: QListWidgetItem) -> None:
+        self.hide()
+        self.file_chosen.emit(str(item.data(_PATH_ROLE)))
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import difflib
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+# Con menos archivos no compensa repartir el trabajo entre procesos.
+PARALLEL_MIN_FILES = 64
+FILES_PER_CHUNK = 32
+MAX_POOL_WORKERS = 4
+
+
+class ReplaceConflict(Exception):
+    """Algún archivo cambió en disco después de la vista previa."""
+
+    def __init__(self, paths: list[str]) -> None:
+        super().__init__("Archivos modificados desde la vista previa: " + ", ".join(paths))
+        self.paths = paths
+
+
+@dataclass(frozen=True)
+class ReplaceRequest:
+    query: str
+    replacement: str
+    regex: bool = False
+    case_sensitive: bool = False
+
+    def pattern(self) -> re.Pattern[str]:
+        flags = re.MULTILINE if self.case_sensitive else re.MULTILINE | re.IGNORECASE
+        return re.compile(self.query if self.regex else re.escape(self.query), flags)
+
+    def template(self) -> str:
+        # Sin expresiones regulares el reemplazo es literal: ``\1`` no es un grupo.
+        return self.replacement if self.regex else self.replacement.replace("\\", "\\\\")
+
+    def validate(self) -> None:
+        """Lanza ``re.error`` si la expresión o el reemplazo no son válidos."""
+        self.pattern().sub(self.template(), "")
+
+
+@dataclass(frozen=True)
+class FileReplacement:
+    path: str
+    original: str
+    replaced: str
+    count: int
+
+    def diff(self) -> str:
+        name = os.path.basename(self.path)
+        lines = difflib.unified_diff(
+            self.original.splitlines(keepends=True),
+            self.replaced.splitlines(keepends=True),
+            f"a/{name}",
+            f"b/{name}",
+        )
+        return "".join(line.rstrip("\r\n") + "\n" for line in lines)
+
+    def first_changed_line(self) -> int:
+        return self.original.count("\n", 0, common_prefix_length(self.original, self.replaced)) + 1
+
+
+def common_prefix_length(first: str, second: str, *, from_end: bool = False) -> int:
+    """Longitud del prefijo (o sufijo) común, por bisección sobre comparaciones de cortes."""
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if from_end:
+            same = first[len(first) - middle :] == second[len(second) - middle :]
+        else:
+            same = first[:middle] == second[:middle]
+        if same:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def plan_text(path: str, text: str, request: ReplaceRequest) -> FileReplacement | None:
+    replaced, count = request.pattern().subn(request.template(), text)
+    if not count or replaced == text:
+        return None
+    return FileReplacement(path, text, replaced, count)
+
+
+def read_source(path: str) -> str | None:
+    """Contenido exacto del archivo (saltos de línea incluidos), o ``None`` si no es texto UTF-8."""
+    try:
+        with open(path, encoding="utf-8", newline="") as handle:
+            return handle.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def plan_files(paths: list[str], request: ReplaceRequest) -> list[FileReplacement]:
+    """Calcula los reemplazos de ``paths``; es lo que ejecuta cada proceso."""
+    plans: list[FileReplacement] = []
+    for path in paths:
+        text = read_source(path)
+        if text is None:
+            continue
+        plan = plan_text(path, text, request)
+        if plan is not None:
+            plans.append(plan)
+    return plans
+
+
+def iter_plans(
+    paths: list[str],
+    request: ReplaceRequest,
+    overrides: dict[str, str] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> Iterator[FileReplacement]:
+    """Entrega los reemplazos según se calculan.
+
+    Los archivos de ``overrides`` (abiertos en el editor) se calculan sobre
+    ese texto en este proceso; el resto se reparte en lotes entre procesos
+    si son suficientes, y sus resultados llegan en el orden en que acaban.
+    """
+    overrides = overrides or {}
+    for path, text in overrides.items():
+        if should_stop is not None and should_stop():
+            return
+        plan = plan_text(path, text, request)
+        if plan is not None:
+            yield plan
+
+    pending = [path for path in paths if path not in overrides]
+    chunks = [pending[start : start + FILES_PER_CHUNK] for start in range(0, len(pending), FILES_PER_CHUNK)]
+    if len(pending) < PARALLEL_MIN_FILES:
+        for chunk in chunks:
+            if should_stop is not None and should_stop():
+                return
+            yield from plan_files(chunk, request)
+        return
+
+    futures: dict[Future[list[FileReplacement]], int] = {}
+    done: set[int] = set()
+    try:
+        pool = _get_pool()
+        for number, chunk in enumerate(chunks):
+            futures[pool.submit(plan_files, chunk, request)] = number
+        for future in as_completed(futures):
+            if should_stop is not None and should_stop():
+                return
+            yield from future.result()
+            done.add(futures[future])
+    except (BrokenProcessPool, RuntimeError, OSError):
+        # Sin procesos disponibles se termina aquí lo que quedaba pendiente.
+        shutdown_replace_pool()
+        for chunk in (chunk for number, chunk in enumerate(chunks) if number not in done):
+            if should_stop is not None and should_stop():
+                return
+            yield from plan_files(chunk, request)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def apply_replacements(plans: list[FileReplacement]) -> None:
+    """Escribe todos los reemplazos o ninguno.
+
+    Primero se comprueba que ningún archivo haya cambiado desde la vista
+    previa y se preparan todos los archivos temporales; después se
+    sustituyen con ``os.replace``. Si una sustitución falla, se restauran
+    los archivos ya sustituidos.
+    """
+    conflicts = [plan.path for plan in plans if read_source(plan.path) != plan.original]
+    if conflicts:
+        raise ReplaceConflict(conflicts)
+
+    staged: list[tuple[FileReplacement, str]] = []
+    try:
+        for plan in plans:
+            staged.append((plan, _stage(plan.path, plan.replaced)))
+    except OSError:
+        for _plan, temporary in staged:
+            _discard(temporary)
+        raise
+
+    done: list[FileReplacement] = []
+    try:
+        for plan, temporary in staged:
+            os.replace(temporary, plan.path)
+            done.append(plan)
+    except OSError:
+        for plan, temporary in staged[len(done) :]:
+            _discard(temporary)
+        for plan in done:
+            try:
+                os.replace(_stage(plan.path, plan.original), plan.path)
+            except OSError:
+                pass
+        raise
+
+
+def _stage(path: str, text: str) -> str:
+    """Escribe ``text`` en un temporal junto a ``path`` con sus mismos permisos."""
+    handle, temporary = tempfile.mkstemp(prefix=".skuld-reemplazo-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8", newline="") as stream:
+            stream.write(text)
+        shutil.copymode(path, temporary)
+    except OSError:
+        _discard(temporary)
+        raise
+    return temporary
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn" en todas las plataformas: hacer fork de un proceso con
+            # hilos de Qt en marcha no es seguro.
+            _pool = ProcessPoolExecutor(
+                max_workers=min(MAX_POOL_WORKERS, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_replace_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
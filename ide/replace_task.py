@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import os
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from ide.file_index import walk_root
+from ide.replace_in_files import ReplaceRequest, iter_plans
+
+
+class ReplaceTask(QThread):
+    """Calcula fuera de la interfaz los reemplazos de todas las carpetas raíz."""
+
+    file_planned = pyqtSignal(object)
+    planning_finished = pyqtSignal(int, int, bool)
+
+    def __init__(
+        self,
+        roots: list[str],
+        request: ReplaceRequest,
+        overrides: dict[str, str],
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.roots = roots
+        self.request = request
+        self.overrides = overrides
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def run(self) -> None:  # type: ignore[override]
+        paths: list[str] = []
+        for root in self.roots:
+            paths.extend(os.path.join(root, *relative.split("/")) for relative in walk_root(root))
+        known = set(paths)
+        overrides = {path: text for path, text in self.overrides.items() if path in known}
+        files = replacements = 0
+        for plan in iter_plans(paths, self.request, overrides, self._cancel_event.is_set):
+            files += 1
+            replacements += plan.count
+            self.file_planned.emit(plan)
+        self.planning_finished.emit(files, replacements, self._cancel_event.is_set())
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import os
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QCheckBox,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPlainTextEdit,
+    QPushButton,
+    QSplitter,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from ide.replace_in_files import FileReplacement
+from ide.text_index import TextMatch
+
+_PATH_ROLE = Qt.UserRole
+_LINE_ROLE = Qt.UserRole + 1
+_COLUMN_ROLE = Qt.UserRole + 2
+
+
+class SearchPanel(QWidget):
+    """Pestaña "Búsqueda": consulta y resultados de "Buscar en carpeta" y de
+    "Reemplazar en carpeta", con la diferencia de cada archivo a la derecha."""
+
+    search_requested = pyqtSignal(str, bool, bool)
+    result_activated = pyqtSignal(str, int, int)
+    replace_preview_requested = pyqtSignal(str, str, bool, bool)
+    replace_apply_requested = pyqtSignal(object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._input = QLineEdit()
+        self._input.setPlaceholderText("Buscar en las carpetas abiertas...")
+        self._input.returnPressed.connect(self._request_search)
+        self._regex = QCheckBox("Regex")
+        self._case_sensitive = QCheckBox("Mayúsculas")
+        search_button = QPushButton("Buscar")
+        search_button.clicked.connect(self._request_search)
+        self._replace_input = QLineEdit()
+        self._replace_input.setPlaceholderText("Reemplazar por...")
+        self._replace_input.returnPressed.connect(self._request_preview)
+        preview_button = QPushButton("Vista previa")
+        preview_button.clicked.connect(self._request_preview)
+        self._apply_button = QPushButton("Reemplazar")
+        self._apply_button.setEnabled(False)
+        self._apply_button.clicked.connect(self._request_apply)
+        self._status = QLabel()
+        self._results = QTreeWidget()
+        self._results.setHeaderHidden(True)
+        self._results.setUniformRowHeights(True)
+        self._results.itemActivated.connect(self._on_item_activated)
+        self._results.currentItemChanged.connect(self._show_diff)
+        self._diff_view = QPlainTextEdit()
+        self._diff_view.setReadOnly(True)
+        self._diff_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self._diff_view.hide()
+        self._plans: dict[str, FileReplacement] = {}
+        self._file_count = 0
+        self._match_count = 0
+
+        query_row = QHBoxLayout()
+        query_row.setContentsMargins(0, 0, 0, 0)
+        query_row.addWidget(self._input, 1)
+        query_row.addWidget(self._regex)
+        query_row.addWidget(self._case_sensitive)
+        query_row.addWidget(search_button)
+
+        replace_row = QHBoxLayout()
+        replace_row.setContentsMargins(0, 0, 0, 0)
+        replace_row.addWidget(self._replace_input, 1)
+        replace_row.addWidget(preview_button)
+        replace_row.addWidget(self._apply_button)
+
+        splitter = QSplitter(Qt.Horizontal)
+        splitter.addWidget(self._results)
+        splitter.addWidget(self._diff_view)
+        splitter.setStretchFactor(0, 1)
+        splitter.setStretchFactor(1, 2)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.setSpacing(4)
+        layout.addLayout(query_row)
+        layout.addLayout(replace_row)
+        layout.addWidget(self._status)
+        layout.addWidget(splitter, 1)
+
+    @property
+    def use_regex(self) -> bool:
+        return self._regex.isChecked()
+
+    @property
+    def case_sensitive(self) -> bool:
+        return self._case_sensitive.isChecked()
+
+    def focus_input(self, text: str = "") -> None:
+        if text:
+            self._input.setText(text)
+        self._input.selectAll()
+        self._input.setFocus()
+
+    def begin(self, query: str) -> None:
+        self._reset(replacing=False)
+        self._status.setText(f"Buscando «{query}»...")
+
+    def add_matches(self, path: str, matches: list[TextMatch]) -> None:
+        file_item = QTreeWidgetItem([f"{os.path.basename(path)}  ({len(matches)})  {os.path.dirname(path)}"])
+        file_item.setToolTip(0, path)
+        file_item.setData(0, _PATH_ROLE, path)
+        file_item.setData(0, _LINE_ROLE, matches[0].line)
+        file_item.setData(0, _COLUMN_ROLE, matches[0].column)
+        for match in matches:
+            child = QTreeWidgetItem([f"{match.line}: {match.text.strip()}"])
+            child.setData(0, _PATH_ROLE, path)
+            child.setData(0, _LINE_ROLE, match.line)
+            child.setData(0, _COLUMN_ROLE, match.column)
+            file_item.addChild(child)
+        self._results.addTopLevelItem(file_item)
+        # Solo se despliegan los primeros archivos; el resto queda plegado.
+        file_item.setExpanded(self._file_count < 20)
+        self._file_count += 1
+        self._match_count += len(matches)
+        self._status.setText(f"Buscando... {self._match_count} coincidencias en {self._file_count} archivos")
+
+    def finish(self, files: int, matches: int, truncated: bool, elapsed: float) -> None:
+        if not matches:
+            self._status.setText(f"Sin coincidencias ({elapsed:.2f} s).")
+            return
+        note = " (se muestran solo las primeras)" if truncated else ""
+        self._status.setText(f"{matches} coincidencias en {files} archivos{note} — {elapsed:.2f} s.")
+
+    def begin_replace(self, query: str) -> None:
+        self._reset(replacing=True)
+        self._status.setText(f"Calculando reemplazos de «{query}»...")
+
+    def add_replacement(self, plan: FileReplacement) -> None:
+        self._plans[plan.path] = plan
+        item = QTreeWidgetItem([f"{os.path.basename(plan.path)}  ({plan.count})  {os.path.dirname(plan.path)}"])
+        item.setToolTip(0, plan.path)
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(0, Qt.Checked)
+        item.setData(0, _PATH_ROLE, plan.path)
+        item.setData(0, _LINE_ROLE, plan.first_changed_line())
+        item.setData(0, _COLUMN_ROLE, 1)
+        self._results.addTopLevelItem(item)
+        if self._results.currentItem() is None:
+            self._results.setCurrentItem(item)
+        self._file_count += 1
+        self._match_count += plan.count
+        self._status.setText(f"Calculando... {self._match_count} reemplazos en {self._file_count} archivos")
+
+    def finish_replace(self, files: int, replacements: int, cancelled: bool, elapsed: float) -> None:
+        if cancelled:
+            self._status.setText("Vista previa cancelada.")
+        elif not replacements:
+            self._status.setText(f"Sin coincidencias que reemplazar ({elapsed:.2f} s).")
+        else:
+            self._status.setText(
+                f"{replacements} reemplazos en {files} archivos — {elapsed:.2f} s. "
+                "Desmarca los archivos que no quieras cambiar."
+            )
+        self._apply_button.setEnabled(bool(self._plans) and not cancelled)
+
+    def checked_replacements(self) -> list[FileReplacement]:
+        plans: list[FileReplacement] = []
+        for row in range(self._results.topLevelItemCount()):
+            item = self._results.topLevelItem(row)
+            plan = self._plans.get(str(item.data(0, _PATH_ROLE)))
+            if plan is not None and item.checkState(0) == Qt.Checked:
+                plans.append(plan)
+        return plans
+
+    def close_replace(self, text: str) -> None:
+        self._reset(replacing=False)
+        self._status.setText(text)
+
+    def show_message(self, text: str) -> None:
+        self._status.setText(text)
+
+    def _reset(self, replacing: bool) -> None:
+        self._results.clear()
+        self._plans.clear()
+        self._diff_view.clear()
+        self._diff_view.setVisible(replacing)
+        self._apply_button.setEnabled(False)
+        self._file_count = 0
+        self._match_count = 0
+
+    def _request_search(self) -> None:
+        query = self._input.text()
+        if query:
+            self.search_requested.emit(query, self.use_regex, self.case_sensitive)
+
+    def _request_preview(self) -> None:
+        query = self._input.text()
+        if query:
+            self.replace_preview_requested.emit(query, self._replace_input.text(), self.use_regex, self.case_sensitive)
+
+    def _request_apply(self) -> None:
+        plans = self.checked_replacements()
+        if plans:
+            self._apply_button.setEnabled(False)
+            self.replace_apply_requested.emit(plans)
+
+    def _show_diff(self, item: QTreeWidgetItem | None, _previous: QTreeWidgetItem | None) -> None:
+        plan = self._plans.get(str(item.data(0, _PATH_ROLE))) if item is not None else None
+        self._diff_view.setPlainText(plan.diff() if plan is not None else "")
+
+    def _on_item_activated(self, item: QTreeWidgetItem, _column: int) -> None:
+        path = item.data(0, _PATH_ROLE)
+        if path:
+            self.result_activated.emit(str(path), int(item.data(0, _LINE_ROLE)), int(item.data(0, _COLUMN_ROLE)))
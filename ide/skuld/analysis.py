@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from ide.skuld.diagnostics import Diagnostic, format_diagnostics
+from ide.skuld.incremental_lexer import IncrementalLexer
+from ide.skuld.incremental_parser import IncrementalParser
+from ide.skuld.incremental_semantic import IncrementalSemanticAnalyzer
+from ide.skuld.lexer import format_tokens, tokenize
+from ide.skuld.phases import DEFAULT_OPTIONS, PhaseOptions, format_intermediate
+from ide.skuld.semantic import Symbol, format_semantic
+from ide.skuld.syntax_tree import count_nodes, format_tree
+
+
+@dataclass
+class AnalysisResult:
+    version: int
+    tokens_text: str
+    syntax_text: str
+    semantic_text: str = ""
+    intermediate_text: str = ""
+    symbols: list[Symbol] = field(default_factory=list)
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+
+
+class DocumentAnalyzer:
+    """Estado del análisis en vivo de un documento.
+
+    Conserva el parser y el análisis semántico incrementales entre
+    ejecuciones; no es seguro usarlo desde dos hilos a la vez, el
+    planificador garantiza una sola tarea por documento.
+    """
+
+    def __init__(self) -> None:
+        self._parser = IncrementalParser()
+        self._semantic = IncrementalSemanticAnalyzer()
+
+    def analyze(
+        self,
+        source: str,
+        version: int,
+        options: PhaseOptions = DEFAULT_OPTIONS,
+        lexer: IncrementalLexer | None = None,
+    ) -> AnalysisResult:
+        """Analiza ``source``; con ``lexer`` (una instantánea del lexer
+        incremental del editor para ese mismo texto) no se vuelve a tokenizar."""
+        tokens, diagnostics = lexer.tokens() if lexer is not None else tokenize(source)
+        program, syntax_diagnostics = self._parser.parse(tokens)
+        diagnostics.extend(syntax_diagnostics)
+
+        syntax_text = f"{format_tree(program)}\n\nNodos: {count_nodes(program)}"
+        if diagnostics:
+            syntax_text += f"\n\nErrores:\n{format_diagnostics(diagnostics)}"
+
+        if not self._parser.reused_count:
+            # Nada se reutilizó en el árbol: se analiza todo desde cero.
+            self._semantic.reset()
+        semantic = self._semantic.analyze(program)
+        semantic_text = format_semantic(semantic)
+        if semantic.diagnostics:
+            semantic_text += f"\n\nErrores:\n{format_diagnostics(semantic.diagnostics)}"
+        diagnostics.extend(semantic.diagnostics)
+
+        if diagnostics:
+            intermediate_text = "No se generó código intermedio: el programa tiene errores."
+        else:
+            intermediate_text = format_intermediate(program, options)
+        return AnalysisResult(
+            version,
+            format_tokens(tokens),
+            syntax_text,
+            semantic_text,
+            intermediate_text,
+            semantic.symbols,
+            diagnostics,
+        )
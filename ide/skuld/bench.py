@@ -0,0 +1,393 @@
+"""Mediciones de rendimiento del compilador Skuld en proceso.
+
+Uso: ``python -m ide.skuld.bench [repeticiones]``
+"""
+
+from __future__ import annotations
+
+import operator
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from ide.skuld.incremental_parser import IncrementalParser
+from ide.skuld.incremental_semantic import IncrementalSemanticAnalyzer
+from ide.skuld.ir import generate
+from ide.skuld import python_backend, register_vm
+from ide.skuld.bytecode import DEFAULT_VALUES, compile_program
+from ide.skuld.lexer import tokenize
+from ide.skuld.optimizer import PIPELINES, PassManager, optimize
+from ide.skuld.parser import parse
+from ide.skuld.runtime import divide, int_divide, int_remainder, value_text
+from ide.skuld.semantic import analyze
+from ide.skuld.syntax_tree import Node, count_nodes
+from ide.skuld.vm import run_program
+
+# Aceleración mínima que se espera de un motor frente al recorrido del AST.
+TARGET_SPEEDUP = 10
+_EXAMPLE_PATH = Path(__file__).resolve().parents[2] / "examples" / "hello_world.stn"
+
+
+def sample_program(repetitions: int) -> str:
+    source = _EXAMPLE_PATH.read_text(encoding="utf-8")
+    return "\n".join(source for _ in range(repetitions))
+
+
+def bench_lexer(source: str) -> None:
+    line_count = source.count("\n") + 1
+    started = time.perf_counter()
+    tokens, _diagnostics = tokenize(source)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Léxico: {line_count} líneas, {len(tokens)} tokens en {elapsed:.3f} s "
+        f"({line_count / elapsed * 60 / 1_000_000:.2f} M líneas/min)"
+    )
+
+
+def bench_parser(source: str) -> None:
+    tokens, _diagnostics = tokenize(source)
+    started = time.perf_counter()
+    program, _syntax_diagnostics = parse(tokens)
+    elapsed = time.perf_counter() - started
+    node_count = count_nodes(program)
+    print(
+        f"Sintáctico: {len(tokens)} tokens, {node_count} nodos en {elapsed:.3f} s "
+        f"({node_count / elapsed / 1_000_000:.2f} M nodos/s)"
+    )
+
+
+def bench_incremental_parser(source: str) -> None:
+    parser = IncrementalParser()
+    semantic = IncrementalSemanticAnalyzer()
+    tokens, _diagnostics = tokenize(source)
+    program, _syntax_diagnostics = parser.parse(tokens)
+    semantic.analyze(program)
+
+    # Edición en mitad del archivo: solo debe reanalizarse el elemento tocado.
+    lines = source.split("\n")
+    middle = len(lines) // 2
+    lines.insert(middle, "labmem worldline extra = 1;")
+    tokens, _diagnostics = tokenize("\n".join(lines))
+    started = time.perf_counter()
+    program, _syntax_diagnostics = parser.parse(tokens)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Sintáctico incremental: {parser.parsed_count} elementos analizados, "
+        f"{parser.reused_count} reutilizados en {elapsed:.3f} s"
+    )
+
+    started = time.perf_counter()
+    semantic.analyze(program)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Semántico incremental: {semantic.checked_count} elementos revisados, "
+        f"{semantic.reused_count} reutilizados en {elapsed:.3f} s"
+    )
+
+
+def bench_semantic(source: str) -> None:
+    tokens, _diagnostics = tokenize(source)
+    program, _syntax_diagnostics = parse(tokens)
+    started = time.perf_counter()
+    result = analyze(program)
+    elapsed = time.perf_counter() - started
+    print(f"Semántico: {len(result.symbols)} símbolos, {len(result.diagnostics)} errores en {elapsed:.3f} s")
+
+
+def bench_ir(source: str) -> None:
+    line_count = source.count("\n") + 1
+    tokens, _diagnostics = tokenize(source)
+    program, _syntax_diagnostics = parse(tokens)
+    started = time.perf_counter()
+    quads = generate(program)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Intermedio: {line_count} líneas, {len(quads)} cuádruplos, "
+        f"{len(quads.operands)} operandos en {elapsed:.3f} s"
+    )
+
+
+def bench_optimizer(source: str) -> None:
+    tokens, _diagnostics = tokenize(source)
+    program, _syntax_diagnostics = parse(tokens)
+    for level in sorted(PIPELINES):
+        if not PIPELINES[level]:
+            continue
+        quads = generate(program)
+        before = len(quads)
+        started = time.perf_counter()
+        PassManager(PIPELINES[level]).run(quads)
+        elapsed = time.perf_counter() - started
+        print(f"Optimización O{level}: {before} → {len(quads)} cuádruplos en {elapsed:.3f} s")
+
+
+LOOP_PROGRAM = """
+steiner worldline collatz(worldline n) {
+    labmem worldline steps = 0;
+    loop (n != 1) {
+        choice (n % 2 == 0) { n = n / 2; } else { n = 3 * n + 1; }
+        steps++;
+    }
+    return steps;
+}
+gate {
+    labmem worldline total = 0;
+    shift (labmem worldline i = 1; i < 3000; i++) {
+        total += collatz(i);
+    }
+    dmail(total);
+}
+"""
+
+
+class _Return(Exception):
+    def __init__(self, value: object) -> None:
+        self.value = value
+
+
+class _Break(Exception):
+    pass
+
+
+class TreeWalker:
+    """Intérprete que recorre el AST directamente: la referencia con la que
+    se comparan los motores.
+
+    Es el diseño más sencillo (un método por tipo de nodo, ``return`` y
+    ``jump`` con excepciones, un diccionario por ámbito) y solo existe para
+    la medición; no comprueba tiempos límite ni cancelación.
+    """
+
+    def __init__(self, program: Node, write: Callable[[str], None]) -> None:
+        self._write = write
+        self._functions: dict[str, Node] = {}
+        self._globals: dict[str, object] = {}
+        self._scopes: list[dict[str, object]] = [self._globals]
+        self._gate: Node | None = None
+        for item in program.children:
+            if item.kind == "Function":
+                self._functions[item.value] = item
+            elif item.kind == "VarDecl":
+                self._globals[item.value] = DEFAULT_VALUES.get(item.type_name, 0)
+            elif item.kind == "Gate":
+                self._gate = item
+        self._declarations = [item for item in program.children if item.kind == "VarDecl"]
+
+    def run(self) -> None:
+        for item in self._declarations:
+            if item.children:
+                self._globals[item.value] = self._coerce(self.evaluate(item.children[0]), item.type_name)
+        if self._gate is not None:
+            self._block(self._gate.children[0])
+
+    # -- Sentencias -------------------------------------------------------
+
+    def execute(self, node: Node) -> None:
+        kind = node.kind
+        if kind == "ExprStmt":
+            self.evaluate(node.children[0])
+        elif kind == "VarDecl":
+            value = self.evaluate(node.children[0]) if node.children else DEFAULT_VALUES.get(node.type_name, 0)
+            self._scopes[-1][node.value] = self._coerce(value, node.type_name)
+        elif kind == "Block":
+            self._block(node)
+        elif kind == "Choice":
+            condition, then_branch, *rest = node.children
+            if self.evaluate(condition):
+                self.execute(then_branch)
+            elif rest:
+                self.execute(rest[0])
+        elif kind == "Loop":
+            condition, body = node.children
+            try:
+                while self.evaluate(condition):
+                    self.execute(body)
+            except _Break:
+                pass
+        elif kind == "Shift":
+            self._shift(node)
+        elif kind == "Jump":
+            raise _Break()
+        elif kind == "Return":
+            raise _Return(self.evaluate(node.children[0]) if node.children else None)
+        elif kind == "Output":
+            self._write("".join(value_text(self.evaluate(child)) for child in node.children) + "\n")
+
+    def _block(self, node: Node) -> None:
+        self._scopes.append({})
+        try:
+            for statement in node.children:
+                self.execute(statement)
+        finally:
+            self._scopes.pop()
+
+    def _shift(self, node: Node) -> None:
+        init, condition, update, body = node.children
+        self._scopes.append({})
+        try:
+            if init.kind == "Block":
+                for statement in init.children:
+                    self.execute(statement)
+            elif init.kind == "VarDecl":
+                self.execute(init)
+            elif init.kind != "Empty":
+                self.evaluate(init)
+            while condition.kind == "Empty" or self.evaluate(condition):
+                self.execute(body)
+                if update.kind != "Empty":
+                    self.evaluate(update)
+        except _Break:
+            pass
+        finally:
+            self._scopes.pop()
+
+    # -- Expresiones ------------------------------------------------------
+
+    def evaluate(self, node: Node) -> object:
+        kind = node.kind
+        if kind == "Literal":
+            return node.value
+        if kind == "Identifier":
+            return self._scope_of(node.value)[node.value]
+        if kind == "Binary":
+            operator = node.value
+            left = self.evaluate(node.children[0])
+            if operator == "and":
+                return left and self.evaluate(node.children[1])
+            if operator == "or":
+                return left or self.evaluate(node.children[1])
+            return self._binary(operator, left, self.evaluate(node.children[1]))
+        if kind == "Unary":
+            operand = self.evaluate(node.children[0])
+            return not operand if node.value == "not" else -operand
+        if kind == "Assign":
+            target, value_node = node.children
+            scope = self._scope_of(target.value)
+            value = self.evaluate(value_node)
+            if node.value != "=":
+                value = self._binary(node.value[0], scope[target.value], value)
+            if type(scope[target.value]) is float and type(value) is int:
+                value = float(value)
+            scope[target.value] = value
+            return value
+        if kind in ("PreInc", "PreDec", "PostInc", "PostDec"):
+            name = node.children[0].value
+            scope = self._scope_of(name)
+            previous = scope[name]
+            scope[name] = previous + 1 if kind.endswith("Inc") else previous - 1
+            return scope[name] if kind.startswith("Pre") else previous
+        if kind == "Call":
+            return self._call(node)
+        return None
+
+    def _binary(self, operator: str, left, right) -> object:
+        if operator == "+":
+            if type(left) is str or type(right) is str:
+                return value_text(left) + value_text(right)
+            return left + right
+        if operator == "-":
+            return left - right
+        if operator == "*":
+            return left * right
+        if operator == "/":
+            return int_divide(left, right) if type(left) is int and type(right) is int else divide(left, right)
+        if operator == "%":
+            return int_remainder(left, right)
+        return _COMPARISONS[operator](left, right)
+
+    def _call(self, node: Node) -> object:
+        function = self._functions[node.value]
+        params, body = function.children
+        frame = {
+            param.value: self._coerce(self.evaluate(argument), param.type_name)
+            for param, argument in zip(params.children, node.children)
+        }
+        saved = self._scopes
+        self._scopes = [self._globals, frame]
+        try:
+            for statement in body.children:
+                self.execute(statement)
+        except _Return as result:
+            return self._coerce(result.value, function.type_name)
+        finally:
+            self._scopes = saved
+        return DEFAULT_VALUES.get(function.type_name)
+
+    def _scope_of(self, name: str) -> dict[str, object]:
+        for scope in reversed(self._scopes):
+            if name in scope:
+                return scope
+        raise KeyError(name)
+
+    @staticmethod
+    def _coerce(value: object, type_name: str) -> object:
+        return float(value) if type_name == "divergence" and type(value) is int else value
+
+
+_COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def run_tree_walker(program: Node, *, write: Callable[[str], None]) -> None:
+    TreeWalker(program, write).run()
+
+
+def bench_vm() -> None:
+    tokens, _diagnostics = tokenize(LOOP_PROGRAM)
+    program, _syntax_diagnostics = parse(tokens)
+    baseline = _time_vm("Recorrido del AST (referencia)", program, run_tree_walker)
+    for fuse in (False, True):
+        label = "con superinstrucciones" if fuse else "sin superinstrucciones"
+        compiled = compile_program(program, fuse=fuse)
+        _time_vm(f"Máquina de pila ({label})", compiled, run_program, baseline)
+
+        quads = generate(program)
+        optimize(quads, 2)
+        registers = register_vm.translate(quads, fuse=fuse)
+        _time_vm(f"Máquina de registros ({label})", registers, register_vm.run_program, baseline)
+
+    python_backend.CODE_CACHE.clear()
+    for attempt in ("sin caché", "con caché"):
+        started = time.perf_counter()
+        compiled_python = python_backend.compile_program(program)
+        elapsed = time.perf_counter() - started
+        print(f"Compilación a Python ({attempt}): {elapsed * 1000:.2f} ms")
+    _time_vm("Funciones de Python", compiled_python, python_backend.run_program, baseline)
+
+
+def _time_vm(label: str, compiled, run, baseline: float | None = None) -> float:
+    output: list[str] = []
+    started = time.perf_counter()
+    run(compiled, write=output.append)
+    elapsed = time.perf_counter() - started
+    size = f"{compiled.instruction_count()} instrucciones, " if hasattr(compiled, "instruction_count") else ""
+    speedup = ""
+    if baseline:
+        below = f", por debajo de {TARGET_SPEEDUP}x" if baseline / elapsed < TARGET_SPEEDUP else ""
+        speedup = f" ({baseline / elapsed:.1f}x respecto al recorrido del AST{below})"
+    print(f"{label}: {size}resultado {''.join(output).strip()} en {elapsed:.3f} s{speedup}")
+    return elapsed
+
+
+def main(argv: list[str]) -> int:
+    repetitions = int(argv[1]) if len(argv) > 1 else 3000
+    source = sample_program(repetitions)
+    bench_lexer(source)
+    bench_parser(source)
+    bench_incremental_parser(source)
+    bench_semantic(source)
+    bench_ir(source)
+    bench_optimizer(source)
+    bench_vm()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
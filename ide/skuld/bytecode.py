@@ -0,0 +1,625 @@
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass, field
+
+from ide.skuld.syntax_tree import Node
+
+# Cada instrucción ocupa dos enteros: código de operación y argumento.
+OPCODES = (
+    "LOAD_LOCAL",
+    "STORE_LOCAL",
+    "LOAD_CONST",
+    "LOAD_GLOBAL",
+    "STORE_GLOBAL",
+    "ADD",
+    "SUB",
+    "MUL",
+    "DIV",
+    "IDIV",
+    "MOD",
+    "CONCAT",
+    "LT",
+    "LE",
+    "GT",
+    "GE",
+    "EQ",
+    "NE",
+    "NEG",
+    "NOT",
+    "ITOF",
+    "JUMP",
+    "JUMP_IF_FALSE",
+    "JUMP_IF_FALSE_OR_POP",
+    "JUMP_IF_TRUE_OR_POP",
+    "POP",
+    "DUP",
+    "CALL",
+    "RETURN",
+    "RETURN_NONE",
+    "PRINT",
+    "READ",
+    "HALT",
+    # Superinstrucciones creadas por ``fuse_instructions``; los dos operandos
+    # van empaquetados en el argumento (16 bits cada uno).
+    "LOAD_LOCAL_CONST",
+    "LOAD_LOCAL2",
+    "ADD_LOCAL_CONST",
+    "JUMP_IF_NOT_LT",
+    "JUMP_IF_NOT_LE",
+    "JUMP_IF_NOT_GT",
+    "JUMP_IF_NOT_GE",
+    "JUMP_IF_NOT_EQ",
+    "JUMP_IF_NOT_NE",
+)
+BC = {name: code for code, name in enumerate(OPCODES)}
+
+JUMP_OPCODES = frozenset(
+    BC[name]
+    for name in (
+        "JUMP",
+        "JUMP_IF_FALSE",
+        "JUMP_IF_FALSE_OR_POP",
+        "JUMP_IF_TRUE_OR_POP",
+        "JUMP_IF_NOT_LT",
+        "JUMP_IF_NOT_LE",
+        "JUMP_IF_NOT_GT",
+        "JUMP_IF_NOT_GE",
+        "JUMP_IF_NOT_EQ",
+        "JUMP_IF_NOT_NE",
+    )
+)
+_COMPARE_JUMPS = {BC[name]: BC[f"JUMP_IF_NOT_{name}"] for name in ("LT", "LE", "GT", "GE", "EQ", "NE")}
+_PACK_LIMIT = 0x8000
+
+VALUE_TYPES = ("worldline", "divergence", "reading", "dmail")
+DEFAULT_VALUES = {"worldline": 0, "divergence": 0.0, "reading": False, "dmail": ""}
+
+_ARITHMETIC = {"+": "ADD", "-": "SUB", "*": "MUL", "/": "DIV", "%": "MOD"}
+_COMPARISONS = {"==": "EQ", "!=": "NE", "<": "LT", "<=": "LE", ">": "GT", ">=": "GE"}
+
+ENTRY_NAME = "<inicio>"
+
+
+@dataclass
+class CodeObject:
+    name: str
+    param_count: int = 0
+    local_count: int = 0
+    code: array = field(default_factory=lambda: array("i"))
+    lines: array = field(default_factory=lambda: array("i"))
+    columns: array = field(default_factory=lambda: array("i"))
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def position(self, index: int) -> tuple[int, int]:
+        if not self.lines:
+            return 0, 0
+        index = max(0, min(index, len(self.lines) - 1))
+        return self.lines[index], self.columns[index]
+
+
+@dataclass
+class BytecodeProgram:
+    constants: list[object]
+    functions: list[CodeObject]
+    global_names: list[str]
+    entry: int
+    # Valor de cada global antes de ejecutar los inicializadores: el cero de
+    # su tipo, igual que en la máquina de registros.
+    global_values: list[object]
+
+    def instruction_count(self) -> int:
+        return sum(len(function) for function in self.functions)
+
+
+class BytecodeCompiler:
+    """Traduce el AST a bytecode para la máquina de pila.
+
+    Supone un programa sin errores semánticos, igual que ``IRGenerator``.
+    Las variables locales ocupan una ranura propia por declaración, de modo
+    que un bloque interior puede ocultar otra variable sin reutilizarla.
+    """
+
+    def __init__(self) -> None:
+        self._constants: list[object] = []
+        self._constant_index: dict[tuple[type, object], int] = {}
+        self._functions: list[CodeObject] = []
+        self._function_index: dict[str, tuple[int, str, tuple[str, ...]]] = {}
+        self._globals: dict[str, tuple[int, str]] = {}
+        self._global_names: list[str] = []
+        self._code = CodeObject("")
+        self._locals: dict[str, list[tuple[int, str]]] = {}
+        self._scopes: list[list[str]] = []
+        self._breaks: list[list[int]] = []
+        self._return_type = "void"
+        self._line = 0
+        self._column = 0
+        self._statement_handlers = {
+            "VarDecl": self._var_decl,
+            "ExprStmt": self._expr_stmt,
+            "Block": self._block,
+            "Choice": self._choice,
+            "Loop": self._loop,
+            "Shift": self._shift,
+            "Jump": self._jump,
+            "Return": self._return,
+            "Output": self._output,
+            "Input": self._input,
+        }
+
+    def compile(self, program: Node) -> BytecodeProgram:
+        functions: list[Node] = []
+        gate: Node | None = None
+        for item in program.children:
+            if item.kind == "Function":
+                params = tuple(param.type_name for param in item.children[0].children)
+                self._function_index[item.value] = (len(self._functions), item.type_name, params)
+                self._functions.append(CodeObject(item.value, len(params)))
+                functions.append(item)
+            elif item.kind == "VarDecl":
+                self._globals[item.value] = (len(self._global_names), item.type_name)
+                self._global_names.append(item.value)
+            elif item.kind == "Gate" and gate is None:
+                gate = item
+        if gate is not None:
+            self._function_index["gate"] = (len(self._functions), "void", ())
+            self._functions.append(CodeObject("gate"))
+
+        # Inicialización de globales, llamada al punto de entrada y fin.
+        entry = len(self._functions)
+        self._begin_function(CodeObject(ENTRY_NAME), "void")
+        for item in program.children:
+            if item.kind == "VarDecl":
+                self._at(item)
+                slot, type_name = self._globals[item.value]
+                self._initializer(item, type_name)
+                self._emit("STORE_GLOBAL", slot)
+        if gate is not None:
+            self._at(gate)
+            self._emit("CALL", self._function_index["gate"][0])
+        self._emit("HALT")
+        self._functions.append(self._code)
+
+        for function in functions:
+            params, body = function.children
+            index = self._function_index[function.value][0]
+            self._begin_function(self._functions[index], function.type_name)
+            for param in params.children:
+                self._declare_local(param.value, param.type_name)
+            self._statements(body.children)
+            self._end_function(function)
+        if gate is not None:
+            self._begin_function(self._functions[self._function_index["gate"][0]], "void")
+            self._statements(gate.children[0].children)
+            self._end_function(gate)
+        global_values = [DEFAULT_VALUES.get(self._globals[name][1], 0) for name in self._global_names]
+        return BytecodeProgram(self._constants, self._functions, self._global_names, entry, global_values)
+
+    # -- Emisión --------------------------------------------------------
+
+    def _at(self, node: Node) -> None:
+        self._line = node.line
+        self._column = node.column
+
+    def _emit(self, name: str, argument: int = 0) -> int:
+        code = self._code
+        code.code.append(BC[name])
+        code.code.append(argument)
+        code.lines.append(self._line)
+        code.columns.append(self._column)
+        return len(code.lines) - 1
+
+    def _patch(self, index: int) -> None:
+        # El salto emitido en ``index`` apunta a la siguiente instrucción.
+        self._code.code[2 * index + 1] = len(self._code.lines)
+
+    def _here(self) -> int:
+        return len(self._code.lines)
+
+    def _constant(self, value: object) -> int:
+        key = _constant_key(value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = len(self._constants)
+            self._constants.append(value)
+            self._constant_index[key] = index
+        return index
+
+    # -- Funciones y ámbitos --------------------------------------------
+
+    def _begin_function(self, code: CodeObject, return_type: str) -> None:
+        self._code = code
+        self._return_type = return_type
+        self._locals = {}
+        self._scopes = [[]]
+        self._breaks = []
+
+    def _end_function(self, node: Node) -> None:
+        # Una función con valor que termina sin 'return' devuelve el valor por defecto.
+        self._at(node)
+        if self._return_type in DEFAULT_VALUES:
+            self._emit("LOAD_CONST", self._constant(DEFAULT_VALUES[self._return_type]))
+            self._emit("RETURN")
+        else:
+            self._emit("RETURN_NONE")
+
+    def _declare_local(self, name: str, type_name: str) -> int:
+        slot = self._code.local_count
+        self._code.local_count += 1
+        self._locals.setdefault(name, []).append((slot, type_name))
+        self._scopes[-1].append(name)
+        return slot
+
+    def _resolve(self, name: str) -> tuple[bool, int, str]:
+        stack = self._locals.get(name)
+        if stack:
+            slot, type_name = stack[-1]
+            return True, slot, type_name
+        slot, type_name = self._globals[name]
+        return False, slot, type_name
+
+    def _load(self, name: str) -> str:
+        is_local, slot, type_name = self._resolve(name)
+        self._emit("LOAD_LOCAL" if is_local else "LOAD_GLOBAL", slot)
+        return type_name
+
+    def _store(self, name: str) -> None:
+        is_local, slot, _type_name = self._resolve(name)
+        self._emit("STORE_LOCAL" if is_local else "STORE_GLOBAL", slot)
+
+    def _push_scope(self) -> None:
+        self._scopes.append([])
+
+    def _pop_scope(self) -> None:
+        locals_ = self._locals
+        for name in self._scopes.pop():
+            locals_[name].pop()
+
+    # -- Sentencias -----------------------------------------------------
+
+    def _statements(self, statements: list[Node] | tuple) -> None:
+        handlers = self._statement_handlers
+        for statement in statements:
+            self._at(statement)
+            handlers[statement.kind](statement)
+
+    def _initializer(self, node: Node, type_name: str) -> None:
+        if node.children:
+            value_type = self._expression(node.children[0])
+            self._coerce(value_type, type_name)
+        else:
+            self._emit("LOAD_CONST", self._constant(DEFAULT_VALUES.get(type_name, 0)))
+
+    def _var_decl(self, node: Node) -> None:
+        # El inicializador se evalúa antes de declarar: "labmem x = x;" usa la x externa.
+        self._initializer(node, node.type_name)
+        self._emit("STORE_LOCAL", self._declare_local(node.value, node.type_name))
+
+    def _expr_stmt(self, node: Node) -> None:
+        self._expression(node.children[0], discard=True)
+
+    def _block(self, node: Node) -> None:
+        self._push_scope()
+        self._statements(node.children)
+        self._pop_scope()
+
+    def _choice(self, node: Node) -> None:
+        condition, then_branch, *rest = node.children
+        self._expression(condition)
+        to_else = self._emit("JUMP_IF_FALSE")
+        self._block(then_branch)
+        if rest:
+            to_end = self._emit("JUMP")
+            self._patch(to_else)
+            branch = rest[0]
+            if branch.kind == "Choice":
+                self._at(branch)
+                self._choice(branch)
+            else:
+                self._block(branch)
+            self._patch(to_end)
+        else:
+            self._patch(to_else)
+
+    def _loop(self, node: Node) -> None:
+        start = self._here()
+        self._expression(node.children[0])
+        exits = [self._emit("JUMP_IF_FALSE")]
+        self._breaks.append(exits)
+        self._block(node.children[1])
+        self._breaks.pop()
+        self._at(node)
+        self._emit("JUMP", start)
+        for index in exits:
+            self._patch(index)
+
+    def _shift(self, node: Node) -> None:
+        init, condition, update, body = node.children
+        self._push_scope()
+        if init.kind == "Block":
+            self._statements(init.children)
+        elif init.kind == "VarDecl":
+            self._var_decl(init)
+        elif init.kind != "Empty":
+            self._expression(init, discard=True)
+
+        start = self._here()
+        exits: list[int] = []
+        if condition.kind != "Empty":
+            self._expression(condition)
+            exits.append(self._emit("JUMP_IF_FALSE"))
+        self._breaks.append(exits)
+        self._block(body)
+        self._breaks.pop()
+        if update.kind != "Empty":
+            self._expression(update, discard=True)
+        self._at(node)
+        self._emit("JUMP", start)
+        for index in exits:
+            self._patch(index)
+        self._pop_scope()
+
+    def _jump(self, node: Node) -> None:
+        if self._breaks:
+            self._breaks[-1].append(self._emit("JUMP"))
+
+    def _return(self, node: Node) -> None:
+        if node.children:
+            value_type = self._expression(node.children[0])
+            self._coerce(value_type, self._return_type)
+            self._emit("RETURN")
+        else:
+            self._emit("RETURN_NONE")
+
+    def _output(self, node: Node) -> None:
+        for child in node.children:
+            self._expression(child)
+        self._emit("PRINT", len(node.children))
+
+    def _input(self, node: Node) -> None:
+        for target in node.children:
+            _is_local, _slot, type_name = self._resolve(target.value)
+            self._emit("READ", VALUE_TYPES.index(type_name) if type_name in VALUE_TYPES else 0)
+            self._store(target.value)
+
+    # -- Expresiones ----------------------------------------------------
+
+    def _expression(self, node: Node, *, discard: bool = False) -> str | None:
+        kind = node.kind
+        if kind == "Literal":
+            if not discard:
+                self._emit("LOAD_CONST", self._constant(node.value))
+            return node.type_name
+        if kind == "Identifier":
+            if discard:
+                return self._resolve(node.value)[2]
+            return self._load(node.value)
+        if kind == "Assign":
+            return self._assign(node, discard)
+        if kind in ("PreInc", "PreDec", "PostInc", "PostDec"):
+            return self._increment(node, discard)
+        if kind == "Call":
+            return self._call(node, discard)
+
+        if kind == "Binary":
+            value_type = self._binary(node)
+        elif kind == "Unary":
+            operand_type = self._expression(node.children[0])
+            self._at(node)
+            if node.value == "not":
+                self._emit("NOT")
+                value_type = "reading"
+            else:
+                self._emit("NEG")
+                value_type = operand_type
+        else:
+            return None
+        if discard:
+            self._emit("POP")
+        return value_type
+
+    def _binary(self, node: Node) -> str:
+        operator = node.value
+        if operator in ("and", "or"):
+            self._expression(node.children[0])
+            jump = self._emit("JUMP_IF_FALSE_OR_POP" if operator == "and" else "JUMP_IF_TRUE_OR_POP")
+            self._expression(node.children[1])
+            self._patch(jump)
+            return "reading"
+        left_type = self._expression(node.children[0])
+        right_type = self._expression(node.children[1])
+        self._at(node)
+        if operator in _COMPARISONS:
+            self._emit(_COMPARISONS[operator])
+            return "reading"
+        if operator == "+" and (left_type == "dmail" or right_type == "dmail"):
+            self._emit("CONCAT")
+            return "dmail"
+        if left_type == right_type == "worldline":
+            self._emit("IDIV" if operator == "/" else _ARITHMETIC[operator])
+            return "worldline"
+        self._emit(_ARITHMETIC[operator])
+        return "divergence"
+
+    def _assign(self, node: Node, discard: bool) -> str:
+        target_node, value_node = node.children
+        target_type = self._resolve(target_node.value)[2]
+        operator = node.value
+        if operator != "=":
+            self._load(target_node.value)
+            value_type = self._expression(value_node)
+            self._at(node)
+            arithmetic = operator[0]
+            if target_type == "dmail":
+                self._emit("CONCAT")
+            elif arithmetic == "/" and target_type == value_type == "worldline":
+                self._emit("IDIV")
+            else:
+                self._emit(_ARITHMETIC[arithmetic])
+            value_type = target_type if target_type == "dmail" or value_type == target_type else "divergence"
+        else:
+            value_type = self._expression(value_node)
+        self._coerce(value_type, target_type)
+        if not discard:
+            self._emit("DUP")
+        self._store(target_node.value)
+        return target_type
+
+    def _increment(self, node: Node, discard: bool) -> str:
+        name = node.children[0].value
+        self._at(node)
+        target_type = self._load(name)
+        if node.kind.startswith("Post") and not discard:
+            self._emit("DUP")
+        self._emit("LOAD_CONST", self._constant(1))
+        self._emit("ADD" if node.kind in ("PreInc", "PostInc") else "SUB")
+        if node.kind.startswith("Pre") and not discard:
+            self._emit("DUP")
+        self._store(name)
+        return target_type
+
+    def _call(self, node: Node, discard: bool) -> str:
+        index, return_type, params = self._function_index[node.value]
+        for argument, param_type in zip(node.children, params):
+            self._coerce(self._expression(argument), param_type)
+        self._at(node)
+        self._emit("CALL", index)
+        if discard and return_type != "void":
+            self._emit("POP")
+        return return_type
+
+    def _coerce(self, from_type: str | None, to_type: str) -> None:
+        if to_type == "divergence" and from_type == "worldline":
+            code = self._code
+            last = len(code.lines) - 1
+            if last >= 0 and code.code[2 * last] == BC["LOAD_CONST"]:
+                # Constante entera: se sustituye por su valor real.
+                value = self._constants[code.code[2 * last + 1]]
+                code.code[2 * last + 1] = self._constant(float(value))
+            else:
+                self._emit("ITOF")
+
+
+def pack(first: int, second: int) -> int:
+    return first | (second << 16)
+
+
+def unpack(argument: int) -> tuple[int, int]:
+    return argument & 0xFFFF, argument >> 16
+
+
+def _constant_key(value: object) -> tuple:
+    # La clave incluye el tipo para no confundir 1, 1.0 y true, y el signo
+    # para no confundir 0.0 con -0.0.
+    if type(value) is float:
+        return float, value, math.copysign(1.0, value)
+    return type(value), value
+
+
+def _constant_slot(constants: list[object], constant_index: dict[tuple, int], value: object) -> int:
+    key = _constant_key(value)
+    index = constant_index.get(key)
+    if index is None:
+        index = len(constants)
+        constants.append(value)
+        constant_index[key] = index
+    return index
+
+
+def _match(
+    ops: list[int],
+    args: list[int],
+    index: int,
+    targets: set[int],
+    constants: list[object],
+    constant_index: dict[tuple, int],
+) -> tuple[int, int, int] | None:
+    """Superinstrucción que empieza en ``index``: (código, argumento, longitud)."""
+    count = len(ops)
+
+    def free(length: int) -> bool:
+        # Ninguna instrucción interior puede ser destino de un salto.
+        if index + length > count:
+            return False
+        return all(position not in targets for position in range(index + 1, index + length))
+
+    op = ops[index]
+    if op in _COMPARE_JUMPS and free(2) and ops[index + 1] == BC["JUMP_IF_FALSE"]:
+        return _COMPARE_JUMPS[op], args[index + 1], 2
+    if op != BC["LOAD_LOCAL"] or not free(2) or args[index] >= _PACK_LIMIT:
+        return None
+    slot = args[index]
+    following = ops[index + 1]
+    if following == BC["LOAD_CONST"] and args[index + 1] < _PACK_LIMIT:
+        constant = constants[args[index + 1]]
+        if (
+            free(4)
+            and ops[index + 2] in (BC["ADD"], BC["SUB"])
+            and ops[index + 3] == BC["STORE_LOCAL"]
+            and args[index + 3] == slot
+            and type(constant) in (int, float)
+        ):
+            if ops[index + 2] == BC["SUB"]:
+                constant_index = _constant_slot(constants, constant_index, -constant)
+            else:
+                constant_index = args[index + 1]
+            if constant_index < _PACK_LIMIT:
+                return BC["ADD_LOCAL_CONST"], pack(slot, constant_index), 4
+        return BC["LOAD_LOCAL_CONST"], pack(slot, args[index + 1]), 2
+    if following == BC["LOAD_LOCAL"] and args[index + 1] < _PACK_LIMIT:
+        return BC["LOAD_LOCAL2"], pack(slot, args[index + 1]), 2
+    return None
+
+
+def fuse_instructions(
+    code: CodeObject,
+    constants: list[object],
+    constant_index: dict[tuple, int] | None = None,
+) -> None:
+    """Sustituye secuencias frecuentes por superinstrucciones.
+
+    Menos instrucciones significa menos vueltas del bucle de despacho, que
+    es lo que más cuesta en la máquina virtual. Los destinos de salto se
+    recalculan al final. ``constant_index`` asocia cada ``_constant_key`` a
+    su posición en ``constants``; si falta, se construye.
+    """
+    if constant_index is None:
+        constant_index = {_constant_key(value): index for index, value in enumerate(constants)}
+    ops = code.code[0::2].tolist()
+    args = code.code[1::2].tolist()
+    targets = {args[index] for index, op in enumerate(ops) if op in JUMP_OPCODES}
+    fused = CodeObject(code.name, code.param_count, code.local_count)
+    index_map = [0] * (len(ops) + 1)
+    index = 0
+    while index < len(ops):
+        match = _match(ops, args, index, targets, constants, constant_index)
+        op, argument, length = match if match is not None else (ops[index], args[index], 1)
+        new_index = len(fused.lines)
+        for position in range(index, index + length):
+            index_map[position] = new_index
+        fused.code.append(op)
+        fused.code.append(argument)
+        fused.lines.append(code.lines[index])
+        fused.columns.append(code.columns[index])
+        index += length
+    index_map[len(ops)] = len(fused.lines)
+
+    for new_index in range(len(fused.lines)):
+        if fused.code[2 * new_index] in JUMP_OPCODES:
+            fused.code[2 * new_index + 1] = index_map[fused.code[2 * new_index + 1]]
+    code.code = fused.code
+    code.lines = fused.lines
+    code.columns = fused.columns
+
+
+def compile_program(program: Node, *, fuse: bool = True) -> BytecodeProgram:
+    compiler = BytecodeCompiler()
+    compiled = compiler.compile(program)
+    if fuse:
+        # La fusión añade constantes al mismo depósito que llenó el compilador.
+        for code in compiled.functions:
+            fuse_instructions(code, compiled.constants, compiler._constant_index)
+    return compiled
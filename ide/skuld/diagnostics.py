@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    phase: str
+    line: int
+    column: int
+    message: str
+
+    def format(self) -> str:
+        # Formato recomendado en PLAN_DESARROLLO.txt: ERROR_LEXICO(linea, columna): descripción
+        return f"ERROR_{self.phase}({self.line}, {self.column}): {self.message}"
+
+
+def format_diagnostics(diagnostics: list[Diagnostic]) -> str:
+    return "\n".join(diagnostic.format() for diagnostic in diagnostics)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from ide.skuld.diagnostics import Diagnostic
+from ide.skuld.lexer import STATE_BLOCK_COMMENT, STATE_NORMAL, Token, lexical_error, tokenize_line
+
+
+class IncrementalLexer:
+    """Tokens por línea con el estado del lexer al final de cada línea.
+
+    Tras una edición solo se vuelve a tokenizar desde la primera línea dañada
+    hasta que el estado de fin de línea coincide con el que había antes de la
+    edición; a partir de ahí el resto del documento no puede haber cambiado.
+    """
+
+    def __init__(self, text: str = "") -> None:
+        self._lines: list[str] = []
+        self._tokens: list[list[Token]] = []
+        self._end_states: list[int] = []
+        self.reset(text)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._lines)
+
+    def reset(self, text: str) -> None:
+        self._lines = text.split("\n")
+        self._tokens = []
+        self._end_states = []
+        state = STATE_NORMAL
+        for index, line_text in enumerate(self._lines):
+            line_tokens, state = tokenize_line(line_text, index + 1, state)
+            self._tokens.append(line_tokens)
+            self._end_states.append(state)
+
+    def update(self, first_line: int, removed_count: int, new_lines: list[str]) -> int:
+        """Sustituye ``removed_count`` líneas desde ``first_line`` por ``new_lines``.
+
+        Devuelve cuántas líneas se volvieron a tokenizar.
+        """
+        first_line = max(0, min(first_line, len(self._lines)))
+        removed_count = max(0, min(removed_count, len(self._lines) - first_line))
+        start_state = self._end_states[first_line - 1] if first_line > 0 else STATE_NORMAL
+        if removed_count:
+            converge_state = self._end_states[first_line + removed_count - 1]
+        else:
+            converge_state = start_state
+
+        new_count = len(new_lines)
+        self._lines[first_line:first_line + removed_count] = new_lines
+        self._tokens[first_line:first_line + removed_count] = [[] for _ in range(new_count)]
+        self._end_states[first_line:first_line + removed_count] = [STATE_NORMAL] * new_count
+
+        state = start_state
+        index = first_line
+        end = first_line + new_count
+        while index < end:
+            state = self._relex(index, state)
+            index += 1
+
+        # Las líneas siguientes solo cambian si el estado de entrada cambió.
+        total = len(self._lines)
+        while index < total and state != converge_state:
+            converge_state = self._end_states[index]
+            state = self._relex(index, state)
+            index += 1
+        return index - first_line
+
+    def _relex(self, index: int, state: int) -> int:
+        line_tokens, end_state = tokenize_line(self._lines[index], index + 1, state)
+        self._tokens[index] = line_tokens
+        self._end_states[index] = end_state
+        return end_state
+
+    def snapshot(self) -> IncrementalLexer:
+        """Copia del estado actual que otro hilo puede leer mientras este sigue editándose.
+
+        Solo se copian las listas por línea: los tokens nunca se mutan, así
+        que ambas instancias pueden compartirlos.
+        """
+        copy = IncrementalLexer.__new__(IncrementalLexer)
+        copy._lines = self._lines[:]
+        copy._tokens = self._tokens[:]
+        copy._end_states = self._end_states[:]
+        return copy
+
+    def line_text(self, index: int) -> str:
+        return self._lines[index]
+
+    def line_tokens(self, index: int) -> list[Token]:
+        tokens = self._tokens[index]
+        line = index + 1
+        if tokens and tokens[0].line != line:
+            # Líneas desplazadas por una inserción previa: se copian los tokens
+            # con el número de línea correcto en lugar de mutarlos, porque
+            # otras instantáneas pueden seguir usándolos.
+            tokens = [Token(token.kind, token.lexeme, line, token.column) for token in tokens]
+            self._tokens[index] = tokens
+        return tokens
+
+    def line_end_state(self, index: int) -> int:
+        return self._end_states[index]
+
+    def line_start_state(self, index: int) -> int:
+        return self._end_states[index - 1] if index > 0 else STATE_NORMAL
+
+    def tokens(self, *, keep_comments: bool = False) -> tuple[list[Token], list[Diagnostic]]:
+        result: list[Token] = []
+        diagnostics: list[Diagnostic] = []
+        for index in range(len(self._lines)):
+            for token in self.line_tokens(index):
+                kind = token.kind
+                if kind == "COMMENT":
+                    if keep_comments:
+                        result.append(token)
+                    continue
+                if kind == "ERROR":
+                    diagnostics.append(lexical_error(token))
+                result.append(token)
+
+        if self._end_states and self._end_states[-1] == STATE_BLOCK_COMMENT:
+            line, column = self._open_comment_position()
+            diagnostics.append(Diagnostic("LEXICO", line, column, "Comentario de bloque sin cerrar."))
+        return result, diagnostics
+
+    def _open_comment_position(self) -> tuple[int, int]:
+        index = len(self._end_states) - 1
+        while index > 0 and self._end_states[index - 1] == STATE_BLOCK_COMMENT and len(self._tokens[index]) <= 1:
+            index -= 1
+        line_tokens = self.line_tokens(index)
+        column = line_tokens[-1].column if line_tokens else 1
+        return index + 1, column
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from itertools import repeat
+from operator import attrgetter, sub
+
+from ide.skuld.diagnostics import Diagnostic
+from ide.skuld.lexer import Token
+from ide.skuld.parser import TOP_LEVEL_START, Parser, parse
+from ide.skuld.syntax_tree import Node, shift_lines
+
+_LEXEME = attrgetter("lexeme")
+_COLUMN = attrgetter("column")
+_LINE = attrgetter("line")
+
+_SegmentKey = tuple
+_Segment = tuple[list[Node], list[Diagnostic], int]
+
+
+def split_top_level(tokens: list[Token]) -> list[tuple[int, int]]:
+    """Divide los tokens en tramos que empiezan en un elemento de nivel superior.
+
+    Un tramo termina donde aparece ``labmem``, ``steiner`` o ``gate`` fuera de
+    cualquier llave; un bloque sin cerrar se extiende hasta el final, igual que
+    en el análisis completo.
+    """
+    spans: list[tuple[int, int]] = []
+    start = 0
+    depth = 0
+    for index, token in enumerate(tokens):
+        kind = token.kind
+        if kind == "LBRACE":
+            depth += 1
+        elif kind == "RBRACE":
+            depth -= 1
+        elif depth <= 0 and kind in TOP_LEVEL_START and index > start:
+            spans.append((start, index))
+            start = index
+            depth = 0
+    if start < len(tokens):
+        spans.append((start, len(tokens)))
+    return spans
+
+
+class IncrementalParser:
+    """Reanálisis sintáctico que reutiliza las funciones y bloques sin cambios.
+
+    Cada elemento de nivel superior (``steiner``, ``gate`` o una declaración
+    global) se identifica por sus lexemas y posiciones relativas a su primera
+    línea. Si ese tramo ya existía en el análisis anterior se reutilizan los
+    mismos nodos (desplazando sus líneas si el tramo se movió) y solo se
+    analizan los tramos editados.
+    """
+
+    def __init__(self) -> None:
+        self._segments: dict[_SegmentKey, list[_Segment]] = {}
+        self.reused_count = 0
+        self.parsed_count = 0
+
+    def reset(self) -> None:
+        self._segments = {}
+
+    def parse(self, tokens: list[Token]) -> tuple[Node, list[Diagnostic]]:
+        previous = self._segments
+        segments: dict[_SegmentKey, list[_Segment]] = {}
+        items: list[Node] = []
+        diagnostics: list[Diagnostic] = []
+        parser: Parser | None = None
+        reused = 0
+        parsed = 0
+
+        spans = split_top_level(tokens)
+        last_stop = len(tokens)
+        for start, stop in spans:
+            segment_tokens = tokens[start:stop]
+            first_line = segment_tokens[0].line
+            # El último tramo se distingue porque sus errores pueden mencionar
+            # el fin de archivo.
+            key = (
+                stop == last_stop,
+                tuple(map(_LEXEME, segment_tokens)),
+                tuple(map(_COLUMN, segment_tokens)),
+                tuple(map(sub, map(_LINE, segment_tokens), repeat(first_line))),
+            )
+            candidates = previous.get(key)
+            if candidates:
+                nodes, segment_diagnostics, old_first_line = candidates.pop()
+                delta = first_line - old_first_line
+                if delta:
+                    for node in nodes:
+                        shift_lines(node, delta)
+                    segment_diagnostics = [
+                        replace(diagnostic, line=diagnostic.line + delta) for diagnostic in segment_diagnostics
+                    ]
+                reused += 1
+            else:
+                if parser is None:
+                    parser = Parser(tokens)
+                first_diagnostic = len(parser.diagnostics)
+                nodes = parser.parse_range(start, stop)
+                if parser.position != stop:
+                    # La recuperación de errores cruzó el límite del tramo: el
+                    # resultado parcial no es fiable y se analiza todo.
+                    return self._parse_full(tokens)
+                segment_diagnostics = parser.diagnostics[first_diagnostic:]
+                parsed += 1
+
+            segments.setdefault(key, []).append((nodes, segment_diagnostics, first_line))
+            items.extend(nodes)
+            diagnostics.extend(segment_diagnostics)
+
+        # Los tramos repetidos se reutilizan en el mismo orden en que aparecen.
+        for entries in segments.values():
+            entries.reverse()
+        self._segments = segments
+        self.reused_count = reused
+        self.parsed_count = parsed
+        return Node("Program", 1, 1, children=items), diagnostics
+
+    def _parse_full(self, tokens: list[Token]) -> tuple[Node, list[Diagnostic]]:
+        self._segments = {}
+        self.reused_count = 0
+        self.parsed_count = 1
+        return parse(tokens)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+
+from ide.skuld.diagnostics import Diagnostic
+from ide.skuld.semantic import SemanticAnalyzer, SemanticResult, Symbol, shift_scope
+from ide.skuld.syntax_tree import Node
+
+
+@dataclass(slots=True)
+class _CheckedItem:
+    node: Node
+    line: int
+    symbols: list[Symbol]
+    diagnostics: list[Diagnostic]
+    reads: frozenset[str]
+
+
+class IncrementalSemanticAnalyzer:
+    """Análisis semántico que solo revisa los elementos afectados por una edición.
+
+    Las declaraciones globales se recalculan siempre (son baratas). Cada
+    función, ``gate`` o inicialización global guarda sus resultados junto con
+    los nombres globales que consultó; se vuelve a revisar si su nodo es nuevo
+    (el parser incremental conserva la identidad de los no editados) o si
+    cambió la firma de alguno de esos nombres. Sin estado previo, el análisis
+    equivale al completo.
+    """
+
+    def __init__(self) -> None:
+        self._items: dict[int, _CheckedItem] = {}
+        self._signatures: dict[str, tuple] = {}
+        self.checked_count = 0
+        self.reused_count = 0
+
+    def reset(self) -> None:
+        self._items = {}
+        self._signatures = {}
+
+    def analyze(self, program: Node) -> SemanticResult:
+        analyzer = SemanticAnalyzer()
+        result = analyzer.result
+        signatures = analyzer.declare_globals(program)
+        previous_signatures = self._signatures
+        changed = {
+            name
+            for name in signatures.keys() | previous_signatures.keys()
+            if signatures.get(name) != previous_signatures.get(name)
+        }
+
+        previous = self._items
+        items: dict[int, _CheckedItem] = {}
+        checked = 0
+        reused = 0
+        for item in program.children:
+            cached = previous.get(id(item))
+            if cached is not None and cached.node is item and cached.reads.isdisjoint(changed):
+                delta = item.line - cached.line
+                if delta:
+                    cached = _CheckedItem(
+                        item,
+                        item.line,
+                        [
+                            replace(symbol, line=symbol.line + delta, scope=shift_scope(symbol.scope, delta))
+                            for symbol in cached.symbols
+                        ],
+                        [replace(diagnostic, line=diagnostic.line + delta) for diagnostic in cached.diagnostics],
+                        cached.reads,
+                    )
+                result.symbols.extend(cached.symbols)
+                result.diagnostics.extend(cached.diagnostics)
+                reused += 1
+            else:
+                first_symbol = len(result.symbols)
+                first_diagnostic = len(result.diagnostics)
+                analyzer.global_reads = set()
+                analyzer.check_item(item)
+                cached = _CheckedItem(
+                    item,
+                    item.line,
+                    result.symbols[first_symbol:],
+                    result.diagnostics[first_diagnostic:],
+                    frozenset(analyzer.global_reads),
+                )
+                checked += 1
+            items[id(item)] = cached
+
+        self._items = items
+        self._signatures = signatures
+        self.checked_count = checked
+        self.reused_count = reused
+        return result
@@ -0,0 +1,583 @@
+from __future__ import annotations
+
+import math
+from array import array
+
+from ide.skuld.bytecode import DEFAULT_VALUES
+from ide.skuld.syntax_tree import Node
+
+# Operandos: el índice 0 significa "sin operando".
+OPERAND_NONE = 0
+KIND_CONST = "const"
+KIND_GLOBAL = "global"
+KIND_LOCAL = "local"
+KIND_TEMP = "temp"
+KIND_LABEL = "label"
+KIND_FUNCTION = "func"
+
+OPCODES = (
+    "nop",
+    "=",
+    "+",
+    "-",
+    "*",
+    "/",
+    "idiv",
+    "%",
+    "concat",
+    "==",
+    "!=",
+    "<",
+    "<=",
+    ">",
+    ">=",
+    "neg",
+    "not",
+    "itof",
+    "label",
+    "goto",
+    "iftrue",
+    "iffalse",
+    "param",
+    "call",
+    "return",
+    "print",
+    "read",
+    "func",
+    "recv",
+    "endfunc",
+    "halt",
+)
+OP = {name: code for code, name in enumerate(OPCODES)}
+OP_NOP = OP["nop"]
+
+BINARY_OPCODES = {OP[name] for name in ("+", "-", "*", "/", "idiv", "%", "concat", "==", "!=", "<", "<=", ">", ">=")}
+
+
+class OperandTable:
+    """Operandos internados: constantes y variables se guardan una sola vez.
+
+    Cada operando es un índice en las listas paralelas ``kinds``, ``values``
+    y ``types``. Los temporales y etiquetas son siempre nuevos.
+    """
+
+    def __init__(self) -> None:
+        self.kinds: list[str] = ["none"]
+        self.values: list[object] = [None]
+        self.types: list[str | None] = [None]
+        self._index: dict[tuple, int] = {}
+        self._temp_count = 0
+        self._label_count = 0
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _intern(self, key: tuple, kind: str, value: object, type_name: str | None) -> int:
+        index = self._index.get(key)
+        if index is None:
+            index = len(self.kinds)
+            self._index[key] = index
+            self.kinds.append(kind)
+            self.values.append(value)
+            self.types.append(type_name)
+        return index
+
+    def const(self, value: object, type_name: str) -> int:
+        # El tipo forma parte de la clave: 1, 1.0 y true son iguales para dict.
+        # El signo también, porque 0.0 y -0.0 son iguales pero 1 / x no.
+        if isinstance(value, float):
+            return self._intern((KIND_CONST, type_name, value, math.copysign(1.0, value)), KIND_CONST, value, type_name)
+        return self._intern((KIND_CONST, type_name, value), KIND_CONST, value, type_name)
+
+    def variable(self, name: str, kind: str, type_name: str | None, scope: str = "") -> int:
+        return self._intern((kind, scope, name), kind, name, type_name)
+
+    def function(self, name: str) -> int:
+        return self._intern((KIND_FUNCTION, name), KIND_FUNCTION, name, None)
+
+    def temp(self, type_name: str | None) -> int:
+        self._temp_count += 1
+        return self._append(KIND_TEMP, f"t{self._temp_count}", type_name)
+
+    def label(self) -> int:
+        self._label_count += 1
+        return self._append(KIND_LABEL, f"L{self._label_count}", None)
+
+    def _append(self, kind: str, value: object, type_name: str | None) -> int:
+        self.kinds.append(kind)
+        self.values.append(value)
+        self.types.append(type_name)
+        return len(self.kinds) - 1
+
+    def text(self, index: int) -> str:
+        if self.kinds[index] == KIND_CONST:
+            value = self.values[index]
+            if self.types[index] == "dmail":
+                return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            if self.types[index] == "reading":
+                return "true" if value else "false"
+            return repr(value)
+        return str(self.values[index])
+
+
+class QuadTable:
+    """Cuádruplos (op, arg1, arg2, resultado) guardados por columnas en ``array``.
+
+    ``lines`` y ``columns`` guardan la posición en el fuente de cada
+    cuádruplo para poder ubicar los errores de ejecución.
+    """
+
+    def __init__(self) -> None:
+        self.ops = array("i")
+        self.arg1 = array("i")
+        self.arg2 = array("i")
+        self.result = array("i")
+        self.lines = array("i")
+        self.columns = array("i")
+        self.operands = OperandTable()
+        self.line = 0
+        self.column = 0
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def emit(self, op: int, arg1: int = OPERAND_NONE, arg2: int = OPERAND_NONE, result: int = OPERAND_NONE) -> int:
+        self.ops.append(op)
+        self.arg1.append(arg1)
+        self.arg2.append(arg2)
+        self.result.append(result)
+        self.lines.append(self.line)
+        self.columns.append(self.column)
+        return len(self.ops) - 1
+
+    def compact(self) -> None:
+        """Elimina los ``nop`` que dejan los pases de optimización."""
+        keep = [index for index, op in enumerate(self.ops) if op != OP_NOP]
+        if len(keep) == len(self.ops):
+            return
+        for name in ("ops", "arg1", "arg2", "result", "lines", "columns"):
+            column = getattr(self, name)
+            setattr(self, name, array("i", [column[index] for index in keep]))
+
+    def instruction_count(self) -> int:
+        return len(self.ops) - self.ops.count(OP_NOP)
+
+    def format_quad(self, index: int) -> str:
+        text = self.operands.text
+        op = OPCODES[self.ops[index]]
+        arg1 = self.arg1[index]
+        arg2 = self.arg2[index]
+        result = self.result[index]
+        if op == "=":
+            return f"{text(result)} = {text(arg1)}"
+        if op in ("neg", "not", "itof"):
+            symbol = {"neg": "-", "not": "not ", "itof": "(divergence) "}[op]
+            return f"{text(result)} = {symbol}{text(arg1)}"
+        if self.ops[index] in BINARY_OPCODES:
+            symbol = {"idiv": "//", "concat": "++"}.get(op, op)
+            return f"{text(result)} = {text(arg1)} {symbol} {text(arg2)}"
+        if op == "label":
+            return f"{text(result)}:"
+        if op == "goto":
+            return f"goto {text(result)}"
+        if op in ("iftrue", "iffalse"):
+            keyword = "if" if op == "iftrue" else "ifFalse"
+            return f"{keyword} {text(arg1)} goto {text(result)}"
+        if op == "call":
+            call = f"call {text(arg1)}, {text(arg2)}"
+            return f"{text(result)} = {call}" if result else call
+        if op == "read":
+            return f"read {text(result)}"
+        if op == "print":
+            return f"print {text(arg1)}"
+        if op in ("param", "return", "func", "recv") and arg1:
+            return f"{op} {text(arg1)}"
+        return op
+
+    def format(self) -> str:
+        width = len(str(max(len(self) - 1, 0)))
+        lines = []
+        for index in range(len(self)):
+            quad = self.format_quad(index)
+            indent = "" if self.ops[index] in (OP["label"], OP["func"], OP["endfunc"]) else "    "
+            lines.append(f"{index:>{width}}: {indent}{quad}")
+        return "\n".join(lines)
+
+
+class IRGenerator:
+    """Traduce el AST a cuádruplos en una sola pasada.
+
+    Supone un programa sin errores semánticos. Las variables locales se
+    renombran (``x``, ``x.1``...) cuando un bloque interior oculta otra con el
+    mismo nombre, así cada operando local es único dentro de su función.
+    """
+
+    def __init__(self) -> None:
+        self.table = QuadTable()
+        self._operands = self.table.operands
+        self._globals: dict[str, tuple[int, str]] = {}
+        self._functions: dict[str, tuple[int, str, tuple[str, ...]]] = {}
+        self._locals: dict[str, list[tuple[int, str]]] = {}
+        self._scopes: list[list[str]] = []
+        self._name_counts: dict[str, int] = {}
+        self._loop_ends: list[int] = []
+        self._function_name = ""
+        self._return_type = "void"
+        self._statement_handlers = {
+            "VarDecl": self._var_decl,
+            "ExprStmt": self._expr_stmt,
+            "Block": self._block,
+            "Choice": self._choice,
+            "Loop": self._loop,
+            "Shift": self._shift,
+            "Jump": self._jump,
+            "Return": self._return,
+            "Output": self._output,
+            "Input": self._input,
+        }
+
+    def generate(self, program: Node) -> QuadTable:
+        operands = self._operands
+        emit = self.table.emit
+        functions: list[Node] = []
+        gate: Node | None = None
+        for item in program.children:
+            if item.kind == "Function":
+                params = tuple(param.type_name for param in item.children[0].children)
+                self._functions[item.value] = (operands.function(item.value), item.type_name, params)
+                functions.append(item)
+            elif item.kind == "VarDecl":
+                self._globals[item.value] = (operands.variable(item.value, KIND_GLOBAL, item.type_name), item.type_name)
+            elif item.kind == "Gate" and gate is None:
+                gate = item
+
+        # Inicialización de globales, llamada al punto de entrada y fin.
+        for item in program.children:
+            if item.kind == "VarDecl":
+                self._at(item)
+                target, target_type = self._globals[item.value]
+                self._store(item, target, target_type)
+        if gate is not None:
+            self._at(gate)
+            emit(OP["call"], operands.function("gate"), operands.const(0, "worldline"))
+        emit(OP["halt"])
+
+        for function in functions:
+            params, body = function.children
+            self._at(function)
+            self._begin_function(function.value, function.type_name)
+            for param in params.children:
+                emit(OP["recv"], self._declare_local(param.value, param.type_name))
+            self._statements(body.children)
+            self._end_function()
+        if gate is not None:
+            self._at(gate)
+            self._begin_function("gate", "void")
+            self._statements(gate.children[0].children)
+            self._end_function()
+        return self.table
+
+    # -- Funciones y ámbitos --------------------------------------------
+
+    def _begin_function(self, name: str, return_type: str) -> None:
+        self.table.emit(OP["func"], self._operands.function(name))
+        self._function_name = name
+        self._return_type = return_type
+        self._locals = {}
+        self._name_counts = {}
+        self._scopes = [[]]
+
+    def _end_function(self) -> None:
+        # Una función con valor que termina sin 'return' devuelve el valor por defecto.
+        if self._return_type in DEFAULT_VALUES:
+            default = self._operands.const(DEFAULT_VALUES[self._return_type], self._return_type)
+            self.table.emit(OP["return"], default)
+        else:
+            self.table.emit(OP["return"])
+        self.table.emit(OP["endfunc"])
+
+    def _declare_local(self, name: str, type_name: str) -> int:
+        count = self._name_counts.get(name, 0)
+        self._name_counts[name] = count + 1
+        unique = name if count == 0 else f"{name}.{count}"
+        operand = self._operands.variable(unique, KIND_LOCAL, type_name, self._function_name)
+        self._locals.setdefault(name, []).append((operand, type_name))
+        self._scopes[-1].append(name)
+        return operand
+
+    def _resolve(self, name: str) -> tuple[int, str]:
+        stack = self._locals.get(name)
+        if stack:
+            return stack[-1]
+        return self._globals[name]
+
+    def _push_scope(self) -> None:
+        self._scopes.append([])
+
+    def _pop_scope(self) -> None:
+        locals_ = self._locals
+        for name in self._scopes.pop():
+            locals_[name].pop()
+
+    # -- Sentencias -----------------------------------------------------
+
+    def _at(self, node: Node) -> None:
+        self.table.line = node.line
+        self.table.column = node.column
+
+    def _statements(self, statements: list[Node] | tuple) -> None:
+        handlers = self._statement_handlers
+        for statement in statements:
+            self._at(statement)
+            handlers[statement.kind](statement)
+
+    def _var_decl(self, node: Node) -> None:
+        # El inicializador se evalúa antes de declarar: "labmem x = x;" usa la x externa.
+        if node.children:
+            value, value_type = self._expression(node.children[0])
+            target = self._declare_local(node.value, node.type_name)
+            self.table.emit(OP["="], self._coerce(value, value_type, node.type_name), result=target)
+        else:
+            self._declare_local(node.value, node.type_name)
+
+    def _store(self, node: Node, target: int, target_type: str) -> None:
+        if node.children:
+            value, value_type = self._expression(node.children[0])
+            self.table.emit(OP["="], self._coerce(value, value_type, target_type), result=target)
+
+    def _expr_stmt(self, node: Node) -> None:
+        self._expression(node.children[0], discard=True)
+
+    def _block(self, node: Node) -> None:
+        self._push_scope()
+        self._statements(node.children)
+        self._pop_scope()
+
+    def _choice(self, node: Node) -> None:
+        emit = self.table.emit
+        operands = self._operands
+        condition, then_branch, *rest = node.children
+        else_label = operands.label()
+        value, _ = self._expression(condition)
+        emit(OP["iffalse"], value, result=else_label)
+        self._block(then_branch)
+        if rest:
+            end_label = operands.label()
+            emit(OP["goto"], result=end_label)
+            emit(OP["label"], result=else_label)
+            branch = rest[0]
+            if branch.kind == "Choice":
+                self._choice(branch)
+            else:
+                self._block(branch)
+            emit(OP["label"], result=end_label)
+        else:
+            emit(OP["label"], result=else_label)
+
+    def _loop(self, node: Node) -> None:
+        emit = self.table.emit
+        start_label = self._operands.label()
+        end_label = self._operands.label()
+        emit(OP["label"], result=start_label)
+        value, _ = self._expression(node.children[0])
+        emit(OP["iffalse"], value, result=end_label)
+        self._loop_ends.append(end_label)
+        self._block(node.children[1])
+        self._loop_ends.pop()
+        emit(OP["goto"], result=start_label)
+        emit(OP["label"], result=end_label)
+
+    def _shift(self, node: Node) -> None:
+        emit = self.table.emit
+        init, condition, update, body = node.children
+        self._push_scope()
+        if init.kind == "Block":
+            self._statements(init.children)
+        elif init.kind == "VarDecl":
+            self._var_decl(init)
+        elif init.kind != "Empty":
+            self._expression(init, discard=True)
+
+        start_label = self._operands.label()
+        end_label = self._operands.label()
+        emit(OP["label"], result=start_label)
+        if condition.kind != "Empty":
+            value, _ = self._expression(condition)
+            emit(OP["iffalse"], value, result=end_label)
+        self._loop_ends.append(end_label)
+        self._block(body)
+        self._loop_ends.pop()
+        if update.kind != "Empty":
+            self._expression(update, discard=True)
+        emit(OP["goto"], result=start_label)
+        emit(OP["label"], result=end_label)
+        self._pop_scope()
+
+    def _jump(self, node: Node) -> None:
+        if self._loop_ends:
+            self.table.emit(OP["goto"], result=self._loop_ends[-1])
+
+    def _return(self, node: Node) -> None:
+        if node.children:
+            value, value_type = self._expression(node.children[0])
+            self.table.emit(OP["return"], self._coerce(value, value_type, self._return_type))
+        else:
+            self.table.emit(OP["return"])
+
+    def _output(self, node: Node) -> None:
+        emit = self.table.emit
+        for child in node.children:
+            value, _ = self._expression(child)
+            emit(OP["param"], value)
+        emit(OP["print"], self._operands.const(len(node.children), "worldline"))
+
+    def _input(self, node: Node) -> None:
+        for target in node.children:
+            operand, _ = self._resolve(target.value)
+            self.table.emit(OP["read"], result=operand)
+
+    # -- Expresiones ----------------------------------------------------
+
+    def _expression(self, node: Node, *, discard: bool = False) -> tuple[int, str | None]:
+        kind = node.kind
+        if kind == "Literal":
+            return self._operands.const(node.value, node.type_name), node.type_name
+        if kind == "Identifier":
+            return self._resolve(node.value)
+        if kind == "Binary":
+            return self._binary(node)
+        if kind == "Unary":
+            operand, operand_type = self._expression(node.children[0])
+            if node.value == "not":
+                result = self._operands.temp("reading")
+                self.table.emit(OP["not"], operand, result=result)
+                return result, "reading"
+            result = self._operands.temp(operand_type)
+            self.table.emit(OP["neg"], operand, result=result)
+            return result, operand_type
+        if kind == "Assign":
+            return self._assign(node)
+        if kind in ("PreInc", "PreDec", "PostInc", "PostDec"):
+            return self._increment(node, discard)
+        if kind == "Call":
+            return self._call(node, discard)
+        return OPERAND_NONE, None
+
+    def _binary(self, node: Node) -> tuple[int, str | None]:
+        operator = node.value
+        if operator in ("and", "or"):
+            return self._short_circuit(node)
+        left, left_type = self._expression(node.children[0])
+        left = self._snapshot(left, node.children[1])
+        right, right_type = self._expression(node.children[1])
+        self._at(node)
+        if operator in ("==", "!=", "<", "<=", ">", ">="):
+            result_type = "reading"
+            opcode = OP[operator]
+        elif operator == "+" and (left_type == "dmail" or right_type == "dmail"):
+            result_type = "dmail"
+            opcode = OP["concat"]
+        elif left_type == right_type == "worldline":
+            result_type = "worldline"
+            opcode = OP["idiv"] if operator == "/" else OP[operator]
+        else:
+            result_type = "divergence"
+            opcode = OP[operator]
+        result = self._operands.temp(result_type)
+        self.table.emit(opcode, left, right, result)
+        return result, result_type
+
+    def _short_circuit(self, node: Node) -> tuple[int, str]:
+        emit = self.table.emit
+        result = self._operands.temp("reading")
+        end_label = self._operands.label()
+        left, _ = self._expression(node.children[0])
+        emit(OP["="], left, result=result)
+        emit(OP["iffalse" if node.value == "and" else "iftrue"], result, result=end_label)
+        right, _ = self._expression(node.children[1])
+        emit(OP["="], right, result=result)
+        emit(OP["label"], result=end_label)
+        return result, "reading"
+
+    def _assign(self, node: Node) -> tuple[int, str | None]:
+        target_node, value_node = node.children
+        target, target_type = self._resolve(target_node.value)
+        operator = node.value
+        current = target if operator == "=" else self._snapshot(target, value_node)
+        value, value_type = self._expression(value_node)
+        if operator != "=":
+            arithmetic = operator[0]
+            if target_type == "dmail":
+                opcode = OP["concat"]
+            elif arithmetic == "/" and target_type == value_type == "worldline":
+                opcode = OP["idiv"]
+            else:
+                opcode = OP[arithmetic]
+            combined = self._operands.temp(target_type)
+            self.table.emit(opcode, current, value, combined)
+            value, value_type = combined, target_type
+        self.table.emit(OP["="], self._coerce(value, value_type, target_type), result=target)
+        return target, target_type
+
+    def _increment(self, node: Node, discard: bool) -> tuple[int, str | None]:
+        emit = self.table.emit
+        target, target_type = self._resolve(node.children[0].value)
+        one = self._operands.const(1, "worldline")
+        opcode = OP["+"] if node.kind in ("PreInc", "PostInc") else OP["-"]
+        if node.kind.startswith("Post") and not discard:
+            previous = self._operands.temp(target_type)
+            emit(OP["="], target, result=previous)
+            emit(opcode, target, one, target)
+            return previous, target_type
+        emit(opcode, target, one, target)
+        return target, target_type
+
+    def _call(self, node: Node, discard: bool) -> tuple[int, str | None]:
+        emit = self.table.emit
+        function, return_type, params = self._functions[node.value]
+        arguments = []
+        for position, (argument, param_type) in enumerate(zip(node.children, params)):
+            value, value_type = self._expression(argument)
+            value = self._coerce(value, value_type, param_type)
+            for later in node.children[position + 1 :]:
+                value = self._snapshot(value, later)
+            arguments.append(value)
+        self._at(node)
+        for argument in arguments:
+            emit(OP["param"], argument)
+        count = self._operands.const(len(arguments), "worldline")
+        if return_type == "void" or discard:
+            emit(OP["call"], function, count)
+            return OPERAND_NONE, return_type
+        result = self._operands.temp(return_type)
+        emit(OP["call"], function, count, result)
+        return result, return_type
+
+    def _snapshot(self, operand: int, later: Node) -> int:
+        """Copia a un temporal una variable ya leída si ``later``, que se evalúa
+        antes de usarla, puede modificarla; así se usa el valor leído, como en
+        los otros motores."""
+        if self._operands.kinds[operand] not in (KIND_GLOBAL, KIND_LOCAL) or not _has_side_effects(later):
+            return operand
+        copy = self._operands.temp(self._operands.types[operand])
+        self.table.emit(OP["="], operand, result=copy)
+        return copy
+
+    def _coerce(self, operand: int, from_type: str | None, to_type: str) -> int:
+        if to_type == "divergence" and from_type == "worldline":
+            if self._operands.kinds[operand] == KIND_CONST:
+                return self._operands.const(float(self._operands.values[operand]), "divergence")
+            result = self._operands.temp("divergence")
+            self.table.emit(OP["itof"], operand, result=result)
+            return result
+        return operand
+
+
+def _has_side_effects(node: Node) -> bool:
+    if node.kind in ("Assign", "PreInc", "PreDec", "PostInc", "PostDec", "Call"):
+        return True
+    return any(_has_side_effects(child) for child in node.children)
+
+
+def generate(program: Node) -> QuadTable:
+    return IRGenerator().generate(program)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import re
+
+from ide.skuld.diagnostics import Diagnostic
+
+STATE_NORMAL = 0
+STATE_BLOCK_COMMENT = 1
+
+KEYWORDS = {
+    "labmem": "KW_LABMEM",
+    "worldline": "KW_WORLDLINE",
+    "divergence": "KW_DIVERGENCE",
+    "dmail": "KW_DMAIL",
+    "sphone": "KW_SPHONE",
+    "reading": "KW_READING",
+    "choice": "KW_CHOICE",
+    "gate": "KW_GATE",
+    "loop": "KW_LOOP",
+    "shift": "KW_SHIFT",
+    "jump": "KW_JUMP",
+    "return": "KW_RETURN",
+    "steiner": "KW_STEINER",
+    "and": "KW_AND",
+    "or": "KW_OR",
+    "not": "KW_NOT",
+    "else": "KW_ELSE",
+    "void": "KW_VOID",
+    "true": "KW_TRUE",
+    "false": "KW_FALSE",
+}
+
+OPERATORS = {
+    "+": "PLUS",
+    "-": "MINUS",
+    "*": "STAR",
+    "/": "SLASH",
+    "%": "PERCENT",
+    "=": "ASSIGN",
+    "+=": "PLUS_ASSIGN",
+    "-=": "MINUS_ASSIGN",
+    "*=": "MUL_ASSIGN",
+    "/=": "DIV_ASSIGN",
+    "%=": "MOD_ASSIGN",
+    "++": "INC",
+    "--": "DEC",
+    "==": "EQ",
+    "!=": "NEQ",
+    "<": "LT",
+    "<=": "LTE",
+    ">": "GT",
+    ">=": "GTE",
+    "<<": "STREAM_OUT",
+    ">>": "STREAM_IN",
+    "&&": "AND_OP",
+    "||": "OR_OP",
+    "!": "NOT_OP",
+}
+
+DELIMITERS = {
+    "(": "LPAREN",
+    ")": "RPAREN",
+    "{": "LBRACE",
+    "}": "RBRACE",
+    "[": "LBRACKET",
+    "]": "RBRACKET",
+    ";": "SEMICOLON",
+    ",": "COMMA",
+    ".": "DOT",
+    ":": "COLON",
+}
+
+# Un único patrón compilado para todo el lenguaje. El orden de las
+# alternativas implementa las prioridades de PLAN_DESARROLLO.txt y los
+# operadores compuestos van antes que los simples (maximal munch).
+_TOKEN_PATTERN = re.compile(
+    r"""
+     (?P<WS>[ \t\r\f\v]+)
+    |(?P<COMMENT>//.*)
+    |(?P<BLOCK_COMMENT>/\*.*?\*/)
+    |(?P<OPEN_COMMENT>/\*.*)
+    |(?P<STRING_LITERAL>"(?:[^"\\]|\\.)*")
+    |(?P<UNTERMINATED_STRING>"(?:[^"\\]|\\.)*\\?)
+    |(?P<FLOAT_LITERAL>[0-9]+\.[0-9]+(?:[eE][+-]?[0-9]+)?)
+    |(?P<INTEGER_LITERAL>[0-9]+)
+    |(?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<OPERATOR>\+\+|--|\+=|-=|\*=|/=|%=|==|!=|<=|>=|<<|>>|&&|\|\||[-+*/%=<>!])
+    |(?P<DELIMITER>[(){}\[\];,.:])
+    |(?P<ERROR>.)
+    """,
+    re.VERBOSE,
+)
+_COMMENT_END = re.compile(r"\*/")
+
+_CATEGORIES = {
+    "COMMENT": "comment",
+    "STRING_LITERAL": "string",
+    "INTEGER_LITERAL": "number",
+    "FLOAT_LITERAL": "number",
+    "IDENTIFIER": "identifier",
+    "ERROR": "error",
+}
+_CATEGORIES.update({kind: "keyword" for kind in KEYWORDS.values()})
+_CATEGORIES.update({kind: "operator" for kind in OPERATORS.values()})
+_CATEGORIES.update({kind: "delimiter" for kind in DELIMITERS.values()})
+
+
+class Token:
+    __slots__ = ("kind", "lexeme", "line", "column")
+
+    def __init__(self, kind: str, lexeme: str, line: int, column: int) -> None:
+        self.kind = kind
+        self.lexeme = lexeme
+        self.line = line
+        self.column = column
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind}, {self.lexeme!r}, {self.line}:{self.column})"
+
+
+def token_category(kind: str) -> str:
+    return _CATEGORIES.get(kind, "identifier")
+
+
+def tokenize_line(text: str, line: int, state: int = STATE_NORMAL) -> tuple[list[Token], int]:
+    """Tokeniza una línea (sin salto final) partiendo del estado de la línea anterior.
+
+    Devuelve los tokens, incluidos comentarios y errores, y el estado con el que
+    termina la línea; solo los comentarios de bloque cruzan líneas.
+    """
+    tokens: list[Token] = []
+    append = tokens.append
+    position = 0
+    length = len(text)
+
+    if state == STATE_BLOCK_COMMENT:
+        end = _COMMENT_END.search(text)
+        if end is None:
+            if text:
+                append(Token("COMMENT", text, line, 1))
+            return tokens, STATE_BLOCK_COMMENT
+        position = end.end()
+        append(Token("COMMENT", text[:position], line, 1))
+
+    keywords = KEYWORDS
+    operators = OPERATORS
+    delimiters = DELIMITERS
+    state = STATE_NORMAL
+    for match in _TOKEN_PATTERN.finditer(text, position, length):
+        group = match.lastgroup
+        if group == "WS":
+            continue
+        lexeme = match.group()
+        column = match.start() + 1
+        if group == "IDENTIFIER":
+            append(Token(keywords.get(lexeme, "IDENTIFIER"), lexeme, line, column))
+        elif group == "OPERATOR":
+            append(Token(operators[lexeme], lexeme, line, column))
+        elif group == "DELIMITER":
+            append(Token(delimiters[lexeme], lexeme, line, column))
+        elif group == "BLOCK_COMMENT":
+            append(Token("COMMENT", lexeme, line, column))
+        elif group == "OPEN_COMMENT":
+            append(Token("COMMENT", lexeme, line, column))
+            state = STATE_BLOCK_COMMENT
+        elif group == "UNTERMINATED_STRING":
+            append(Token("ERROR", lexeme, line, column))
+        else:
+            append(Token(group, lexeme, line, column))
+    return tokens, state
+
+
+def tokenize(text: str, *, keep_comments: bool = False) -> tuple[list[Token], list[Diagnostic]]:
+    tokens: list[Token] = []
+    diagnostics: list[Diagnostic] = []
+    state = STATE_NORMAL
+    comment_opened_at = (0, 0)
+
+    for line_number, line_text in enumerate(text.split("\n"), start=1):
+        previous_state = state
+        line_tokens, state = tokenize_line(line_text, line_number, state)
+        if state == STATE_BLOCK_COMMENT and (previous_state == STATE_NORMAL or len(line_tokens) > 1):
+            comment_opened_at = (line_number, line_tokens[-1].column)
+        for token in line_tokens:
+            kind = token.kind
+            if kind == "COMMENT":
+                if keep_comments:
+                    tokens.append(token)
+                continue
+            if kind == "ERROR":
+                diagnostics.append(lexical_error(token))
+            tokens.append(token)
+
+    if state == STATE_BLOCK_COMMENT:
+        line, column = comment_opened_at
+        diagnostics.append(Diagnostic("LEXICO", line, column, "Comentario de bloque sin cerrar."))
+    return tokens, diagnostics
+
+
+def lexical_error(token: Token) -> Diagnostic:
+    if token.lexeme.startswith('"'):
+        message = "Cadena sin cierre antes del fin de línea."
+    else:
+        message = f"Carácter no reconocido: {token.lexeme!r}"
+    return Diagnostic("LEXICO", token.line, token.column, message)
+
+
+def format_tokens(tokens: list[Token]) -> str:
+    lines = [f"{'Línea':>6} {'Col':>5}  {'Token':<18} Lexema", "-" * 48]
+    for token in tokens:
+        lines.append(f"{token.line:>6} {token.column:>5}  {token.kind:<18} {token.lexeme}")
+    lines.append("")
+    lines.append(f"Total de tokens: {len(tokens)}")
+    return "\n".join(lines)
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from ide.skuld.ir import (
+    BINARY_OPCODES,
+    KIND_CONST,
+    KIND_GLOBAL,
+    KIND_LOCAL,
+    KIND_TEMP,
+    OP,
+    OP_NOP,
+    QuadTable,
+)
+from ide.skuld.runtime import BINARY_OPERATIONS, UNARY_OPERATIONS, SkuldRuntimeError
+
+ASSIGN = OP["="]
+LABEL = OP["label"]
+GOTO = OP["goto"]
+IFTRUE = OP["iftrue"]
+IFFALSE = OP["iffalse"]
+PARAM = OP["param"]
+CALL = OP["call"]
+RETURN = OP["return"]
+READ = OP["read"]
+FUNC = OP["func"]
+RECV = OP["recv"]
+ENDFUNC = OP["endfunc"]
+HALT = OP["halt"]
+
+UNARY_OPCODES = frozenset(UNARY_OPERATIONS)
+PURE_OPCODES = frozenset(BINARY_OPCODES | UNARY_OPCODES | {ASSIGN})
+# Sin efectos salvo que el divisor sea cero: entonces detienen el programa.
+TRAPPING_OPCODES = frozenset({OP["/"], OP["idiv"], OP["%"]})
+USES_ARG1 = frozenset(PURE_OPCODES | {IFTRUE, IFFALSE, PARAM, RETURN})
+BLOCK_BOUNDARIES = frozenset({LABEL, FUNC, ENDFUNC})
+TERMINATORS = frozenset({GOTO, RETURN, HALT, ENDFUNC})
+
+OPT_LEVELS = {
+    0: "Sin optimizar",
+    1: "Básica (constantes y código muerto)",
+    2: "Completa",
+}
+
+
+@dataclass
+class PassReport:
+    name: str
+    seconds: float
+    before: int
+    after: int
+
+
+# -- Utilidades -----------------------------------------------------------
+
+
+def _defined_operand(table: QuadTable, index: int) -> int:
+    op = table.ops[index]
+    if op in PURE_OPCODES or op == CALL or op == READ:
+        return table.result[index]
+    if op == RECV:
+        return table.arg1[index]
+    return 0
+
+
+def _regions(table: QuadTable) -> list[tuple[int, int]]:
+    """Tramos ``[inicio, fin)``: el código global y cada ``func ... endfunc``."""
+    regions: list[tuple[int, int]] = []
+    start = 0
+    for index, op in enumerate(table.ops):
+        if op == FUNC:
+            if index > start:
+                regions.append((start, index))
+            start = index
+        elif op == ENDFUNC:
+            regions.append((start, index + 1))
+            start = index + 1
+    if start < len(table.ops):
+        regions.append((start, len(table.ops)))
+    return regions
+
+
+class _Invalidator:
+    """Hechos "operando -> valor" válidos dentro de un bloque básico.
+
+    Guarda un índice inverso para invalidar en O(1) los hechos que mencionan
+    un operando redefinido.
+    """
+
+    def __init__(self) -> None:
+        self.facts: dict[object, int] = {}
+        self._mentions: dict[int, list[object]] = {}
+
+    def clear(self) -> None:
+        self.facts.clear()
+        self._mentions.clear()
+
+    def add(self, key: object, value: int, operands: tuple[int, ...]) -> None:
+        self.facts[key] = value
+        for operand in operands:
+            self._mentions.setdefault(operand, []).append(key)
+
+    def kill(self, operand: int) -> None:
+        keys = self._mentions.pop(operand, None)
+        if keys:
+            facts = self.facts
+            for key in keys:
+                facts.pop(key, None)
+
+    def kill_globals(self, kinds: list[str]) -> None:
+        for operand in [operand for operand in self._mentions if kinds[operand] == KIND_GLOBAL]:
+            self.kill(operand)
+
+
+# -- Pases ----------------------------------------------------------------
+
+
+def fold_constants(table: QuadTable) -> None:
+    """Plegado y propagación de constantes dentro de cada bloque básico."""
+    operands = table.operands
+    kinds = operands.kinds
+    values = operands.values
+    types = operands.types
+    ops, arg1, arg2, result = table.ops, table.arg1, table.arg2, table.result
+    constants = _Invalidator()
+
+    for index in range(len(ops)):
+        op = ops[index]
+        if op in BLOCK_BOUNDARIES:
+            constants.clear()
+            continue
+
+        facts = constants.facts
+        if op in USES_ARG1 and arg1[index] in facts:
+            arg1[index] = facts[arg1[index]]
+        if op in BINARY_OPCODES and arg2[index] in facts:
+            arg2[index] = facts[arg2[index]]
+
+        if op in BINARY_OPCODES and kinds[arg1[index]] == KIND_CONST and kinds[arg2[index]] == KIND_CONST:
+            try:
+                value = BINARY_OPERATIONS[op](values[arg1[index]], values[arg2[index]])
+            except SkuldRuntimeError:
+                value = None
+            if value is not None:
+                ops[index] = op = ASSIGN
+                arg1[index] = operands.const(value, types[result[index]] or "reading")
+                arg2[index] = 0
+        elif op in UNARY_OPCODES and kinds[arg1[index]] == KIND_CONST:
+            value = UNARY_OPERATIONS[op](values[arg1[index]])
+            ops[index] = op = ASSIGN
+            arg1[index] = operands.const(value, types[result[index]] or "reading")
+        elif (op == IFTRUE or op == IFFALSE) and kinds[arg1[index]] == KIND_CONST:
+            taken = bool(values[arg1[index]]) == (op == IFTRUE)
+            ops[index] = GOTO if taken else OP_NOP
+            arg1[index] = 0
+            if not taken:
+                result[index] = 0
+            continue
+
+        if op == CALL:
+            constants.kill_globals(kinds)
+        defined = _defined_operand(table, index)
+        if defined:
+            constants.kill(defined)
+            if op == ASSIGN and kinds[arg1[index]] == KIND_CONST:
+                constants.add(defined, arg1[index], (defined,))
+
+
+def propagate_copies(table: QuadTable) -> None:
+    """Sustituye ``x`` por ``y`` tras ``x = y`` mientras ninguno de los dos cambie."""
+    kinds = table.operands.kinds
+    ops, arg1, arg2 = table.ops, table.arg1, table.arg2
+    copies = _Invalidator()
+
+    for index in range(len(ops)):
+        op = ops[index]
+        if op in BLOCK_BOUNDARIES:
+            copies.clear()
+            continue
+
+        facts = copies.facts
+        if op in USES_ARG1 and arg1[index] in facts:
+            arg1[index] = facts[arg1[index]]
+        if op in BINARY_OPCODES and arg2[index] in facts:
+            arg2[index] = facts[arg2[index]]
+
+        if op == CALL:
+            copies.kill_globals(kinds)
+        defined = _defined_operand(table, index)
+        if defined:
+            copies.kill(defined)
+            source = arg1[index]
+            if op == ASSIGN and source != defined and kinds[source] != KIND_CONST:
+                copies.add(defined, source, (defined, source))
+
+
+def eliminate_common_subexpressions(table: QuadTable) -> None:
+    """Reutiliza el resultado de una operación pura ya calculada en el bloque."""
+    kinds = table.operands.kinds
+    ops, arg1, arg2, result = table.ops, table.arg1, table.arg2, table.result
+    available = _Invalidator()
+
+    for index in range(len(ops)):
+        op = ops[index]
+        if op in BLOCK_BOUNDARIES:
+            available.clear()
+            continue
+
+        defined = _defined_operand(table, index)
+        key = None
+        if op in PURE_OPCODES and op != ASSIGN:
+            key = (op, arg1[index], arg2[index])
+            previous = available.facts.get(key)
+            if previous is not None and previous != defined:
+                ops[index] = ASSIGN
+                arg1[index] = previous
+                arg2[index] = 0
+                key = None
+
+        if op == CALL:
+            available.kill_globals(kinds)
+        if defined:
+            available.kill(defined)
+            if key is not None and defined not in (key[1], key[2]):
+                available.add(key, defined, (defined, key[1], key[2]))
+
+
+def eliminate_dead_code(table: QuadTable) -> None:
+    """Quita asignaciones a temporales y locales cuyo valor nunca se lee.
+
+    Una división solo se quita si su divisor es una constante distinta de
+    cero: si no, quitarla haría que el programa no se detuviera donde sí lo
+    hace sin optimizar.
+    """
+    kinds = table.operands.kinds
+    values = table.operands.values
+    ops, arg1, arg2, result = table.ops, table.arg1, table.arg2, table.result
+
+    for start, end in _regions(table):
+        uses: dict[int, int] = {}
+        for index in range(start, end):
+            op = ops[index]
+            if op in USES_ARG1:
+                uses[arg1[index]] = uses.get(arg1[index], 0) + 1
+            if op in BINARY_OPCODES:
+                uses[arg2[index]] = uses.get(arg2[index], 0) + 1
+
+        changed = True
+        while changed:
+            changed = False
+            for index in range(start, end):
+                op = ops[index]
+                if op == CALL and result[index] and kinds[result[index]] in (KIND_TEMP, KIND_LOCAL):
+                    if not uses.get(result[index]):
+                        result[index] = 0
+                    continue
+                if op not in PURE_OPCODES:
+                    continue
+                if op in TRAPPING_OPCODES and (kinds[arg2[index]] != KIND_CONST or values[arg2[index]] == 0):
+                    continue
+                target = result[index]
+                self_copy = op == ASSIGN and arg1[index] == target
+                if not self_copy and (kinds[target] not in (KIND_TEMP, KIND_LOCAL) or uses.get(target)):
+                    continue
+                ops[index] = OP_NOP
+                uses[arg1[index]] -= 1
+                if op in BINARY_OPCODES:
+                    uses[arg2[index]] -= 1
+                changed = True
+
+
+def remove_unreachable_code(table: QuadTable) -> None:
+    """Elimina bloques inalcanzables, saltos al siguiente bloque y etiquetas sin uso."""
+    ops, arg1, result = table.ops, table.arg1, table.result
+
+    for start, end in _regions(table):
+        label_at: dict[int, int] = {}
+        for index in range(start, end):
+            if ops[index] == LABEL:
+                label_at[result[index]] = index
+
+        # Recorrido del grafo de flujo desde la entrada de la función.
+        reachable = bytearray(end - start)
+        pending = [start]
+        while pending:
+            index = pending.pop()
+            while index < end and not reachable[index - start]:
+                reachable[index - start] = 1
+                op = ops[index]
+                if op == GOTO:
+                    pending.append(label_at[result[index]])
+                    break
+                if op == IFTRUE or op == IFFALSE:
+                    pending.append(label_at[result[index]])
+                elif op in TERMINATORS:
+                    break
+                index += 1
+
+        for index in range(start, end):
+            if not reachable[index - start] and ops[index] not in (FUNC, ENDFUNC):
+                ops[index] = OP_NOP
+
+        # "goto L" seguido de "L:" es un salto innecesario.
+        for index in range(start, end):
+            if ops[index] != GOTO:
+                continue
+            following = index + 1
+            while following < end and ops[following] == OP_NOP:
+                following += 1
+            if following < end and ops[following] == LABEL and result[following] == result[index]:
+                ops[index] = OP_NOP
+
+        targets = {result[index] for index in range(start, end) if ops[index] in (GOTO, IFTRUE, IFFALSE)}
+        for index in range(start, end):
+            if ops[index] == LABEL and result[index] not in targets:
+                ops[index] = OP_NOP
+
+
+# -- Gestor de pases ------------------------------------------------------
+
+PASSES: dict[str, Callable[[QuadTable], None]] = {
+    "Plegado de constantes": fold_constants,
+    "Propagación de copias": propagate_copies,
+    "Subexpresiones comunes": eliminate_common_subexpressions,
+    "Código muerto": eliminate_dead_code,
+    "Código inalcanzable": remove_unreachable_code,
+}
+
+PIPELINES: dict[int, list[str]] = {
+    0: [],
+    1: ["Plegado de constantes", "Código muerto", "Código inalcanzable"],
+    2: [
+        "Plegado de constantes",
+        "Propagación de copias",
+        "Subexpresiones comunes",
+        "Propagación de copias",
+        "Plegado de constantes",
+        "Código muerto",
+        "Código inalcanzable",
+    ],
+}
+
+
+class PassManager:
+    """Ejecuta una secuencia de pases y mide tiempo e instrucciones de cada uno."""
+
+    def __init__(self, pass_names: list[str]) -> None:
+        self.pass_names = pass_names
+
+    def run(self, table: QuadTable) -> list[PassReport]:
+        reports: list[PassReport] = []
+        for name in self.pass_names:
+            before = table.instruction_count()
+            started = time.perf_counter()
+            PASSES[name](table)
+            table.compact()
+            elapsed = time.perf_counter() - started
+            reports.append(PassReport(name, elapsed, before, len(table)))
+        return reports
+
+
+def optimize(table: QuadTable, level: int) -> list[PassReport]:
+    return PassManager(PIPELINES.get(level, PIPELINES[max(PIPELINES)])).run(table)
+
+
+def format_reports(reports: list[PassReport], level: int) -> str:
+    lines = [f"Optimización nivel {level}: {OPT_LEVELS.get(level, '')}"]
+    if not reports:
+        return lines[0]
+    name_width = max(len(report.name) for report in reports)
+    for report in reports:
+        delta = report.after - report.before
+        lines.append(
+            f"  {report.name:<{name_width}}  {report.seconds * 1000:8.2f} ms  "
+            f"{report.before:>6} → {report.after:<6} ({delta:+d})"
+        )
+    total = sum(report.seconds for report in reports)
+    lines.append(f"  {'Total':<{name_width}}  {total * 1000:8.2f} ms  {reports[0].before:>6} → {reports[-1].after:<6}")
+    return "\n".join(lines)
@@ -0,0 +1,496 @@
+from __future__ import annotations
+
+from sys import intern
+from typing import NoReturn
+
+from ide.skuld.diagnostics import Diagnostic
+from ide.skuld.lexer import Token
+from ide.skuld.syntax_tree import NO_CHILDREN, Node
+
+TYPE_KEYWORDS = {
+    "KW_WORLDLINE": "worldline",
+    "KW_DIVERGENCE": "divergence",
+    "KW_DMAIL": "dmail",
+    "KW_READING": "reading",
+}
+
+ASSIGN_OPERATORS = {"ASSIGN", "PLUS_ASSIGN", "MINUS_ASSIGN", "MUL_ASSIGN", "DIV_ASSIGN", "MOD_ASSIGN"}
+
+# Precedencia de operadores binarios (mayor número, mayor precedencia).
+BINARY_PRECEDENCE = {
+    "KW_OR": 1,
+    "OR_OP": 1,
+    "KW_AND": 2,
+    "AND_OP": 2,
+    "EQ": 3,
+    "NEQ": 3,
+    "LT": 4,
+    "LTE": 4,
+    "GT": 4,
+    "GTE": 4,
+    "PLUS": 5,
+    "MINUS": 5,
+    "STAR": 6,
+    "SLASH": 6,
+    "PERCENT": 6,
+}
+_NORMALIZED_OPERATORS = {"KW_OR": "or", "OR_OP": "or", "KW_AND": "and", "AND_OP": "and", "KW_NOT": "not", "NOT_OP": "not"}
+
+TOP_LEVEL_START = {"KW_LABMEM", "KW_STEINER", "KW_GATE"}
+STATEMENT_START = {
+    "KW_LABMEM",
+    "KW_CHOICE",
+    "KW_LOOP",
+    "KW_SHIFT",
+    "KW_JUMP",
+    "KW_RETURN",
+    "KW_DMAIL",
+    "KW_SPHONE",
+    "LBRACE",
+}
+
+_EOF = "EOF"
+
+
+class _SyntaxError(Exception):
+    pass
+
+
+class Parser:
+    """Parser descendente recursivo de Skuld con recuperación en modo pánico.
+
+    Los errores no detienen el análisis: se registran en ``diagnostics`` y el
+    parser se resincroniza en el siguiente ``;``, ``}`` o inicio de sentencia,
+    de modo que una sola pasada reporta todos los errores del archivo.
+
+    Los nombres de variables y funciones se internan al crear los nodos para
+    que las búsquedas posteriores en la tabla de símbolos comparen por
+    identidad.
+    """
+
+    def __init__(self, tokens: list[Token]) -> None:
+        if tokens:
+            last = tokens[-1]
+            end_of_file = Token(_EOF, "", last.line, last.column + len(last.lexeme))
+        else:
+            end_of_file = Token(_EOF, "", 1, 1)
+        self._tokens = [*tokens, end_of_file]
+        self._pos = 0
+        self.diagnostics: list[Diagnostic] = []
+
+    def parse_program(self) -> Node:
+        items: list[Node] = []
+        while self._kind() != _EOF:
+            items.extend(self.parse_top_level_item())
+        return Node("Program", 1, 1, children=items)
+
+    @property
+    def position(self) -> int:
+        return self._pos
+
+    def parse_range(self, start: int, stop: int) -> list[Node]:
+        """Analiza los elementos de nivel superior que empiezan en ``[start, stop)``."""
+        self._pos = start
+        items: list[Node] = []
+        while self._pos < stop and self._kind() != _EOF:
+            items.extend(self.parse_top_level_item())
+        return items
+
+    def parse_top_level_item(self) -> list[Node]:
+        start = self._pos
+        try:
+            kind = self._kind()
+            if kind == "KW_LABMEM":
+                return self._declaration()
+            if kind == "KW_STEINER":
+                return [self._function()]
+            if kind == "KW_GATE":
+                return [self._gate()]
+            self._fail(self._current(), "Se esperaba 'labmem', 'steiner' o 'gate' en el nivel superior")
+        except _SyntaxError:
+            pass
+        self._synchronize_top_level(start)
+        return []
+
+    # -- Nivel superior -------------------------------------------------
+
+    def _function(self) -> Node:
+        keyword = self._advance()
+        if self._kind() == "KW_VOID":
+            return_type = "void"
+            self._advance()
+        else:
+            return_type = self._type()
+        name = self._expect("IDENTIFIER", "Se esperaba el nombre de la función")
+        self._expect("LPAREN", "Se esperaba '(' después del nombre de la función")
+        params: list[Node] = []
+        if self._kind() != "RPAREN":
+            while True:
+                param_type_token = self._current()
+                param_type = self._type()
+                param_name = self._expect("IDENTIFIER", "Se esperaba el nombre del parámetro")
+                params.append(
+                    Node(
+                        "Param",
+                        param_type_token.line,
+                        param_type_token.column,
+                        value=intern(param_name.lexeme),
+                        type_name=param_type,
+                    )
+                )
+                if self._kind() != "COMMA":
+                    break
+                self._advance()
+        self._expect("RPAREN", "Se esperaba ')' al cerrar los parámetros")
+        body = self._block()
+        params_node = Node("Params", keyword.line, keyword.column, children=params or NO_CHILDREN)
+        return Node(
+            "Function",
+            keyword.line,
+            keyword.column,
+            value=intern(name.lexeme),
+            type_name=return_type,
+            children=[params_node, body],
+        )
+
+    def _gate(self) -> Node:
+        keyword = self._advance()
+        body = self._block()
+        return Node("Gate", keyword.line, keyword.column, children=[body])
+
+    def _declaration(self) -> list[Node]:
+        self._advance()
+        type_name = self._type()
+        declarations: list[Node] = []
+        while True:
+            name = self._expect("IDENTIFIER", "Se esperaba el nombre de la variable")
+            children: list[Node] | tuple = NO_CHILDREN
+            if self._kind() == "ASSIGN":
+                self._advance()
+                children = [self._expression()]
+            declarations.append(
+                Node("VarDecl", name.line, name.column, value=intern(name.lexeme), type_name=type_name, children=children)
+            )
+            if self._kind() != "COMMA":
+                break
+            self._advance()
+        self._expect("SEMICOLON", "Se esperaba ';' al final de la declaración")
+        return declarations
+
+    def _type(self) -> str:
+        token = self._current()
+        type_name = TYPE_KEYWORDS.get(token.kind)
+        if type_name is None:
+            self._fail(token, "Se esperaba un tipo (worldline, divergence, dmail o reading)")
+        self._advance()
+        return type_name
+
+    # -- Sentencias -----------------------------------------------------
+
+    def _block(self) -> Node:
+        opening = self._expect("LBRACE", "Se esperaba '{'")
+        statements: list[Node] = []
+        while self._kind() not in ("RBRACE", _EOF):
+            start = self._pos
+            try:
+                statements.extend(self._statement())
+            except _SyntaxError:
+                self._synchronize_statement(start)
+        if self._kind() == _EOF:
+            self._report(opening, "Falta '}' para cerrar este bloque")
+        else:
+            self._advance()
+        return Node("Block", opening.line, opening.column, children=statements or NO_CHILDREN)
+
+    def _statement(self) -> list[Node]:
+        kind = self._kind()
+        if kind == "KW_LABMEM":
+            return self._declaration()
+        if kind == "KW_CHOICE":
+            return [self._choice()]
+        if kind == "KW_LOOP":
+            return [self._loop()]
+        if kind == "KW_SHIFT":
+            return [self._shift()]
+        if kind == "LBRACE":
+            return [self._block()]
+        if kind == "KW_JUMP":
+            token = self._advance()
+            self._expect("SEMICOLON", "Se esperaba ';' después de 'jump'")
+            return [Node("Jump", token.line, token.column)]
+        if kind == "KW_RETURN":
+            token = self._advance()
+            children: list[Node] | tuple = NO_CHILDREN
+            if self._kind() != "SEMICOLON":
+                children = [self._expression()]
+            self._expect("SEMICOLON", "Se esperaba ';' después de 'return'")
+            return [Node("Return", token.line, token.column, children=children)]
+        if kind == "KW_DMAIL":
+            return [self._output()]
+        if kind == "KW_SPHONE":
+            return [self._input()]
+        if kind in ("KW_STEINER", "KW_GATE"):
+            self._fail(self._current(), f"'{self._current().lexeme}' solo puede aparecer en el nivel superior")
+
+        expression = self._expression()
+        self._expect("SEMICOLON", "Se esperaba ';' al final de la sentencia")
+        return [Node("ExprStmt", expression.line, expression.column, children=[expression])]
+
+    def _choice(self) -> Node:
+        keyword = self._advance()
+        self._expect("LPAREN", "Se esperaba '(' después de 'choice'")
+        condition = self._expression()
+        self._expect("RPAREN", "Se esperaba ')' al cerrar la condición")
+        children = [condition, self._block()]
+        if self._kind() == "KW_ELSE":
+            self._advance()
+            children.append(self._choice() if self._kind() == "KW_CHOICE" else self._block())
+        return Node("Choice", keyword.line, keyword.column, children=children)
+
+    def _loop(self) -> Node:
+        keyword = self._advance()
+        self._expect("LPAREN", "Se esperaba '(' después de 'loop'")
+        condition = self._expression()
+        self._expect("RPAREN", "Se esperaba ')' al cerrar la condición")
+        return Node("Loop", keyword.line, keyword.column, children=[condition, self._block()])
+
+    def _shift(self) -> Node:
+        keyword = self._advance()
+        self._expect("LPAREN", "Se esperaba '(' después de 'shift'")
+        empty = Node("Empty", keyword.line, keyword.column)
+        if self._kind() == "KW_LABMEM":
+            declarations = self._declaration()
+            init = declarations[0] if len(declarations) == 1 else Node(
+                "Block", keyword.line, keyword.column, children=declarations
+            )
+        elif self._kind() == "SEMICOLON":
+            self._advance()
+            init = empty
+        else:
+            init = self._expression()
+            self._expect("SEMICOLON", "Se esperaba ';' después de la inicialización de 'shift'")
+        condition = empty if self._kind() == "SEMICOLON" else self._expression()
+        self._expect("SEMICOLON", "Se esperaba ';' después de la condición de 'shift'")
+        update = empty if self._kind() == "RPAREN" else self._expression()
+        self._expect("RPAREN", "Se esperaba ')' al cerrar 'shift'")
+        return Node("Shift", keyword.line, keyword.column, children=[init, condition, update, self._block()])
+
+    def _output(self) -> Node:
+        keyword = self._advance()
+        values: list[Node] = []
+        if self._kind() == "LPAREN":
+            self._advance()
+            values.append(self._expression())
+            self._expect("RPAREN", "Se esperaba ')' al cerrar 'dmail'")
+        else:
+            if self._kind() != "STREAM_OUT":
+                self._fail(self._current(), "Se esperaba '(' o '<<' después de 'dmail'")
+            while self._kind() == "STREAM_OUT":
+                self._advance()
+                values.append(self._expression())
+        self._expect("SEMICOLON", "Se esperaba ';' después de 'dmail'")
+        return Node("Output", keyword.line, keyword.column, children=values)
+
+    def _input(self) -> Node:
+        keyword = self._advance()
+        targets: list[Node] = []
+        if self._kind() != "STREAM_IN":
+            self._fail(self._current(), "Se esperaba '>>' después de 'sphone'")
+        while self._kind() == "STREAM_IN":
+            self._advance()
+            name = self._expect("IDENTIFIER", "Se esperaba una variable después de '>>'")
+            targets.append(Node("Identifier", name.line, name.column, value=intern(name.lexeme)))
+        self._expect("SEMICOLON", "Se esperaba ';' después de 'sphone'")
+        return Node("Input", keyword.line, keyword.column, children=targets)
+
+    # -- Expresiones ----------------------------------------------------
+
+    def _expression(self) -> Node:
+        return self._assignment()
+
+    def _assignment(self) -> Node:
+        left = self._binary(1)
+        kind = self._kind()
+        if kind in ASSIGN_OPERATORS:
+            operator = self._advance()
+            value = self._assignment()
+            if left.kind != "Identifier":
+                self._report(operator, "El lado izquierdo de una asignación debe ser una variable")
+            return Node("Assign", operator.line, operator.column, value=operator.lexeme, children=[left, value])
+        return left
+
+    def _binary(self, min_precedence: int) -> Node:
+        left = self._unary()
+        precedence_table = BINARY_PRECEDENCE
+        while True:
+            kind = self._kind()
+            precedence = precedence_table.get(kind, 0)
+            if precedence < min_precedence:
+                return left
+            operator = self._advance()
+            right = self._binary(precedence + 1)
+            left = Node(
+                "Binary",
+                operator.line,
+                operator.column,
+                value=_NORMALIZED_OPERATORS.get(kind, operator.lexeme),
+                children=[left, right],
+            )
+
+    def _unary(self) -> Node:
+        kind = self._kind()
+        if kind in ("MINUS", "NOT_OP", "KW_NOT"):
+            operator = self._advance()
+            operand = self._unary()
+            return Node("Unary", operator.line, operator.column, value=_NORMALIZED_OPERATORS.get(kind, "-"), children=[operand])
+        if kind in ("INC", "DEC"):
+            operator = self._advance()
+            name = self._expect("IDENTIFIER", f"Se esperaba una variable después de '{operator.lexeme}'")
+            target = Node("Identifier", name.line, name.column, value=intern(name.lexeme))
+            node_kind = "PreInc" if kind == "INC" else "PreDec"
+            return Node(node_kind, operator.line, operator.column, children=[target])
+        return self._postfix()
+
+    def _postfix(self) -> Node:
+        node = self._primary()
+        kind = self._kind()
+        if kind in ("INC", "DEC"):
+            operator = self._advance()
+            if node.kind != "Identifier":
+                self._report(operator, f"'{operator.lexeme}' solo se puede aplicar a una variable")
+            node_kind = "PostInc" if kind == "INC" else "PostDec"
+            return Node(node_kind, operator.line, operator.column, children=[node])
+        return node
+
+    def _primary(self) -> Node:
+        token = self._current()
+        kind = token.kind
+        if kind == "INTEGER_LITERAL":
+            self._advance()
+            return Node("Literal", token.line, token.column, value=int(token.lexeme), type_name="worldline")
+        if kind == "FLOAT_LITERAL":
+            self._advance()
+            return Node("Literal", token.line, token.column, value=float(token.lexeme), type_name="divergence")
+        if kind == "STRING_LITERAL":
+            self._advance()
+            return Node("Literal", token.line, token.column, value=_unescape(token.lexeme[1:-1]), type_name="dmail")
+        if kind in ("KW_TRUE", "KW_FALSE"):
+            self._advance()
+            return Node("Literal", token.line, token.column, value=kind == "KW_TRUE", type_name="reading")
+        if kind == "IDENTIFIER":
+            self._advance()
+            if self._kind() == "LPAREN":
+                return self._call(token)
+            return Node("Identifier", token.line, token.column, value=intern(token.lexeme))
+        if kind == "LPAREN":
+            self._advance()
+            expression = self._expression()
+            self._expect("RPAREN", "Se esperaba ')'")
+            return expression
+        self._fail(token, "Se esperaba una expresión")
+
+    def _call(self, name: Token) -> Node:
+        self._advance()
+        arguments: list[Node] = []
+        if self._kind() != "RPAREN":
+            while True:
+                arguments.append(self._expression())
+                if self._kind() != "COMMA":
+                    break
+                self._advance()
+        self._expect("RPAREN", "Se esperaba ')' al cerrar la llamada")
+        return Node("Call", name.line, name.column, value=intern(name.lexeme), children=arguments or NO_CHILDREN)
+
+    # -- Utilidades -----------------------------------------------------
+
+    def _current(self) -> Token:
+        return self._tokens[self._pos]
+
+    def _kind(self) -> str:
+        return self._tokens[self._pos].kind
+
+    def _advance(self) -> Token:
+        token = self._tokens[self._pos]
+        if token.kind != _EOF:
+            self._pos += 1
+        return token
+
+    def _expect(self, kind: str, message: str) -> Token:
+        token = self._tokens[self._pos]
+        if token.kind == kind:
+            self._pos += 1
+            return token
+        if kind == "SEMICOLON" and self._pos > 0:
+            # Un ';' faltante se reporta al final de la construcción y no en el
+            # token siguiente, que suele estar en otra línea.
+            self._fail(self._tokens[self._pos - 1], message, after=True)
+        self._fail(token, message)
+
+    def _report(self, token: Token, message: str) -> None:
+        self.diagnostics.append(Diagnostic("SINTACTICO", token.line, token.column, message))
+
+    def _fail(self, token: Token, message: str, *, after: bool = False) -> NoReturn:
+        if after:
+            column = token.column + len(token.lexeme)
+            self.diagnostics.append(Diagnostic("SINTACTICO", token.line, column, message))
+        else:
+            found = "fin de archivo" if token.kind == _EOF else f"'{token.lexeme}'"
+            self._report(token, f"{message}; se encontró {found}")
+        raise _SyntaxError(message)
+
+    def _synchronize_statement(self, start: int) -> None:
+        if self._pos == start:
+            self._advance()
+        while True:
+            kind = self._kind()
+            if kind == _EOF or kind == "RBRACE":
+                return
+            if kind == "SEMICOLON":
+                self._advance()
+                return
+            if kind in STATEMENT_START:
+                return
+            self._advance()
+
+    def _synchronize_top_level(self, start: int) -> None:
+        if self._pos == start:
+            self._advance()
+        depth = 0
+        while True:
+            kind = self._kind()
+            if kind == _EOF:
+                return
+            if depth <= 0 and kind in TOP_LEVEL_START:
+                return
+            if kind == "LBRACE":
+                depth += 1
+            elif kind == "RBRACE":
+                depth -= 1
+            self._advance()
+
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    result: list[str] = []
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char == "\\" and index + 1 < length:
+            following = text[index + 1]
+            result.append(_ESCAPES.get(following, following))
+            index += 2
+            continue
+        result.append(char)
+        index += 1
+    return "".join(result)
+
+
+def parse(tokens: list[Token]) -> tuple[Node, list[Diagnostic]]:
+    parser = Parser(tokens)
+    program = parser.parse_program()
+    return program, parser.diagnostics
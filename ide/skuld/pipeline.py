@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+from ide.skuld import python_backend, register_vm
+from ide.skuld.bytecode import BytecodeProgram, compile_program
+from ide.skuld.diagnostics import Diagnostic
+from ide.skuld.ir import QuadTable, generate
+from ide.skuld.lexer import Token, tokenize
+from ide.skuld.optimizer import PassReport, optimize
+from ide.skuld.parser import parse
+from ide.skuld.semantic import SemanticResult, analyze
+from ide.skuld.syntax_tree import Node
+
+# Documentos distintos que se recuerdan a la vez (pestañas alternadas).
+PIPELINE_CACHE_SIZE = 4
+
+
+class CompilationPipeline:
+    """Etapas de compilación de una versión concreta de un documento.
+
+    Cada etapa se calcula la primera vez que se pide y se reutiliza después:
+    pedir el código intermedio tras el análisis semántico no vuelve a
+    tokenizar ni a analizar. El código intermedio y lo que deriva de él se
+    guardan por nivel de optimización.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._lock = threading.RLock()
+        self._tokens: tuple[list[Token], list[Diagnostic]] | None = None
+        self._syntax: tuple[Node, list[Diagnostic]] | None = None
+        self._semantic: SemanticResult | None = None
+        self._intermediate: dict[int, tuple[QuadTable, list[PassReport]]] = {}
+        self._register: dict[int, register_vm.RegisterProgram] = {}
+        self._bytecode: BytecodeProgram | None = None
+        self._python: python_backend.PythonProgram | None = None
+
+    def tokens(self) -> tuple[list[Token], list[Diagnostic]]:
+        with self._lock:
+            if self._tokens is None:
+                self._tokens = tokenize(self.source)
+            return self._tokens
+
+    def syntax(self) -> tuple[Node, list[Diagnostic]]:
+        """Árbol sintáctico y diagnósticos léxicos y sintácticos."""
+        with self._lock:
+            if self._syntax is None:
+                tokens, lexical_diagnostics = self.tokens()
+                program, syntax_diagnostics = parse(tokens)
+                self._syntax = (program, [*lexical_diagnostics, *syntax_diagnostics])
+            return self._syntax
+
+    def semantic(self) -> SemanticResult:
+        with self._lock:
+            if self._semantic is None:
+                self._semantic = analyze(self.syntax()[0])
+            return self._semantic
+
+    def diagnostics(self) -> list[Diagnostic]:
+        """Todos los diagnósticos hasta el análisis semántico."""
+        return [*self.syntax()[1], *self.semantic().diagnostics]
+
+    def intermediate(self, opt_level: int) -> tuple[QuadTable, list[PassReport]]:
+        with self._lock:
+            if opt_level not in self._intermediate:
+                quads = generate(self.syntax()[0])
+                reports = optimize(quads, opt_level) if opt_level else []
+                self._intermediate[opt_level] = (quads, reports)
+            return self._intermediate[opt_level]
+
+    def register_program(self, opt_level: int) -> register_vm.RegisterProgram:
+        with self._lock:
+            if opt_level not in self._register:
+                self._register[opt_level] = register_vm.translate(self.intermediate(opt_level)[0])
+            return self._register[opt_level]
+
+    def bytecode(self) -> BytecodeProgram:
+        with self._lock:
+            if self._bytecode is None:
+                self._bytecode = compile_program(self.syntax()[0])
+            return self._bytecode
+
+    def python_program(self) -> python_backend.PythonProgram:
+        with self._lock:
+            if self._python is None:
+                self._python = python_backend.compile_program(self.syntax()[0])
+            return self._python
+
+
+_pipelines: OrderedDict[str, CompilationPipeline] = OrderedDict()
+_pipelines_lock = threading.Lock()
+
+
+def pipeline_for(source: str) -> CompilationPipeline:
+    """Devuelve la tubería de ``source``, reutilizando la de la misma versión."""
+    with _pipelines_lock:
+        pipeline = _pipelines.get(source)
+        if pipeline is None:
+            pipeline = CompilationPipeline(source)
+            _pipelines[source] = pipeline
+            if len(_pipelines) > PIPELINE_CACHE_SIZE:
+                _pipelines.popitem(last=False)
+        else:
+            _pipelines.move_to_end(source)
+        return pipeline
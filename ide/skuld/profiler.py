@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from ide.skuld.python_backend import ENTRY_NAME, PythonProgram
+
+DEFAULT_INTERVAL_SECONDS = 0.001
+
+
+@dataclass
+class ProfileResult:
+    interval: float
+    samples: int = 0
+    elapsed: float = 0.0
+    # Muestras en las que cada línea estaba en la cima de la pila.
+    line_hits: Counter = field(default_factory=Counter)
+    self_counts: Counter = field(default_factory=Counter)
+    total_counts: Counter = field(default_factory=Counter)
+    # Pila completa (de la raíz a la hoja) -> muestras.
+    stacks: Counter = field(default_factory=Counter)
+
+
+class SamplingProfiler:
+    """Muestrea la función y la línea de Skuld que ejecuta otro hilo.
+
+    Un hilo aparte despierta cada ``interval`` segundos y recorre la pila
+    de Python del hilo perfilado con ``sys._current_frames``; solo cuentan
+    los marcos del código generado por ``python_backend``, que se traducen
+    a línea de Skuld con la tabla de posiciones de cada función. El programa
+    no se instrumenta, así que el coste es el de tomar las muestras.
+
+    El hilo perfilado solo cede el GIL en saltos hacia atrás y llamadas, de
+    modo que las muestras de línea caen en la cabecera del bucle o en la
+    llamada que se está ejecutando: miden bucles y funciones, no sentencias.
+    """
+
+    def __init__(self, program: PythonProgram, interval: float = DEFAULT_INTERVAL_SECONDS) -> None:
+        self.result = ProfileResult(interval)
+        self._interval = interval
+        # La envoltura de entrada no es código de Skuld; la raíz real es 'gate'.
+        self._functions = {
+            function.filename: function for function in program.functions if function.name != ENTRY_NAME
+        }
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._target = 0
+        self._started_at = 0.0
+        self._switch_interval = sys.getswitchinterval()
+
+    def start(self, thread_id: int | None = None) -> None:
+        self._target = thread_id if thread_id is not None else threading.get_ident()
+        # El hilo perfilado debe soltar el GIL al menos una vez por muestra.
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self._interval / 2))
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="skuld-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> ProfileResult:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        sys.setswitchinterval(self._switch_interval)
+        if self._started_at:
+            self.result.elapsed = time.perf_counter() - self._started_at
+        return self.result
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self._record(frame)
+
+    def _record(self, frame) -> None:
+        stack: list[tuple[str, int]] = []
+        functions = self._functions
+        while frame is not None:
+            function = functions.get(frame.f_code.co_filename)
+            if function is not None:
+                line_number = frame.f_lineno or 0
+                line = function.positions[line_number - 1][0] if 0 < line_number <= len(function.positions) else 0
+                stack.append((function.name, line))
+            frame = frame.f_back
+        if not stack:
+            return
+        result = self.result
+        result.samples += 1
+        name, line = stack[0]
+        result.line_hits[line] += 1
+        result.self_counts[name] += 1
+        names = tuple(entry[0] for entry in reversed(stack))
+        for seen in set(names):
+            result.total_counts[seen] += 1
+        result.stacks[names] += 1
+
+
+def format_flat_profile(result: ProfileResult) -> str:
+    if not result.samples:
+        return (
+            f"Sin muestras: el programa terminó en {result.elapsed * 1000:.1f} ms, "
+            f"antes del primer muestreo ({result.interval * 1000:g} ms)."
+        )
+    samples = result.samples
+    lines = [
+        f"Muestras: {samples} cada {result.interval * 1000:g} ms · duración {result.elapsed:.3f} s",
+        "",
+        f"{'% propio':>9}  {'% total':>8}  {'propias':>8}  Función",
+    ]
+    for name in sorted(result.total_counts, key=lambda name: (-result.self_counts[name], name)):
+        own = result.self_counts[name]
+        total = result.total_counts[name]
+        lines.append(f"{own * 100 / samples:>8.1f}%  {total * 100 / samples:>7.1f}%  {own:>8}  {name}")
+    lines.extend(["", f"{'%':>7}  {'muestras':>8}  Línea"])
+    for line, hits in result.line_hits.most_common():
+        lines.append(f"{hits * 100 / samples:>6.1f}%  {hits:>8}  {line}")
+    return "\n".join(lines)
+
+
+def format_collapsed_stacks(result: ProfileResult) -> str:
+    """Pilas en el formato "raíz;...;hoja muestras" de flamegraph.pl y speedscope."""
+    return "\n".join(f"{';'.join(stack)} {count}" for stack, count in sorted(result.stacks.items()))
+
+
+def format_profile(result: ProfileResult) -> str:
+    text = format_flat_profile(result)
+    if result.stacks:
+        text += f"\n\nPilas colapsadas (flamegraph):\n{format_collapsed_stacks(result)}"
+    return text
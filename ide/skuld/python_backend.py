@@ -0,0 +1,576 @@
+from __future__ import annotations
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import CodeType, TracebackType
+from typing import Callable
+
+from ide.skuld.bytecode import DEFAULT_VALUES
+from ide.skuld.runtime import SkuldRuntimeError, divide, int_divide, int_remainder, value_text
+from ide.skuld.syntax_tree import Node
+from ide.skuld.vm import MAX_CALL_DEPTH, STOP_CHECK_INTERVAL, ExecutionError, ExecutionInterrupted, parse_input
+
+CODE_CACHE_SIZE = 256
+FILENAME_PREFIX = "<skuld:"
+ENTRY_NAME = "_main"
+# Cada llamada de Skuld es un marco de Python: el programa se ejecuta en un
+# hilo con pila propia y un límite de recursión que admite tantas llamadas
+# como las máquinas virtuales.
+RECURSION_LIMIT = MAX_CALL_DEPTH + 100
+THREAD_STACK_SIZE = 256 * 1024 * 1024
+
+_ARITHMETIC = {"+": "+", "-": "-", "*": "*"}
+_COMPARISONS = ("==", "!=", "<", "<=", ">", ">=")
+
+
+class CodeCache:
+    """Objetos de código compilados, indexados por el hash del fuente generado.
+
+    El fuente de cada función ya incluye los tipos y nombres que resolvió el
+    generador, así que dos cuerpos con el mismo hash producen el mismo código.
+    Se descartan los menos usados cuando se supera ``capacity``.
+    """
+
+    def __init__(self, capacity: int = CODE_CACHE_SIZE) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CodeType] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def compile(self, source: str, filename: str) -> CodeType:
+        key = hashlib.sha1(f"{filename}\0{source}".encode("utf-8")).hexdigest()
+        with self._lock:
+            code = self._entries.get(key)
+            if code is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return code
+        code = compile(source, filename, "exec")
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = code
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return code
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+CODE_CACHE = CodeCache()
+
+
+@dataclass
+class CompiledFunction:
+    name: str
+    filename: str
+    source: str
+    code: CodeType
+    # Posición en el fuente Skuld de cada línea del código Python generado.
+    positions: list[tuple[int, int]] = field(default_factory=list)
+
+
+@dataclass
+class PythonProgram:
+    functions: list[CompiledFunction]
+    global_names: list[str]
+    global_values: list[object]
+
+    def source(self) -> str:
+        return "\n\n".join(function.source for function in self.functions)
+
+
+class _FunctionWriter:
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.positions: list[tuple[int, int]] = []
+        self.depth = 0
+        self.line = 0
+        self.column = 0
+
+    def write(self, text: str) -> None:
+        self.lines.append("    " * self.depth + text)
+        self.positions.append((self.line, self.column))
+
+
+class PythonCodeGenerator:
+    """Traduce cada función de Skuld a una función de Python.
+
+    Supone un programa sin errores semánticos. Las variables locales se
+    llaman ``v<n>_<nombre>`` (``n`` distingue declaraciones que se ocultan),
+    las globales ``g_<nombre>`` y las funciones ``f_<nombre>``, así ningún
+    identificador choca con palabras reservadas de Python.
+    """
+
+    def __init__(self, cache: CodeCache = CODE_CACHE) -> None:
+        self._cache = cache
+        self._globals: dict[str, str] = {}
+        self._functions: dict[str, tuple[str, tuple[str, ...]]] = {}
+        self._writer = _FunctionWriter()
+        self._locals: dict[str, list[tuple[str, str]]] = {}
+        self._scopes: list[list[str]] = []
+        self._name_counts: dict[str, int] = {}
+        self._written_globals: set[str] = set()
+        self._temp_count = 0
+        self._return_type = "void"
+
+    def generate(self, program: Node) -> PythonProgram:
+        functions: list[Node] = []
+        gate: Node | None = None
+        for item in program.children:
+            if item.kind == "Function":
+                params = tuple(param.type_name for param in item.children[0].children)
+                self._functions[item.value] = (item.type_name, params)
+                functions.append(item)
+            elif item.kind == "VarDecl":
+                self._globals[item.value] = item.type_name
+            elif item.kind == "Gate" and gate is None:
+                gate = item
+        if gate is not None:
+            self._functions["gate"] = ("void", ())
+
+        compiled = [self._function(function.value, function) for function in functions]
+        if gate is not None:
+            compiled.append(self._function("gate", gate))
+        compiled.append(self._entry(program, gate))
+        global_values = [DEFAULT_VALUES.get(type_name, 0) for type_name in self._globals.values()]
+        return PythonProgram(compiled, list(self._globals), global_values)
+
+    # -- Funciones --------------------------------------------------------
+
+    def _begin(self, node: Node, return_type: str) -> None:
+        self._writer = _FunctionWriter()
+        self._writer.line = node.line
+        self._writer.column = node.column
+        self._locals = {}
+        self._scopes = [[]]
+        self._name_counts = {}
+        self._written_globals = set()
+        self._temp_count = 0
+        self._return_type = return_type
+
+    def _finish(self, name: str, header: str) -> CompiledFunction:
+        writer = self._writer
+        declared = sorted(self._written_globals | {"_ticks"})
+        writer.lines.insert(0, "    global " + ", ".join(declared))
+        writer.positions.insert(0, writer.positions[0])
+        writer.lines.insert(0, header)
+        writer.positions.insert(0, writer.positions[0])
+        source = "\n".join(writer.lines) + "\n"
+        filename = f"{FILENAME_PREFIX}{name}>"
+        code = self._cache.compile(source, filename)
+        return CompiledFunction(name, filename, source, code, writer.positions)
+
+    def _function(self, name: str, node: Node) -> CompiledFunction:
+        return_type = self._functions[name][0]
+        self._begin(node, return_type)
+        if node.kind == "Function":
+            params, body = node.children
+            names = [self._declare_local(param.value, param.type_name) for param in params.children]
+        else:
+            body = node.children[0]
+            names = []
+        self._writer.depth = 1
+        self._statements(body.children)
+        self._writer.line = node.line
+        self._writer.column = node.column
+        if return_type in DEFAULT_VALUES:
+            # Una función con valor que termina sin 'return' devuelve el valor por defecto.
+            self._writer.write(f"return {DEFAULT_VALUES[return_type]!r}")
+        else:
+            self._writer.write("return None")
+        return self._finish(name, f"def f_{name}({', '.join(names)}):")
+
+    def _entry(self, program: Node, gate: Node | None) -> CompiledFunction:
+        self._begin(program, "void")
+        self._writer.depth = 1
+        for item in program.children:
+            if item.kind == "VarDecl":
+                self._at(item)
+                type_name = self._globals[item.value]
+                self._written_globals.add(f"g_{item.value}")
+                self._writer.write(f"g_{item.value} = {self._initializer(item, type_name)}")
+        if gate is not None:
+            self._at(gate)
+            self._writer.write("f_gate()")
+        else:
+            self._writer.write("pass")
+        return self._finish(ENTRY_NAME, f"def {ENTRY_NAME}():")
+
+    # -- Nombres ----------------------------------------------------------
+
+    def _declare_local(self, name: str, type_name: str) -> str:
+        count = self._name_counts.get(name, 0)
+        self._name_counts[name] = count + 1
+        python_name = f"v{count}_{name}"
+        self._locals.setdefault(name, []).append((python_name, type_name))
+        self._scopes[-1].append(name)
+        return python_name
+
+    def _resolve(self, name: str) -> tuple[str, str]:
+        stack = self._locals.get(name)
+        if stack:
+            return stack[-1]
+        return f"g_{name}", self._globals[name]
+
+    def _target(self, name: str) -> tuple[str, str]:
+        python_name, type_name = self._resolve(name)
+        if python_name.startswith("g_"):
+            self._written_globals.add(python_name)
+        return python_name, type_name
+
+    def _temp(self) -> str:
+        self._temp_count += 1
+        return f"_t{self._temp_count}"
+
+    def _push_scope(self) -> None:
+        self._scopes.append([])
+
+    def _pop_scope(self) -> None:
+        for name in self._scopes.pop():
+            self._locals[name].pop()
+
+    # -- Sentencias -------------------------------------------------------
+
+    def _at(self, node: Node) -> None:
+        self._writer.line = node.line
+        self._writer.column = node.column
+
+    def _statements(self, statements: list[Node] | tuple) -> None:
+        written = len(self._writer.lines)
+        for statement in statements:
+            self._at(statement)
+            self._statement(statement)
+        if len(self._writer.lines) == written:
+            self._writer.write("pass")
+
+    def _statement(self, node: Node) -> None:
+        kind = node.kind
+        write = self._writer.write
+        if kind == "VarDecl":
+            value = self._initializer(node, node.type_name)
+            write(f"{self._declare_local(node.value, node.type_name)} = {value}")
+        elif kind == "ExprStmt":
+            self._expr_statement(node.children[0])
+        elif kind == "Block":
+            self._block(node)
+        elif kind == "Choice":
+            self._choice(node, "if")
+        elif kind == "Loop":
+            condition, _type = self._expression(node.children[0])
+            write(f"while {condition}:")
+            self._loop_body(node.children[1], None)
+        elif kind == "Shift":
+            self._shift(node)
+        elif kind == "Jump":
+            write("break")
+        elif kind == "Return":
+            if node.children:
+                value, value_type = self._expression(node.children[0])
+                write(f"return {self._coerce(value, value_type, self._return_type)}")
+            else:
+                write("return None")
+        elif kind == "Output":
+            parts = [self._text(*self._expression(child)) for child in node.children]
+            write(f"_write({' + '.join(parts + [repr(chr(10))])})")
+        elif kind == "Input":
+            for target in node.children:
+                python_name, type_name = self._target(target.value)
+                write(f"{python_name} = _read({type_name!r})")
+
+    def _block(self, node: Node) -> None:
+        self._push_scope()
+        for statement in node.children:
+            self._at(statement)
+            self._statement(statement)
+        self._pop_scope()
+
+    def _indented_block(self, node: Node) -> None:
+        self._writer.depth += 1
+        self._push_scope()
+        self._statements(node.children)
+        self._pop_scope()
+        self._writer.depth -= 1
+
+    def _choice(self, node: Node, keyword: str) -> None:
+        condition, then_branch, *rest = node.children
+        value, _type = self._expression(condition)
+        self._writer.write(f"{keyword} {value}:")
+        self._indented_block(then_branch)
+        if not rest:
+            return
+        branch = rest[0]
+        self._at(branch)
+        if branch.kind == "Choice":
+            self._choice(branch, "elif")
+        else:
+            self._writer.write("else:")
+            self._indented_block(branch)
+
+    def _loop_body(self, body: Node, update: Node | None) -> None:
+        # Cada vuelta descuenta un tick; al llegar a cero se consulta si hay
+        # que detener el programa (cancelación o tiempo límite).
+        writer = self._writer
+        writer.depth += 1
+        writer.write("_ticks -= 1")
+        writer.write("if not _ticks:")
+        writer.depth += 1
+        writer.write("_check()")
+        writer.depth -= 1
+        self._push_scope()
+        self._statements(body.children)
+        self._pop_scope()
+        if update is not None:
+            self._at(update)
+            self._expr_statement(update)
+        writer.depth -= 1
+
+    def _shift(self, node: Node) -> None:
+        init, condition, update, body = node.children
+        self._push_scope()
+        if init.kind == "Block":
+            for statement in init.children:
+                self._at(statement)
+                self._statement(statement)
+        elif init.kind == "VarDecl":
+            self._statement(init)
+        elif init.kind != "Empty":
+            self._expr_statement(init)
+        self._at(node)
+        if condition.kind != "Empty":
+            value, _type = self._expression(condition)
+            self._writer.write(f"while {value}:")
+        else:
+            self._writer.write("while True:")
+        self._loop_body(body, update if update.kind != "Empty" else None)
+        self._pop_scope()
+
+    def _initializer(self, node: Node, type_name: str) -> str:
+        if node.children:
+            value, value_type = self._expression(node.children[0])
+            return self._coerce(value, value_type, type_name)
+        return repr(DEFAULT_VALUES.get(type_name, 0))
+
+    def _expr_statement(self, node: Node) -> None:
+        kind = node.kind
+        write = self._writer.write
+        if kind == "Assign":
+            target, value = self._assignment_value(node)
+            write(f"{target} = {value}")
+        elif kind in ("PreInc", "PreDec", "PostInc", "PostDec"):
+            target, _type = self._target(node.children[0].value)
+            write(f"{target} {'+' if node.kind.endswith('Inc') else '-'}= 1")
+        elif kind in ("Literal", "Identifier"):
+            return
+        else:
+            value, _type = self._expression(node)
+            write(value)
+
+    # -- Expresiones ------------------------------------------------------
+
+    def _expression(self, node: Node) -> tuple[str, str | None]:
+        kind = node.kind
+        if kind == "Literal":
+            return repr(node.value), node.type_name
+        if kind == "Identifier":
+            return self._resolve(node.value)
+        if kind == "Binary":
+            return self._binary(node)
+        if kind == "Unary":
+            operand, operand_type = self._expression(node.children[0])
+            if node.value == "not":
+                return f"(not {operand})", "reading"
+            return f"(-{operand})", operand_type
+        if kind == "Assign":
+            target, value = self._assignment_value(node)
+            return f"({target} := {value})", self._resolve(node.children[0].value)[1]
+        if kind in ("PreInc", "PreDec", "PostInc", "PostDec"):
+            target, target_type = self._target(node.children[0].value)
+            sign = "+" if node.kind.endswith("Inc") else "-"
+            if node.kind.startswith("Pre"):
+                return f"({target} := {target} {sign} 1)", target_type
+            previous = self._temp()
+            return f"({previous} := {target}, {target} := {previous} {sign} 1)[0]", target_type
+        if kind == "Call":
+            return_type, params = self._functions[node.value]
+            arguments = [
+                self._coerce(*self._expression(argument), param_type)
+                for argument, param_type in zip(node.children, params)
+            ]
+            return f"f_{node.value}({', '.join(arguments)})", return_type
+        return "None", None
+
+    def _binary(self, node: Node) -> tuple[str, str]:
+        operator = node.value
+        left, left_type = self._expression(node.children[0])
+        right, right_type = self._expression(node.children[1])
+        if operator in ("and", "or"):
+            return f"({left} {operator} {right})", "reading"
+        if operator in _COMPARISONS:
+            return f"({left} {operator} {right})", "reading"
+        if operator == "+" and (left_type == "dmail" or right_type == "dmail"):
+            return f"({self._text(left, left_type)} + {self._text(right, right_type)})", "dmail"
+        result_type = "worldline" if left_type == right_type == "worldline" else "divergence"
+        return self._arithmetic(operator, left, right, node.children[0], node.children[1], result_type), result_type
+
+    def _arithmetic(self, operator: str, left: str, right: str, left_node: Node, right_node: Node, result_type: str) -> str:
+        if operator in _ARITHMETIC:
+            return f"({left} {operator} {right})"
+        positive_literal = (
+            right_node.kind == "Literal" and type(right_node.value) in (int, float) and right_node.value > 0
+        )
+        if operator == "/" and result_type == "divergence":
+            return f"({left} / {right})" if positive_literal else f"_div({left}, {right})"
+        # Cociente y resto truncan hacia cero como en C. Con divisor literal
+        # positivo y un nombre a la izquierda se evita llamar a la función auxiliar.
+        simple_left = left_node.kind == "Identifier"
+        python_operator = "//" if operator == "/" else "%"
+        if positive_literal and simple_left and result_type == "worldline":
+            return f"({left} {python_operator} {right} if {left} >= 0 else -(-{left} {python_operator} {right}))"
+        helper = "_idiv" if operator == "/" else "_mod"
+        return f"{helper}({left}, {right})"
+
+    def _assignment_value(self, node: Node) -> tuple[str, str]:
+        target_node, value_node = node.children
+        target, target_type = self._target(target_node.value)
+        value, value_type = self._expression(value_node)
+        operator = node.value
+        if operator != "=":
+            arithmetic = operator[0]
+            if target_type == "dmail":
+                value = f"({target} + {self._text(value, value_type)})"
+                value_type = "dmail"
+            else:
+                result_type = "worldline" if target_type == value_type == "worldline" else "divergence"
+                value = self._arithmetic(arithmetic, target, value, target_node, value_node, result_type)
+                value_type = result_type
+        return target, self._coerce(value, value_type, target_type)
+
+    @staticmethod
+    def _text(value: str, value_type: str | None) -> str:
+        return value if value_type == "dmail" else f"_text({value})"
+
+    @staticmethod
+    def _coerce(value: str, from_type: str | None, to_type: str) -> str:
+        if to_type == "divergence" and from_type == "worldline":
+            if value.isdigit():
+                return repr(float(int(value)))
+            return f"float({value})"
+        return value
+
+
+def compile_program(program: Node, cache: CodeCache = CODE_CACHE) -> PythonProgram:
+    return PythonCodeGenerator(cache).generate(program)
+
+
+def _error_position(program: PythonProgram, traceback: TracebackType | None) -> tuple[int, int]:
+    by_filename = {function.filename: function for function in program.functions}
+    position = (0, 0)
+    while traceback is not None:
+        function = by_filename.get(traceback.tb_frame.f_code.co_filename)
+        if function is not None and 0 < traceback.tb_lineno <= len(function.positions):
+            position = function.positions[traceback.tb_lineno - 1]
+        traceback = traceback.tb_next
+    return position
+
+
+def run_program(
+    program: PythonProgram,
+    *,
+    write: Callable[[str], None],
+    read: Callable[[], str | None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    on_start: Callable[[int], None] | None = None,
+) -> None:
+    """Ejecuta ``program``; ``on_start`` recibe el identificador del hilo
+    en el que corre, justo antes de empezar (lo usa el perfilador)."""
+    namespace: dict[str, object] = {"__builtins__": {"float": float}}
+
+    def check() -> None:
+        namespace["_ticks"] = STOP_CHECK_INTERVAL
+        if should_stop is not None and should_stop():
+            raise ExecutionInterrupted()
+
+    def read_value(type_name: str) -> object:
+        text = read() if read is not None else None
+        if text is None:
+            raise SkuldRuntimeError("No hay más datos de entrada para 'sphone'")
+        return parse_input(text, type_name)
+
+    namespace.update(
+        _write=write,
+        _read=read_value,
+        _text=value_text,
+        _div=divide,
+        _idiv=int_divide,
+        _mod=int_remainder,
+        _check=check,
+        _ticks=STOP_CHECK_INTERVAL,
+    )
+    namespace.update({f"g_{name}": value for name, value in zip(program.global_names, program.global_values)})
+    for function in program.functions:
+        exec(function.code, namespace)
+    try:
+        _run_deep(namespace[ENTRY_NAME], on_start)  # type: ignore[arg-type]
+    except ExecutionInterrupted:
+        raise
+    except RecursionError as exc:
+        line, column = _error_position(program, exc.__traceback__)
+        raise ExecutionError("Desbordamiento de la pila de llamadas", line, column) from exc
+    except (SkuldRuntimeError, ArithmeticError, TypeError) as exc:
+        line, column = _error_position(program, exc.__traceback__)
+        message = str(exc) if isinstance(exc, SkuldRuntimeError) else f"Error de ejecución: {exc}"
+        raise ExecutionError(message, line, column) from exc
+
+
+_deep_lock = threading.Lock()
+_deep_runs = 0
+_saved_recursion_limit = 0
+
+
+def _run_deep(entry: Callable[[], object], on_start: Callable[[int], None] | None = None) -> None:
+    """Ejecuta ``entry`` en un hilo con pila grande y vuelve a lanzar aquí
+    la excepción que termine la ejecución, con su traza original."""
+    global _deep_runs, _saved_recursion_limit
+    failure: list[BaseException] = []
+
+    def target() -> None:
+        try:
+            if on_start is not None:
+                on_start(threading.get_ident())
+            entry()
+        except BaseException as exc:
+            failure.append(exc)
+
+    with _deep_lock:
+        # El límite es global al intérprete: se restaura al terminar la última ejecución.
+        if _deep_runs == 0:
+            _saved_recursion_limit = sys.getrecursionlimit()
+            sys.setrecursionlimit(max(_saved_recursion_limit, RECURSION_LIMIT))
+        _deep_runs += 1
+    try:
+        with _deep_lock:
+            previous_stack_size = threading.stack_size(THREAD_STACK_SIZE)
+            try:
+                worker = threading.Thread(target=target, name="skuld-python", daemon=True)
+                worker.start()
+            finally:
+                threading.stack_size(previous_stack_size)
+        worker.join()
+    finally:
+        with _deep_lock:
+            _deep_runs -= 1
+            if _deep_runs == 0:
+                sys.setrecursionlimit(_saved_recursion_limit)
+    if failure:
+        raise failure[0]
@@ -0,0 +1,509 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable
+
+from ide.skuld.bytecode import DEFAULT_VALUES, VALUE_TYPES
+from ide.skuld.ir import (
+    KIND_CONST,
+    KIND_GLOBAL,
+    KIND_TEMP,
+    OP,
+    OPERAND_NONE,
+    QuadTable,
+)
+from ide.skuld.runtime import SkuldRuntimeError, int_divide, int_remainder, value_text
+from ide.skuld.vm import (
+    MAX_CALL_DEPTH,
+    STOP_CHECK_INTERVAL,
+    ExecutionError,
+    ExecutionInterrupted,
+    parse_input,
+)
+
+# Instrucciones (op, a, b, c): a y b son registros de origen, c el destino
+# o el destino de salto. -1 significa "sin registro".
+REGISTER_OPCODES = (
+    "MOVE",
+    "ADD",
+    "SUB",
+    "MUL",
+    "DIV",
+    "IDIV",
+    "MOD",
+    "CONCAT",
+    "LT",
+    "LE",
+    "GT",
+    "GE",
+    "EQ",
+    "NE",
+    "NEG",
+    "NOT",
+    "ITOF",
+    "JUMP",
+    "JUMP_IF_TRUE",
+    "JUMP_IF_FALSE",
+    "GET_GLOBAL",
+    "SET_GLOBAL",
+    "PARAM",
+    "CALL",
+    "RETURN",
+    "PRINT",
+    "READ",
+    "HALT",
+    # Superinstrucciones: comparación y salto, e incremento en el sitio.
+    "JUMP_IF_NOT_LT",
+    "JUMP_IF_NOT_LE",
+    "JUMP_IF_NOT_GT",
+    "JUMP_IF_NOT_GE",
+    "JUMP_IF_NOT_EQ",
+    "JUMP_IF_NOT_NE",
+    "INCR",
+    "DECR",
+)
+(
+    MOVE, ADD, SUB, MUL, DIV, IDIV, MOD, CONCAT,
+    LT, LE, GT, GE, EQ, NE, NEG, NOT, ITOF,
+    JUMP, JUMP_IF_TRUE, JUMP_IF_FALSE, GET_GLOBAL, SET_GLOBAL,
+    PARAM, CALL, RETURN, PRINT, READ, HALT,
+    JUMP_IF_NOT_LT, JUMP_IF_NOT_LE, JUMP_IF_NOT_GT, JUMP_IF_NOT_GE, JUMP_IF_NOT_EQ, JUMP_IF_NOT_NE,
+    INCR, DECR,
+) = range(len(REGISTER_OPCODES))
+
+_QUAD_BINARY = {
+    OP["+"]: ADD,
+    OP["-"]: SUB,
+    OP["*"]: MUL,
+    OP["/"]: DIV,
+    OP["idiv"]: IDIV,
+    OP["%"]: MOD,
+    OP["concat"]: CONCAT,
+    OP["<"]: LT,
+    OP["<="]: LE,
+    OP[">"]: GT,
+    OP[">="]: GE,
+    OP["=="]: EQ,
+    OP["!="]: NE,
+}
+_QUAD_UNARY = {OP["neg"]: NEG, OP["not"]: NOT, OP["itof"]: ITOF}
+# "ifFalse a < b" salta si no se cumple a < b; "if a < b" salta si no se
+# cumple la comparación opuesta.
+_JUMP_IF_NOT = {LT: JUMP_IF_NOT_LT, LE: JUMP_IF_NOT_LE, GT: JUMP_IF_NOT_GT, GE: JUMP_IF_NOT_GE, EQ: JUMP_IF_NOT_EQ, NE: JUMP_IF_NOT_NE}
+_OPPOSITE = {LT: GE, LE: GT, GT: LE, GE: LT, EQ: NE, NE: EQ}
+_JUMPS = frozenset({JUMP, JUMP_IF_TRUE, JUMP_IF_FALSE, *_JUMP_IF_NOT.values()})
+
+ENTRY_NAME = "<inicio>"
+
+
+@dataclass
+class RegisterFunction:
+    name: str
+    template: list[object] = field(default_factory=list)
+    param_registers: list[int] = field(default_factory=list)
+    code: list[tuple[int, int, int, int]] = field(default_factory=list)
+    lines: array = field(default_factory=lambda: array("i"))
+    columns: array = field(default_factory=lambda: array("i"))
+
+    def position(self, index: int) -> tuple[int, int]:
+        if not self.lines:
+            return 0, 0
+        index = max(0, min(index, len(self.lines) - 1))
+        return self.lines[index], self.columns[index]
+
+
+@dataclass
+class RegisterProgram:
+    functions: list[RegisterFunction]
+    globals: list[object]
+    entry: int = 0
+
+    def instruction_count(self) -> int:
+        return sum(len(function.code) for function in self.functions)
+
+
+class RegisterTranslator:
+    """Traduce los cuádruplos a código de la máquina de registros.
+
+    Cada función tiene su propio banco de registros: constantes, variables
+    locales y temporales del código intermedio reciben un registro fijo, y
+    las constantes ya vienen cargadas en la plantilla que se copia en cada
+    llamada. Las globales se leen y escriben con instrucciones aparte.
+    """
+
+    def __init__(self, table: QuadTable, *, fuse: bool = True) -> None:
+        self.table = table
+        self.fuse = fuse
+        operands = table.operands
+        self._global_slots: dict[int, int] = {}
+        self._globals: list[object] = []
+        for operand, kind in enumerate(operands.kinds):
+            if kind == KIND_GLOBAL:
+                self._global_slots[operand] = len(self._globals)
+                self._globals.append(DEFAULT_VALUES.get(operands.types[operand]))
+        self._function_index: dict[int, int] = {}
+        self._function: RegisterFunction = RegisterFunction(ENTRY_NAME)
+        self._registers: dict[int, int] = {}
+        self._labels: dict[int, int] = {}
+        self._uses: dict[int, int] = {}
+        self._quad = 0
+
+    def translate(self) -> RegisterProgram:
+        table = self.table
+        regions: list[tuple[str, int, int]] = []
+        start = 0
+        name = ENTRY_NAME
+        for index, op in enumerate(table.ops):
+            if op == OP["func"]:
+                regions.append((name, start, index))
+                name = str(table.operands.values[table.arg1[index]])
+                self._function_index[table.arg1[index]] = len(regions)
+                start = index + 1
+        regions.append((name, start, len(table.ops)))
+        functions = [self._translate_region(*region) for region in regions]
+        return RegisterProgram(functions, self._globals)
+
+    # -- Registros ------------------------------------------------------
+
+    def _register(self, operand: int) -> int:
+        register = self._registers.get(operand)
+        if register is None:
+            operands = self.table.operands
+            register = len(self._function.template)
+            if operands.kinds[operand] == KIND_CONST:
+                self._function.template.append(operands.values[operand])
+            else:
+                self._function.template.append(DEFAULT_VALUES.get(operands.types[operand]))
+            self._registers[operand] = register
+        return register
+
+    def _scratch(self) -> int:
+        self._function.template.append(None)
+        return len(self._function.template) - 1
+
+    def _source(self, operand: int) -> int:
+        if operand == OPERAND_NONE:
+            return -1
+        slot = self._global_slots.get(operand)
+        if slot is None:
+            return self._register(operand)
+        register = self._scratch()
+        self._emit(GET_GLOBAL, slot, -1, register)
+        return register
+
+    def _is_global(self, operand: int) -> bool:
+        return operand in self._global_slots
+
+    def _store(self, operand: int, emit_value: Callable[[int], None]) -> None:
+        """Emite el cálculo con destino ``operand``, pasando por un registro si es global."""
+        slot = self._global_slots.get(operand)
+        if slot is None:
+            emit_value(self._register(operand))
+            return
+        register = self._scratch()
+        emit_value(register)
+        self._emit(SET_GLOBAL, register, -1, slot)
+
+    def _emit(self, op: int, a: int = -1, b: int = -1, c: int = -1) -> None:
+        function = self._function
+        function.code.append((op, a, b, c))
+        function.lines.append(self.table.lines[self._quad] if self.table.lines else 0)
+        function.columns.append(self.table.columns[self._quad] if self.table.columns else 0)
+
+    # -- Traducción -----------------------------------------------------
+
+    def _translate_region(self, name: str, start: int, end: int) -> RegisterFunction:
+        table = self.table
+        arg1, arg2 = table.arg1, table.arg2
+        kinds = table.operands.kinds
+        self._function = RegisterFunction(name)
+        self._registers = {}
+        self._labels = {}
+        self._uses = {}
+        for index in range(start, end):
+            for operand in (arg1[index], arg2[index]):
+                if kinds[operand] == KIND_TEMP:
+                    self._uses[operand] = self._uses.get(operand, 0) + 1
+
+        index = start
+        while index < end:
+            self._quad = index
+            index += self._translate_quad(index, end)
+
+        # Los saltos guardan la etiqueta; aquí se cambian por su posición.
+        code = self._function.code
+        for position, (op, a, b, c) in enumerate(code):
+            if op in _JUMPS:
+                code[position] = (op, a, b, self._labels[c])
+        return self._function
+
+    def _single_use_temp(self, operand: int) -> bool:
+        return self.table.operands.kinds[operand] == KIND_TEMP and self._uses.get(operand, 0) == 1
+
+    def _translate_quad(self, index: int, end: int) -> int:
+        """Traduce el cuádruplo ``index``; devuelve cuántos cuádruplos consumió."""
+        table = self.table
+        op = table.ops[index]
+        a, b, c = table.arg1[index], table.arg2[index], table.result[index]
+        has_next = index + 1 < end
+
+        if op in _QUAD_BINARY:
+            register_op = _QUAD_BINARY[op]
+            if self.fuse and has_next and self._single_use_temp(c):
+                next_op = table.ops[index + 1]
+                next_a = table.arg1[index + 1]
+                if register_op in _JUMP_IF_NOT and next_op in (OP["iffalse"], OP["iftrue"]) and next_a == c:
+                    if next_op == OP["iftrue"]:
+                        register_op = _OPPOSITE[register_op]
+                    left, right = self._source(a), self._source(b)
+                    self._emit(_JUMP_IF_NOT[register_op], left, right, table.result[index + 1])
+                    return 2
+                if next_op == OP["="] and next_a == c:
+                    # t = a op b; x = t  ->  x = a op b
+                    self._binary(register_op, a, b, table.result[index + 1])
+                    return 2
+            self._binary(register_op, a, b, c)
+            return 1
+
+        if op == OP["="]:
+            source = self._source(a)
+            self._store(c, lambda target: self._emit(MOVE, source, -1, target))
+        elif op in _QUAD_UNARY:
+            source = self._source(a)
+            self._store(c, lambda target: self._emit(_QUAD_UNARY[op], source, -1, target))
+        elif op == OP["label"]:
+            self._labels[c] = len(self._function.code)
+        elif op == OP["goto"]:
+            self._emit(JUMP, -1, -1, c)
+        elif op in (OP["iftrue"], OP["iffalse"]):
+            self._emit(JUMP_IF_TRUE if op == OP["iftrue"] else JUMP_IF_FALSE, self._source(a), -1, c)
+        elif op == OP["param"]:
+            self._emit(PARAM, self._source(a))
+        elif op == OP["call"]:
+            count = int(table.operands.values[b])
+            function = self._function_index.get(a, -1)
+            if c == OPERAND_NONE:
+                self._emit(CALL, function, count, -1)
+            else:
+                self._store(c, lambda target: self._emit(CALL, function, count, target))
+        elif op == OP["return"]:
+            self._emit(RETURN, self._source(a))
+        elif op == OP["print"]:
+            self._emit(PRINT, int(table.operands.values[a]))
+        elif op == OP["read"]:
+            type_name = table.operands.types[c]
+            type_index = VALUE_TYPES.index(type_name) if type_name in VALUE_TYPES else -1
+            self._store(c, lambda target: self._emit(READ, type_index, -1, target))
+        elif op == OP["recv"]:
+            self._function.param_registers.append(self._register(a))
+        elif op == OP["halt"]:
+            self._emit(HALT)
+        # nop, func y endfunc no generan código.
+        return 1
+
+    def _binary(self, register_op: int, a: int, b: int, c: int) -> None:
+        if (
+            self.fuse
+            and c == a
+            and register_op in (ADD, SUB)
+            and not self._is_global(c)
+            and self.table.operands.kinds[b] == KIND_CONST
+        ):
+            # x = x + k  ->  incremento en el sitio.
+            self._emit(INCR if register_op == ADD else DECR, -1, self._register(b), self._register(c))
+            return
+        left, right = self._source(a), self._source(b)
+        self._store(c, lambda target: self._emit(register_op, left, right, target))
+
+
+def translate(table: QuadTable, *, fuse: bool = True) -> RegisterProgram:
+    return RegisterTranslator(table, fuse=fuse).translate()
+
+
+class RegisterVM:
+    """Máquina de registros que ejecuta un ``RegisterProgram``.
+
+    Cada instrucción es una tupla (op, a, b, c) que se desempaqueta de una
+    vez; las operaciones leen y escriben el banco de registros del marco
+    actual sin pasar por una pila de operandos.
+    """
+
+    def __init__(
+        self,
+        program: RegisterProgram,
+        *,
+        write: Callable[[str], None],
+        read: Callable[[], str | None] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> None:
+        self.program = program
+        self.globals = list(program.globals)
+        self._write = write
+        self._read = read
+        self._should_stop = should_stop
+
+    def run(self) -> None:
+        functions = self.program.functions
+        globals_ = self.globals
+        write = self._write
+        should_stop = self._should_stop
+        arguments: list[object] = []
+        push_argument = arguments.append
+        frames: list[tuple] = []
+
+        function = functions[self.program.entry]
+        code = function.code
+        regs = function.template[:]
+        pc = 0
+        ticks = STOP_CHECK_INTERVAL
+        try:
+            while True:
+                op, a, b, c = code[pc]
+                pc += 1
+                # Las instrucciones más frecuentes se comprueban primero.
+                if op == MOVE:
+                    regs[c] = regs[a]
+                elif op == INCR:
+                    regs[c] += regs[b]
+                elif op == JUMP_IF_NOT_LT:
+                    if not regs[a] < regs[b]:
+                        pc = c
+                elif op == ADD:
+                    regs[c] = regs[a] + regs[b]
+                elif op == JUMP:
+                    if c < pc and should_stop is not None:
+                        ticks -= 1
+                        if not ticks:
+                            ticks = STOP_CHECK_INTERVAL
+                            if should_stop():
+                                raise ExecutionInterrupted()
+                    pc = c
+                elif op == JUMP_IF_FALSE:
+                    if not regs[a]:
+                        pc = c
+                elif op == JUMP_IF_NOT_EQ:
+                    if not regs[a] == regs[b]:
+                        pc = c
+                elif op == JUMP_IF_NOT_NE:
+                    if not regs[a] != regs[b]:
+                        pc = c
+                elif op == SUB:
+                    regs[c] = regs[a] - regs[b]
+                elif op == MUL:
+                    regs[c] = regs[a] * regs[b]
+                elif op == MOD:
+                    left = regs[a]
+                    right = regs[b]
+                    if right > 0 and left >= 0:
+                        regs[c] = left % right
+                    else:
+                        regs[c] = int_remainder(left, right)
+                elif op == IDIV:
+                    left = regs[a]
+                    right = regs[b]
+                    if right > 0 and left >= 0:
+                        regs[c] = left // right
+                    else:
+                        regs[c] = int_divide(left, right)
+                elif op == PARAM:
+                    push_argument(regs[a])
+                elif op == CALL:
+                    callee = functions[a]
+                    if len(frames) >= MAX_CALL_DEPTH:
+                        raise SkuldRuntimeError("Desbordamiento de la pila de llamadas")
+                    frames.append((function, code, pc, regs, c))
+                    new_regs = callee.template[:]
+                    if b:
+                        for register, value in zip(callee.param_registers, arguments[-b:]):
+                            new_regs[register] = value
+                        del arguments[-b:]
+                    function = callee
+                    code = callee.code
+                    regs = new_regs
+                    pc = 0
+                elif op == RETURN:
+                    value = regs[a] if a >= 0 else None
+                    function, code, pc, regs, target = frames.pop()
+                    if target >= 0:
+                        regs[target] = value
+                elif op == DECR:
+                    regs[c] -= regs[b]
+                elif op == GET_GLOBAL:
+                    regs[c] = globals_[a]
+                elif op == SET_GLOBAL:
+                    globals_[c] = regs[a]
+                elif op == JUMP_IF_NOT_LE:
+                    if not regs[a] <= regs[b]:
+                        pc = c
+                elif op == JUMP_IF_NOT_GT:
+                    if not regs[a] > regs[b]:
+                        pc = c
+                elif op == JUMP_IF_NOT_GE:
+                    if not regs[a] >= regs[b]:
+                        pc = c
+                elif op == JUMP_IF_TRUE:
+                    if regs[a]:
+                        pc = c
+                elif op == DIV:
+                    right = regs[b]
+                    if right == 0:
+                        raise SkuldRuntimeError("División entre cero")
+                    regs[c] = regs[a] / right
+                elif op == CONCAT:
+                    regs[c] = value_text(regs[a]) + value_text(regs[b])
+                elif op == LT:
+                    regs[c] = regs[a] < regs[b]
+                elif op == LE:
+                    regs[c] = regs[a] <= regs[b]
+                elif op == GT:
+                    regs[c] = regs[a] > regs[b]
+                elif op == GE:
+                    regs[c] = regs[a] >= regs[b]
+                elif op == EQ:
+                    regs[c] = regs[a] == regs[b]
+                elif op == NE:
+                    regs[c] = regs[a] != regs[b]
+                elif op == NOT:
+                    regs[c] = not regs[a]
+                elif op == NEG:
+                    regs[c] = -regs[a]
+                elif op == ITOF:
+                    regs[c] = float(regs[a])
+                elif op == PRINT:
+                    if a:
+                        values = arguments[-a:]
+                        del arguments[-a:]
+                    else:
+                        values = []
+                    write("".join([value_text(value) for value in values]) + "\n")
+                elif op == READ:
+                    regs[c] = self._read_value(VALUE_TYPES[a] if a >= 0 else "")
+                elif op == HALT:
+                    return
+                else:
+                    raise SkuldRuntimeError(f"Instrucción desconocida: {op}")
+        except ExecutionInterrupted:
+            raise
+        except (SkuldRuntimeError, ArithmeticError, TypeError, RecursionError) as exc:
+            line, column = function.position(pc - 1)
+            message = str(exc) if isinstance(exc, SkuldRuntimeError) else f"Error de ejecución: {exc}"
+            raise ExecutionError(message, line, column) from exc
+
+    def _read_value(self, type_name: str) -> object:
+        text = self._read() if self._read is not None else None
+        if text is None:
+            raise SkuldRuntimeError("No hay más datos de entrada para 'sphone'")
+        if type_name not in DEFAULT_VALUES:
+            return text
+        return parse_input(text, type_name)
+
+
+def run_program(
+    program: RegisterProgram,
+    *,
+    write: Callable[[str], None],
+    read: Callable[[], str | None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> None:
+    RegisterVM(program, write=write, read=read, should_stop=should_stop).run()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import operator
+
+from ide.skuld.ir import OP
+
+
+class SkuldRuntimeError(Exception):
+    pass
+
+
+def value_text(value: object) -> str:
+    """Texto de un valor de Skuld tal como lo imprime ``dmail``."""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
+
+def divide(left, right):
+    if right == 0:
+        raise SkuldRuntimeError("División entre cero")
+    return left / right
+
+
+def int_divide(left: int, right: int) -> int:
+    # Como en C: el cociente se trunca hacia cero.
+    if right == 0:
+        raise SkuldRuntimeError("División entre cero")
+    quotient = abs(left) // abs(right)
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+def int_remainder(left: int, right: int) -> int:
+    if right == 0:
+        raise SkuldRuntimeError("División entre cero")
+    remainder = abs(left) % abs(right)
+    return -remainder if left < 0 else remainder
+
+
+def concat(left: object, right: object) -> str:
+    return value_text(left) + value_text(right)
+
+
+BINARY_OPERATIONS = {
+    OP["+"]: operator.add,
+    OP["-"]: operator.sub,
+    OP["*"]: operator.mul,
+    OP["/"]: divide,
+    OP["idiv"]: int_divide,
+    OP["%"]: int_remainder,
+    OP["concat"]: concat,
+    OP["=="]: operator.eq,
+    OP["!="]: operator.ne,
+    OP["<"]: operator.lt,
+    OP["<="]: operator.le,
+    OP[">"]: operator.gt,
+    OP[">="]: operator.ge,
+}
+
+UNARY_OPERATIONS = {
+    OP["neg"]: operator.neg,
+    OP["not"]: operator.not_,
+    OP["itof"]: float,
+}
@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+from ide.skuld.diagnostics import Diagnostic
+from ide.skuld.syntax_tree import Node
+
+NUMERIC_TYPES = {"worldline", "divergence"}
+RELATIONAL_OPERATORS = {"<", "<=", ">", ">="}
+EQUALITY_OPERATORS = {"==", "!="}
+LOGICAL_OPERATORS = {"and", "or"}
+
+GLOBAL_SCOPE = "global"
+# Los ámbitos anidados se nombran con la línea donde empiezan: "f › bloque 12".
+_SCOPE_LINE = re.compile(r"( › (?:bloque|shift) )(\d+)")
+
+
+@dataclass(slots=True)
+class Symbol:
+    name: str
+    kind: str
+    type_name: str
+    scope: str
+    line: int
+    column: int
+    params: tuple[str, ...] = ()
+
+    def signature(self) -> str:
+        if self.kind == "función":
+            return f"{self.type_name}({', '.join(self.params)})"
+        return self.type_name
+
+
+@dataclass
+class SemanticResult:
+    symbols: list[Symbol] = field(default_factory=list)
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+
+
+class SymbolTable:
+    """Tabla de símbolos con un diccionario por ámbito.
+
+    Además de los diccionarios de cada ámbito (que detectan duplicados), se
+    mantiene un índice nombre -> pila de símbolos visibles: la búsqueda es
+    una sola consulta al diccionario sin recorrer la cadena de ámbitos, sin
+    importar la profundidad de anidamiento.
+    """
+
+    def __init__(self) -> None:
+        self._visible: dict[str, list[Symbol]] = {}
+        self._scopes: list[dict[str, Symbol]] = []
+
+    def push_scope(self) -> None:
+        self._scopes.append({})
+
+    def pop_scope(self) -> None:
+        visible = self._visible
+        for name in self._scopes.pop():
+            stack = visible[name]
+            stack.pop()
+            if not stack:
+                del visible[name]
+
+    def declare(self, symbol: Symbol) -> Symbol | None:
+        """Declara ``symbol`` en el ámbito actual; devuelve el previo si ya existía."""
+        scope = self._scopes[-1]
+        previous = scope.get(symbol.name)
+        if previous is not None:
+            return previous
+        scope[symbol.name] = symbol
+        self._visible.setdefault(symbol.name, []).append(symbol)
+        return None
+
+    def lookup(self, name: str) -> Symbol | None:
+        stack = self._visible.get(name)
+        return stack[-1] if stack else None
+
+
+class SemanticAnalyzer:
+    """Comprobación de tipos y resolución de nombres sobre el AST.
+
+    Las funciones y variables globales se declaran antes de revisar cualquier
+    cuerpo, así que pueden usarse desde cualquier punto del archivo (una
+    global leída antes de su inicializador vale el cero de su tipo). Cada
+    bloque abre un ámbito nuevo; los parámetros comparten ámbito con el
+    cuerpo de la función.
+    """
+
+    def __init__(self) -> None:
+        self.table = SymbolTable()
+        self.result = SemanticResult()
+        # Nombres globales (o no declarados) consultados; el análisis
+        # incremental los usa como dependencias de cada elemento.
+        self.global_reads: set[str] = set()
+        self._scope_names: list[str] = []
+        self._return_type = "void"
+        self._loop_depth = 0
+
+    def analyze(self, program: Node) -> SemanticResult:
+        self.declare_globals(program)
+        for item in program.children:
+            self.check_item(item)
+        return self.result
+
+    def declare_globals(self, program: Node) -> dict[str, tuple]:
+        """Declara funciones y variables globales; devuelve la firma de cada nombre."""
+        self.table.push_scope()
+        self._scope_names.append(GLOBAL_SCOPE)
+        gate_seen = False
+        for item in program.children:
+            kind = item.kind
+            if kind == "Function":
+                self._declare_function(item)
+            elif kind == "VarDecl":
+                self._declare_variable(item, "variable")
+            elif kind == "Gate":
+                if gate_seen:
+                    self._error(item.line, item.column, "Solo puede haber un bloque 'gate'")
+                gate_seen = True
+
+        signatures: dict[str, tuple] = {}
+        for symbol in self.result.symbols:
+            signatures.setdefault(symbol.name, (symbol.kind, symbol.type_name, symbol.params))
+        return signatures
+
+    def check_item(self, item: Node) -> None:
+        kind = item.kind
+        if kind == "Function":
+            self._check_function(item)
+        elif kind == "Gate":
+            self._check_gate(item)
+        elif kind == "VarDecl" and item.children:
+            self._check_initializer(item)
+
+    # -- Declaraciones --------------------------------------------------
+
+    def _declare(self, symbol: Symbol) -> None:
+        previous = self.table.declare(symbol)
+        if previous is not None:
+            self._error(
+                symbol.line,
+                symbol.column,
+                f"'{symbol.name}' ya fue declarado en este ámbito (línea {previous.line})",
+            )
+            return
+        self.result.symbols.append(symbol)
+
+    def _declare_variable(self, node: Node, kind: str) -> None:
+        self._declare(Symbol(node.value, kind, node.type_name, self._scope_names[-1], node.line, node.column))
+
+    def _declare_function(self, node: Node) -> None:
+        params = tuple(param.type_name for param in node.children[0].children)
+        self._declare(Symbol(node.value, "función", node.type_name, GLOBAL_SCOPE, node.line, node.column, params))
+
+    def _check_initializer(self, node: Node) -> None:
+        value_type = self._expression(node.children[0])
+        self._check_assignable(node.type_name, value_type, node.children[0])
+
+    # -- Nivel superior -------------------------------------------------
+
+    def _check_function(self, node: Node) -> None:
+        params, body = node.children
+        self._enter_scope(node.value)
+        for param in params.children:
+            self._declare_variable(param, "parámetro")
+        self._return_type = node.type_name
+        self._statements(body.children)
+        self._exit_scope()
+
+    def _check_gate(self, node: Node) -> None:
+        self._enter_scope("gate")
+        self._return_type = "void"
+        self._statements(node.children[0].children)
+        self._exit_scope()
+
+    def _enter_scope(self, name: str) -> None:
+        self.table.push_scope()
+        self._scope_names.append(name)
+
+    def _exit_scope(self) -> None:
+        self.table.pop_scope()
+        self._scope_names.pop()
+
+    # -- Sentencias -----------------------------------------------------
+
+    def _statements(self, statements: list[Node] | tuple) -> None:
+        for statement in statements:
+            self._statement(statement)
+
+    def _statement(self, node: Node) -> None:
+        kind = node.kind
+        if kind == "VarDecl":
+            if node.children:
+                self._check_initializer(node)
+            self._declare_variable(node, "variable")
+        elif kind == "ExprStmt":
+            self._expression(node.children[0], allow_void=True)
+        elif kind == "Block":
+            self._enter_scope(f"{self._scope_names[-1]} › bloque {node.line}")
+            self._statements(node.children)
+            self._exit_scope()
+        elif kind == "Choice":
+            self._condition(node.children[0], "choice")
+            for branch in node.children[1:]:
+                self._statement(branch)
+        elif kind == "Loop":
+            self._condition(node.children[0], "loop")
+            self._loop_body(node.children[1])
+        elif kind == "Shift":
+            self._shift(node)
+        elif kind == "Jump":
+            if not self._loop_depth:
+                self._error(node.line, node.column, "'jump' solo puede usarse dentro de 'loop' o 'shift'")
+        elif kind == "Return":
+            self._return(node)
+        elif kind == "Output":
+            for value in node.children:
+                self._expression(value)
+        elif kind == "Input":
+            for target in node.children:
+                self._variable(target)
+
+    def _loop_body(self, body: Node) -> None:
+        self._loop_depth += 1
+        self._statement(body)
+        self._loop_depth -= 1
+
+    def _shift(self, node: Node) -> None:
+        init, condition, update, body = node.children
+        self._enter_scope(f"{self._scope_names[-1]} › shift {node.line}")
+        if init.kind == "Block":
+            self._statements(init.children)
+        elif init.kind == "VarDecl":
+            self._statement(init)
+        elif init.kind != "Empty":
+            self._expression(init, allow_void=True)
+        if condition.kind != "Empty":
+            self._condition(condition, "shift")
+        if update.kind != "Empty":
+            self._expression(update, allow_void=True)
+        self._loop_body(body)
+        self._exit_scope()
+
+    def _condition(self, node: Node, keyword: str) -> None:
+        condition_type = self._expression(node)
+        if condition_type is not None and condition_type != "reading":
+            self._error(
+                node.line,
+                node.column,
+                f"La condición de '{keyword}' debe ser de tipo reading, no {condition_type}",
+            )
+
+    def _return(self, node: Node) -> None:
+        expected = self._return_type
+        if not node.children:
+            if expected != "void":
+                self._error(node.line, node.column, f"'return' debe devolver un valor de tipo {expected}")
+            return
+        value_type = self._expression(node.children[0])
+        if expected == "void":
+            self._error(node.line, node.column, "Una función void no puede devolver un valor")
+            return
+        self._check_assignable(expected, value_type, node.children[0])
+
+    # -- Expresiones ----------------------------------------------------
+
+    def _expression(self, node: Node, *, allow_void: bool = False) -> str | None:
+        """Devuelve el tipo de la expresión o ``None`` si ya se reportó un error."""
+        kind = node.kind
+        if kind == "Literal":
+            return node.type_name
+        if kind == "Identifier":
+            symbol = self._variable(node)
+            return symbol.type_name if symbol is not None else None
+        if kind == "Binary":
+            return self._binary(node)
+        if kind == "Unary":
+            return self._unary(node)
+        if kind == "Assign":
+            return self._assign(node)
+        if kind in ("PreInc", "PreDec", "PostInc", "PostDec"):
+            target = node.children[0]
+            if target.kind != "Identifier":
+                return None
+            symbol = self._variable(target)
+            if symbol is not None and symbol.type_name not in NUMERIC_TYPES:
+                self._error(node.line, node.column, f"'{target.value}' debe ser numérica para usar '++' o '--'")
+                return None
+            return symbol.type_name if symbol is not None else None
+        if kind == "Call":
+            result_type = self._call(node)
+            if result_type == "void" and not allow_void:
+                self._error(node.line, node.column, f"La función '{node.value}' no devuelve ningún valor")
+                return None
+            return result_type
+        return None
+
+    def _lookup(self, name: str) -> Symbol | None:
+        symbol = self.table.lookup(name)
+        if symbol is None or symbol.scope == GLOBAL_SCOPE:
+            self.global_reads.add(name)
+        return symbol
+
+    def _variable(self, node: Node) -> Symbol | None:
+        symbol = self._lookup(node.value)
+        if symbol is None:
+            self._error(node.line, node.column, f"'{node.value}' no ha sido declarado")
+            return None
+        if symbol.kind == "función":
+            self._error(node.line, node.column, f"'{node.value}' es una función, no una variable")
+            return None
+        return symbol
+
+    def _binary(self, node: Node) -> str | None:
+        left_node, right_node = node.children
+        left = self._expression(left_node)
+        right = self._expression(right_node)
+        if left is None or right is None:
+            return None
+
+        operator = node.value
+        if operator in LOGICAL_OPERATORS:
+            if left == "reading" and right == "reading":
+                return "reading"
+        elif operator in EQUALITY_OPERATORS:
+            if left == right or (left in NUMERIC_TYPES and right in NUMERIC_TYPES):
+                return "reading"
+        elif operator in RELATIONAL_OPERATORS:
+            if left in NUMERIC_TYPES and right in NUMERIC_TYPES:
+                return "reading"
+        elif operator == "+" and (left == "dmail" or right == "dmail"):
+            # Concatenación: cualquier valor se convierte a dmail.
+            return "dmail"
+        elif operator == "%":
+            if left == "worldline" and right == "worldline":
+                return "worldline"
+        elif left in NUMERIC_TYPES and right in NUMERIC_TYPES:
+            return "worldline" if left == right == "worldline" else "divergence"
+
+        self._error(node.line, node.column, f"El operador '{operator}' no admite operandos {left} y {right}")
+        return None
+
+    def _unary(self, node: Node) -> str | None:
+        operand = self._expression(node.children[0])
+        if operand is None:
+            return None
+        if node.value == "not":
+            if operand == "reading":
+                return "reading"
+        elif operand in NUMERIC_TYPES:
+            return operand
+        self._error(node.line, node.column, f"El operador '{node.value}' no admite un operando {operand}")
+        return None
+
+    def _assign(self, node: Node) -> str | None:
+        target, value = node.children
+        value_type = self._expression(value)
+        if target.kind != "Identifier":
+            return None
+        symbol = self._variable(target)
+        if symbol is None or value_type is None:
+            return None
+
+        operator = node.value
+        if operator != "=":
+            arithmetic = operator[0]
+            if arithmetic == "+" and symbol.type_name == "dmail":
+                return symbol.type_name
+            if symbol.type_name not in NUMERIC_TYPES or value_type not in NUMERIC_TYPES:
+                self._error(
+                    node.line,
+                    node.column,
+                    f"El operador '{operator}' no admite operandos {symbol.type_name} y {value_type}",
+                )
+                return None
+        self._check_assignable(symbol.type_name, value_type, value)
+        return symbol.type_name
+
+    def _call(self, node: Node) -> str | None:
+        argument_types = [self._expression(argument) for argument in node.children]
+        symbol = self._lookup(node.value)
+        if symbol is None:
+            self._error(node.line, node.column, f"La función '{node.value}' no ha sido declarada")
+            return None
+        if symbol.kind != "función":
+            self._error(node.line, node.column, f"'{node.value}' no es una función")
+            return None
+
+        params = symbol.params
+        if len(argument_types) != len(params):
+            self._error(
+                node.line,
+                node.column,
+                f"'{node.value}' espera {len(params)} argumento(s) y recibió {len(argument_types)}",
+            )
+            return symbol.type_name
+        for param_type, argument_type, argument in zip(params, argument_types, node.children):
+            self._check_assignable(param_type, argument_type, argument)
+        return symbol.type_name
+
+    def _check_assignable(self, target_type: str, value_type: str | None, node: Node) -> None:
+        if value_type is None or target_type == value_type:
+            return
+        if target_type == "divergence" and value_type == "worldline":
+            return
+        self._error(node.line, node.column, f"No se puede usar un valor {value_type} donde se espera {target_type}")
+
+    def _error(self, line: int, column: int, message: str) -> None:
+        self.result.diagnostics.append(Diagnostic("SEMANTICO", line, column, message))
+
+
+def shift_scope(scope: str, delta: int) -> str:
+    """Nombre de ``scope`` con las líneas de sus bloques desplazadas ``delta``."""
+    if not delta or " › " not in scope:
+        return scope
+    return _SCOPE_LINE.sub(lambda match: f"{match.group(1)}{int(match.group(2)) + delta}", scope)
+
+
+def analyze(program: Node) -> SemanticResult:
+    return SemanticAnalyzer().analyze(program)
+
+
+def format_symbols(symbols: list[Symbol]) -> str:
+    rows = [("Nombre", "Categoría", "Tipo", "Ámbito", "Línea")]
+    rows.extend((symbol.name, symbol.kind, symbol.signature(), symbol.scope, str(symbol.line)) for symbol in symbols)
+    widths = [max(len(row[index]) for row in rows) for index in range(5)]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+
+def format_semantic(result: SemanticResult) -> str:
+    functions = sum(1 for symbol in result.symbols if symbol.kind == "función")
+    variables = len(result.symbols) - functions
+    if result.diagnostics:
+        status = f"{len(result.diagnostics)} error(es) semántico(s)"
+    else:
+        status = "Análisis semántico correcto"
+    return f"{status}\nFunciones: {functions}  ·  Variables y parámetros: {variables}\n\n{format_symbols(result.symbols)}"
+
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+NO_CHILDREN: tuple = ()
+
+
+class Node:
+    """Nodo del árbol sintáctico de Skuld.
+
+    ``kind`` identifica la construcción (``Function``, ``Binary``...), ``value``
+    guarda el dato propio del nodo (nombre, operador o valor literal) y
+    ``type_name`` el tipo declarado cuando aplica. Las hojas comparten la tupla
+    vacía ``NO_CHILDREN`` para no reservar una lista por nodo.
+    """
+
+    __slots__ = ("kind", "value", "type_name", "children", "line", "column")
+
+    def __init__(
+        self,
+        kind: str,
+        line: int,
+        column: int,
+        *,
+        value: object = None,
+        type_name: str | None = None,
+        children: list[Node] | tuple = NO_CHILDREN,
+    ) -> None:
+        self.kind = kind
+        self.value = value
+        self.type_name = type_name
+        self.children = children
+        self.line = line
+        self.column = column
+
+    def __repr__(self) -> str:
+        return f"Node({self.kind}, {self.value!r}, {self.line}:{self.column})"
+
+    def label(self) -> str:
+        parts = [self.kind]
+        if self.type_name:
+            parts.append(self.type_name)
+        if self.value is not None:
+            parts.append(repr(self.value) if self.kind == "Literal" else str(self.value))
+        return " ".join(parts)
+
+
+def walk(node: Node) -> Iterator[Node]:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(current.children))
+
+
+def count_nodes(node: Node) -> int:
+    total = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        total += 1
+        stack.extend(current.children)
+    return total
+
+
+def shift_lines(node: Node, delta: int) -> None:
+    if not delta:
+        return
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        current.line += delta
+        stack.extend(current.children)
+
+
+def format_tree(root: Node) -> str:
+    lines = [root.label()]
+    # Pila explícita: programas grandes superarían el límite de recursión.
+    stack: list[tuple[Node, str, bool]] = [
+        (child, "", index == len(root.children) - 1)
+        for index, child in reversed(list(enumerate(root.children)))
+    ]
+    while stack:
+        node, prefix, is_last = stack.pop()
+        connector = "└── " if is_last else "├── "
+        lines.append(f"{prefix}{connector}{node.label()}  [{node.line}]")
+        child_prefix = prefix + ("    " if is_last else "│   ")
+        children = node.children
+        for index in range(len(children) - 1, -1, -1):
+            stack.append((children[index], child_prefix, index == len(children) - 1))
+    return "\n".join(lines)
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from ide.skuld.bytecode import DEFAULT_VALUES, OPCODES, VALUE_TYPES, BytecodeProgram
+from ide.skuld.runtime import SkuldRuntimeError, int_divide, int_remainder, value_text
+
+MAX_CALL_DEPTH = 10_000
+# Cada cuántos saltos hacia atrás se consulta si hay que detener el programa.
+STOP_CHECK_INTERVAL = 4096
+
+(
+    LOAD_LOCAL, STORE_LOCAL, LOAD_CONST, LOAD_GLOBAL, STORE_GLOBAL,
+    ADD, SUB, MUL, DIV, IDIV, MOD, CONCAT,
+    LT, LE, GT, GE, EQ, NE, NEG, NOT, ITOF,
+    JUMP, JUMP_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP,
+    POP, DUP, CALL, RETURN, RETURN_NONE, PRINT, READ, HALT,
+    LOAD_LOCAL_CONST, LOAD_LOCAL2, ADD_LOCAL_CONST,
+    JUMP_IF_NOT_LT, JUMP_IF_NOT_LE, JUMP_IF_NOT_GT, JUMP_IF_NOT_GE, JUMP_IF_NOT_EQ, JUMP_IF_NOT_NE,
+) = range(len(OPCODES))
+
+
+class ExecutionInterrupted(Exception):
+    pass
+
+
+class ExecutionError(Exception):
+    def __init__(self, message: str, line: int, column: int) -> None:
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.column = column
+
+
+def parse_input(text: str, type_name: str) -> object:
+    """Convierte una línea de entrada de ``sphone`` al tipo de la variable."""
+    value = text.strip()
+    try:
+        if type_name == "worldline":
+            return int(value)
+        if type_name == "divergence":
+            return float(value)
+    except ValueError:
+        raise SkuldRuntimeError(f"Entrada no válida para {type_name}: '{value}'") from None
+    if type_name == "reading":
+        if value not in ("true", "false"):
+            raise SkuldRuntimeError(f"Entrada no válida para reading: '{value}'")
+        return value == "true"
+    return text
+
+
+class StackVM:
+    """Máquina de pila que ejecuta un ``BytecodeProgram``.
+
+    Todas las funciones comparten una sola pila de operandos; cada marco solo
+    guarda sus variables locales y el punto de retorno. El bucle de despacho
+    compara el código de operación con las instrucciones más frecuentes
+    primero y evita llamadas a función en las operaciones básicas.
+
+    En el bucle de ``bench`` es unas 2 veces más rápida que el recorrido del
+    AST, lejos de las 10 que se pedían: solo repartir unos 2,8 millones de
+    instrucciones ya cuesta más de la décima parte de lo que tarda ese
+    recorrido, incluso llamando a un cierre por instrucción en lugar de
+    comparar códigos. Por eso no es el motor predeterminado.
+    """
+
+    def __init__(
+        self,
+        program: BytecodeProgram,
+        *,
+        write: Callable[[str], None],
+        read: Callable[[], str | None] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> None:
+        self.program = program
+        self.globals: list[object] = list(program.global_values)
+        self._write = write
+        self._read = read
+        self._should_stop = should_stop
+        # Códigos y argumentos en listas separadas: indexar una lista es más
+        # rápido que un array y evita sumar 1 al contador en cada instrucción.
+        self._decoded = [(code.code[0::2].tolist(), code.code[1::2].tolist()) for code in program.functions]
+
+    def run(self) -> None:
+        functions = self.program.functions
+        constants = self.program.constants
+        decoded = self._decoded
+        globals_ = self.globals
+        write = self._write
+        should_stop = self._should_stop
+
+        stack: list[object] = []
+        push = stack.append
+        pop = stack.pop
+        frames: list[tuple] = []
+        frame_push = frames.append
+        frame_pop = frames.pop
+
+        function_index = self.program.entry
+        ops, args = decoded[function_index]
+        locals_: list[object] = [None] * functions[function_index].local_count
+        pc = 0
+        ticks = STOP_CHECK_INTERVAL
+        try:
+            while True:
+                op = ops[pc]
+                arg = args[pc]
+                pc += 1
+                # Las instrucciones más frecuentes se comprueban primero.
+                if op == LOAD_LOCAL_CONST:
+                    push(locals_[arg & 0xFFFF])
+                    push(constants[arg >> 16])
+                elif op == LOAD_LOCAL:
+                    push(locals_[arg])
+                elif op == STORE_LOCAL:
+                    locals_[arg] = pop()
+                elif op == LOAD_CONST:
+                    push(constants[arg])
+                elif op == JUMP_IF_NOT_LT:
+                    right = pop()
+                    if not pop() < right:
+                        pc = arg
+                elif op == ADD_LOCAL_CONST:
+                    locals_[arg & 0xFFFF] += constants[arg >> 16]
+                elif op == JUMP:
+                    if arg < pc and should_stop is not None:
+                        ticks -= 1
+                        if not ticks:
+                            ticks = STOP_CHECK_INTERVAL
+                            if should_stop():
+                                raise ExecutionInterrupted()
+                    pc = arg
+                elif op == ADD:
+                    right = pop()
+                    stack[-1] += right
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == LOAD_LOCAL2:
+                    push(locals_[arg & 0xFFFF])
+                    push(locals_[arg >> 16])
+                elif op == JUMP_IF_NOT_EQ:
+                    right = pop()
+                    if not pop() == right:
+                        pc = arg
+                elif op == JUMP_IF_NOT_NE:
+                    right = pop()
+                    if not pop() != right:
+                        pc = arg
+                elif op == CALL:
+                    callee = functions[arg]
+                    if len(frames) >= MAX_CALL_DEPTH:
+                        raise SkuldRuntimeError("Desbordamiento de la pila de llamadas")
+                    frame_push((ops, args, pc, locals_))
+                    count = callee.param_count
+                    if count:
+                        locals_ = stack[-count:]
+                        del stack[-count:]
+                    else:
+                        locals_ = []
+                    if callee.local_count > count:
+                        locals_.extend([None] * (callee.local_count - count))
+                    ops, args = decoded[arg]
+                    pc = 0
+                elif op == RETURN or op == RETURN_NONE:
+                    # El valor devuelto ya está en la cima de la pila compartida.
+                    ops, args, pc, locals_ = frame_pop()
+                elif op == SUB:
+                    right = pop()
+                    stack[-1] -= right
+                elif op == MUL:
+                    right = pop()
+                    stack[-1] *= right
+                elif op == MOD:
+                    right = pop()
+                    left = stack[-1]
+                    if right > 0 and left >= 0:
+                        stack[-1] = left % right
+                    else:
+                        stack[-1] = int_remainder(left, right)
+                elif op == IDIV:
+                    right = pop()
+                    left = stack[-1]
+                    if right > 0 and left >= 0:
+                        stack[-1] = left // right
+                    else:
+                        stack[-1] = int_divide(left, right)
+                elif op == LOAD_GLOBAL:
+                    push(globals_[arg])
+                elif op == STORE_GLOBAL:
+                    globals_[arg] = pop()
+                elif op == JUMP_IF_NOT_LE:
+                    right = pop()
+                    if not pop() <= right:
+                        pc = arg
+                elif op == JUMP_IF_NOT_GT:
+                    right = pop()
+                    if not pop() > right:
+                        pc = arg
+                elif op == JUMP_IF_NOT_GE:
+                    right = pop()
+                    if not pop() >= right:
+                        pc = arg
+                elif op == DIV:
+                    right = pop()
+                    if right == 0:
+                        raise SkuldRuntimeError("División entre cero")
+                    stack[-1] /= right
+                elif op == DUP:
+                    push(stack[-1])
+                elif op == POP:
+                    pop()
+                elif op == CONCAT:
+                    right = pop()
+                    stack[-1] = value_text(stack[-1]) + value_text(right)
+                elif op == LT:
+                    right = pop()
+                    stack[-1] = stack[-1] < right
+                elif op == LE:
+                    right = pop()
+                    stack[-1] = stack[-1] <= right
+                elif op == GT:
+                    right = pop()
+                    stack[-1] = stack[-1] > right
+                elif op == GE:
+                    right = pop()
+                    stack[-1] = stack[-1] >= right
+                elif op == EQ:
+                    right = pop()
+                    stack[-1] = stack[-1] == right
+                elif op == NE:
+                    right = pop()
+                    stack[-1] = stack[-1] != right
+                elif op == JUMP_IF_FALSE_OR_POP:
+                    if stack[-1]:
+                        pop()
+                    else:
+                        pc = arg
+                elif op == JUMP_IF_TRUE_OR_POP:
+                    if stack[-1]:
+                        pc = arg
+                    else:
+                        pop()
+                elif op == NOT:
+                    stack[-1] = not stack[-1]
+                elif op == NEG:
+                    stack[-1] = -stack[-1]
+                elif op == ITOF:
+                    stack[-1] = float(stack[-1])
+                elif op == PRINT:
+                    if arg:
+                        values = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        values = []
+                    write("".join([value_text(value) for value in values]) + "\n")
+                elif op == READ:
+                    push(self._read_value(VALUE_TYPES[arg]))
+                elif op == HALT:
+                    return
+                else:
+                    raise SkuldRuntimeError(f"Instrucción desconocida: {op}")
+        except ExecutionInterrupted:
+            raise
+        except (SkuldRuntimeError, ArithmeticError, TypeError, RecursionError) as exc:
+            code = self._function_of(ops)
+            line, column = code.position(pc - 1) if code is not None else (0, 0)
+            message = str(exc) if isinstance(exc, SkuldRuntimeError) else f"Error de ejecución: {exc}"
+            raise ExecutionError(message, line, column) from exc
+
+    def _function_of(self, ops: list[int]):
+        for index, (candidate, _args) in enumerate(self._decoded):
+            if candidate is ops:
+                return self.program.functions[index]
+        return None
+
+    def _read_value(self, type_name: str) -> object:
+        text = self._read() if self._read is not None else None
+        if text is None:
+            raise SkuldRuntimeError("No hay más datos de entrada para 'sphone'")
+        if type_name not in DEFAULT_VALUES:
+            return text
+        return parse_input(text, type_name)
+
+
+def run_program(
+    program: BytecodeProgram,
+    *,
+    write: Callable[[str], None],
+    read: Callable[[], str | None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> None:
+    StackVM(program, write=write, read=read, should_stop=should_stop).run()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QColor, QFont, QSyntaxHighlighter, QTextBlock, QTextCharFormat, QTextDocument
+
+from ide.skuld.incremental_lexer import IncrementalLexer
+from ide.skuld.lexer import STATE_NORMAL, token_category, tokenize_line
+from ide.theme import steins_gate_theme
+
+
+class SkuldHighlighter(QSyntaxHighlighter):
+    """Resaltado de sintaxis que reutiliza los tokens del lexer incremental.
+
+    Qt solo llama a ``highlightBlock`` para los bloques modificados y sigue
+    con los siguientes mientras cambie el estado de fin de bloque, que es el
+    mismo estado del lexer (dentro o fuera de un comentario de bloque).
+    """
+
+    IDLE_BATCH_SIZE = 400
+    _formats_by_theme: dict[str, dict[str, QTextCharFormat]] = {}
+
+    def __init__(self, document: QTextDocument, lexer: IncrementalLexer) -> None:
+        super().__init__(document)
+        self._lexer = lexer
+        self._formats = self._formats_for_theme(steins_gate_theme.get_theme_key())
+        self._idle_block = QTextBlock()
+        self._idle_skip = range(0)
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(0)
+        self._idle_timer.timeout.connect(self._rehighlight_idle_batch)
+
+    @classmethod
+    def _formats_for_theme(cls, theme_key: str) -> dict[str, QTextCharFormat]:
+        formats = cls._formats_by_theme.get(theme_key)
+        if formats is not None:
+            return formats
+
+        colors = steins_gate_theme.get_colors_for_theme(theme_key)
+
+        def make(color: str, *, bold: bool = False, italic: bool = False) -> QTextCharFormat:
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(color))
+            if bold:
+                text_format.setFontWeight(QFont.Bold)
+            if italic:
+                text_format.setFontItalic(True)
+            return text_format
+
+        error_format = QTextCharFormat()
+        error_format.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+        error_format.setUnderlineColor(QColor(colors.accent))
+
+        formats = {
+            "keyword": make(colors.keywords, bold=True),
+            "string": make(colors.strings),
+            "comment": make(colors.comments, italic=True),
+            "number": make(colors.numbers),
+            "operator": make(colors.operators),
+            "delimiter": make(colors.operators),
+            "error": error_format,
+        }
+        cls._formats_by_theme[theme_key] = formats
+        return formats
+
+    def highlightBlock(self, text: str) -> None:  # type: ignore[override]
+        index = self.currentBlock().blockNumber()
+        lexer = self._lexer
+        if 0 <= index < lexer.line_count and lexer.line_text(index) == text:
+            tokens = lexer.line_tokens(index)
+            end_state = lexer.line_end_state(index)
+        else:
+            start_state = max(self.previousBlockState(), STATE_NORMAL)
+            tokens, end_state = tokenize_line(text, index + 1, start_state)
+
+        formats = self._formats
+        for token in tokens:
+            text_format = formats.get(token_category(token.kind))
+            if text_format is not None:
+                self.setFormat(token.column - 1, len(token.lexeme), text_format)
+        self.setCurrentBlockState(end_state)
+
+    def apply_theme(self, first_visible: QTextBlock, last_visible_number: int) -> None:
+        """Cambia los formatos: primero los bloques visibles y el resto en tiempo ocioso."""
+        self._formats = self._formats_for_theme(steins_gate_theme.get_theme_key())
+        self._idle_timer.stop()
+
+        block = first_visible
+        first_number = block.blockNumber() if block.isValid() else 0
+        while block.isValid() and block.blockNumber() <= last_visible_number:
+            self.rehighlightBlock(block)
+            block = block.next()
+
+        self._idle_skip = range(first_number, last_visible_number + 1)
+        document = self.document()
+        self._idle_block = document.firstBlock() if document is not None else QTextBlock()
+        self._idle_timer.start()
+
+    def _rehighlight_idle_batch(self) -> None:
+        block = self._idle_block
+        processed = 0
+        while block.isValid() and processed < self.IDLE_BATCH_SIZE:
+            if block.blockNumber() not in self._idle_skip:
+                self.rehighlightBlock(block)
+                processed += 1
+            block = block.next()
+
+        self._idle_block = block
+        if block.isValid():
+            self._idle_timer.start()
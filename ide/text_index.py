@@ -0,0 +1,480 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from ide.file_index import walk_root
+
+TEXT_INDEX_VERSION = 1
+# Archivos más grandes no se indexan: son candidatos en todas las búsquedas.
+MAX_INDEXED_BYTES = 2 * 1024 * 1024
+MAX_SEARCH_MATCHES = 5000
+MAX_PREVIEW_CHARS = 200
+
+_REGEX_META = set(".^$*+?{}[]()|\\")
+_OPTIONAL_QUANTIFIERS = set("?*{")
+_INLINE_FLAGS = set("aiLmsux-")
+_OCTAL_DIGITS = set("01234567")
+# Dígitos que siguen a ``\x``, ``\u`` y ``\U``.
+_HEX_ESCAPE_DIGITS = {"x": 2, "u": 4, "U": 8}
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigramas de ``text`` en minúsculas."""
+    text = text.lower()
+    return set(map("".join, zip(text, text[1:], text[2:])))
+
+
+def required_literals(pattern: str) -> list[str] | None:
+    """Fragmentos literales que cualquier coincidencia de ``pattern`` contiene.
+
+    Es un análisis conservador: ante una alternativa ``|`` fuera de clases
+    devuelve ``None`` (no se puede filtrar) y todo lo que está dentro de
+    grupos, clases o escapes como ``\\d`` o ``\\x41`` simplemente corta el
+    fragmento. Las banderas en línea como ``(?x)`` cambian el significado del
+    resto del patrón, así que también devuelven ``None``.
+    """
+    literals: list[str] = []
+    current: list[str] = []
+    depth = 0
+    index = 0
+
+    def cut() -> None:
+        if current:
+            literals.append("".join(current))
+            current.clear()
+
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\" and index + 1 < len(pattern):
+            escaped = pattern[index + 1]
+            if depth or escaped.isalnum():
+                cut()
+                index = _skip_escape(pattern, index)
+                continue
+            index += 2
+            literal = escaped
+        elif char == "[":
+            cut()
+            index = _skip_class(pattern, index)
+            continue
+        elif char == "(":
+            if pattern.startswith("?", index + 1) and pattern[index + 2 : index + 3] in _INLINE_FLAGS:
+                return None
+            cut()
+            depth += 1
+            index += 1
+            continue
+        elif char == ")":
+            depth = max(0, depth - 1)
+            index += 1
+            continue
+        elif char == "|":
+            if depth == 0:
+                return None
+            index += 1
+            continue
+        elif char == "{":
+            cut()
+            closing = pattern.find("}", index)
+            index = closing + 1 if closing >= 0 else index + 1
+            continue
+        elif depth or char in _REGEX_META:
+            cut()
+            index += 1
+            continue
+        else:
+            literal = char
+            index += 1
+        # Un carácter seguido de ?, * o {m,n} puede no aparecer.
+        if index < len(pattern) and pattern[index] in _OPTIONAL_QUANTIFIERS:
+            cut()
+            continue
+        current.append(literal)
+        if index < len(pattern) and pattern[index] == "+":
+            cut()
+    cut()
+    return literals
+
+
+def _skip_escape(pattern: str, index: int) -> int:
+    """Índice justo después del escape completo que empieza en ``index``."""
+    escaped = pattern[index + 1]
+    end = index + 2
+    if escaped in _HEX_ESCAPE_DIGITS:
+        return min(end + _HEX_ESCAPE_DIGITS[escaped], len(pattern))
+    if escaped == "N" and pattern.startswith("{", end):
+        closing = pattern.find("}", end)
+        return closing + 1 if closing >= 0 else len(pattern)
+    if escaped == "0":
+        while end < min(index + 4, len(pattern)) and pattern[end] in _OCTAL_DIGITS:
+            end += 1
+        return end
+    if escaped.isdigit():
+        # ``\123`` es octal; si no, ``\1`` o ``\12`` es una referencia a un grupo.
+        octal = pattern[index + 1 : index + 4]
+        if len(octal) == 3 and set(octal) <= _OCTAL_DIGITS:
+            return index + 4
+        if end < len(pattern) and pattern[end].isdigit():
+            end += 1
+        return end
+    return end
+
+
+def _skip_class(pattern: str, index: int) -> int:
+    index += 1
+    if index < len(pattern) and pattern[index] == "^":
+        index += 1
+    if index < len(pattern) and pattern[index] == "]":
+        index += 1
+    while index < len(pattern) and pattern[index] != "]":
+        index += 2 if pattern[index] == "\\" else 1
+    return index + 1
+
+
+@dataclass(frozen=True)
+class TextMatch:
+    line: int
+    column: int
+    length: int
+    text: str
+
+
+@dataclass
+class SearchRequest:
+    query: str
+    regex: bool = False
+    case_sensitive: bool = False
+    # Contenido de los editores con cambios sin guardar, por ruta.
+    overrides: dict[str, str] = field(default_factory=dict)
+    generation: int = 0
+
+
+class TrigramIndex:
+    """Índice invertido de trigramas de los archivos de las carpetas raíz.
+
+    Cada archivo tiene un número; ``postings`` asocia cada trigrama (en
+    minúsculas) a los números de los archivos que lo contienen. Con la fecha
+    y el tamaño guardados se sabe qué archivos hay que volver a leer.
+    """
+
+    def __init__(self) -> None:
+        self.files: list[tuple[str, int, int] | None] = []
+        self.ids: dict[str, int] = {}
+        self.postings: dict[str, set[int]] = {}
+        self.unindexed: set[int] = set()
+        self._free_ids: list[int] = []
+        self.modified = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def paths(self) -> list[str]:
+        return list(self.ids)
+
+    def is_current(self, path: str, stat: os.stat_result) -> bool:
+        file_id = self.ids.get(path)
+        if file_id is None:
+            return False
+        entry = self.files[file_id]
+        return entry is not None and entry[1] == stat.st_mtime_ns and entry[2] == stat.st_size
+
+    def update(self, paths: list[str]) -> None:
+        """Vuelve a indexar los ``paths`` que cambiaron y quita los que ya no se pueden leer.
+
+        Quitar un archivo recorre todos los trigramas, así que los cambios
+        se quitan de una vez antes de volver a añadirlos.
+        """
+        changed: list[tuple[str, os.stat_result]] = []
+        gone: list[str] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                gone.append(path)
+                continue
+            if not self.is_current(path, stat):
+                changed.append((path, stat))
+        self.remove([*gone, *(path for path, _stat in changed)])
+        for path, stat in changed:
+            self._add(path, stat)
+
+    def remove(self, paths: list[str]) -> None:
+        removed = {self.ids.pop(path) for path in paths if path in self.ids}
+        if not removed:
+            return
+        for file_id in removed:
+            self.files[file_id] = None
+        self.unindexed -= removed
+        self._free_ids.extend(removed)
+        empty: list[str] = []
+        for gram, ids in self.postings.items():
+            ids -= removed
+            if not ids:
+                empty.append(gram)
+        for gram in empty:
+            del self.postings[gram]
+        self.modified = True
+
+    def remove_tree(self, folder: str) -> None:
+        prefix = folder.rstrip(os.sep) + os.sep
+        self.remove([path for path in self.ids if path == folder or path.startswith(prefix)])
+
+    def _add(self, path: str, stat: os.stat_result) -> None:
+        grams: set[str] = set()
+        indexed = stat.st_size <= MAX_INDEXED_BYTES
+        if indexed:
+            try:
+                grams = trigrams(Path(path).read_text(encoding="utf-8", errors="replace"))
+            except OSError:
+                return
+        file_id = self._free_ids.pop() if self._free_ids else len(self.files)
+        if file_id == len(self.files):
+            self.files.append(None)
+        self.files[file_id] = (path, stat.st_mtime_ns, stat.st_size)
+        self.ids[path] = file_id
+        if not indexed:
+            self.unindexed.add(file_id)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(file_id)
+        self.modified = True
+
+    def candidates(self, literals: list[str] | None) -> list[str]:
+        """Archivos que pueden contener todos los ``literals``, ordenados por ruta."""
+        grams: set[str] = set()
+        for literal in literals or []:
+            grams |= trigrams(literal)
+        if not grams:
+            return sorted(self.ids)
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        ids = set(postings[0])
+        for other in postings[1:]:
+            ids &= other
+            if not ids:
+                break
+        ids |= self.unindexed
+        return sorted(entry[0] for entry in map(self.files.__getitem__, ids) if entry is not None)
+
+    def save(self, path: Path) -> None:
+        data = {
+            "version": TEXT_INDEX_VERSION,
+            "files": self.files,
+            "unindexed": sorted(self.unindexed),
+            "postings": {gram: sorted(ids) for gram, ids in self.postings.items()},
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(temporary, path)
+        self.modified = False
+
+    @classmethod
+    def load(cls, path: Path) -> TrigramIndex:
+        index = cls()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return index
+        if not isinstance(data, dict) or data.get("version") != TEXT_INDEX_VERSION:
+            return index
+        try:
+            index.files = [tuple(entry) if entry else None for entry in data["files"]]
+            index.postings = {gram: set(ids) for gram, ids in data["postings"].items()}
+            index.unindexed = set(data.get("unindexed", []))
+        except (KeyError, TypeError, AttributeError):
+            return cls()
+        for file_id, entry in enumerate(index.files):
+            if entry is None:
+                index._free_ids.append(file_id)
+            else:
+                index.ids[entry[0]] = file_id
+        return index
+
+
+def find_matches(pattern: re.Pattern[str], text: str, limit: int) -> list[TextMatch]:
+    """Coincidencias de ``pattern`` en ``text`` con línea y columna (desde 1)."""
+    matches: list[TextMatch] = []
+    line = 1
+    scanned = 0
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+        line += text.count("\n", scanned, start)
+        scanned = start
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", start)
+        if line_end < 0:
+            line_end = len(text)
+        preview = text[line_start:line_end].rstrip("\r")[:MAX_PREVIEW_CHARS]
+        matches.append(TextMatch(line, start - line_start + 1, end - start, preview))
+        if len(matches) >= limit:
+            break
+    return matches
+
+
+def compile_query(request: SearchRequest) -> re.Pattern[str]:
+    """Expresión de la búsqueda; lanza ``re.error`` si la expresión no es válida."""
+    flags = re.MULTILINE if request.case_sensitive else re.MULTILINE | re.IGNORECASE
+    source = request.query if request.regex else re.escape(request.query)
+    return re.compile(source, flags)
+
+
+class TextSearchWorker(QThread):
+    """Hilo dueño del índice de texto: lo mantiene y atiende las búsquedas.
+
+    Todo lo que toca el índice pasa por una cola y se hace aquí, en orden,
+    así que el índice no necesita cerrojos. Una búsqueda nueva deja obsoleta
+    la anterior (``generation``), que se detiene en el siguiente archivo.
+    Antes de buscar se comprueban fecha y tamaño de los archivos indexados,
+    de modo que los cambios hechos fuera del IDE también se ven.
+    """
+
+    file_matched = pyqtSignal(int, str, object)
+    search_finished = pyqtSignal(int, int, int, bool)
+    index_status = pyqtSignal(str)
+
+    def __init__(self, index_path: Path, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._index_path = index_path
+        self._index: TrigramIndex | None = None
+        self._roots: list[str] = []
+        self._jobs: queue.Queue[tuple[str, object] | None] = queue.Queue()
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+
+    def sync_roots(self, roots: list[str]) -> None:
+        self._put("roots", list(roots))
+
+    def update_path(self, path: str) -> None:
+        self._put("update", path)
+
+    def rescan_path(self, folder: str) -> None:
+        self._put("rescan", folder)
+
+    def remove_path(self, path: str) -> None:
+        self._put("remove", path)
+
+    def search(self, request: SearchRequest) -> int:
+        with self._generation_lock:
+            self._generation += 1
+            request.generation = self._generation
+        self._put("search", request)
+        return request.generation
+
+    def cancel_search(self) -> None:
+        with self._generation_lock:
+            self._generation += 1
+
+    def shutdown(self, timeout_ms: int = 10000) -> None:
+        """Guarda el índice si cambió y detiene el hilo."""
+        if self.isRunning():
+            self.cancel_search()
+            self._jobs.put(None)
+            self.wait(timeout_ms)
+
+    def run(self) -> None:  # type: ignore[override]
+        self._index = TrigramIndex.load(self._index_path)
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._save()
+                return
+            kind, argument = job
+            if kind == "roots":
+                self._sync_roots(argument)
+            elif kind == "update":
+                self._index.update([argument])
+            elif kind == "rescan":
+                self._rescan(argument)
+            elif kind == "remove":
+                self._index.remove([argument])
+                self._index.remove_tree(argument)
+            elif kind == "search":
+                self._search(argument)
+
+    def _put(self, kind: str, argument: object) -> None:
+        if not self.isRunning():
+            self.start()
+        self._jobs.put((kind, argument))
+
+    def _save(self) -> None:
+        if self._index is not None and self._index.modified:
+            try:
+                self._index.save(self._index_path)
+            except OSError:
+                pass
+
+    def _sync_roots(self, roots: list[str]) -> None:
+        self._roots = roots
+        self._index.remove([path for path in self._index.paths() if self._root_for(path) is None])
+        for root in roots:
+            self._rescan(root)
+        self._save()
+        self.index_status.emit(f"{len(self._index)} archivos indexados")
+
+    def _rescan(self, folder: str) -> None:
+        """Pone al día todo lo que cuelga de ``folder``."""
+        root = self._root_for(folder)
+        if root is None:
+            return
+        prefix = folder.rstrip(os.sep) + os.sep
+        found = {os.path.join(folder, *relative.split("/")) for relative in walk_root(folder)}
+        self._index.remove([path for path in self._index.paths() if path.startswith(prefix) and path not in found])
+        self._index.update(sorted(found))
+
+    def _root_for(self, path: str) -> str | None:
+        for root in self._roots:
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    def _current(self, generation: int) -> bool:
+        with self._generation_lock:
+            return generation == self._generation
+
+    def _search(self, request: SearchRequest) -> None:
+        generation = request.generation
+        if not self._current(generation):
+            return
+        # Recorrer las raíces cuesta poco comparado con leer archivos y
+        # recoge lo creado o editado fuera del IDE en carpetas no vigiladas.
+        for root in self._roots:
+            self._rescan(root)
+        try:
+            pattern = compile_query(request)
+        except re.error:
+            self.search_finished.emit(generation, 0, 0, False)
+            return
+        literals = required_literals(request.query) if request.regex else [request.query]
+        candidates = self._index.candidates(literals)
+        # Los editores con cambios se buscan siempre: el índice refleja el disco.
+        extra = [path for path in request.overrides if self._root_for(path)]
+        files = matches = 0
+        truncated = False
+        for path in sorted(set(candidates) | set(extra)):
+            if not self._current(generation):
+                return
+            text = request.overrides.get(path)
+            if text is None:
+                try:
+                    text = Path(path).read_text(encoding="utf-8", errors="replace")
+                except OSError:
+                    continue
+            found = find_matches(pattern, text, MAX_SEARCH_MATCHES - matches)
+            if not found:
+                continue
+            files += 1
+            matches += len(found)
+            self.file_matched.emit(generation, path, found)
+            if matches >= MAX_SEARCH_MATCHES:
+                truncated = True
+                break
+        self.search_finished.emit(generation, files, matches, truncated)
@@ -0,0 +1,39 @@
+from ide.skuld.analysis import DocumentAnalyzer
+from ide.skuld.incremental_lexer import IncrementalLexer
+
+SOURCE = """labmem worldline total = 0;
+/* comentario
+   de bloque */
+steiner worldline doble(worldline n) {
+    return n * 2;
+}
+gate {
+    total = doble(21);
+    dmail << total;
+}
+"""
+
+
+def test_analysis_from_lexer_snapshot_matches_full_tokenization():
+    lexer = IncrementalLexer(SOURCE)
+    lines = SOURCE.split("\n")
+    lines[4:5] = ["    labmem worldline m = n;", "    return m * 2 @;"]
+    lexer.update(4, 1, lines[4:6])
+    source = "\n".join(lines)
+
+    incremental = DocumentAnalyzer().analyze(source, 1, lexer=lexer.snapshot())
+    full = DocumentAnalyzer().analyze(source, 1)
+    assert incremental.tokens_text == full.tokens_text
+    assert incremental.syntax_text == full.syntax_text
+    assert incremental.semantic_text == full.semantic_text
+    assert incremental.diagnostics == full.diagnostics
+    assert incremental.diagnostics
+
+
+def test_snapshot_is_not_affected_by_later_edits():
+    lexer = IncrementalLexer(SOURCE)
+    snapshot = lexer.snapshot()
+    before, _diagnostics = snapshot.tokens()
+    lexer.update(0, 0, ["", "", "/* abre"])
+    after, _diagnostics = snapshot.tokens()
+    assert [(token.kind, token.line) for token in after] == [(token.kind, token.line) for token in before]
@@ -0,0 +1,23 @@
+from ide.skuld.bytecode import _constant_key
+from ide.skuld.phases import pipeline_for
+
+SOURCE = """
+gate {
+    labmem worldline x = 0;
+    labmem divergence y = 0.0;
+    x = x - 3;
+    x = x + 3;
+    x = x - 1;
+    x = x + -1;
+    y = y - 0.0;
+    y = y + 0.0;
+    dmail << x << " " << y;
+}
+"""
+
+
+def test_fusion_reuses_constants():
+    constants = pipeline_for(SOURCE).bytecode().constants
+    keys = [_constant_key(value) for value in constants]
+    assert len(keys) == len(set(keys))
+    assert {3, -3, 1, -1} <= set(constants)
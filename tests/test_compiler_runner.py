@@ -0,0 +1,83 @@
+import shlex
+import sys
+import time
+
+import pytest
+from PyQt5.QtCore import Qt
+
+from ide.compiler_runner import run_compiler, run_in_process, shutdown_compiler_server
+from ide.compiler_task import CompilerTask
+from ide.output_stream import OutputStream
+from ide.skuld.phases import ENGINES, PhaseOptions
+
+
+def write_source(tmp_path):
+    path = tmp_path / "programa.stn"
+    path.write_text("gate {\n    labmem worldline x = 2 + 3;\n    dmail << x;\n}\n", encoding="utf-8")
+    return str(path)
+
+
+def test_in_process_phase_includes_earlier_stages(tmp_path):
+    result = run_in_process("semantico", write_source(tmp_path))
+    assert result.returncode == 0
+    assert list(result.stages) == ["lexico", "sintactico"]
+    assert all(result.stages.values())
+
+
+def test_pipeline_runs_skip_earlier_stages(tmp_path):
+    source_path = write_source(tmp_path)
+    result = run_in_process("semantico", source_path, with_stages=False)
+    assert result.stages == {}
+    assert result.stdout == run_in_process("semantico", source_path).stdout
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_cancelled_task_finishes(qapp, tmp_path, engine):
+    path = tmp_path / "infinito.stn"
+    path.write_text("gate {\n    labmem worldline x = 0;\n    loop (true) { x = x + 1; }\n}\n", encoding="utf-8")
+    output = OutputStream()
+    task = CompilerTask("ejecucion", str(path), options=PhaseOptions(engine=engine), output=output)
+    results = []
+    task.result_ready.connect(lambda _phase, result: results.append(result), Qt.DirectConnection)
+    task.start()
+    time.sleep(0.2)
+    task.cancel()
+    assert task.wait(5000)
+    assert results[0].cancelled
+
+
+FAKE_COMPILER = """
+import json
+import pathlib
+import sys
+
+crashed = pathlib.Path(sys.argv[1])
+if sys.argv[2:] != ["--servidor"]:
+    print("una sola ejecucion")
+    sys.exit(0)
+for line in sys.stdin:
+    message = json.loads(line)
+    if message["phase"] == "ping":
+        reply = {"id": 0, "pong": True}
+    elif not crashed.exists():
+        crashed.touch()
+        sys.exit(3)
+    else:
+        reply = {"id": message["id"], "returncode": 0, "stdout": "servidor", "stderr": ""}
+    print(json.dumps(reply), flush=True)
+"""
+
+
+def test_server_crash_falls_back_and_restarts(tmp_path, monkeypatch):
+    script = tmp_path / "compilador.py"
+    script.write_text(FAKE_COMPILER, encoding="utf-8")
+    command = shlex.join([sys.executable, str(script), str(tmp_path / "caido")])
+    monkeypatch.setenv("SKULD_COMPILER_CMD", command)
+    source_path = write_source(tmp_path)
+    try:
+        first = run_compiler("lexico", source_path, use_server=True)
+        second = run_compiler("lexico", source_path, use_server=True)
+    finally:
+        shutdown_compiler_server()
+    assert (first.returncode, first.stdout.strip()) == (0, "una sola ejecucion")
+    assert (second.returncode, second.stdout) == (0, "servidor")
@@ -0,0 +1,324 @@
+"""El mismo programa debe dar la misma salida en los tres motores y en cada nivel de optimización."""
+
+import re
+
+import pytest
+
+from ide.skuld.phases import ENGINES, PhaseOptions, execution_phase
+
+OPT_LEVELS = (0, 2)
+CONFIGURATIONS = [(engine, opt_level) for engine in ENGINES for opt_level in OPT_LEVELS]
+
+# El motor de Python sitúa los errores por sentencia y las máquinas por
+# operación, así que de un error solo se comparan la línea y el mensaje.
+_ERROR_COLUMN = re.compile(r"^(ERROR_\w+\(\d+), \d+\)")
+
+
+def run(source: str, engine: str, opt_level: int, stdin: str = "") -> tuple[str, str]:
+    output, errors = execution_phase(source, PhaseOptions(opt_level=opt_level, stdin=stdin, engine=engine))
+    return output, _ERROR_COLUMN.sub(r"\1)", errors)
+
+
+def assert_agree(source: str, output: str, error: str = "", stdin: str = "") -> None:
+    results = {configuration: run(source, *configuration, stdin=stdin) for configuration in CONFIGURATIONS}
+    assert results == {configuration: (output, error) for configuration in CONFIGURATIONS}
+
+
+def test_globals_read_before_their_initializer_hold_the_zero_value():
+    assert_agree(
+        """
+labmem worldline a = b + 1;
+labmem worldline b = 2;
+labmem dmail s = t + "!";
+labmem dmail t = "x";
+gate { dmail << a << " " << b << " " << s; }
+""",
+        "1 2 !\n",
+    )
+
+
+def test_negative_zero_keeps_its_sign():
+    assert_agree(
+        """
+gate {
+    labmem divergence z = 0.0;
+    labmem divergence n = -0.0;
+    dmail << z << " " << n << " " << 0.0 * -1.0 << " " << z * -1.0;
+}
+""",
+        "0.0 -0.0 -0.0 -0.0\n",
+    )
+
+
+def test_subtracting_zero_keeps_negative_zero():
+    assert_agree(
+        """
+gate {
+    labmem divergence n = -0.0;
+    labmem divergence z = 0.0;
+    n = n - 0.0;
+    z = z + 0.0;
+    dmail << n << " " << z;
+}
+""",
+        "-0.0 0.0\n",
+    )
+
+
+@pytest.mark.parametrize("operation", ["a / 0", "a % 0", "a / b", "a % b", "1.5 / c", "1.5 / (c - 0.0)"])
+def test_unused_division_by_zero_still_traps(operation):
+    assert_agree(
+        f"""
+gate {{
+    labmem worldline a = 5;
+    labmem worldline b = 0;
+    labmem divergence c = 0.0;
+    dmail << "antes";
+    labmem divergence x = {operation};
+    dmail << "despues";
+}}
+""",
+        "antes\n",
+        "ERROR_EJECUCION(7): División entre cero",
+    )
+
+
+def test_unused_division_by_a_nonzero_constant_is_harmless():
+    assert_agree(
+        """
+gate {
+    labmem worldline a = 5;
+    labmem worldline x = a / 2;
+    labmem worldline y = a % 3;
+    dmail << "fin";
+}
+""",
+        "fin\n",
+    )
+
+
+PROGRAMS = {
+    "aritmetica": (
+        """
+gate {
+    labmem worldline a = 17;
+    labmem worldline b = -5;
+    labmem divergence x = 7.5;
+    dmail << a / b << " " << a % b << " " << b / 2 << " " << b % 3;
+    dmail << a / 2.0 << " " << x * 2 << " " << x - a << " " << -x;
+    a += 3;
+    a -= 1;
+    a *= 2;
+    a /= 4;
+    x /= 2;
+    dmail << a << " " << x;
+    dmail << (a > 5 and not (x < 1.0)) << " " << (a == 9 or false) << " " << (a != 9);
+}
+""",
+        "-3 2 -2 -2\n8.5 15.0 -9.5 -7.5\n9 3.75\ntrue true false\n",
+        "",
+        "",
+    ),
+    "bucles": (
+        """
+steiner worldline suma(worldline n) {
+    labmem worldline total = 0;
+    shift (labmem worldline i = 1; i <= n; i++) {
+        choice (i % 2 == 0) {
+            total += i;
+        } else {
+            total -= 1;
+        }
+    }
+    return total;
+}
+
+gate {
+    labmem worldline i = 0;
+    loop (true) {
+        i++;
+        choice (i > 4) {
+            jump;
+        }
+        dmail << "vuelta " << i << " pre " << ++i << " post " << i--;
+    }
+    dmail << suma(10) << " " << i;
+    shift (labmem worldline j = 0, k = 10; j < k; j += 3) {
+        dmail << j << "," << k;
+        k--;
+    }
+}
+""",
+        "vuelta 1 pre 2 post 2\nvuelta 2 pre 3 post 3\nvuelta 3 pre 4 post 4\nvuelta 4 pre 5 post 5\n"
+        "25 5\n0,10\n3,9\n6,8\n",
+        "",
+        "",
+    ),
+    "cadenas": (
+        """
+labmem dmail saludo = "El Psy";
+
+steiner dmail repetir(dmail texto, worldline veces) {
+    labmem dmail resultado = "";
+    shift (; veces > 0; veces--) {
+        resultado = resultado + texto;
+    }
+    return resultado;
+}
+
+steiner reading par(worldline n) {
+    return n % 2 == 0;
+}
+
+gate {
+    dmail(saludo + " " + "Kongroo");
+    dmail << repetir("ab", 3) << "|" << 1 + 2 << "|" << "x" + 1 + 2 << "|" << 1.5 + "y";
+    dmail << par(4) << " " << par(7) << " " << (par(2) == true);
+}
+""",
+        "El Psy Kongroo\nababab|3|x12|1.5y\ntrue false true\n",
+        "",
+        "",
+    ),
+    "recursion": (
+        """
+steiner worldline fib(worldline n) {
+    choice (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+steiner worldline mcd(worldline a, worldline b) {
+    loop (b != 0) {
+        labmem worldline t = b;
+        b = a % b;
+        a = t;
+    }
+    return a;
+}
+
+gate {
+    shift (labmem worldline n = 0; n < 12; n++) {
+        dmail << fib(n) << " ";
+    }
+    dmail << mcd(1071, 462);
+}
+""",
+        "0 \n1 \n1 \n2 \n3 \n5 \n8 \n13 \n21 \n34 \n55 \n89 \n21\n",
+        "",
+        "",
+    ),
+    "entrada": (
+        """
+gate {
+    labmem worldline n;
+    labmem divergence factor;
+    labmem dmail nombre;
+    sphone >> nombre >> n >> factor;
+    dmail << nombre << ": " << n * factor;
+    sphone >> n;
+}
+""",
+        "Okabe: 4.5\n",
+        "ERROR_EJECUCION(8): No hay más datos de entrada para 'sphone'",
+        "Okabe\n3\n1.5\n",
+    ),
+    "efectos_en_operandos": (
+        """
+labmem worldline g = 4;
+
+steiner worldline f(worldline a, worldline b) {
+    g++;
+    return a * 10 + b;
+}
+
+steiner worldline h() {
+    g++;
+    return 0;
+}
+
+gate {
+    labmem worldline x = g + h();
+    dmail << x << " " << g;
+    g = 3;
+    g -= h();
+    dmail << g;
+    g = 4;
+    dmail << f(g, f(1, 2));
+    labmem worldline i = 1;
+    labmem worldline y = i + i++;
+    labmem worldline z = i * (i = 7);
+    i += i++;
+    dmail << y << " " << z << " " << i;
+}
+""",
+        "4 5\n3\n52\n2 14 14\n",
+        "",
+        "",
+    ),
+}
+
+
+@pytest.mark.parametrize("name", PROGRAMS)
+def test_program_agrees_everywhere(name):
+    source, output, error, stdin = PROGRAMS[name]
+    assert_agree(source, output, error, stdin=stdin)
+
+
+@pytest.mark.parametrize("engine, opt_level", CONFIGURATIONS)
+def test_configuration_runs(engine, opt_level):
+    assert run('gate { dmail << "El Psy Kongroo"; }', engine, opt_level) == ("El Psy Kongroo\n", "")
+
+
+def test_function_without_return_gives_the_default_value():
+    assert_agree(
+        """
+steiner worldline entero(worldline x) {
+    choice (x > 0) {
+        return x;
+    }
+}
+
+steiner divergence real() {
+    labmem divergence y = 1.5;
+}
+
+steiner reading logico() {
+}
+
+steiner dmail texto() {
+}
+
+gate {
+    dmail << entero(-1) << " " << entero(3) << " " << real() << " " << logico() << " [" << texto() << "]";
+}
+""",
+        "0 3 0.0 false []\n",
+    )
+
+
+@pytest.mark.parametrize(
+    "depth, output, error",
+    [
+        (8000, "8000\n", ""),
+        (12000, "", "ERROR_EJECUCION(6): Desbordamiento de la pila de llamadas"),
+    ],
+)
+def test_deep_recursion(depth, output, error):
+    assert_agree(
+        f"""
+steiner worldline f(worldline n) {{
+    choice (n == 0) {{
+        return 0;
+    }}
+    return f(n - 1) + 1;
+}}
+
+gate {{
+    dmail << f({depth});
+}}
+""",
+        output,
+        error,
+    )
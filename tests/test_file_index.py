@@ -0,0 +1,112 @@
+import random
+import re
+import string
+
+import pytest
+
+from ide.file_index import CANDIDATE_FRACTION, FileIndex, RootFiles
+
+WORDS = ["src", "lib", "core", "util", "test", "ide", "skuld", "main", "parser", "vm"]
+
+
+def make_paths(count, seed=7):
+    generator = random.Random(seed)
+    paths = set()
+    while len(paths) < count:
+        folders = [generator.choice(WORDS) + str(generator.randint(0, 9)) for _ in range(generator.randint(1, 4))]
+        name = "".join(generator.choice(string.ascii_lowercase) for _ in range(generator.randint(3, 9)))
+        paths.add("/".join(folders) + "/" + name + generator.choice([".stn", ".py"]))
+    return sorted(paths)
+
+
+def expected(paths, query, limit):
+    """Clasificación por fuerza bruta con los niveles de FileIndex.search."""
+    needle = "".join(query.lower().split())
+    letters = re.compile(".*?".join(map(re.escape, needle)))
+    ranked = []
+    for row, path in enumerate(paths):
+        display = f"proyecto/{path}".lower()
+        name = display.rpartition("/")[2]
+        tiers = [needle in display, bool(letters.search(display))]
+        if "/" not in needle:
+            tiers[:0] = [name.startswith(needle), needle in name, bool(letters.search(name))]
+        if any(tiers):
+            ranked.append((tiers.index(True), row))
+    return [f"proyecto/{paths[row]}" for _tier, row in sorted(ranked)[:limit]]
+
+
+@pytest.fixture(scope="module")
+def paths():
+    return make_paths(3000)
+
+
+@pytest.mark.parametrize("query", ["srccoreparser", "testmainvm.py", "lib3/core", "zzqx", "skuld7util", "mainstn"])
+def test_search_while_typing_matches_a_full_ranking(paths, query):
+    index = FileIndex()
+    index.set_root("/w/proyecto", paths)
+    for length in range(1, len(query) + 1):
+        shown = [display for _path, display in index.search(query[:length], limit=8)]
+        assert shown == expected(paths, query[:length], 8), query[:length]
+
+
+def test_unrelated_queries_do_not_reuse_earlier_scans(paths):
+    index = FileIndex()
+    index.set_root("/w/proyecto", paths)
+    for query in ["parsertest", "src", "corevm", "c", "utilmain.py", "ide/"]:
+        shown = [display for _path, display in index.search(query, limit=8)]
+        assert shown == expected(paths, query, 8), query
+
+
+def test_index_changes_discard_earlier_scans(paths):
+    index = FileIndex()
+    index.set_root("/w/proyecto", paths)
+    index.search("zzq", limit=8)
+    index.add_file("/w/proyecto/nuevo/zzqa.stn")
+    shown = [display for _path, display in index.search("zzqa", limit=8)]
+    assert shown[0] == "proyecto/nuevo/zzqa.stn"
+
+
+def test_prepared_root_files_search_like_a_plain_list(paths):
+    files = RootFiles("/w/proyecto", paths)
+    files.prepare()
+    index = FileIndex()
+    index.set_root("/w/proyecto", files)
+    for query in ["qz", "mainstn", "src/", "zzqx"]:
+        shown = [display for _path, display in index.search(query, limit=8)]
+        assert shown == expected(paths, query, 8), query
+
+
+def test_rare_letters_are_searched_among_candidate_rows_only(paths):
+    files = RootFiles("/w/proyecto", paths)
+    files.prepare()
+    assert 0 < files._marks(set("qzx"), False).count(1) <= CANDIDATE_FRACTION * len(paths)
+    index = FileIndex()
+    index.set_root("/w/proyecto", files)
+    for query in ["qzx", "xq", "qz.py"]:
+        shown = [display for _path, display in index.search(query, limit=100)]
+        assert shown == expected(paths, query, 100), query
+
+
+def test_added_and_removed_files_keep_the_prefilter_consistent(paths):
+    files = RootFiles("/w/proyecto", paths[:500])
+    files.prepare()
+    index = FileIndex()
+    index.set_root("/w/proyecto", files)
+    for path in paths[500:600]:
+        index.add_file("/w/proyecto/" + path)
+    index.remove_file("/w/proyecto/" + paths[10])
+    index.remove_tree("/w/proyecto/" + paths[20].partition("/")[0])
+    fresh = RootFiles("/w/proyecto", files.files)
+    fresh.prepare()
+    assert files._path_flags == fresh._path_flags
+    assert files._name_flags == fresh._name_flags
+    shown = [display for _path, display in index.search("mainvm", limit=20)]
+    assert shown == expected(files.files, "mainvm", 20)
+
+
+def test_results_from_several_roots_are_ordered_by_tier_then_root():
+    index = FileIndex()
+    index.set_root("/w/uno", ["lib/parser.stn", "parser/otro.stn"])
+    index.set_root("/w/dos", ["dos/parser.stn", "parser.py/nada.stn"])
+    shown = [display for _path, display in index.search("parser")]
+    assert shown == ["uno/lib/parser.stn", "dos/dos/parser.stn", "uno/parser/otro.stn", "dos/parser.py/nada.stn"]
@@ -0,0 +1,147 @@
+import os
+import time
+
+import pytest
+from PyQt5.QtCore import QtWarningMsg, qInstallMessageHandler
+from PyQt5.QtGui import QIcon
+from PyQt5.QtTest import QAbstractItemModelTester
+
+from ide.file_explorer import FileTreeModel
+
+
+@pytest.fixture
+def model(qapp):
+    warnings = []
+
+    def handler(kind, _context, message):
+        if kind >= QtWarningMsg:
+            warnings.append(message)
+
+    previous = qInstallMessageHandler(handler)
+    model = FileTreeModel(QIcon(), QIcon())
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+    yield model
+    model.shutdown()
+    del tester
+    qInstallMessageHandler(previous)
+    assert warnings == []
+
+
+def wait_for_scan(qapp, node):
+    deadline = time.monotonic() + 5
+    while node.pending and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    assert not node.pending
+
+
+def load(qapp, model, node):
+    model.fetchMore(model.index_for_node(node))
+    wait_for_scan(qapp, node)
+
+
+def refresh(qapp, model, node):
+    model.refresh_folder(node.path)
+    wait_for_scan(qapp, node)
+
+
+def names(node):
+    return [child.name for child in node.children]
+
+
+def make_tree(root):
+    (root / "src").mkdir()
+    (root / "src" / "main.stn").write_text("gate {}")
+    (root / "docs").mkdir()
+    (root / "b.stn").write_text("")
+    (root / "a.txt").write_text("")
+    (root / "oculto.py").write_text("")
+    (root / ".git").mkdir()
+
+
+def test_first_load_lists_visible_entries_folders_first(qapp, model, tmp_path):
+    make_tree(tmp_path)
+    root = model.node(model.add_root(tmp_path))
+    load(qapp, model, root)
+    assert names(root) == ["docs", "src", "a.txt", "b.stn"]
+    assert [child.row for child in root.children] == [0, 1, 2, 3]
+    assert model.rowCount(model.index_for_node(root)) == 4
+
+
+def test_rescan_merges_additions_and_removals(qapp, model, tmp_path):
+    make_tree(tmp_path)
+    root = model.node(model.add_root(tmp_path))
+    load(qapp, model, root)
+    kept = root.children[3]
+    changes = []
+    model.files_changed.connect(lambda added, removed: changes.append((added, removed)))
+
+    (tmp_path / "a.txt").unlink()
+    (tmp_path / "docs").rmdir()
+    (tmp_path / "c.stn").write_text("")
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "0.stn").write_text("")
+    refresh(qapp, model, root)
+
+    assert names(root) == ["lib", "src", "0.stn", "b.stn", "c.stn"]
+    assert [child.row for child in root.children] == list(range(5))
+    assert root.children[3] is kept
+    assert model.folder_node(str(tmp_path / "docs")) is None
+    assert model.folder_node(str(tmp_path / "lib")) is root.children[0]
+    [(added, removed)] = changes
+    assert sorted(added) == [
+        (str(tmp_path / "0.stn"), False),
+        (str(tmp_path / "c.stn"), False),
+        (str(tmp_path / "lib"), True),
+    ]
+    assert sorted(removed) == [(str(tmp_path / "a.txt"), False), (str(tmp_path / "docs"), True)]
+
+
+def test_rename_on_disk_moves_the_same_row(qapp, model, tmp_path):
+    make_tree(tmp_path)
+    root = model.node(model.add_root(tmp_path))
+    load(qapp, model, root)
+    node = root.children[3]
+    changes = []
+    model.files_changed.connect(lambda added, removed: changes.append((added, removed)))
+
+    os.rename(tmp_path / "b.stn", tmp_path / "0.stn")
+    refresh(qapp, model, root)
+
+    assert names(root) == ["docs", "src", "0.stn", "a.txt"]
+    assert root.children[2] is node
+    assert node.path == str(tmp_path / "0.stn")
+    assert changes == [([(str(tmp_path / "0.stn"), False)], [(str(tmp_path / "b.stn"), False)])]
+
+
+def test_rename_path_rekeys_loaded_folders(qapp, model, tmp_path):
+    make_tree(tmp_path)
+    root = model.node(model.add_root(tmp_path))
+    load(qapp, model, root)
+    src = model.folder_node(str(tmp_path / "src"))
+    load(qapp, model, src)
+
+    os.rename(tmp_path / "src", tmp_path / "codigo")
+    model.rename_path(str(tmp_path / "src"), str(tmp_path / "codigo"))
+
+    assert names(root) == ["codigo", "docs", "a.txt", "b.stn"]
+    assert model.folder_node(str(tmp_path / "src")) is None
+    assert model.folder_node(str(tmp_path / "codigo")) is src
+    assert src.children[0].path == str(tmp_path / "codigo" / "main.stn")
+    refresh(qapp, model, src)
+    assert names(src) == ["main.stn"]
+
+
+def test_file_replaced_by_a_folder_is_not_a_rename(qapp, model, tmp_path):
+    make_tree(tmp_path)
+    root = model.node(model.add_root(tmp_path))
+    load(qapp, model, root)
+    old = root.children[3]
+
+    (tmp_path / "b.stn").unlink()
+    (tmp_path / "b.stn").mkdir()
+    refresh(qapp, model, root)
+
+    assert names(root) == ["b.stn", "docs", "src", "a.txt"]
+    assert root.children[0] is not old
+    assert root.children[0].is_dir
@@ -0,0 +1,61 @@
+from ide.skuld.incremental_parser import IncrementalParser
+from ide.skuld.lexer import tokenize
+from ide.skuld.parser import parse
+from ide.skuld.syntax_tree import Node, format_tree
+
+SOURCE = """labmem worldline total = 0;
+
+steiner worldline doble(worldline n) {
+    return n * 2;
+}
+
+steiner worldline triple(worldline n) {
+    return n * 3;
+}
+
+steiner void saluda() {
+    dmail << "hola";
+}
+
+gate {
+    dmail << doble(2) + triple(3);
+    saluda();
+}
+"""
+
+
+def parse_incrementally(parser: IncrementalParser, source: str) -> Node:
+    tokens, _diagnostics = tokenize(source)
+    program, _diagnostics = parser.parse(tokens)
+    return program
+
+
+def items_by_name(program: Node) -> dict[str, Node]:
+    return {str(item.value or item.kind): item for item in program.children}
+
+
+def test_untouched_top_level_nodes_are_reused():
+    parser = IncrementalParser()
+    before = items_by_name(parse_incrementally(parser, SOURCE))
+    edited = SOURCE.replace("return n * 3;", "return n * 3 + 1;")
+    after_program = parse_incrementally(parser, edited)
+    after = items_by_name(after_program)
+
+    assert after["triple"] is not before["triple"]
+    for name in ("total", "doble", "saluda", "Gate"):
+        assert after[name] is before[name]
+    assert parser.parsed_count == 1
+    assert format_tree(after_program) == format_tree(parse(tokenize(edited)[0])[0])
+
+
+def test_reused_nodes_follow_inserted_lines():
+    parser = IncrementalParser()
+    before = items_by_name(parse_incrementally(parser, SOURCE))
+    edited = SOURCE.replace("    return n * 2;\n", "    labmem worldline m = n;\n    return m * 2;\n")
+    after_program = parse_incrementally(parser, edited)
+    after = items_by_name(after_program)
+
+    assert after["doble"] is not before["doble"]
+    assert after["saluda"] is before["saluda"]
+    assert after["saluda"].line == 12
+    assert format_tree(after_program) == format_tree(parse(tokenize(edited)[0])[0])
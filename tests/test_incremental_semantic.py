@@ -0,0 +1,57 @@
+from ide.skuld.incremental_parser import IncrementalParser
+from ide.skuld.incremental_semantic import IncrementalSemanticAnalyzer
+from ide.skuld.lexer import tokenize
+from ide.skuld.semantic import analyze, format_semantic
+
+SOURCE = """labmem worldline total = 0;
+
+steiner worldline suma(worldline n) {
+    labmem worldline acumulado = 0;
+    shift (labmem worldline i = 0; i < n; i++) {
+        labmem worldline paso = i;
+        acumulado += paso;
+    }
+    return acumulado;
+}
+
+gate {
+    choice (total == 0) {
+        labmem worldline dentro = suma(3);
+        dmail << dentro;
+    }
+}
+"""
+
+
+def analyze_both(incremental: IncrementalSemanticAnalyzer, parser: IncrementalParser, source: str):
+    program, _diagnostics = parser.parse(tokenize(source)[0])
+    full_program = IncrementalParser().parse(tokenize(source)[0])[0]
+    return incremental.analyze(program), analyze(full_program)
+
+
+def test_incremental_matches_full_analysis_after_lines_shift():
+    parser = IncrementalParser()
+    incremental = IncrementalSemanticAnalyzer()
+    analyze_both(incremental, parser, SOURCE)
+
+    edited = SOURCE.replace("labmem worldline total = 0;\n", "labmem worldline total = 0;\n\n\n// nuevo\n")
+    result, full = analyze_both(incremental, parser, edited)
+
+    assert incremental.reused_count > 0
+    assert result.symbols == full.symbols
+    assert format_semantic(result) == format_semantic(full)
+    scopes = {symbol.name: symbol.scope for symbol in result.symbols}
+    assert scopes["paso"] == "suma › shift 8 › bloque 8"
+    assert scopes["dentro"] == "gate › bloque 16"
+
+
+def test_incremental_matches_full_analysis_after_an_edit_and_shift():
+    parser = IncrementalParser()
+    incremental = IncrementalSemanticAnalyzer()
+    analyze_both(incremental, parser, SOURCE)
+
+    edited = SOURCE.replace("    return acumulado;\n", "    dmail << acumulado;\n\n    return acumulado;\n")
+    result, full = analyze_both(incremental, parser, edited)
+
+    assert result.symbols == full.symbols
+    assert result.diagnostics == full.diagnostics
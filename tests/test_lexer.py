@@ -0,0 +1,63 @@
+from ide.skuld.lexer import STATE_BLOCK_COMMENT, tokenize, tokenize_line
+
+
+def kinds(source: str) -> list[str]:
+    tokens, _diagnostics = tokenize(source)
+    return [token.kind for token in tokens]
+
+
+def test_keywords_literals_and_positions():
+    tokens, diagnostics = tokenize('labmem worldline x = 10;\ndmail << "hola" + 1.5;')
+    assert not diagnostics
+    assert [(token.kind, token.lexeme, token.line, token.column) for token in tokens[:5]] == [
+        ("KW_LABMEM", "labmem", 1, 1),
+        ("KW_WORLDLINE", "worldline", 1, 8),
+        ("IDENTIFIER", "x", 1, 18),
+        ("ASSIGN", "=", 1, 20),
+        ("INTEGER_LITERAL", "10", 1, 22),
+    ]
+    assert kinds('dmail << "hola" + 1.5;') == [
+        "KW_DMAIL",
+        "STREAM_OUT",
+        "STRING_LITERAL",
+        "PLUS",
+        "FLOAT_LITERAL",
+        "SEMICOLON",
+    ]
+
+
+def test_compound_operators_use_maximal_munch():
+    assert kinds("a += b++ <= c && !d") == [
+        "IDENTIFIER",
+        "PLUS_ASSIGN",
+        "IDENTIFIER",
+        "INC",
+        "LTE",
+        "IDENTIFIER",
+        "AND_OP",
+        "NOT_OP",
+        "IDENTIFIER",
+    ]
+
+
+def test_comments_are_dropped_unless_requested():
+    source = "x // fin\n/* varias\nlíneas */ y"
+    assert kinds(source) == ["IDENTIFIER", "IDENTIFIER"]
+    tokens, _diagnostics = tokenize(source, keep_comments=True)
+    assert [token.kind for token in tokens].count("COMMENT") == 3
+
+
+def test_block_comment_state_crosses_lines():
+    tokens, state = tokenize_line("x /* abre", 1)
+    assert state == STATE_BLOCK_COMMENT
+    tokens, state = tokenize_line("sigue */ y", 2, state)
+    assert [token.kind for token in tokens] == ["COMMENT", "IDENTIFIER"]
+    assert tokens[1].column == 10
+
+
+def test_lexical_errors_are_reported_with_position():
+    _tokens, diagnostics = tokenize('x = "abierta\n@')
+    assert [(diagnostic.line, diagnostic.column) for diagnostic in diagnostics] == [(1, 5), (2, 1)]
+    _tokens, diagnostics = tokenize("/* sin cerrar\nx")
+    assert len(diagnostics) == 1 and diagnostics[0].line == 1
+
@@ -0,0 +1,83 @@
+import os
+import threading
+
+from ide.output_stream import MAX_PENDING_BYTES, OutputStream
+
+
+def test_drain_returns_every_complete_line_since_the_last_call():
+    output = OutputStream()
+    for index in range(10_000):
+        output.write(f"linea {index}\n")
+    output.write("sin salto")
+    text = output.drain()
+    assert text.count("\n") == 10_000
+    assert output.drain() == ""
+    output.close()
+    assert output.drain() == "sin salto"
+
+
+def test_write_blocks_on_pending_bytes_until_drained():
+    output = OutputStream(cap_bytes=4 * MAX_PENDING_BYTES)
+    line = "x" * 1023 + "\n"
+    finished = threading.Event()
+
+    def produce():
+        for _ in range(2 * MAX_PENDING_BYTES // len(line)):
+            output.write(line)
+        finished.set()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    assert not finished.wait(0.3)
+    received = output.drain()
+    assert len(received) == MAX_PENDING_BYTES
+    assert finished.wait(5)
+    received += output.drain()
+    producer.join()
+    assert received == line * (2 * MAX_PENDING_BYTES // len(line))
+
+
+def test_cancel_releases_a_blocked_writer():
+    output = OutputStream(cap_bytes=4 * MAX_PENDING_BYTES)
+    output.write("x" * (MAX_PENDING_BYTES - 1) + "\n")
+    producer = threading.Thread(target=output.write, args=("y\n",), daemon=True)
+    producer.start()
+    output.cancel_event.set()
+    producer.join(5)
+    assert not producer.is_alive()
+
+
+def test_output_over_the_cap_spills_to_a_file():
+    output = OutputStream(cap_bytes=10)
+    output.write("uno\ndos\ntres\ncuatro\n")
+    output.close()
+    assert output.drain() == "uno\ndos\n"
+    with open(output.spill_path, encoding="utf-8") as spill:
+        assert spill.read() == "tres\ncuatro\n"
+    os.remove(output.spill_path)
+
+
+def test_sizes_count_utf8_bytes():
+    output = OutputStream(cap_bytes=17)
+    output.write("ñandú\n")
+    output.write("😀😀\n")
+    output.write("más\n")
+    output.close()
+    assert output.total_bytes == 8 + 9 + 5
+    assert output.drain() == "ñandú\n😀😀\n"
+    with open(output.spill_path, encoding="utf-8") as spill:
+        assert spill.read() == "más\n"
+    os.remove(output.spill_path)
+
+
+def test_pending_limit_counts_utf8_bytes():
+    output = OutputStream(cap_bytes=4 * MAX_PENDING_BYTES)
+    line = "ñ" * (MAX_PENDING_BYTES // 4 - 1) + "\n"
+    output.write(line)
+    producer = threading.Thread(target=output.write, args=(line * 2,), daemon=True)
+    producer.start()
+    producer.join(0.3)
+    assert producer.is_alive()
+    assert output.drain() == line
+    producer.join(5)
+    assert output.drain() == line * 2
@@ -0,0 +1,71 @@
+from ide.skuld.lexer import tokenize
+from ide.skuld.parser import parse
+from ide.skuld.syntax_tree import Node
+
+
+def parse_source(source: str) -> tuple[Node, list]:
+    tokens, _diagnostics = tokenize(source)
+    return parse(tokens)
+
+
+def shape(node: Node) -> tuple:
+    return (node.kind, node.value, tuple(shape(child) for child in node.children))
+
+
+def test_top_level_items():
+    program, diagnostics = parse_source(
+        "labmem worldline g = 1;\n"
+        "steiner divergence f(worldline a, divergence b) { return a + b; }\n"
+        "gate { dmail << f(g, 2.0); }\n"
+    )
+    assert not diagnostics
+    assert [child.kind for child in program.children] == ["VarDecl", "Function", "Gate"]
+    function = program.children[1]
+    assert (function.value, function.type_name, function.line) == ("f", "divergence", 2)
+    params = function.children[0].children
+    assert [(param.value, param.type_name) for param in params] == [("a", "worldline"), ("b", "divergence")]
+
+
+def test_operator_precedence_and_parentheses():
+    program, _diagnostics = parse_source("gate { dmail << 1 + 2 * 3; dmail << (1 + 2) * 3; }")
+    first, second = program.children[0].children[0].children
+    assert shape(first.children[0]) == (
+        "Binary",
+        "+",
+        (("Literal", 1, ()), ("Binary", "*", (("Literal", 2, ()), ("Literal", 3, ())))),
+    )
+    assert shape(second.children[0]) == (
+        "Binary",
+        "*",
+        (("Binary", "+", (("Literal", 1, ()), ("Literal", 2, ()))), ("Literal", 3, ())),
+    )
+
+
+def test_logical_operator_spellings_are_normalised():
+    program, _diagnostics = parse_source("gate { dmail << a && b or not c; }")
+    expression = program.children[0].children[0].children[0].children[0]
+    assert shape(expression) == (
+        "Binary",
+        "or",
+        (
+            ("Binary", "and", (("Identifier", "a", ()), ("Identifier", "b", ()))),
+            ("Unary", "not", (("Identifier", "c", ()),)),
+        ),
+    )
+
+
+def test_error_recovery_reports_every_error_and_keeps_going():
+    program, diagnostics = parse_source(
+        "gate {\n"
+        "  labmem worldline x = ;\n"
+        "  dmail << 1;\n"
+        "  x = 5 y = 2;\n"
+        "  dmail << 2;\n"
+        "}\n"
+        "steiner worldline ok() { return 1; }\n"
+    )
+    assert [(diagnostic.phase, diagnostic.line) for diagnostic in diagnostics] == [("SINTACTICO", 2), ("SINTACTICO", 4)]
+    block = program.children[0].children[0]
+    assert [statement.kind for statement in block.children] == ["Output", "Output"]
+    assert program.children[1].value == "ok"
+
@@ -0,0 +1,13 @@
+from ide.skuld.bench import LOOP_PROGRAM
+from ide.skuld.phases import profile_phase
+
+
+def test_profile_samples_the_running_program():
+    output, errors, profile = profile_phase(LOOP_PROGRAM)
+    assert errors == ""
+    assert output.strip()
+    assert profile is not None
+    assert profile.samples > 0
+    assert profile.line_hits
+    assert all(line > 0 for line in profile.line_hits)
+    assert sum(profile.line_hits.values()) == profile.samples
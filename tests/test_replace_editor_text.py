@@ -0,0 +1,22 @@
+import pytest
+
+from ide.code_editor import CodeEditor
+from ide.main_window_sections.workspace_flow import replace_editor_text
+
+
+@pytest.mark.parametrize(
+    ("before", "after"),
+    [
+        ("// 😀 nota\nfoo = 1;\n", "// 😀 nota\nbar = 1;\n"),
+        ("a 😀😀 b foo c 😀", "a 😀😀 b barra c 😀"),
+        ("foo 😀", "😀 foo 😀"),
+        ("ñandú\n", "ñandú 😀\n"),
+    ],
+)
+def test_replace_editor_text_counts_utf16_positions(qapp, before, after):
+    editor = CodeEditor()
+    editor.setPlainText(before)
+    replace_editor_text(editor, after)
+    assert editor.toPlainText() == after
+    editor.undo()
+    assert editor.toPlainText() == before
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from ide.replace_in_files import ReplaceConflict, ReplaceRequest, apply_replacements, iter_plans, plan_text
+
+
+def test_literal_replacement_keeps_backslashes():
+    plan = plan_text("a.stn", "foo(1); Foo(2);\n", ReplaceRequest("foo", r"bar\1\n"))
+    assert plan.replaced == "bar\\1\\n(1); bar\\1\\n(2);\n"
+    assert plan.count == 2
+
+
+def test_regex_replacement_expands_groups():
+    request = ReplaceRequest(r"(\w+) = (\d+)", r"\2 = \1", regex=True, case_sensitive=True)
+    plan = plan_text("a.stn", "x = 1;\ny = 22;\n", request)
+    assert plan.replaced == "1 = x;\n22 = y;\n"
+    assert plan.first_changed_line() == 1
+
+
+def test_no_change_gives_no_plan():
+    assert plan_text("a.stn", "nada\n", ReplaceRequest("foo", "bar")) is None
+    assert plan_text("a.stn", "foo\n", ReplaceRequest("foo", "foo")) is None
+
+
+def test_overrides_are_planned_on_the_editor_text(tmp_path):
+    path = tmp_path / "a.stn"
+    path.write_text("foo en disco\n")
+    plans = list(iter_plans([str(path)], ReplaceRequest("foo", "bar"), {str(path): "foo sin guardar\n"}))
+    assert [plan.replaced for plan in plans] == ["bar sin guardar\n"]
+
+
+def make_plans(tmp_path, request):
+    paths = []
+    for index, text in enumerate(["foo uno\r\n", "dos foo\n", "foo\nfoo\n"]):
+        path = tmp_path / f"{index}.stn"
+        path.write_bytes(text.encode("utf-8"))
+        paths.append(str(path))
+    return paths, list(iter_plans(paths, request))
+
+
+def contents(paths):
+    return [open(path, "rb").read().decode("utf-8") for path in paths]
+
+
+def leftovers(tmp_path):
+    return [name for name in os.listdir(tmp_path) if name.startswith(".skuld-reemplazo-")]
+
+
+def test_apply_writes_every_file(tmp_path):
+    paths, plans = make_plans(tmp_path, ReplaceRequest("foo", "bar"))
+    apply_replacements(plans)
+    assert contents(paths) == ["bar uno\r\n", "dos bar\n", "bar\nbar\n"]
+    assert leftovers(tmp_path) == []
+
+
+def test_apply_refuses_files_changed_since_the_preview(tmp_path):
+    paths, plans = make_plans(tmp_path, ReplaceRequest("foo", "bar"))
+    with open(paths[1], "a", encoding="utf-8") as handle:
+        handle.write("editado\n")
+    with pytest.raises(ReplaceConflict) as raised:
+        apply_replacements(plans)
+    assert raised.value.paths == [paths[1]]
+    assert contents(paths) == ["foo uno\r\n", "dos foo\neditado\n", "foo\nfoo\n"]
+    assert leftovers(tmp_path) == []
+
+
+def test_apply_restores_replaced_files_when_one_fails(tmp_path, monkeypatch):
+    paths, plans = make_plans(tmp_path, ReplaceRequest("foo", "bar"))
+    real_replace = os.replace
+    failed = []
+
+    def flaky_replace(source, destination):
+        if destination == paths[2] and not failed:
+            failed.append(destination)
+            raise PermissionError(destination)
+        real_replace(source, destination)
+
+    monkeypatch.setattr(os, "replace", flaky_replace)
+    with pytest.raises(PermissionError):
+        apply_replacements(plans)
+    assert failed == [paths[2]]
+    assert contents(paths) == ["foo uno\r\n", "dos foo\n", "foo\nfoo\n"]
+    assert leftovers(tmp_path) == []
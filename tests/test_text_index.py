@@ -0,0 +1,103 @@
+import re
+
+import pytest
+
+from ide.text_index import MAX_INDEXED_BYTES, TrigramIndex, required_literals
+
+
+@pytest.mark.parametrize(
+    ("pattern", "literals"),
+    [
+        ("labmem", ["labmem"]),
+        (r"foo\.bar", ["foo.bar"]),
+        ("fo+bar", ["fo", "bar"]),
+        ("colou?r", ["colo", "r"]),
+        (r"gate\s*\(", ["gate", "("]),
+        ("x[abc]y", ["x", "y"]),
+        ("foo(bar)?baz", ["foo", "baz"]),
+        (r"\x41BC", ["BC"]),
+        (r"\xe9tude", ["tude"]),
+        (r"\U0001F600 ok", [" ok"]),
+        (r"\101bc", ["bc"]),
+        (r"\0abc", ["abc"]),
+        (r"(a)\1bc", ["bc"]),
+        (r"\N{EM DASH}abc", ["abc"]),
+        ("a{2,3}bc", ["bc"]),
+    ],
+)
+def test_required_literals(pattern, literals):
+    assert required_literals(pattern) == literals
+
+
+@pytest.mark.parametrize("pattern", ["foo|bar", "(?x)foo bar", "(?i)Foo", "(?s:a.b)cd", "abc(?-i:d)"])
+def test_required_literals_gives_up(pattern):
+    assert required_literals(pattern) is None
+
+
+@pytest.mark.parametrize(
+    ("pattern", "text"),
+    [
+        (r"\x41BC", "ABC"),
+        (r"\101bc", "Abc"),
+        (r"\0abc", "\0abc"),
+        (r"\N{EM DASH}abc", "—abc"),
+        (r"\xe9tude", "étude"),
+    ],
+)
+def test_required_literals_are_in_every_match(pattern, text):
+    assert re.fullmatch(pattern, text)
+    assert all(literal in text for literal in required_literals(pattern))
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_candidates_follow_updates_and_removals(tmp_path):
+    index = TrigramIndex()
+    first = write(tmp_path / "uno.stn", "labmem worldline x = 1;")
+    second = write(tmp_path / "dos.stn", "steiner dmail saludo() {}")
+    index.update([first, second])
+    assert len(index) == 2
+    assert index.candidates(["worldline"]) == [first]
+    assert index.candidates(["DMAIL"]) == [second]
+    assert index.candidates(["nada"]) == []
+    assert index.candidates(None) == sorted([first, second])
+    assert index.candidates(["ab"]) == sorted([first, second])
+
+    write(tmp_path / "uno.stn", "gate() { dmail << 1; } // más largo")
+    index.update([first, second])
+    assert index.candidates(["worldline"]) == []
+    assert index.candidates(["dmail"]) == sorted([first, second])
+
+    index.remove([second])
+    assert index.paths() == [first]
+    assert index.candidates(["steiner"]) == []
+
+    third = write(tmp_path / "tres.stn", "steiner otra")
+    index.update([third])
+    assert index.candidates(["steiner"]) == [third]
+    assert len(index.files) == 2
+
+
+def test_update_drops_deleted_files(tmp_path):
+    index = TrigramIndex()
+    path = write(tmp_path / "borrar.stn", "labmem x;")
+    index.update([path])
+    (tmp_path / "borrar.stn").unlink()
+    index.update([path])
+    assert len(index) == 0
+    assert index.candidates(["labmem"]) == []
+    assert not index.postings
+
+
+def test_large_files_are_always_candidates(tmp_path):
+    index = TrigramIndex()
+    small = write(tmp_path / "chico.stn", "labmem x;")
+    large = write(tmp_path / "grande.stn", "a" * (MAX_INDEXED_BYTES + 1))
+    index.update([small, large])
+    assert index.candidates(["zzzz"]) == [large]
+    index.remove([large])
+    assert index.candidates(["zzzz"]) == []
+    assert not index.unindexed